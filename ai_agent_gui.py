@@ -16,9 +16,11 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                            QHeaderView, QProgressBar, QCheckBox, QSpinBox,
                            QSplitter, QListWidget, QListWidgetItem)
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, pyqtSlot
-from PyQt5.QtGui import QFont, QIcon, QColor, QPalette, QPixmap, QPainter, QBrush
+from PyQt5.QtGui import QFont, QIcon, QColor, QPalette, QPixmap, QPainter, QBrush, QTextCursor
 from datetime import datetime
 
+from prewarm import ComponentPrewarmer, READY, FAILED
+
 # Importar o gerenciador de configurações
 try:
     from config_manager import ConfigManager
@@ -322,17 +324,44 @@ class DarkTheme:
             }
         """)
 
+def create_rag_system():
+    """Inicializa o sistema RAG (modelo de embeddings e índice); roda em background"""
+    rag_system = RAGSystem()
+    
+    # Ver documentos adicionados por outros processos (ex.: ingestão em lote)
+    if hasattr(rag_system, "start_auto_refresh"):
+        rag_system.start_auto_refresh()
+    return rag_system
+
 class AiAgentGUI(QMainWindow):
     """Interface gráfica principal do AiAgenteMCP"""
     
+    # Mudanças de prontidão vindas das threads de prewarm (nome, estado)
+    component_state_changed = pyqtSignal(str, str)
+    # Resposta do chat em streaming: trechos de texto e linha final
+    chat_delta = pyqtSignal(str)
+    chat_finished = pyqtSignal(str)
+    
     def __init__(self):
         super().__init__()
         self.agent = None
         self.rag_system = None
+        
+        # Componentes pesados (embeddings, índice FAISS) carregam em background
+        self.prewarmer = ComponentPrewarmer()
+        self.component_state_changed.connect(self.on_component_state_changed)
+        self.chat_delta.connect(self.on_chat_delta)
+        self.chat_finished.connect(self.on_chat_finished)
+        self.prewarmer.add_listener(lambda name, state, error: self.component_state_changed.emit(name, state))
+        
         self.init_ui()
         self.load_agent()
         self.load_rag_system()
         self.load_mcp_manager()
+        
+        self.readiness_label = QLabel(self.prewarmer.summary())
+        self.statusBar().addPermanentWidget(self.readiness_label)
+        self.prewarmer.start()
     
     def init_ui(self):
         """Inicializa a interface gráfica"""
@@ -1079,18 +1108,40 @@ class AiAgentGUI(QMainWindow):
             QMessageBox.warning(self, "Aviso", f"⚠️  Agente não disponível: {e}\nA interface funcionará em modo limitado")
     
     def load_rag_system(self):
-        """Carrega o sistema RAG"""
-        try:
-            if LANGCHAIN_AVAILABLE and RAGSystem:
-                self.rag_system = RAGSystem()
-                self.refresh_documents_list()
-                self.statusBar().showMessage("🧠 Sistema RAG carregado")
-            else:
-                self.rag_system = None
-                self.statusBar().showMessage("⚠️  Sistema RAG não disponível - modo limitado")
-        except Exception as e:
+        """Agenda o carregamento do sistema RAG em background"""
+        if LANGCHAIN_AVAILABLE and RAGSystem:
+            self.prewarmer.register("rag_system", create_rag_system, label="Sistema RAG")
+            self.statusBar().showMessage("🔄 Carregando sistema RAG em segundo plano...")
+        else:
+            self.rag_system = None
+            self.statusBar().showMessage("⚠️  Sistema RAG não disponível - modo limitado")
+    
+    @pyqtSlot(str, str)
+    def on_component_state_changed(self, name, state):
+        """Atualiza a prontidão na interface (thread principal)"""
+        if name == "rag_system" and state == READY:
+            self.rag_system = self.prewarmer.peek("rag_system")
+            self.refresh_documents_list()
+            self.statusBar().showMessage("🧠 Sistema RAG carregado")
+        elif name == "rag_system" and state == FAILED:
             self.rag_system = None
-            QMessageBox.warning(self, "Aviso", f"⚠️  Sistema RAG não disponível: {e}\nA interface funcionará em modo limitado")
+            error = self.prewarmer.status()[name]["error"]
+            QMessageBox.warning(self, "Aviso", f"⚠️  Sistema RAG não disponível: {error}\nA interface funcionará em modo limitado")
+        self.readiness_label.setText(self.prewarmer.summary())
+    
+    def rag_system_available(self) -> bool:
+        """O sistema RAG está pronto ou ainda carregando?"""
+        return bool(LANGCHAIN_AVAILABLE and RAGSystem) and self.prewarmer.state("rag_system") != FAILED
+    
+    def rag_system_or_warn(self):
+        """Sistema RAG, ou aviso se ainda estiver carregando ou indisponível"""
+        if self.rag_system:
+            return self.rag_system
+        if self.rag_system_available():
+            QMessageBox.information(self, "Aguarde", "⏳ O sistema RAG ainda está carregando")
+        else:
+            QMessageBox.warning(self, "Aviso", "⚠️  Sistema RAG não disponível")
+        return None
     
     def toggle_api_key_visibility(self):
         """Alterna visibilidade da API key"""
@@ -1170,7 +1221,7 @@ class AiAgentGUI(QMainWindow):
     def upload_pdf_file(self, file_path):
         """Faz upload de um arquivo PDF"""
         try:
-            if not self.rag_system:
+            if not self.rag_system_available():
                 QMessageBox.warning(self, "Aviso", "⚠️  Sistema RAG não disponível")
                 return
                 
@@ -1180,7 +1231,8 @@ class AiAgentGUI(QMainWindow):
             # Executar em thread separada para não travar a interface
             def upload_thread():
                 try:
-                    success = self.rag_system.add_document(file_path)
+                    # Espera só pelo sistema RAG, caso ainda esteja carregando
+                    success = self.prewarmer.get("rag_system").add_document(file_path)
                     
                     # Atualizar interface na thread principal
                     self.upload_progress.setVisible(False)
@@ -1210,7 +1262,10 @@ class AiAgentGUI(QMainWindow):
         try:
             if not self.rag_system:
                 self.documents_list.clear()
-                self.documents_list.addItem("⚠️  Sistema RAG não disponível")
+                if self.rag_system_available():
+                    self.documents_list.addItem("⏳ Sistema RAG carregando...")
+                else:
+                    self.documents_list.addItem("⚠️  Sistema RAG não disponível")
                 return
             
             self.documents_list.clear()
@@ -1228,8 +1283,7 @@ class AiAgentGUI(QMainWindow):
     def remove_selected_document(self):
         """Remove documento selecionado"""
         try:
-            if not self.rag_system:
-                QMessageBox.warning(self, "Aviso", "⚠️  Sistema RAG não disponível")
+            if not self.rag_system_or_warn():
                 return
                 
             current_item = self.documents_list.currentItem()
@@ -1262,8 +1316,7 @@ class AiAgentGUI(QMainWindow):
     def clear_all_documents(self):
         """Limpa todos os documentos"""
         try:
-            if not self.rag_system:
-                QMessageBox.warning(self, "Aviso", "⚠️  Sistema RAG não disponível")
+            if not self.rag_system_or_warn():
                 return
                 
             # Confirmar limpeza
@@ -1288,7 +1341,7 @@ class AiAgentGUI(QMainWindow):
     def perform_search(self):
         """Executa busca semântica"""
         try:
-            if not self.rag_system:
+            if not self.rag_system_available():
                 QMessageBox.warning(self, "Aviso", "⚠️  Sistema RAG não disponível")
                 return
                 
@@ -1302,7 +1355,7 @@ class AiAgentGUI(QMainWindow):
             # Executar busca em thread separada
             def search_thread():
                 try:
-                    results = self.rag_system.search(query, top_k=top_k)
+                    results = self.prewarmer.get("rag_system").search(query, top_k=top_k)
                     
                     # Atualizar interface na thread principal
                     if results:
@@ -1358,20 +1411,23 @@ class AiAgentGUI(QMainWindow):
             self.chat_area.append(f"👤 Você: {message}")
             self.message_input.clear()
             
-            # Processar mensagem em thread separada
+            self.chat_area.append("🤖 Agente: ")
+            
+            # Processar mensagem em thread separada; os trechos chegam via sinal
             def process_message():
                 try:
-                    response = self.agent.process_message(message)
+                    response = self.agent.process_message(message, on_delta=self.chat_delta.emit)
                     
-                    # Atualizar interface na thread principal
                     if response.success:
-                        self.chat_area.append(f"🤖 Agente: {response.message}")
-                        self.chat_area.append(f"📊 Modelo: {response.model_used}, Tokens: {response.tokens_used}")
+                        info = f"📊 Modelo: {response.model_used}, Tokens: {response.tokens_used}"
+                        if response.time_to_first_token is not None:
+                            info += f", Primeiro token: {response.time_to_first_token:.2f}s"
+                        self.chat_finished.emit(info)
                     else:
-                        self.chat_area.append(f"❌ Erro: {response.error_message}")
+                        self.chat_finished.emit(f"❌ Erro: {response.error_message}")
                         
                 except Exception as e:
-                    self.chat_area.append(f"❌ Erro: {e}")
+                    self.chat_finished.emit(f"❌ Erro: {e}")
             
             thread = threading.Thread(target=process_message)
             thread.daemon = True
@@ -1380,6 +1436,16 @@ class AiAgentGUI(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Erro ao enviar mensagem: {e}")
     
+    def on_chat_delta(self, text):
+        """Acrescenta um trecho da resposta ao fim do chat"""
+        self.chat_area.moveCursor(QTextCursor.End)
+        self.chat_area.insertPlainText(text)
+        self.chat_area.ensureCursorVisible()
+    
+    def on_chat_finished(self, text):
+        """Fecha a resposta com modelo, tokens e tempo até o primeiro token"""
+        self.chat_area.append(text)
+    
     def load_mcp_manager(self):
         """Carrega o gerenciador de MCPs"""
         try:
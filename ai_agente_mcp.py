@@ -9,12 +9,22 @@ import json
 import requests
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, Callable, Generator
 from dataclasses import dataclass
 from pathlib import Path
 import threading
 import time
 
+from memory_accounting import (build_memory_report, cached_memory_report, deep_sizeof,
+                               model_parameter_bytes, PeriodicMemoryLogger)
+from llm_streaming import iter_sse_data, StreamTimer, collect_stream
+from response_cache import ResponseCache, make_cache_key
+from semantic_cache import SemanticResponseCache
+from async_llm_client import fan_out_sync, first_good_sync
+from token_counter import get_token_counter
+from openrouter_calculator import OpenRouterCalculator
+from context_window import select_history, messages_tokens, output_reserve, RollingSummary
+
 # Configuração de logging
 logging.basicConfig(
     level=logging.INFO,
@@ -47,6 +57,8 @@ class AgentResponse:
     response_time: float
     success: bool
     error_message: Optional[str] = None
+    time_to_first_token: Optional[float] = None
+    streamed: bool = False
 
 class OpenRouterClient:
     """Cliente para integração com OpenRouter"""
@@ -152,6 +164,82 @@ class OpenRouterClient:
                 error_message=str(e)
             )
 
+    def chat_completion_stream(self,
+                               messages: List[Dict[str, str]],
+                               model: str = "anthropic/claude-3-opus",
+                               max_tokens: int = 4096,
+                               temperature: float = 0.7) -> Generator[str, None, AgentResponse]:
+        """Versão em streaming (SSE): gera os deltas de texto e retorna o AgentResponse final"""
+        timer = StreamTimer()
+        parts = []
+        tokens_used = 0
+        
+        try:
+            payload = {
+                "model": model,
+                "messages": messages,
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+                "stream": True,
+                "usage": {"include": True}
+            }
+            
+            # Timeout de leitura vale entre eventos, não para a geração inteira
+            with self.session.post(
+                f"{self.base_url}/chat/completions",
+                json=payload,
+                stream=True,
+                timeout=(10, 30)
+            ) as response:
+                if response.status_code != 200:
+                    return AgentResponse(
+                        content="",
+                        model_used=model,
+                        tokens_used=0,
+                        response_time=timer.elapsed,
+                        success=False,
+                        error_message=f"API Error: {response.status_code} - {response.text}",
+                        streamed=True
+                    )
+                
+                for data in iter_sse_data(response.iter_lines()):
+                    event = json.loads(data)
+                    if "error" in event:
+                        raise RuntimeError(event["error"].get("message", event["error"]))
+                    
+                    if event.get("usage"):
+                        tokens_used = event["usage"].get("total_tokens", tokens_used)
+                    
+                    for choice in event.get("choices", []):
+                        delta = (choice.get("delta") or {}).get("content")
+                        if delta:
+                            timer.mark_token()
+                            parts.append(delta)
+                            yield delta
+            
+            return AgentResponse(
+                content="".join(parts),
+                model_used=model,
+                tokens_used=tokens_used,
+                response_time=timer.elapsed,
+                success=True,
+                time_to_first_token=timer.time_to_first_token,
+                streamed=True
+            )
+            
+        except Exception as e:
+            logger.error(f"Erro no streaming com OpenRouter: {e}")
+            return AgentResponse(
+                content="".join(parts),
+                model_used=model,
+                tokens_used=tokens_used,
+                response_time=timer.elapsed,
+                success=False,
+                error_message=str(e),
+                time_to_first_token=timer.time_to_first_token,
+                streamed=True
+            )
+
 class MCPTools:
     """Ferramentas MCP disponíveis para o agente"""
     
@@ -289,12 +377,41 @@ class AiAgenteMCP:
         self.current_model = self.config.get("default_model", "anthropic/claude-3-opus")
         self.agent_mode = self.config.get("agent_mode", "assistant")
         
-        # Cache para respostas
-        self.response_cache = {}
+        # Cache de respostas (LRU com TTL; chave inclui modelo, modo e janela de histórico)
+        self.response_cache = ResponseCache(
+            max_entries=self.config.get("cache_max_entries", 512),
+            ttl=self.config.get("cache_ttl", 3600),
+            db_path=self.config.get("cache_file") if self.config.get("cache_persist", False) else None
+        )
+        
+        # Cache semântico (opcional): reaproveita respostas de prompts parafraseados
+        self.semantic_cache = None
+        if self.config.get("semantic_cache_enabled", False):
+            self.semantic_cache = SemanticResponseCache(
+                threshold=self.config.get("semantic_cache_threshold", 0.92),
+                max_entries_per_scope=self.config.get("semantic_cache_max_entries", 256),
+                ttl=self.config.get("cache_ttl", 3600)
+            )
         
         # Threading para operações assíncronas
         self.lock = threading.Lock()
         
+        # Janela de histórico por orçamento de tokens (contexto de cada modelo)
+        self.models_info = OpenRouterCalculator.load_models_info()
+        self.token_counter = get_token_counter()
+        self.last_context_window: Dict[str, Any] = {}
+        self.history_summary = None
+        if self.config.get("summarize_history", False):
+            self.history_summary = RollingSummary(self._summarize_messages,
+                                                  self.config.get("summary_min_messages", 6))
+        
+        # Registro periódico de memória (0 desativa)
+        self.memory_logger = None
+        if self.config.get("memory_log_interval", 0) > 0:
+            self.memory_logger = PeriodicMemoryLogger("AiAgenteMCP", self.get_memory_usage,
+                                                      self.config["memory_log_interval"])
+            self.memory_logger.start()
+        
         logger.info("AiAgenteMCP inicializado com sucesso")
     
     def load_config(self) -> Dict[str, Any]:
@@ -315,7 +432,21 @@ class AiAgenteMCP:
                     "voice_enabled": False,
                     "browser_agent_enabled": False,
                     "cache_enabled": True,
-                    "cache_ttl": 3600
+                    "cache_ttl": 3600,
+                    "cache_max_entries": 512,
+                    "cache_persist": False,
+                    "cache_file": "config/response_cache.db",
+                    "history_window": 10,
+                    "history_token_budget": 8000,
+                    "default_context_length": 8192,
+                    "summarize_history": False,
+                    "summary_model": "",
+                    "summary_min_messages": 6,
+                    "semantic_cache_enabled": False,
+                    "semantic_cache_threshold": 0.92,
+                    "semantic_cache_max_entries": 256,
+                    "max_parallel_requests": 4,
+                    "streaming": True
                 }
                 
                 # Criar diretório de configuração se não existir
@@ -410,61 +541,170 @@ class AiAgenteMCP:
         
         return base_prompt + mode_instructions.get(self.agent_mode, "")
     
-    def process_message(self, message: str, use_cache: bool = True) -> AgentResponse:
-        """Processa uma mensagem e retorna resposta do agente"""
+    def context_length(self, model: Optional[str] = None) -> int:
+        """Tamanho de contexto do modelo (models_info da calculadora ou padrão da configuração)"""
+        info = self.models_info.get(model or self.current_model, {})
+        return info.get("context_length") or self.config.get("default_context_length", 8192)
+    
+    def build_messages(self, system_prompt: str, message: str) -> tuple:
+        """Mensagens a enviar, max_tokens ajustado ao contexto e mensagens que ficaram de fora
+        
+        O histórico entra do mais recente para o mais antigo enquanto couber em
+        contexto - reserva da resposta - sistema - mensagem atual, limitado por
+        history_token_budget e history_window.
+        """
+        model = self.current_model
+        context_length = self.context_length(model)
+        max_tokens = output_reserve(context_length, self.config.get("max_tokens", 4096))
+        count_batch = lambda texts: self.token_counter.count_batch(texts, model)
+        
+        fixed = [{"role": "system", "content": system_prompt}]
+        summary_message = self.history_summary.as_message() if self.history_summary else None
+        if summary_message:
+            fixed.append(summary_message)
+        current = {"role": "user", "content": message}
+        fixed_tokens = messages_tokens(fixed + [current], count_batch)
+        
+        budget = context_length - max_tokens - fixed_tokens
+        if self.config.get("history_token_budget", 0) > 0:
+            budget = min(budget, self.config["history_token_budget"])
+        if budget < 0:
+            logger.warning(f"Mensagem excede o contexto de {model} ({context_length} tokens)")
+        
+        with self.lock:
+            history = list(self.conversation_history)
+        window = self.config.get("history_window", 10)
+        kept, dropped, history_tokens = select_history(history, max(budget, 0), count_batch,
+                                                       max_messages=max(window - 1, 0))
+        
+        self.last_context_window = {
+            "model": model,
+            "context_length": context_length,
+            "history_budget": budget,
+            "history_tokens": history_tokens,
+            "prompt_tokens": fixed_tokens + history_tokens,
+            "messages_kept": len(kept),
+            "messages_dropped": len(dropped),
+            "summary": bool(summary_message)
+        }
+        
+        messages = fixed + [{"role": m["role"], "content": m["content"]} for m in kept] + [current]
+        return messages, max_tokens, dropped
+    
+    def _summarize_messages(self, current_summary: str, new_messages: List[Dict[str, Any]]) -> str:
+        """Resume turnos antigos com o LLM (modelo de resumo configurável)"""
+        if not self.openrouter_client:
+            return ""
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in new_messages)
+        prompt = ("Atualize o resumo da conversa com os novos turnos. Mantenha fatos, decisões, "
+                  "nomes e pendências; seja conciso (no máximo 200 palavras).\n\n"
+                  f"Resumo atual:\n{current_summary or '(vazio)'}\n\nNovos turnos:\n{transcript}")
+        response = self.openrouter_client.chat_completion(
+            messages=[{"role": "user", "content": prompt}],
+            model=self.config.get("summary_model") or self.current_model,
+            max_tokens=400,
+            temperature=0.2
+        )
+        return response.content if response.success else ""
+    
+    def process_message(self, message: str, use_cache: bool = True,
+                        on_delta: Optional[Callable[[str], None]] = None) -> AgentResponse:
+        """Processa uma mensagem e retorna resposta do agente
+        
+        Com on_delta, a resposta é recebida em streaming e cada trecho de texto
+        é repassado ao callback assim que chega.
+        """
         start_time = time.time()
         
-        # Verificar cache
+        # Preparar mensagens para o modelo: sistema + resumo + histórico que cabe no orçamento + mensagem atual
+        system_prompt = self.get_context_prompt()
+        messages, max_tokens, dropped = self.build_messages(system_prompt, message)
+        temperature = self.config.get("temperature", 0.7)
+        
+        # Verificar cache (mesma resposta só no mesmo contexto de conversa)
+        cache_key = None
         if use_cache and self.config.get("cache_enabled", True):
-            cache_key = f"{self.current_model}:{message}"
-            if cache_key in self.response_cache:
-                cached_response = self.response_cache[cache_key]
-                if time.time() - cached_response["timestamp"] < self.config.get("cache_ttl", 3600):
-                    logger.info("Resposta obtida do cache")
-                    return AgentResponse(
-                        content=cached_response["content"],
-                        model_used=self.current_model,
-                        tokens_used=cached_response["tokens_used"],
-                        response_time=time.time() - start_time,
-                        success=True
-                    )
+            cache_key = make_cache_key(self.current_model, system_prompt, self.agent_mode, messages[1:],
+                                       temperature=temperature, max_tokens=max_tokens)
+            cached_response = self.response_cache.get(cache_key)
+            if cached_response:
+                logger.info("Resposta obtida do cache")
+                self.add_to_history("user", message)
+                self.add_to_history("assistant", cached_response["content"])
+                if on_delta:
+                    on_delta(cached_response["content"])
+                elapsed = time.time() - start_time
+                return AgentResponse(
+                    content=cached_response["content"],
+                    model_used=self.current_model,
+                    tokens_used=cached_response["tokens_used"],
+                    response_time=elapsed,
+                    success=True,
+                    time_to_first_token=elapsed
+                )
+        
+        # Cache semântico: prompt equivalente já respondido no mesmo modo e modelo.
+        # Só para turnos independentes (sem histórico nem resumo na janela enviada):
+        # "e em Python?" depende da conversa e não pode reaproveitar a resposta de outra
+        semantic_scope = f"{self.agent_mode}:{self.current_model}"
+        use_semantic = use_cache and self.semantic_cache is not None and len(messages) == 2
+        if use_semantic:
+            similar = self.semantic_cache.lookup(message, semantic_scope)
+            if similar:
+                logger.info(f"Resposta obtida do cache semântico (similaridade {similar['similarity']:.3f})")
+                self.add_to_history("user", message)
+                self.add_to_history("assistant", similar["response"])
+                if on_delta:
+                    on_delta(similar["response"])
+                elapsed = time.time() - start_time
+                return AgentResponse(
+                    content=similar["response"],
+                    model_used=self.current_model,
+                    tokens_used=similar["tokens_used"],
+                    response_time=elapsed,
+                    success=True,
+                    time_to_first_token=elapsed
+                )
         
         # Adicionar mensagem ao histórico
         self.add_to_history("user", message)
         
-        # Preparar mensagens para o modelo
-        messages = [
-            {"role": "system", "content": self.get_context_prompt()}
-        ]
-        
-        # Adicionar histórico recente (últimas 10 mensagens)
-        recent_history = self.conversation_history[-10:]
-        for msg in recent_history:
-            messages.append({"role": msg["role"], "content": msg["content"]})
-        
         # Obter resposta do modelo
         if self.openrouter_client:
-            response = self.openrouter_client.chat_completion(
+            request = dict(
                 messages=messages,
                 model=self.current_model,
-                max_tokens=self.config.get("max_tokens", 4096),
-                temperature=self.config.get("temperature", 0.7)
+                max_tokens=max_tokens,
+                temperature=temperature
             )
+            if on_delta and self.config.get("streaming", True):
+                response = collect_stream(self.openrouter_client.chat_completion_stream(**request), on_delta)
+            else:
+                response = self.openrouter_client.chat_completion(**request)
+                if on_delta and response.success:
+                    on_delta(response.content)
             
             if response.success:
                 # Adicionar resposta ao histórico
                 self.add_to_history("assistant", response.content)
                 
                 # Salvar no cache
-                if use_cache and self.config.get("cache_enabled", True):
-                    cache_key = f"{self.current_model}:{message}"
-                    self.response_cache[cache_key] = {
-                        "content": response.content,
-                        "tokens_used": response.tokens_used,
-                        "timestamp": time.time()
-                    }
+                if cache_key:
+                    self.response_cache.put(cache_key, response.content, response.tokens_used,
+                                            response.response_time, self.current_model)
+                if use_semantic:
+                    self.semantic_cache.store(message, response.content, semantic_scope,
+                                              response.tokens_used, response.response_time)
+                
+                # Turnos fora da janela entram no resumo em background
+                if self.history_summary and dropped:
+                    self.history_summary.update_in_background(dropped)
                 
-                logger.info(f"Resposta gerada com sucesso usando {self.current_model}")
+                if response.time_to_first_token is not None:
+                    logger.info(f"Resposta gerada com sucesso usando {self.current_model} "
+                                f"(primeiro token em {response.time_to_first_token:.2f}s)")
+                else:
+                    logger.info(f"Resposta gerada com sucesso usando {self.current_model}")
                 return response
             else:
                 logger.error(f"Erro ao gerar resposta: {response.error_message}")
@@ -481,6 +721,40 @@ class AiAgenteMCP:
                 error_message=error_msg
             )
     
+    def ask_models(self, message: str, models: List[str], first_good: bool = False,
+                   deadline: Optional[float] = None) -> List[AgentResponse]:
+        """Envia a mensagem a vários modelos em paralelo (não altera o histórico)
+        
+        Com first_good, retorna apenas a primeira resposta válida dentro do prazo.
+        """
+        api_key = self.config.get("openrouter_api_key")
+        if not api_key:
+            logger.error("OpenRouter não configurado. Configure a API key primeiro.")
+            return []
+        
+        messages = [
+            {"role": "system", "content": self.get_context_prompt()},
+            {"role": "user", "content": message}
+        ]
+        params = dict(max_tokens=self.config.get("max_tokens", 4096),
+                      temperature=self.config.get("temperature", 0.7))
+        client_options = {"max_concurrency": self.config.get("max_parallel_requests", 4),
+                          "timeout": self.config.get("timeout", 30)}
+        try:
+            if first_good:
+                result = first_good_sync(api_key, messages, models, deadline, client_options, **params)
+                results = [result] if result else []
+            else:
+                results = fan_out_sync(api_key, messages, models, client_options, **params)
+        except Exception as e:
+            logger.error(f"Erro ao consultar modelos em paralelo: {e}")
+            return []
+        
+        return [AgentResponse(content=r.content, model_used=r.model, tokens_used=r.tokens_used,
+                              response_time=r.response_time, success=r.success,
+                              error_message=r.error_message)
+                for r in results]
+    
     def execute_tool(self, tool_category: str, tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Executa uma ferramenta MCP específica"""
         try:
@@ -514,14 +788,30 @@ class AiAgenteMCP:
             "openrouter_configured": self.openrouter_client is not None,
             "config_file": self.config_file,
             "cache_enabled": self.config.get("cache_enabled", True),
+            "cache": self.response_cache.stats(),
+            "semantic_cache": self.semantic_cache.stats() if self.semantic_cache else None,
+            "context_window": self.last_context_window,
             "voice_enabled": self.config.get("voice_enabled", False),
-            "browser_agent_enabled": self.config.get("browser_agent_enabled", False)
+            "browser_agent_enabled": self.config.get("browser_agent_enabled", False),
+            "memory": cached_memory_report(self)
         }
     
+    def get_memory_usage(self) -> Dict[str, Any]:
+        """Memória aproximada dos caches de respostas (exato e semântico) e do histórico"""
+        semantic_cache = self.semantic_cache
+        return build_memory_report({
+            "response_cache": deep_sizeof(self.response_cache),
+            "semantic_cache": deep_sizeof(semantic_cache._scopes) if semantic_cache else 0,
+            "semantic_cache_model": model_parameter_bytes(semantic_cache.embedding_model()) if semantic_cache else 0,
+            "conversation_history": deep_sizeof(self.conversation_history)
+        })
+    
     def clear_history(self):
         """Limpa o histórico de conversa"""
         with self.lock:
             self.conversation_history.clear()
+        if self.history_summary:
+            self.history_summary.reset()
         logger.info("Histórico de conversa limpo")
     
     def export_conversation(self, filepath: str) -> bool:
@@ -543,6 +833,8 @@ class AiAgenteMCP:
             
             with self.lock:
                 self.conversation_history = imported_history
+            if self.history_summary:
+                self.history_summary.reset()
             
             logger.info(f"Conversa importada de: {filepath}")
             return True
@@ -1,16 +1,20 @@
 import os
 import json
-import datetime
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 import logging
 import subprocess
 import threading
+import uuid
+import requests
 from dotenv import load_dotenv
 
 # Import our custom modules
 from scripts.web_search import WebSearch, ExternalAPIClient
 from scripts.docs_manager import DocsManager
+from ollama_client import get_ollama_client, OllamaRequestCancelled
+from ollama_inventory import get_model_inventory
+from history_store import HistoryStore
 
 # Load environment variables
 load_dotenv()
@@ -38,31 +42,49 @@ PROMPTS_DIR = "PROMPTS"
 web_search = WebSearch()
 api_client = ExternalAPIClient()
 docs_manager = DocsManager()
+# Created by init_app() so importing this module (e.g. import_profiler) has no side effects
+ollama_client = None
+ollama_inventory = None
+history_store = None
+_init_lock = threading.Lock()
 
-# Ensure PROMPTS directory exists
-os.makedirs(PROMPTS_DIR, exist_ok=True)
+def init_app():
+    """Start the Ollama client, the model inventory and the history store (once per process)"""
+    global ollama_client, ollama_inventory, history_store
+    with _init_lock:
+        if history_store is not None:
+            return app
+        # Keep-alive connection pool to the Ollama API (OLLAMA_HOST, OLLAMA_KEEP_ALIVE)
+        ollama_client = get_ollama_client()
+        # Installed models from /api/tags, refreshed in the background (the UI polls /api/status)
+        ollama_inventory = get_model_inventory(ollama_client.base_url)
+        ollama_inventory.start()
+
+        # Ensure PROMPTS directory exists
+        os.makedirs(PROMPTS_DIR, exist_ok=True)
+
+        # Conversation history (SQLite, append-only); imports legacy PROMPTS/*.json once
+        history_store = HistoryStore(os.path.join(PROMPTS_DIR, "history.db"))
+        history_store.migrate_directory(PROMPTS_DIR)
+    return app
+
+@app.before_request
+def ensure_initialized():
+    """Initialize on the first request when served by "flask run" or a WSGI server"""
+    if history_store is None:
+        init_app()
 
 # Helper functions
-def save_prompt(user_input, ai_response):
-    """Save conversation to the PROMPTS directory"""
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{PROMPTS_DIR}/prompt_{timestamp}.json"
-    
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump({
-            "timestamp": timestamp,
-            "user_input": user_input,
-            "ai_response": ai_response
-        }, f, ensure_ascii=False, indent=2)
-    
-    logger.info(f"Prompt saved to {filename}")
-    return filename
+def save_prompt(user_input, ai_response, technology=None, model=None):
+    """Append the conversation to the history store"""
+    entry_id = history_store.append(user_input, ai_response, technology=technology, model=model)
+    logger.info(f"Prompt saved to history (id {entry_id})")
+    return entry_id
 
 def check_ollama_model(model_name):
-    """Check if the specified Ollama model is available"""
+    """Check if the specified Ollama model is available (cached inventory, no process spawn)"""
     try:
-        result = subprocess.run(["ollama", "list"], capture_output=True, text=True)
-        return model_name in result.stdout
+        return ollama_inventory.has_model(model_name)
     except Exception as e:
         logger.error(f"Error checking Ollama model: {e}")
         return False
@@ -138,17 +160,14 @@ def get_technology_from_command(command_text):
     else:
         return None
 
-def query_ollama(model_name, prompt):
-    """Query the Ollama model with the given prompt"""
+def query_ollama(model_name, prompt, request_id=None):
+    """Query the Ollama model with the given prompt through the pooled HTTP client"""
     try:
-        result = subprocess.run(
-            ["ollama", "run", model_name, prompt],
-            capture_output=True,
-            text=True,
-            timeout=30  # Set a timeout for the command
-        )
-        return result.stdout.strip()
-    except subprocess.TimeoutExpired:
+        result = ollama_client.generate(model_name, prompt, request_id=request_id)
+        return result["text"].strip()
+    except OllamaRequestCancelled:
+        return "Request cancelled."
+    except requests.Timeout:
         return "The model took too long to respond. Please try a simpler request."
     except Exception as e:
         logger.error(f"Error querying Ollama: {e}")
@@ -189,6 +208,7 @@ def status():
     
     return jsonify({
         'vosk_available': vosk_available,
+        'ollama_available': ollama_inventory.is_available(),
         'models': model_status,
         'docs': {k: v['downloaded'] for k, v in docs_status.items()},
         'apis': api_status
@@ -208,6 +228,7 @@ def process_command():
     
     # Detect technology 
     technology = data.get('technology') or get_technology_from_command(command_text)
+    request_id = data.get('request_id')
     
     # Check if this is a request to use an external API
     external_apis = ['openai', 'gemini', 'openrouter', 'deepseek', 'grok']
@@ -218,10 +239,10 @@ def process_command():
         prompt = generate_prompt_for_command(command_text, technology, use_docs, use_web)
         
         # Query the AI model
-        ai_response = query_ollama(model_name, prompt)
+        ai_response = query_ollama(model_name, prompt, request_id)
     
     # Save the conversation
-    save_prompt(command_text, ai_response)
+    save_prompt(command_text, ai_response, technology, model_name)
     
     return jsonify({
         'technology': technology,
@@ -230,21 +251,70 @@ def process_command():
         'model_used': model_name
     })
 
+@app.route('/api/process_command/stream', methods=['POST'])
+def process_command_stream():
+    """Stream the Ollama answer as NDJSON lines: start, delta..., done (or error)"""
+    data = request.json
+    command_text = data.get('command', '')
+    model_name = data.get('model', DEFAULT_MODEL)
+    use_web = data.get('use_web', False)
+    use_docs = data.get('use_docs', True)
+    
+    if not command_text:
+        return jsonify({'error': 'Empty command'}), 400
+    
+    technology = data.get('technology') or get_technology_from_command(command_text)
+    prompt = generate_prompt_for_command(command_text, technology, use_docs, use_web)
+    request_id = data.get('request_id') or uuid.uuid4().hex
+    
+    def generate():
+        yield json.dumps({'type': 'start', 'request_id': request_id, 'technology': technology}) + "\n"
+        parts = []
+        try:
+            stream = ollama_client.generate_stream(model_name, prompt, request_id=request_id)
+            for delta in stream:
+                parts.append(delta)
+                yield json.dumps({'type': 'delta', 'text': delta}) + "\n"
+            ai_response = "".join(parts).strip()
+            save_prompt(command_text, ai_response, technology, model_name)
+            yield json.dumps({
+                'type': 'done',
+                'technology': technology,
+                'original_command': command_text,
+                'ai_response': ai_response,
+                'model_used': model_name
+            }) + "\n"
+        except OllamaRequestCancelled:
+            yield json.dumps({'type': 'cancelled', 'request_id': request_id}) + "\n"
+        except Exception as e:
+            logger.error(f"Error streaming from Ollama: {e}")
+            yield json.dumps({'type': 'error', 'error': str(e)}) + "\n"
+        finally:
+            # Client disconnected mid-stream: stop the generation on the Ollama side too
+            ollama_client.cancel(request_id)
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/cancel/<request_id>', methods=['POST'])
+def cancel_request(request_id):
+    return jsonify({'cancelled': ollama_client.cancel(request_id)})
+
 @app.route('/api/history', methods=['GET'])
 def get_history():
-    prompts = []
-    for filename in os.listdir(PROMPTS_DIR):
-        if filename.endswith('.json'):
-            try:
-                with open(os.path.join(PROMPTS_DIR, filename), 'r', encoding='utf-8') as f:
-                    prompts.append(json.load(f))
-            except Exception as e:
-                logger.error(f"Error loading prompt file {filename}: {e}")
-    
-    # Sort by timestamp
-    prompts.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+    """Newest first; ?limit=&cursor=&q=&since=&until=&technology= (since/until: ISO or epoch)"""
+    try:
+        page = history_store.query(
+            limit=request.args.get('limit', 20, type=int),
+            cursor=request.args.get('cursor'),
+            since=request.args.get('since'),
+            until=request.args.get('until'),
+            search=request.args.get('q'),
+            technology=request.args.get('technology')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    return jsonify(prompts)
+    return jsonify(page)
 
 @app.route('/api/web_search', methods=['POST'])
 def web_search_route():
@@ -311,4 +381,5 @@ if __name__ == '__main__':
         logger.info("Please install Ollama from https://ollama.ai/")
     
     # Start the server
+    init_app()
     app.run(debug=True) 
\ No newline at end of file
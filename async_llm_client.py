@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Cliente assíncrono para APIs de chat compatíveis com OpenAI (OpenRouter)
+Um pool de conexões aiohttp compartilhado, com limite de requisições
+simultâneas, permite consultar vários modelos em paralelo: todos os
+resultados (fan-out) ou o primeiro resultado bom dentro de um prazo.
+"""
+
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Callable, Sequence
+
+from lazy_imports import module_available, lazy_import
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+AIOHTTP_AVAILABLE = module_available("aiohttp")
+if AIOHTTP_AVAILABLE:
+    aiohttp = lazy_import("aiohttp")
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+@dataclass
+class LLMResult:
+    """Resposta de um modelo (ou o erro) em uma consulta paralela"""
+    model: str
+    content: str
+    success: bool
+    tokens_used: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    response_time: float = 0.0
+    error_message: Optional[str] = None
+
+class AsyncLLMClient:
+    """Cliente com pool de conexões e semáforo de concorrência
+
+    Use como "async with AsyncLLMClient(api_key) as client"; a sessão é
+    criada no loop em que o cliente é usado.
+    """
+
+    def __init__(self, api_key: str, base_url: str = OPENROUTER_BASE_URL,
+                 max_concurrency: int = 8, pool_size: int = 32, timeout: float = 60.0,
+                 headers: Optional[Dict[str, str]] = None):
+        if not AIOHTTP_AVAILABLE:
+            raise ImportError("aiohttp não disponível. Instale com: pip install aiohttp")
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://ailocal.com",
+            "X-Title": "AILocal Agent"
+        }
+        self.headers.update(headers or {})
+        self._session = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout, sock_connect=10)
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self):
+        self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def chat_completion(self, messages: List[Dict[str, str]], model: str,
+                              max_tokens: int = 4096, temperature: float = 0.7) -> LLMResult:
+        """Uma requisição /chat/completions; erros viram LLMResult com success=False"""
+        session = self._get_session()
+        payload = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature
+        }
+
+        async with self._semaphore:
+            start = time.perf_counter()
+            try:
+                async with session.post(f"{self.base_url}/chat/completions", json=payload) as response:
+                    if response.status != 200:
+                        text = await response.text()
+                        return LLMResult(model, "", False, response_time=time.perf_counter() - start,
+                                         error_message=f"API Error: {response.status} - {text}")
+                    data = await response.json(content_type=None)
+
+                usage = data.get("usage") or {}
+                return LLMResult(
+                    model=model,
+                    content=data["choices"][0]["message"]["content"] or "",
+                    success=True,
+                    tokens_used=usage.get("total_tokens", 0),
+                    prompt_tokens=usage.get("prompt_tokens", 0),
+                    completion_tokens=usage.get("completion_tokens", 0),
+                    response_time=time.perf_counter() - start
+                )
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                return LLMResult(model, "", False, response_time=time.perf_counter() - start,
+                                 error_message="Tempo limite excedido")
+            except Exception as e:
+                logger.error(f"Erro na requisição ao modelo {model}: {e}")
+                return LLMResult(model, "", False, response_time=time.perf_counter() - start,
+                                 error_message=str(e))
+
+    async def fan_out(self, messages: List[Dict[str, str]], models: Sequence[str],
+                      **params) -> List[LLMResult]:
+        """Consulta todos os modelos em paralelo; resultados na ordem de models"""
+        return list(await asyncio.gather(*(self.chat_completion(messages, model, **params)
+                                           for model in models)))
+
+    async def first_good(self, messages: List[Dict[str, str]], models: Sequence[str],
+                         deadline: Optional[float] = None,
+                         accept: Optional[Callable[[LLMResult], bool]] = None,
+                         **params) -> Optional[LLMResult]:
+        """Primeiro resultado aceito dentro do prazo (s); as demais requisições são canceladas
+
+        Por padrão aceita qualquer resposta bem-sucedida e não vazia.
+        """
+        accept = accept or (lambda result: result.success and bool(result.content.strip()))
+        loop = asyncio.get_running_loop()
+        end = None if deadline is None else loop.time() + deadline
+        pending = {asyncio.ensure_future(self.chat_completion(messages, model, **params))
+                   for model in models}
+        try:
+            while pending:
+                remaining = None if end is None else end - loop.time()
+                if remaining is not None and remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if accept(result):
+                        return result
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+def _run(coroutine_factory: Callable[[AsyncLLMClient], Any], api_key: str, **client_options):
+    async def main():
+        async with AsyncLLMClient(api_key, **client_options) as client:
+            return await coroutine_factory(client)
+    return asyncio.run(main())
+
+def fan_out_sync(api_key: str, messages: List[Dict[str, str]], models: Sequence[str],
+                 client_options: Optional[Dict[str, Any]] = None, **params) -> List[LLMResult]:
+    """fan_out para código síncrono (threads da GUI, calculadora)"""
+    return _run(lambda client: client.fan_out(messages, models, **params), api_key, **(client_options or {}))
+
+def first_good_sync(api_key: str, messages: List[Dict[str, str]], models: Sequence[str],
+                    deadline: Optional[float] = None, client_options: Optional[Dict[str, Any]] = None,
+                    **params) -> Optional[LLMResult]:
+    """first_good para código síncrono"""
+    return _run(lambda client: client.first_good(messages, models, deadline, **params),
+                api_key, **(client_options or {}))
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Janela de contexto limitada por orçamento de tokens
+Escolhe as mensagens mais recentes do histórico que cabem no contexto do
+modelo (descontando prompt de sistema, mensagem atual e reserva para a
+resposta) e, opcionalmente, mantém um resumo incremental dos turnos que
+ficaram de fora.
+"""
+
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Tokens de formatação por mensagem (papel, delimitadores) no formato de chat
+MESSAGE_OVERHEAD_TOKENS = 4
+
+CountBatch = Callable[[List[str]], List[int]]
+Message = Dict[str, Any]
+
+def output_reserve(context_length: int, max_tokens: int) -> int:
+    """Tokens reservados para a resposta; no máximo metade do contexto"""
+    return max(1, min(max_tokens, context_length // 2))
+
+def messages_tokens(messages: List[Message], count_batch: CountBatch) -> int:
+    """Tokens de uma lista de mensagens, incluindo a formatação do chat"""
+    if not messages:
+        return 0
+    counts = count_batch([m.get("content", "") for m in messages])
+    return sum(counts) + MESSAGE_OVERHEAD_TOKENS * len(messages)
+
+def select_history(history: List[Message], budget: int, count_batch: CountBatch,
+                   max_messages: Optional[int] = None) -> Tuple[List[Message], List[Message], int]:
+    """Mensagens mais recentes que cabem no orçamento
+
+    Retorna (mantidas, descartadas, tokens das mantidas), ambas em ordem
+    cronológica. A seleção para na primeira mensagem que não cabe, para não
+    deixar lacunas no meio da conversa.
+    """
+    if max_messages is None:
+        candidates = list(history)
+    else:
+        candidates = history[-max_messages:] if max_messages > 0 else []
+    counts = count_batch([m.get("content", "") for m in candidates]) if candidates else []
+
+    used = 0
+    kept_from = len(candidates)
+    for position in range(len(candidates) - 1, -1, -1):
+        cost = counts[position] + MESSAGE_OVERHEAD_TOKENS
+        if used + cost > budget:
+            break
+        used += cost
+        kept_from = position
+
+    kept = candidates[kept_from:]
+    dropped = history[:len(history) - len(kept)]
+    return kept, dropped, used
+
+class RollingSummary:
+    """Resumo incremental dos turnos que saíram da janela
+
+    summarize_fn(resumo_atual, novas_mensagens) -> novo resumo. Só é chamado
+    quando pelo menos min_new_messages mensagens novas ficaram de fora.
+    """
+
+    def __init__(self, summarize_fn: Callable[[str, List[Message]], str],
+                 min_new_messages: int = 6):
+        self.summarize_fn = summarize_fn
+        self.min_new_messages = min_new_messages
+        self.text = ""
+        self.covered_until = ""
+        # Incrementada por reset(): resumos em andamento de outra conversa são descartados
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._running = False
+
+    def pending(self, dropped: List[Message]) -> List[Message]:
+        """Mensagens descartadas ainda não incluídas no resumo"""
+        return [m for m in dropped if m.get("timestamp", "") > self.covered_until]
+
+    def as_message(self) -> Optional[Message]:
+        if not self.text:
+            return None
+        return {"role": "system", "content": f"Resumo da conversa anterior:\n{self.text}"}
+
+    def update(self, dropped: List[Message]) -> bool:
+        """Incorpora ao resumo as mensagens descartadas novas (bloqueia durante a chamada)"""
+        new_messages = self.pending(dropped)
+        if len(new_messages) < self.min_new_messages:
+            return False
+        with self._lock:
+            if self._running:
+                return False
+            self._running = True
+            generation = self.generation
+            current_text = self.text
+        try:
+            summary = self.summarize_fn(current_text, new_messages)
+            with self._lock:
+                if not summary or generation != self.generation:
+                    return False
+                self.text = summary.strip()
+                self.covered_until = new_messages[-1].get("timestamp", "")
+                return True
+        except Exception as e:
+            logger.error(f"Erro ao resumir histórico: {e}")
+            return False
+        finally:
+            with self._lock:
+                self._running = False
+
+    def update_in_background(self, dropped: List[Message]):
+        """update() em thread separada, para não atrasar a resposta atual"""
+        if len(self.pending(dropped)) >= self.min_new_messages and not self._running:
+            threading.Thread(target=self.update, args=(list(dropped),),
+                             name="history-summary", daemon=True).start()
+
+    def reset(self):
+        with self._lock:
+            self.generation += 1
+            self.text = ""
+            self.covered_until = ""
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Redução de dimensionalidade de embeddings (PCA) para o sistema RAG
+A projeção é aprendida sobre uma amostra, salva ao lado do índice e aplicada
+tanto na indexação quanto nas queries. Inclui benchmark de recall@k contra
+o índice de dimensão completa.
+"""
+
+import time
+import hashlib
+import logging
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PCA_FILE_NAME = "pca_projection.npz"
+
+class PCAProjection:
+    """Projeção PCA aprendida (média + componentes principais)"""
+
+    def __init__(self, mean: np.ndarray, components: np.ndarray,
+                 explained_variance_ratio: Optional[np.ndarray] = None):
+        self.mean = mean.astype('float32')
+        self.components = components.astype('float32')  # (dim_saida, dim_entrada)
+        self.explained_variance_ratio = explained_variance_ratio
+
+    @property
+    def input_dim(self) -> int:
+        return self.components.shape[1]
+
+    @property
+    def output_dim(self) -> int:
+        return self.components.shape[0]
+
+    @property
+    def signature(self) -> str:
+        """Identificador da projeção (muda a cada novo ajuste)"""
+        digest = hashlib.sha1(self.components.tobytes())
+        digest.update(self.mean.tobytes())
+        return digest.hexdigest()[:12]
+
+    @classmethod
+    def fit(cls, embeddings: np.ndarray, target_dim: int,
+            sample_size: int = 5000, seed: int = 42) -> "PCAProjection":
+        """Ajusta a projeção sobre uma amostra dos embeddings"""
+        embeddings = np.asarray(embeddings, dtype='float32')
+        if target_dim >= embeddings.shape[1]:
+            raise ValueError(f"Dimensão alvo {target_dim} deve ser menor que {embeddings.shape[1]}")
+        if embeddings.shape[0] < target_dim:
+            raise ValueError(f"Amostra insuficiente: {embeddings.shape[0]} vetores para {target_dim} dimensões")
+
+        if embeddings.shape[0] > sample_size:
+            rng = np.random.default_rng(seed)
+            embeddings = embeddings[rng.choice(embeddings.shape[0], sample_size, replace=False)]
+
+        mean = embeddings.mean(axis=0)
+        centered = embeddings - mean
+        _, singular_values, vt = np.linalg.svd(centered, full_matrices=False)
+
+        variance = singular_values ** 2
+        explained = variance[:target_dim] / variance.sum()
+        logger.info(f"PCA ajustado: {embeddings.shape[1]} -> {target_dim} dimensões "
+                    f"({explained.sum():.1%} da variância)")
+
+        return cls(mean, vt[:target_dim], explained)
+
+    def transform(self, embeddings: np.ndarray) -> np.ndarray:
+        """Projeta e renormaliza (para similaridade de cosseno via produto interno)"""
+        projected = (np.asarray(embeddings, dtype='float32') - self.mean) @ self.components.T
+        norms = np.linalg.norm(projected, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return np.ascontiguousarray(projected / norms, dtype='float32')
+
+    def save(self, path: Path):
+        """Salva a projeção em disco"""
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp.npz")
+        np.savez(tmp_path, mean=self.mean, components=self.components,
+                 explained_variance_ratio=(self.explained_variance_ratio
+                                           if self.explained_variance_ratio is not None
+                                           else np.array([], dtype='float32')))
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["PCAProjection"]:
+        """Carrega a projeção, se existir"""
+        path = Path(path)
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            explained = data["explained_variance_ratio"]
+            return cls(data["mean"], data["components"], explained if explained.size else None)
+
+def recall_at_k(reference_ids: np.ndarray, candidate_ids: np.ndarray, k: int) -> float:
+    """Fração média dos k vizinhos de referência encontrados pelo candidato"""
+    hits = 0
+    for reference, candidate in zip(reference_ids[:, :k], candidate_ids[:, :k]):
+        hits += len(set(reference.tolist()) & set(candidate.tolist()))
+    return hits / (len(reference_ids) * k) if len(reference_ids) else 0.0
+
+def benchmark_pca_recall(vectors: np.ndarray,
+                         query_vectors: np.ndarray,
+                         dims: Sequence[int] = (64, 128, 192, 256),
+                         k: int = 10,
+                         sample_size: int = 5000) -> List[Dict[str, Any]]:
+    """Compara recall@k, tamanho e latência do índice reduzido com o completo"""
+    import faiss
+
+    vectors = np.ascontiguousarray(vectors, dtype='float32')
+    query_vectors = np.ascontiguousarray(query_vectors, dtype='float32')
+    k = min(k, vectors.shape[0])
+
+    full_index = faiss.IndexFlatIP(vectors.shape[1])
+    full_index.add(vectors)
+    start = time.perf_counter()
+    _, reference_ids = full_index.search(query_vectors, k)
+    full_latency = (time.perf_counter() - start) / max(len(query_vectors), 1)
+
+    report = [{
+        "dim": vectors.shape[1],
+        f"recall@{k}": 1.0,
+        "index_bytes": vectors.nbytes,
+        "size_ratio": 1.0,
+        "query_ms": round(full_latency * 1000, 4),
+        "explained_variance": 1.0
+    }]
+
+    for dim in dims:
+        if dim >= vectors.shape[1] or dim > vectors.shape[0]:
+            continue
+
+        projection = PCAProjection.fit(vectors, dim, sample_size=sample_size)
+        reduced = projection.transform(vectors)
+        reduced_index = faiss.IndexFlatIP(dim)
+        reduced_index.add(reduced)
+
+        start = time.perf_counter()
+        _, candidate_ids = reduced_index.search(projection.transform(query_vectors), k)
+        latency = (time.perf_counter() - start) / max(len(query_vectors), 1)
+
+        report.append({
+            "dim": dim,
+            f"recall@{k}": round(recall_at_k(reference_ids, candidate_ids, k), 4),
+            "index_bytes": reduced.nbytes,
+            "size_ratio": round(reduced.nbytes / vectors.nbytes, 4),
+            "query_ms": round(latency * 1000, 4),
+            "explained_variance": round(float(projection.explained_variance_ratio.sum()), 4)
+        })
+
+    return report
+
+def main():
+    """Benchmark de recall@k para escolher a dimensão alvo"""
+    import argparse
+    from rag_system import RAGSystem
+
+    parser = argparse.ArgumentParser(description="Benchmark de redução PCA dos embeddings do RAG")
+    parser.add_argument("--data-dir", default="rag_data")
+    parser.add_argument("--dims", type=int, nargs="+", default=[64, 128, 192, 256])
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200, help="Número de chunks usados como queries (retirados do índice avaliado)")
+    parser.add_argument("--apply", type=int, default=None, help="Ativa o PCA com esta dimensão após o benchmark")
+    args = parser.parse_args()
+
+    rag = RAGSystem(data_dir=args.data_dir)
+    report = rag.benchmark_pca_recall(dims=args.dims, k=args.k, n_queries=args.queries)
+
+    print(f"{'dim':>6} {'recall@' + str(args.k):>10} {'tamanho':>9} {'ms/query':>9} {'variância':>10}")
+    for row in report:
+        print(f"{row['dim']:>6} {row[f'recall@{args.k}']:>10.4f} {row['size_ratio']:>9.2f} "
+              f"{row['query_ms']:>9.4f} {row['explained_variance']:>10.4f}")
+
+    if args.apply:
+        rag.enable_pca(args.apply)
+
+if __name__ == "__main__":
+    main()
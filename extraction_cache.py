@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Cache de extração endereçado por conteúdo
+Guarda o texto (ou as páginas) extraído de cada arquivo, comprimido em disco,
+indexado por (hash do arquivo, extrator, versão). Reprocessar um documento
+após mudar o chunker ou o modelo de embeddings dispensa o parsing do PDF/DOCX/EPUB.
+O tamanho total é limitado com despejo dos itens menos usados (mtime).
+"""
+
+import os
+import json
+import zlib
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+from knowledge_watcher import hash_file
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "rag_data/extraction_cache"
+DEFAULT_MAX_SIZE_MB = 512
+ENTRY_SUFFIX = ".json.z"
+
+class ExtractionCache:
+    """Cache em disco do conteúdo extraído de documentos
+
+    Cada entrada é um arquivo independente (gravado de forma atômica), então
+    vários processos podem compartilhar o mesmo diretório.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_size_mb: float = DEFAULT_MAX_SIZE_MB):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Hash por (caminho, tamanho, mtime) para não reler arquivos inalterados
+        self._file_hashes: Dict[Tuple[str, int, int], str] = {}
+        self._size_bytes = sum(size for _, size, _ in self._scan_entries())
+
+    def _scan_entries(self) -> List[Tuple[Path, int, int]]:
+        """Lista (caminho, tamanho, mtime_ns) de todas as entradas"""
+        entries = []
+        for shard in self.cache_dir.iterdir():
+            if not shard.is_dir():
+                continue
+            with os.scandir(shard) as items:
+                for item in items:
+                    if item.name.endswith(ENTRY_SUFFIX):
+                        try:
+                            stat = item.stat()
+                            entries.append((Path(item.path), stat.st_size, stat.st_mtime_ns))
+                        except OSError:
+                            continue
+        return entries
+
+    def file_hash(self, file_path: str) -> str:
+        """SHA-256 do arquivo, memorizado enquanto ele não mudar"""
+        stat = os.stat(file_path)
+        key = (str(file_path), stat.st_size, stat.st_mtime_ns)
+        digest = self._file_hashes.get(key)
+        if digest is None:
+            digest = hash_file(file_path)
+            self._file_hashes[key] = digest
+        return digest
+
+    def _entry_path(self, file_path: str, extractor: str, version: str) -> Path:
+        key = hashlib.sha256(f"{self.file_hash(file_path)}:{extractor}:{version}".encode()).hexdigest()
+        return self.cache_dir / key[:2] / f"{key}{ENTRY_SUFFIX}"
+
+    def get(self, file_path: str, extractor: str, version: str) -> Optional[Any]:
+        """Retorna o conteúdo em cache ou None"""
+        try:
+            path = self._entry_path(file_path, extractor, version)
+            with open(path, 'rb') as f:
+                value = json.loads(zlib.decompress(f.read()).decode('utf-8'))
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"Entrada de cache inválida para {file_path}: {e}")
+            self.misses += 1
+            return None
+
+        # Marca como usada recentemente (ordem de despejo)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+
+    def put(self, file_path: str, extractor: str, version: str, value: Any) -> bool:
+        """Grava o conteúdo extraído (JSON comprimido com zlib)"""
+        try:
+            path = self._entry_path(file_path, extractor, version)
+            data = zlib.compress(json.dumps(value, ensure_ascii=False).encode('utf-8'), 6)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            with self._lock:
+                # Sobrescrever uma entrada troca o tamanho antigo pelo novo
+                try:
+                    previous = path.stat().st_size
+                except FileNotFoundError:
+                    previous = 0
+                os.replace(tmp_path, path)
+                self._size_bytes += len(data) - previous
+        except Exception as e:
+            logger.error(f"Erro ao gravar cache de extração de {file_path}: {e}")
+            return False
+
+        with self._lock:
+            if self._size_bytes > self.max_size_bytes:
+                self._evict()
+        return True
+
+    def get_or_extract(self, file_path: str, extractor: str, version: str,
+                       extract: Callable[[], Any]) -> Any:
+        """Retorna do cache ou executa a extração e guarda o resultado"""
+        try:
+            cached = self.get(file_path, extractor, version)
+        except OSError as e:
+            logger.warning(f"Cache de extração indisponível para {file_path}: {e}")
+            return extract()
+
+        if cached is not None:
+            return cached
+
+        value = extract()
+        # Resultados vazios geralmente são falhas de extração: não guardar
+        if value:
+            self.put(file_path, extractor, version, value)
+        return value
+
+    def get_or_load_documents(self, file_path: str, extractor: str, version: str,
+                              load: Callable[[], List[Any]], document_class: Callable[..., Any]) -> List[Any]:
+        """Versão para loaders do LangChain: guarda page_content + metadata"""
+        records = self.get_or_extract(
+            file_path, extractor, version,
+            lambda: [{"page_content": doc.page_content, "metadata": doc.metadata} for doc in load()]
+        )
+        documents = []
+        for record in records or []:
+            metadata = dict(record["metadata"])
+            # O mesmo conteúdo pode estar em outro caminho
+            if "source" in metadata:
+                metadata["source"] = str(file_path)
+            documents.append(document_class(page_content=record["page_content"], metadata=metadata))
+        return documents
+
+    def _evict(self):
+        """Remove as entradas menos usadas até ficar abaixo de 90% do limite"""
+        entries = sorted(self._scan_entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_size_bytes * 0.9)
+        removed = 0
+
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+                total -= size
+                removed += 1
+            except OSError:
+                continue
+
+        self._size_bytes = total
+        if removed:
+            logger.info(f"Cache de extração: {removed} entradas removidas ({total / 1024 / 1024:.1f} MB)")
+
+    def clear(self):
+        """Remove todas as entradas"""
+        with self._lock:
+            for path, _, _ in self._scan_entries():
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+            self._size_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Acertos, falhas e tamanho do cache"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size_bytes": self._size_bytes,
+            "max_size_bytes": self.max_size_bytes,
+            "cache_dir": str(self.cache_dir)
+        }
+
+# Instâncias compartilhadas por diretório (uma por processo)
+_shared_caches: Dict[str, ExtractionCache] = {}
+_shared_lock = threading.Lock()
+
+def get_extraction_cache(cache_dir: str = DEFAULT_CACHE_DIR,
+                         max_size_mb: float = DEFAULT_MAX_SIZE_MB) -> ExtractionCache:
+    """Cache de extração compartilhado por todos os loaders do processo"""
+    key = str(Path(cache_dir).resolve())
+    with _shared_lock:
+        cache = _shared_caches.get(key)
+        if cache is None:
+            cache = ExtractionCache(cache_dir, max_size_mb)
+            _shared_caches[key] = cache
+        return cache
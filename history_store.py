@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Histórico de conversas só-de-acréscimo em SQLite (WAL)
+Substitui um arquivo JSON por requisição em PROMPTS/: paginação por cursor,
+consultas por intervalo de tempo usando índice e busca de texto com FTS5
+(ou LIKE, quando o SQLite não tem FTS5). Inclui a migração dos arquivos antigos.
+"""
+
+import json
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Union
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 200
+LEGACY_TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+TimeValue = Union[float, int, str, datetime, None]
+
+def parse_time(value: TimeValue) -> Optional[float]:
+    """Epoch (s), datetime, ISO 8601 ou o formato antigo AAAAMMDD_HHMMSS"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    # float() aceita "_" entre dígitos, o que confundiria o formato antigo com epoch
+    if "_" not in value:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    for parse in (datetime.fromisoformat, lambda v: datetime.strptime(v, LEGACY_TIMESTAMP_FORMAT)):
+        try:
+            return parse(value).timestamp()
+        except ValueError:
+            continue
+    raise ValueError(f"Data inválida: {value}")
+
+def encode_cursor(created_at: float, entry_id: int) -> str:
+    return f"{created_at!r}:{entry_id}"
+
+def decode_cursor(cursor: str) -> tuple:
+    created_at, entry_id = cursor.rsplit(":", 1)
+    return float(created_at), int(entry_id)
+
+def fts_query(text: str) -> str:
+    """Termos entre aspas (busca por todos os termos, sem sintaxe FTS do usuário)"""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in text.split())
+
+class HistoryStore:
+    """Entradas de comando/resposta, ordenadas da mais recente para a mais antiga"""
+
+    def __init__(self, db_path: str = "PROMPTS/history.db"):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+        self.fts_enabled = self._create_fts()
+
+    def _create_tables(self):
+        with self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at REAL NOT NULL,
+                    user_input TEXT NOT NULL,
+                    ai_response TEXT NOT NULL,
+                    technology TEXT,
+                    model TEXT,
+                    source_file TEXT UNIQUE
+                );
+                CREATE INDEX IF NOT EXISTS idx_history_created ON history(created_at, id);
+            """)
+
+    def _create_fts(self) -> bool:
+        """Índice FTS5 externo (content=history) mantido por trigger"""
+        try:
+            with self._conn:
+                self._conn.executescript("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+                        user_input, ai_response, content='history', content_rowid='id'
+                    );
+                    CREATE TRIGGER IF NOT EXISTS history_fts_insert AFTER INSERT ON history BEGIN
+                        INSERT INTO history_fts(rowid, user_input, ai_response)
+                        VALUES (new.id, new.user_input, new.ai_response);
+                    END;
+                """)
+            return True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 indisponível, busca usará LIKE: {e}")
+            return False
+
+    def append(self, user_input: str, ai_response: str, technology: Optional[str] = None,
+               model: Optional[str] = None, created_at: TimeValue = None,
+               source_file: Optional[str] = None) -> Optional[int]:
+        """Acrescenta uma entrada; retorna o id (None se source_file já foi importado)"""
+        created = parse_time(created_at) or time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO history (created_at, user_input, ai_response, technology, model, source_file) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (created, user_input or "", ai_response or "", technology, model, source_file))
+            return cursor.lastrowid if cursor.rowcount else None
+
+    def query(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+              since: TimeValue = None, until: TimeValue = None,
+              search: Optional[str] = None, technology: Optional[str] = None) -> Dict[str, Any]:
+        """Página de entradas (mais recentes primeiro) e o cursor da próxima página"""
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        conditions, params = [], []
+
+        if cursor:
+            created_at, entry_id = decode_cursor(cursor)
+            conditions.append("(h.created_at < ? OR (h.created_at = ? AND h.id < ?))")
+            params += [created_at, created_at, entry_id]
+        since, until = parse_time(since), parse_time(until)
+        if since is not None:
+            conditions.append("h.created_at >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("h.created_at < ?")
+            params.append(until)
+        if technology:
+            conditions.append("h.technology = ?")
+            params.append(technology)
+
+        source = "history h"
+        if search and search.strip():
+            if self.fts_enabled:
+                source = "history h JOIN history_fts f ON f.rowid = h.id"
+                conditions.append("history_fts MATCH ?")
+                params.append(fts_query(search))
+            else:
+                for term in search.split():
+                    conditions.append("(h.user_input LIKE ? OR h.ai_response LIKE ?)")
+                    params += [f"%{term}%", f"%{term}%"]
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = (f"SELECT h.* FROM {source} {where} "
+               f"ORDER BY h.created_at DESC, h.id DESC LIMIT ?")
+        with self._lock:
+            rows = self._conn.execute(sql, params + [limit + 1]).fetchall()
+
+        items = [self._row_to_entry(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(last["created_at"], last["id"])
+        return {"items": items, "next_cursor": next_cursor}
+
+    def _row_to_entry(self, row: sqlite3.Row) -> Dict[str, Any]:
+        created = datetime.fromtimestamp(row["created_at"])
+        return {
+            "id": row["id"],
+            "timestamp": created.strftime(LEGACY_TIMESTAMP_FORMAT),
+            "created_at": created.isoformat(timespec="seconds"),
+            "user_input": row["user_input"],
+            "ai_response": row["ai_response"],
+            "technology": row["technology"],
+            "model": row["model"]
+        }
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    def migrate_directory(self, prompts_dir: str, remove_files: bool = False) -> int:
+        """Importa os arquivos prompt_*.json antigos; pode ser repetida sem duplicar"""
+        prompts_dir = Path(prompts_dir)
+        if not prompts_dir.exists():
+            return 0
+
+        # Arquivos já importados nem são abertos (migração roda a cada início do app)
+        with self._lock:
+            imported_files = {row[0] for row in self._conn.execute(
+                "SELECT source_file FROM history WHERE source_file IS NOT NULL")}
+
+        entries = []
+        for file_path in prompts_dir.glob("*.json"):
+            if file_path.name in imported_files:
+                if remove_files:
+                    file_path.unlink()
+                continue
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                created = parse_time(data.get("timestamp")) or file_path.stat().st_mtime
+                entries.append((created, file_path, data))
+            except Exception as e:
+                logger.error(f"Erro ao migrar {file_path}: {e}")
+
+        imported = 0
+        # Ordem cronológica: os ids seguem a ordem original das conversas
+        for created, file_path, data in sorted(entries, key=lambda e: e[0]):
+            entry_id = self.append(data.get("user_input", ""), data.get("ai_response", ""),
+                                   technology=data.get("technology"), model=data.get("model"),
+                                   created_at=created, source_file=file_path.name)
+            if entry_id is not None:
+                imported += 1
+            if remove_files:
+                file_path.unlink()
+
+        if imported:
+            logger.info(f"{imported} entradas migradas de {prompts_dir} para {self.db_path}")
+        return imported
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
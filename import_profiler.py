@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Perfil do tempo de importação (cold start)
+Executa "python -X importtime" em um processo novo para cada alvo (ex.:
+run_ai_agent, app) e relata o custo de cada módulo. O histórico pode ser
+gravado em JSONL para acompanhar o tempo de inicialização entre versões.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_TARGETS = ["run_ai_agent", "app"]
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    """Converte a saída de -X importtime em registros por módulo
+
+    Linhas no formato "import time:   self [us] |  cumulative | imported package";
+    a indentação do nome indica a profundidade na árvore de imports.
+    """
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+            records.append({
+                "module": name.strip(),
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": depth
+            })
+        except ValueError:
+            continue
+    return records
+
+def profile_import(target: str, python: str = sys.executable, cwd: Optional[str] = None,
+                   timeout: float = 300) -> Dict[str, Any]:
+    """Importa um módulo em processo novo e mede o custo de cada import"""
+    module = target[:-3] if target.endswith(".py") else target
+    start = time.perf_counter()
+    process = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=cwd or os.getcwd(), timeout=timeout,
+        env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    records = parse_importtime(process.stderr)
+    root = next((r for r in reversed(records) if r["module"] == module), None)
+    error = None
+    if process.returncode != 0:
+        error = process.stderr.strip().splitlines()[-1] if process.stderr.strip() else "erro desconhecido"
+
+    return {
+        "target": module,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "wall_ms": round(wall_ms, 1),
+        "import_ms": root["cumulative_ms"] if root else None,
+        "modules": len(records),
+        "records": records,
+        "error": error
+    }
+
+def top_packages(records: List[Dict[str, Any]], limit: int = 20) -> List[Dict[str, Any]]:
+    """Pacotes de topo mais caros (soma do custo próprio de todos os submódulos)"""
+    totals: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        package = record["module"].split(".")[0]
+        entry = totals.setdefault(package, {"package": package, "self_ms": 0.0, "modules": 0})
+        entry["self_ms"] += record["self_ms"]
+        entry["modules"] += 1
+    return sorted(totals.values(), key=lambda e: e["self_ms"], reverse=True)[:limit]
+
+def direct_imports(records: List[Dict[str, Any]], module: str) -> List[Dict[str, Any]]:
+    """Imports feitos diretamente pelo módulo alvo
+
+    A saída de -X importtime é pós-ordem: os filhos aparecem logo antes do pai.
+    """
+    index = next((i for i in range(len(records) - 1, -1, -1) if records[i]["module"] == module), None)
+    if index is None:
+        return []
+    depth = records[index]["depth"]
+    children = []
+    for record in reversed(records[:index]):
+        if record["depth"] <= depth:
+            break
+        if record["depth"] == depth + 1:
+            children.append(record)
+    return children
+
+def append_history(report: Dict[str, Any], history_file: str):
+    """Acrescenta o resumo do perfil ao histórico (JSONL)"""
+    Path(history_file).parent.mkdir(parents=True, exist_ok=True)
+    summary = {key: report[key] for key in ("target", "timestamp", "wall_ms", "import_ms", "modules", "error")}
+    summary["top_packages"] = top_packages(report["records"], 10)
+    with open(history_file, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(summary, ensure_ascii=False) + "\n")
+
+def print_report(report: Dict[str, Any], limit: int = 20):
+    import_ms = f"{report['import_ms']:.1f}" if report["import_ms"] is not None else "?"
+    print(f"\n⏱️  {report['target']}: {import_ms} ms de imports "
+          f"({report['wall_ms']} ms com o interpretador), {report['modules']} módulos")
+    if report["error"]:
+        print(f"   ❌ {report['error']}")
+
+    print(f"   {'pacote':<32} {'próprio (ms)':>12} {'módulos':>8}")
+    for entry in top_packages(report["records"], limit):
+        print(f"   {entry['package']:<32} {entry['self_ms']:>12.1f} {entry['modules']:>8}")
+
+    direct = direct_imports(report["records"], report["target"])
+    if direct:
+        print("   Imports diretos mais caros (acumulado):")
+        for record in sorted(direct, key=lambda r: r["cumulative_ms"], reverse=True)[:limit]:
+            print(f"   {record['module']:<32} {record['cumulative_ms']:>12.1f}")
+
+def main():
+    """Relata o custo de importação dos pontos de entrada"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Perfil do tempo de importação (cold start)")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS,
+                        help="Módulos ou scripts a importar (padrão: run_ai_agent app)")
+    parser.add_argument("--top", type=int, default=20, help="Número de linhas por tabela")
+    parser.add_argument("--json", dest="json_file", help="Grava o relatório completo em JSON")
+    parser.add_argument("--history", help="Acrescenta o resumo a um histórico JSONL (ex.: logs/import_times.jsonl)")
+    args = parser.parse_args()
+
+    reports = []
+    for target in args.targets:
+        report = profile_import(target)
+        print_report(report, args.top)
+        if args.history:
+            append_history(report, args.history)
+        reports.append(report)
+
+    if args.json_file:
+        with open(args.json_file, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    main()
@@ -30,15 +30,19 @@ except ImportError:
     PYQT5_AVAILABLE = False
     print("⚠️ PyQt5 não disponível")
 
+from lazy_imports import module_available
+
 # Importar componentes do sistema
+# O sistema de conhecimento (TensorFlow, embeddings) é importado em background pelo prewarm
 try:
-    from knowledge_enhancement_system import KnowledgeEnhancementSystem
     from docker_n8n_interface import DockerManager, N8NManager, MCPIntegration
-    KNOWLEDGE_SYSTEM_AVAILABLE = True
+    KNOWLEDGE_SYSTEM_AVAILABLE = module_available("knowledge_enhancement_system")
 except ImportError as e:
     KNOWLEDGE_SYSTEM_AVAILABLE = False
     print(f"⚠️ Sistema de conhecimento não disponível: {e}")
 
+from prewarm import ComponentPrewarmer, ComponentNotReady, READY, FAILED
+
 # Configurar logging
 import logging
 logging.basicConfig(level=logging.INFO)
@@ -51,15 +55,21 @@ class KnowledgeWorker(QThread):
     status_updated = pyqtSignal(str)
     result_ready = pyqtSignal(dict)
     
-    def __init__(self, system, task_type, data):
+    def __init__(self, system, task_type, data, prewarmer=None):
         super().__init__()
         self.system = system
         self.task_type = task_type
         self.data = data
+        self.prewarmer = prewarmer
     
     def run(self):
         """Executa tarefa em background"""
         try:
+            if self.system is None and self.prewarmer is not None:
+                # Esperar apenas pelo sistema de conhecimento, sem travar a interface
+                self.status_updated.emit("Aguardando o sistema de conhecimento carregar...")
+                self.system = self.prewarmer.get("knowledge_system")
+            
             self.status_updated.emit("Iniciando processamento...")
             
             if self.task_type == "add_document":
@@ -80,9 +90,20 @@ class KnowledgeWorker(QThread):
             self.status_updated.emit(f"Erro: {e}")
             self.result_ready.emit({"error": str(e)})
 
+def load_knowledge_system():
+    """Importa e inicializa o sistema de conhecimento (TensorFlow, embeddings, índices)"""
+    from knowledge_enhancement_system import KnowledgeEnhancementSystem
+    
+    system = KnowledgeEnhancementSystem()
+    system.start_processing()
+    return system
+
 class IntegratedKnowledgeInterface(QMainWindow):
     """Interface integrada principal"""
     
+    # Mudanças de prontidão vindas das threads de prewarm (nome, estado)
+    component_state_changed = pyqtSignal(str, str)
+    
     def __init__(self):
         super().__init__()
         
@@ -92,8 +113,12 @@ class IntegratedKnowledgeInterface(QMainWindow):
         self.n8n_manager = None
         self.mcp_integration = None
         
+        # Componentes pesados carregam em background depois que a janela aparece
+        self.prewarmer = ComponentPrewarmer()
+        
         if KNOWLEDGE_SYSTEM_AVAILABLE:
-            self.knowledge_system = KnowledgeEnhancementSystem()
+            self.prewarmer.register("knowledge_system", load_knowledge_system,
+                                    label="Sistema de conhecimento")
             self.docker_manager = DockerManager()
             self.n8n_manager = N8NManager()
             self.mcp_integration = MCPIntegration()
@@ -104,6 +129,33 @@ class IntegratedKnowledgeInterface(QMainWindow):
         
         # Carregar dados iniciais
         self.refresh_all_data()
+        
+        self.component_state_changed.connect(self.on_component_state_changed)
+        self.prewarmer.add_listener(lambda name, state, error: self.component_state_changed.emit(name, state))
+        self.prewarmer.start()
+    
+    @pyqtSlot(str, str)
+    def on_component_state_changed(self, name, state):
+        """Atualiza a prontidão na interface (thread principal)"""
+        if name == "knowledge_system" and state == READY:
+            self.knowledge_system = self.prewarmer.peek("knowledge_system")
+            self.update_status()
+        elif state == FAILED:
+            error = self.prewarmer.status()[name]["error"]
+            self.statusBar().showMessage(f"⚠️ {name} não disponível: {error}")
+        self.readiness_label.setText(self.prewarmer.summary())
+    
+    def knowledge_system_available(self) -> bool:
+        """O sistema de conhecimento está pronto ou ainda carregando?"""
+        return KNOWLEDGE_SYSTEM_AVAILABLE and self.prewarmer.state("knowledge_system") != FAILED
+    
+    def knowledge_system_or_warn(self):
+        """Sistema de conhecimento, ou aviso se ainda estiver carregando"""
+        if self.knowledge_system:
+            return self.knowledge_system
+        if KNOWLEDGE_SYSTEM_AVAILABLE and self.prewarmer.is_loading("knowledge_system"):
+            QMessageBox.information(self, "Aguarde", "O sistema de conhecimento ainda está carregando")
+        return None
     
     def init_ui(self):
         """Inicializa a interface gráfica"""
@@ -159,6 +211,10 @@ class IntegratedKnowledgeInterface(QMainWindow):
         self.system_status_label = QLabel("Status: Inicializando...")
         status_layout.addWidget(self.system_status_label)
         
+        # Prontidão dos componentes carregados em background
+        self.readiness_label = QLabel(self.prewarmer.summary())
+        status_layout.addWidget(self.readiness_label)
+        
         # Progress bar
         self.global_progress = QProgressBar()
         self.global_progress.setMaximumWidth(200)
@@ -203,6 +259,10 @@ class IntegratedKnowledgeInterface(QMainWindow):
         self.upload_folder_btn.clicked.connect(self.upload_folder)
         upload_buttons_layout.addWidget(self.upload_folder_btn)
         
+        self.watch_folder_btn = QPushButton("👁️ Observar Pasta")
+        self.watch_folder_btn.clicked.connect(self.watch_folder)
+        upload_buttons_layout.addWidget(self.watch_folder_btn)
+        
         upload_layout.addLayout(upload_buttons_layout)
         
         # Lista de documentos processados
@@ -1069,15 +1129,31 @@ class IntegratedKnowledgeInterface(QMainWindow):
         """Atualiza status do sistema"""
         if self.knowledge_system:
             status = self.knowledge_system.get_system_status()
-            self.system_status_label.setText(f"Status: {status['processed_documents']} docs, {status['queue_size']} na fila")
+            workers = status['workers']
+            self.system_status_label.setText(
+                f"Status: {status['processed_documents']} docs, {status['queue_size']} na fila, "
+                f"{workers['in_flight']} em execução, {workers['throughput_per_min']:.1f}/min"
+            )
+            
+            memory_details = "\n".join(
+                f"  • {name}: {size}" for name, size in status['memory']['summary'].items()
+            )
             
             # Atualizar texto de status
             status_text = f"""
 Sistema de Conhecimento:
 - Documentos processados: {status['processed_documents']}
 - Base de conhecimento: {status['knowledge_base_size']} itens
-- Análises realizadas: {len(status['analysis_results'])}
+- Análises realizadas: {status['analysis_results']}
 - Fila de processamento: {status['queue_size']}
+- Em execução: {workers['in_flight']} ({workers['threads']} threads, {workers['processes']} processos)
+- Vazão: {workers['throughput_per_min']:.1f} tarefas/min (média {workers['avg_task_seconds']:.2f}s)
+- Concluídas/falhas: {workers['completed']}/{workers['failed']}
+
+Memória:
+- Processo (RSS): {status['memory']['process_rss']}
+- Estruturas rastreadas: {status['memory']['tracked']}
+{memory_details}
 
 Componentes:
 - TensorFlow: {'✅' if status['tensorflow_available'] else '❌'}
@@ -1093,7 +1169,7 @@ Componentes:
             "Todos os Arquivos (*);;PDF (*.pdf);;Word (*.docx *.doc);;Excel (*.xlsx *.xls);;PowerPoint (*.pptx *.ppt);;E-book (*.epub *.mobi);;Texto (*.txt *.md)"
         )
         
-        if file_path and self.knowledge_system:
+        if file_path and self.knowledge_system_or_warn():
             # Adicionar à fila de processamento
             result = self.knowledge_system.add_document(file_path)
             
@@ -1108,7 +1184,7 @@ Componentes:
         """Upload de pasta inteira"""
         folder_path = QFileDialog.getExistingDirectory(self, "Selecionar Pasta")
         
-        if folder_path and self.knowledge_system:
+        if folder_path and self.knowledge_system_or_warn():
             folder = Path(folder_path)
             supported_extensions = ['.pdf', '.docx', '.doc', '.xlsx', '.xls', '.pptx', '.ppt', '.epub', '.txt', '.md']
             
@@ -1125,6 +1201,21 @@ Componentes:
             
             QMessageBox.information(self, "Sucesso", f"{files_added} arquivos adicionados da pasta")
     
+    def watch_folder(self):
+        """Mantém uma pasta sincronizada com a base de conhecimento"""
+        folder_path = QFileDialog.getExistingDirectory(self, "Selecionar Pasta para Observar")
+        
+        if folder_path and self.knowledge_system_or_warn():
+            watched = self.knowledge_system.config.setdefault("watch_directories", [])
+            if folder_path not in watched:
+                watched.append(folder_path)
+            
+            if self.knowledge_system.start_watching(watched):
+                QMessageBox.information(self, "Sucesso", 
+                    f"Observando {len(watched)} pasta(s). Apenas arquivos novos, modificados ou removidos serão processados.")
+            else:
+                QMessageBox.warning(self, "Erro", "Nenhuma pasta válida para observar")
+    
     def query_knowledge(self):
         """Consulta a base de conhecimento"""
         question = self.query_input.toPlainText().strip()
@@ -1133,12 +1224,12 @@ Componentes:
             QMessageBox.warning(self, "Erro", "Digite uma pergunta")
             return
         
-        if not self.knowledge_system:
+        if not self.knowledge_system_available():
             QMessageBox.warning(self, "Erro", "Sistema de conhecimento não disponível")
             return
         
-        # Executar consulta em background
-        self.worker = KnowledgeWorker(self.knowledge_system, "query_knowledge", question)
+        # Executar consulta em background (espera o sistema carregar, se preciso)
+        self.worker = KnowledgeWorker(self.knowledge_system, "query_knowledge", question, self.prewarmer)
         self.worker.result_ready.connect(self.handle_query_result)
         self.worker.status_updated.connect(self.statusBar().showMessage)
         self.worker.start()
@@ -1160,14 +1251,14 @@ Documentos de referência:
     
     def analyze_documents(self):
         """Analisa documentos com TensorFlow"""
-        if not self.knowledge_system:
+        if not self.knowledge_system_available():
             QMessageBox.warning(self, "Erro", "Sistema de conhecimento não disponível")
             return
         
         n_clusters = self.clusters_spin.value()
         
-        # Executar análise em background
-        self.worker = KnowledgeWorker(self.knowledge_system, "analyze_documents", n_clusters)
+        # Executar análise em background (espera o sistema carregar, se preciso)
+        self.worker = KnowledgeWorker(self.knowledge_system, "analyze_documents", n_clusters, self.prewarmer)
         self.worker.result_ready.connect(self.handle_analysis_result)
         self.worker.status_updated.connect(self.statusBar().showMessage)
         self.worker.start()
@@ -1193,7 +1284,9 @@ Clusters encontrados:
     
     def analyze_sentiment(self):
         """Analisa sentimento dos documentos"""
-        if not self.knowledge_system or not self.knowledge_system.knowledge_base:
+        if not self.knowledge_system_or_warn():
+            return
+        if not self.knowledge_system.knowledge_base:
             QMessageBox.warning(self, "Erro", "Nenhum documento disponível para análise")
             return
         
@@ -1402,7 +1495,7 @@ Clusters encontrados:
     
     def quick_analysis(self):
         """Análise rápida do sistema"""
-        if not self.knowledge_system:
+        if not self.knowledge_system_or_warn():
             return
         
         # Executar análise rápida
@@ -6,68 +6,92 @@ Integração com LangChain, TensorFlow e múltiplos formatos
 
 import os
 import json
+import pickle
 import logging
 import asyncio
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Union, Callable, Iterable, Iterator, Set, Tuple
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import Future
 import threading
-import queue
+
+from lazy_imports import module_available, lazy_import, lazy_attribute
+
+# Dependências opcionais pesadas: verificadas sem importar e carregadas no primeiro uso
+# (importar este módulo não carrega LangChain, TensorFlow ou pandas)
 
 # Dependências principais
-try:
-    import langchain
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
-    from langchain_community.embeddings import OpenAIEmbeddings, HuggingFaceEmbeddings
-    from langchain_community.vectorstores import FAISS, Chroma
-    from langchain_community.document_loaders import (
-        PyPDFLoader, TextLoader, Docx2txtLoader, 
-        UnstructuredEPubLoader, UnstructuredPowerPointLoader,
-        UnstructuredExcelLoader, UnstructuredWordDocumentLoader
-    )
-    from langchain.chains import RetrievalQA, ConversationalRetrievalChain
-    from langchain.memory import ConversationBufferMemory
-    from langchain_community.llms import OpenAI, HuggingFaceHub
-    LANGCHAIN_AVAILABLE = True
-except ImportError:
-    LANGCHAIN_AVAILABLE = False
+LANGCHAIN_AVAILABLE = module_available("langchain.text_splitter", "langchain.chains", "langchain.memory",
+                                       "langchain_community.embeddings",
+                                       "langchain_community.vectorstores",
+                                       "langchain_community.document_loaders")
+if LANGCHAIN_AVAILABLE:
+    RecursiveCharacterTextSplitter = lazy_attribute("langchain.text_splitter", "RecursiveCharacterTextSplitter")
+    OpenAIEmbeddings = lazy_attribute("langchain_community.embeddings", "OpenAIEmbeddings")
+    HuggingFaceEmbeddings = lazy_attribute("langchain_community.embeddings", "HuggingFaceEmbeddings")
+    FAISS = lazy_attribute("langchain_community.vectorstores", "FAISS")
+    Docx2txtLoader = lazy_attribute("langchain_community.document_loaders", "Docx2txtLoader")
+    UnstructuredEPubLoader = lazy_attribute("langchain_community.document_loaders", "UnstructuredEPubLoader")
+    UnstructuredPowerPointLoader = lazy_attribute("langchain_community.document_loaders", "UnstructuredPowerPointLoader")
+    ConversationalRetrievalChain = lazy_attribute("langchain.chains", "ConversationalRetrievalChain")
+    ConversationBufferMemory = lazy_attribute("langchain.memory", "ConversationBufferMemory")
+else:
     print("⚠️ LangChain não disponível. Instale com: pip install langchain")
 
 # TensorFlow para análise de dados
-try:
-    import tensorflow as tf
-    from tensorflow import keras
-    from tensorflow.keras import layers
-    import numpy as np
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.cluster import KMeans
-    TENSORFLOW_AVAILABLE = True
-except ImportError:
-    TENSORFLOW_AVAILABLE = False
+TENSORFLOW_AVAILABLE = module_available("tensorflow", "numpy", "sklearn.feature_extraction.text", "sklearn.cluster")
+if TENSORFLOW_AVAILABLE:
+    tf = lazy_import("tensorflow")
+    keras = lazy_import("tensorflow.keras")
+    layers = lazy_import("tensorflow.keras.layers")
+    np = lazy_import("numpy")
+    HashingVectorizer = lazy_attribute("sklearn.feature_extraction.text", "HashingVectorizer")
+    MiniBatchKMeans = lazy_attribute("sklearn.cluster", "MiniBatchKMeans")
+else:
     print("⚠️ TensorFlow não disponível. Instale com: pip install tensorflow scikit-learn")
 
 # Processamento de documentos
-try:
-    import docx2txt
-    import PyPDF2
-    import ebooklib
-    from ebooklib import epub
-    import pandas as pd
-    import openpyxl
-    from pptx import Presentation
-    DOCUMENT_PROCESSING_AVAILABLE = True
-except ImportError:
-    DOCUMENT_PROCESSING_AVAILABLE = False
+DOCUMENT_PROCESSING_AVAILABLE = module_available("docx2txt", "PyPDF2", "ebooklib.epub", "pandas", "openpyxl", "pptx")
+if DOCUMENT_PROCESSING_AVAILABLE:
+    docx2txt = lazy_import("docx2txt")
+    ebooklib = lazy_import("ebooklib")
+    epub = lazy_import("ebooklib.epub")
+    pd = lazy_import("pandas")
+    Presentation = lazy_attribute("pptx", "Presentation")
+else:
     print("⚠️ Bibliotecas de processamento não disponíveis")
 
+from knowledge_watcher import FolderWatcher, FolderCatalog, FileChange, normalize_path
+from knowledge_workers import WorkerPool, TaskEvent, PRIORITY_QUERY
+from tabular_streaming import iter_row_groups, RowGroup, STREAMING_EXTENSIONS
+from extraction_cache import get_extraction_cache
+from knowledge_store import KnowledgeStore, LazyContentList
+from pdf_engines import extract_pdf_pages
+from knowledge_export import ChunkExportWriter, chunk_row, iter_in_batches
+from sentiment_lexicon import score_sentiment_batch, content_hash, SENTIMENT_VERSION
+from memory_accounting import (
+    build_memory_report, cached_memory_report, deep_sizeof, faiss_index_bytes,
+    model_parameter_bytes, PeriodicMemoryLogger
+)
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Incrementar quando algum extrator mudar, invalidando o cache de extração
+EXTRACTOR_VERSION = "1"
+
+# Grupos de linhas de planilha gravados no armazenamento por vez
+TABULAR_WRITE_BATCH = 64
+
+# Formato antigo (JSON único), migrado automaticamente para o armazenamento segmentado
+LEGACY_KNOWLEDGE_FILE = "knowledge_base.json"
+
 class DocumentProcessor:
     """Processador de documentos para múltiplos formatos"""
     
-    def __init__(self):
+    def __init__(self, pdf_engine: str = "auto"):
+        self.pdf_engine = pdf_engine
         self.supported_formats = {
             # Microsoft Office
             '.docx': self._process_docx,
@@ -92,6 +116,9 @@ class DocumentProcessor:
             '.md': self._process_markdown,
             '.csv': self._process_csv
         }
+        
+        # Texto extraído compartilhado com os demais loaders
+        self.extraction_cache = get_extraction_cache()
     
     def process_document(self, file_path: str) -> Dict[str, Any]:
         """Processa documento e extrai conteúdo"""
@@ -104,10 +131,18 @@ class DocumentProcessor:
         
         if file_extension not in self.supported_formats:
             raise ValueError(f"Formato não suportado: {file_extension}")
+        if file_extension in STREAMING_EXTENSIONS:
+            raise ValueError(f"Planilhas ({file_extension}) são lidas em grupos de linhas: use iter_document_chunks")
         
         try:
             processor = self.supported_formats[file_extension]
-            content = processor(file_path)
+            backend = "langchain" if LANGCHAIN_AVAILABLE else "native"
+            if file_extension == '.pdf':
+                backend = f"pdf:{self.pdf_engine}"
+            content = self.extraction_cache.get_or_extract(
+                str(file_path), f"document_processor{file_extension}:{backend}",
+                EXTRACTOR_VERSION, lambda: processor(file_path)
+            )
             
             return {
                 "file_path": str(file_path),
@@ -130,21 +165,39 @@ class DocumentProcessor:
                 "status": "error"
             }
     
+    def supports_streaming(self, file_path: str) -> bool:
+        """Indica se o formato pode ser lido em grupos de linhas"""
+        return Path(file_path).suffix.lower() in STREAMING_EXTENSIONS
+    
+    def iter_document_chunks(self, file_path: str, rows_per_group: int = 200,
+                             max_chars: int = 1000):
+        """Lê uma planilha em streaming, gerando um documento por grupo de linhas"""
+        file_path = Path(file_path)
+        
+        if not file_path.exists():
+            raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+        
+        processor = self.supported_formats[file_path.suffix.lower()]
+        for index, group in enumerate(processor(file_path, rows_per_group, max_chars)):
+            yield {
+                "file_path": str(file_path),
+                "file_name": file_path.name,
+                "file_type": file_path.suffix.lower(),
+                "content": group.to_text(),
+                "chunk_index": index,
+                "sheet": group.sheet,
+                "row_start": group.start_row,
+                "row_end": group.end_row,
+                "processed_at": datetime.now().isoformat(),
+                "status": "success"
+            }
+    
     def _process_pdf(self, file_path: Path) -> str:
         """Processa arquivo PDF"""
         try:
-            if LANGCHAIN_AVAILABLE:
-                loader = PyPDFLoader(str(file_path))
-                pages = loader.load()
-                return "\n".join([page.page_content for page in pages])
-            else:
-                # Fallback para PyPDF2
-                with open(file_path, 'rb') as file:
-                    reader = PyPDF2.PdfReader(file)
-                    text = ""
-                    for page in reader.pages:
-                        text += page.extract_text() + "\n"
-                    return text
+            pages, engine = extract_pdf_pages(str(file_path), self.pdf_engine)
+            logger.info(f"PDF {file_path.name} extraído com {engine}")
+            return "\n".join(pages)
         except Exception as e:
             logger.error(f"Erro ao processar PDF {file_path}: {e}")
             return ""
@@ -170,18 +223,10 @@ class DocumentProcessor:
             logger.error(f"Erro ao processar DOC {file_path}: {e}")
             return ""
     
-    def _process_xlsx(self, file_path: Path) -> str:
-        """Processa arquivo Excel"""
-        try:
-            if LANGCHAIN_AVAILABLE:
-                loader = UnstructuredExcelLoader(str(file_path))
-                return loader.load()[0].page_content
-            else:
-                df = pd.read_excel(file_path)
-                return df.to_string()
-        except Exception as e:
-            logger.error(f"Erro ao processar Excel {file_path}: {e}")
-            return ""
+    def _process_xlsx(self, file_path: Path, rows_per_group: int = 200,
+                      max_chars: int = 4000) -> Iterator[RowGroup]:
+        """Processa arquivo Excel em grupos de linhas"""
+        return iter_row_groups(file_path, rows_per_group, max_chars)
     
     def _process_xls(self, file_path: Path) -> str:
         """Processa arquivo Excel legado"""
@@ -224,14 +269,10 @@ class DocumentProcessor:
             logger.error(f"Erro ao processar ODT {file_path}: {e}")
             return ""
     
-    def _process_ods(self, file_path: Path) -> str:
-        """Processa arquivo ODS (LibreOffice)"""
-        try:
-            df = pd.read_excel(file_path)
-            return df.to_string()
-        except Exception as e:
-            logger.error(f"Erro ao processar ODS {file_path}: {e}")
-            return ""
+    def _process_ods(self, file_path: Path, rows_per_group: int = 200,
+                     max_chars: int = 4000) -> Iterator[RowGroup]:
+        """Processa arquivo ODS (LibreOffice) em grupos de linhas"""
+        return iter_row_groups(file_path, rows_per_group, max_chars)
     
     def _process_odp(self, file_path: Path) -> str:
         """Processa arquivo ODP (LibreOffice)"""
@@ -278,23 +319,41 @@ class DocumentProcessor:
         """Processa arquivo Markdown"""
         return self._process_txt(file_path)
     
-    def _process_csv(self, file_path: Path) -> str:
-        """Processa arquivo CSV"""
-        try:
-            df = pd.read_csv(file_path)
-            return df.to_string()
-        except Exception as e:
-            logger.error(f"Erro ao processar CSV {file_path}: {e}")
-            return ""
+    def _process_csv(self, file_path: Path, rows_per_group: int = 200,
+                     max_chars: int = 4000) -> Iterator[RowGroup]:
+        """Processa arquivo CSV em grupos de linhas"""
+        return iter_row_groups(file_path, rows_per_group, max_chars)
+
+# Processador por processo do pool de extração
+_process_document_processor = None
+
+def extract_document(file_path: str, pdf_engine: str = "auto") -> Dict[str, Any]:
+    """Extrai o conteúdo de um documento (executado no pool de processos)"""
+    global _process_document_processor
+    if _process_document_processor is None or _process_document_processor.pdf_engine != pdf_engine:
+        _process_document_processor = DocumentProcessor(pdf_engine)
+    return _process_document_processor.process_document(file_path)
+
+# Dimensão do espaço de hashing: os centróides do MiniBatchKMeans são densos
+# (n_clusters x n_features em float64), então 2^15 mantém o modelo salvo em ~1 MB
+HASHING_FEATURES = 2 ** 15
 
 class TensorFlowAnalyzer:
     """Analisador de dados usando TensorFlow"""
     
-    def __init__(self):
+    def __init__(self, model_path: str = "rag_data/knowledge_clusters.pkl",
+                 hashing_features: int = HASHING_FEATURES):
         self.model = None
         self.vectorizer = None
         self.cluster_model = None
         self.is_trained = False
+        self.hashing_features = hashing_features
+        
+        # Clustering incremental: rótulo de cada documento pelo hash do conteúdo
+        self.model_path = Path(model_path)
+        self.document_labels: Dict[str, int] = {}
+        self.feature_space = None
+        self.load_cluster_model()
     
     def create_text_analysis_model(self, vocab_size: int = 10000, max_length: int = 100):
         """Cria modelo de análise de texto"""
@@ -318,90 +377,199 @@ class TensorFlowAnalyzer:
         
         logger.info("Modelo de análise de texto criado")
     
-    def extract_features(self, texts: List[str]) -> np.ndarray:
-        """Extrai características dos textos"""
+    def extract_features(self, texts: List[str]):
+        """Extrai características esparsas dos textos (matriz CSR)"""
         if not TENSORFLOW_AVAILABLE:
             return np.array([])
         
         if self.vectorizer is None:
-            self.vectorizer = TfidfVectorizer(
-                max_features=1000,
+            # Hashing não tem vocabulário a ajustar: documentos novos caem
+            # no mesmo espaço sem reprocessar o corpus
+            self.vectorizer = HashingVectorizer(
+                n_features=self.hashing_features,
                 stop_words='english',
-                ngram_range=(1, 2)
+                ngram_range=(1, 2),
+                alternate_sign=False,
+                norm='l2'
             )
         
-        features = self.vectorizer.fit_transform(texts)
-        return features.toarray()
+        return self.vectorizer.transform(texts)
+    
+    @staticmethod
+    def _content_hash(text: str) -> str:
+        return content_hash(text)
+    
+    def _feature_space(self, embed_fn) -> str:
+        # A dimensão faz parte do espaço: modelos salvos com outra dimensão são refeitos
+        return "embeddings" if embed_fn else f"hashing:{self.hashing_features}"
+    
+    def prepare_cluster_model(self, n_clusters: int = 5,
+                              embed_fn: Optional[Callable[[List[str]], Any]] = None,
+                              batch_size: int = 1024) -> Dict[str, int]:
+        """Garante um modelo compatível; retorna os rótulos já conhecidos (hash -> cluster)
+        
+        Mudar o número de clusters ou o espaço de características descarta os rótulos.
+        """
+        feature_space = self._feature_space(embed_fn)
+        if (self.cluster_model is None or self.cluster_model.n_clusters != n_clusters
+                or self.feature_space != feature_space):
+            self.cluster_model = MiniBatchKMeans(
+                n_clusters=n_clusters, random_state=42, batch_size=batch_size, n_init=3,
+                reassignment_ratio=0.0
+            )
+            self.document_labels = {}
+            self.feature_space = feature_space
+        return self.document_labels
     
-    def cluster_documents(self, texts: List[str], n_clusters: int = 5) -> Dict[str, Any]:
-        """Agrupa documentos por similaridade"""
+    def update_clusters(self, new_documents: Iterable[Tuple[str, str]],
+                        live_hashes: Optional[Set[str]] = None, n_clusters: int = 5,
+                        embed_fn: Optional[Callable[[List[str]], Any]] = None,
+                        batch_size: int = 1024) -> Dict[str, Any]:
+        """Rotula os pares (hash, texto) ainda não rotulados, um lote por vez
+        
+        Só os documentos novos são lidos e vetorizados; com live_hashes, rótulos de
+        documentos que saíram da base são esquecidos.
+        """
         if not TENSORFLOW_AVAILABLE:
             return {"error": "TensorFlow não disponível"}
         
         try:
-            # Extrair características
-            features = self.extract_features(texts)
-            
-            # Aplicar clustering
-            self.cluster_model = KMeans(n_clusters=n_clusters, random_state=42)
-            clusters = self.cluster_model.fit_predict(features)
-            
-            # Organizar resultados
-            results = {}
-            for i, cluster_id in enumerate(clusters):
-                if f"cluster_{cluster_id}" not in results:
-                    results[f"cluster_{cluster_id}"] = []
-                results[f"cluster_{cluster_id}"].append({
-                    "text": texts[i][:100] + "...",
-                    "index": i
-                })
+            self.prepare_cluster_model(n_clusters, embed_fn, batch_size)
+            labelled = 0
             
-            return {
-                "clusters": results,
-                "n_clusters": n_clusters,
-                "total_documents": len(texts),
-                "cluster_centers": self.cluster_model.cluster_centers_.tolist()
-            }
+            def batches():
+                batch, seen = [], set()
+                for doc_hash, text in new_documents:
+                    if doc_hash in self.document_labels or doc_hash in seen:
+                        continue
+                    seen.add(doc_hash)
+                    batch.append((doc_hash, text))
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+                if batch:
+                    yield batch
+            
+            for batch in batches():
+                if not hasattr(self.cluster_model, "cluster_centers_") and len(batch) < n_clusters:
+                    return {"error": f"São necessários pelo menos {n_clusters} documentos distintos"}
+                
+                texts = [text for _, text in batch]
+                if embed_fn:
+                    features = np.asarray(embed_fn(texts), dtype='float32')
+                else:
+                    features = self.extract_features(texts)
+                
+                # Atualiza os centróides apenas com os documentos novos
+                self.cluster_model.partial_fit(features)
+                for (doc_hash, _), label in zip(batch, self.cluster_model.predict(features)):
+                    self.document_labels[doc_hash] = int(label)
+                labelled += len(batch)
+            
+            if not hasattr(self.cluster_model, "cluster_centers_"):
+                return {"error": f"São necessários pelo menos {n_clusters} documentos distintos"}
+            
+            # Esquecer documentos que saíram da base
+            removed = 0
+            if live_hashes is not None:
+                stale = [h for h in self.document_labels if h not in live_hashes]
+                for doc_hash in stale:
+                    del self.document_labels[doc_hash]
+                removed = len(stale)
+            
+            if labelled or removed:
+                self.save_cluster_model()
+            return {"new_documents": labelled, "removed_documents": removed}
             
         except Exception as e:
             logger.error(f"Erro no clustering: {e}")
             return {"error": str(e)}
     
+    def cluster_results(self, entries: Iterable[Tuple[str, str]], n_clusters: int,
+                        new_documents: int = 0) -> Dict[str, Any]:
+        """Organiza (hash, prévia) por cluster, na ordem dos documentos"""
+        results = {}
+        total = 0
+        for i, (doc_hash, preview) in enumerate(entries):
+            total += 1
+            cluster_id = self.document_labels.get(doc_hash)
+            if cluster_id is None:
+                continue
+            results.setdefault(f"cluster_{cluster_id}", []).append({
+                "text": preview[:100] + "...",
+                "index": i
+            })
+        
+        result = {
+            "clusters": results,
+            "n_clusters": n_clusters,
+            "total_documents": total,
+            "new_documents": new_documents,
+            "cluster_sizes": {name: len(docs) for name, docs in results.items()}
+        }
+        # Centróides de hashing têm milhares de dimensões: só retornados para embeddings
+        if self.feature_space == "embeddings":
+            result["cluster_centers"] = self.cluster_model.cluster_centers_.tolist()
+        return result
+    
+    def cluster_documents(self, texts: List[str], n_clusters: int = 5,
+                          embed_fn: Optional[Callable[[List[str]], Any]] = None,
+                          batch_size: int = 1024) -> Dict[str, Any]:
+        """Agrupa documentos por similaridade (incremental: só documentos novos são processados)
+        
+        Com embed_fn (ex.: embeddings já usados pelo RAG), os vetores densos
+        substituem as características de hashing.
+        """
+        if not TENSORFLOW_AVAILABLE:
+            return {"error": "TensorFlow não disponível"}
+        
+        hashes = [self._content_hash(text) for text in texts]
+        update = self.update_clusters(zip(hashes, texts), set(hashes), n_clusters, embed_fn, batch_size)
+        if "error" in update:
+            return update
+        return self.cluster_results(zip(hashes, texts), n_clusters, update["new_documents"])
+    
+    def save_cluster_model(self) -> bool:
+        """Salva o modelo de clustering e os rótulos por documento"""
+        try:
+            self.model_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.model_path.with_name(self.model_path.name + ".tmp")
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({
+                    "cluster_model": self.cluster_model,
+                    "document_labels": self.document_labels,
+                    "feature_space": self.feature_space
+                }, f)
+            os.replace(tmp_path, self.model_path)
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao salvar modelo de clustering: {e}")
+            return False
+    
+    def load_cluster_model(self) -> bool:
+        """Carrega o modelo de clustering salvo, se existir"""
+        if not TENSORFLOW_AVAILABLE or not self.model_path.exists():
+            return False
+        try:
+            with open(self.model_path, 'rb') as f:
+                state = pickle.load(f)
+            self.cluster_model = state["cluster_model"]
+            self.document_labels = state["document_labels"]
+            self.feature_space = state["feature_space"]
+            logger.info(f"Modelo de clustering carregado ({len(self.document_labels)} documentos)")
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao carregar modelo de clustering: {e}")
+            return False
+    
     def analyze_sentiment(self, texts: List[str]) -> List[Dict[str, Any]]:
         """Análise de sentimento básica"""
         if not TENSORFLOW_AVAILABLE:
             return [{"error": "TensorFlow não disponível"} for _ in texts]
         
         try:
-            # Análise simples baseada em palavras-chave
-            positive_words = ['good', 'great', 'excellent', 'amazing', 'wonderful', 'perfect']
-            negative_words = ['bad', 'terrible', 'awful', 'horrible', 'worst', 'disappointing']
-            
-            results = []
-            for text in texts:
-                text_lower = text.lower()
-                positive_count = sum(1 for word in positive_words if word in text_lower)
-                negative_count = sum(1 for word in negative_words if word in text_lower)
-                
-                if positive_count > negative_count:
-                    sentiment = "positive"
-                    score = positive_count / (positive_count + negative_count + 1)
-                elif negative_count > positive_count:
-                    sentiment = "negative"
-                    score = negative_count / (positive_count + negative_count + 1)
-                else:
-                    sentiment = "neutral"
-                    score = 0.5
-                
-                results.append({
-                    "text": text[:100] + "...",
-                    "sentiment": sentiment,
-                    "score": score,
-                    "positive_words": positive_count,
-                    "negative_words": negative_count
-                })
-            
-            return results
+            # Análise baseada em palavras-chave (léxico compilado em uma regex)
+            return score_sentiment_batch(texts)
             
         except Exception as e:
             logger.error(f"Erro na análise de sentimento: {e}")
@@ -415,6 +583,7 @@ class LangChainEnhancer:
         self.model_name = model_name
         self.embeddings = None
         self.vectorstore = None
+        self.persist_directory = None
         self.qa_chain = None
         self.memory = None
         
@@ -447,8 +616,13 @@ class LangChainEnhancer:
         except Exception as e:
             logger.error(f"Erro ao inicializar LangChain: {e}")
     
-    def create_vectorstore(self, documents: List[str], persist_directory: str = "vectorstore"):
-        """Cria vectorstore com documentos"""
+    def create_vectorstore(self, documents: List[str], persist_directory: str = "vectorstore",
+                           sources: Optional[List[str]] = None):
+        """Cria vectorstore com documentos
+        
+        sources (ou metadata["source"] das Documents) identifica o arquivo de cada
+        documento, para que remove_source apague os chunks de um arquivo removido.
+        """
         if not LANGCHAIN_AVAILABLE or not self.embeddings:
             return False
         
@@ -460,17 +634,27 @@ class LangChainEnhancer:
             )
             
             texts = []
-            for doc in documents:
+            metadatas = []
+            for i, doc in enumerate(documents):
                 if isinstance(doc, str):
-                    texts.extend(text_splitter.split_text(doc))
+                    chunks = text_splitter.split_text(doc)
+                    metadata = {}
                 else:
-                    texts.extend(text_splitter.split_text(doc.page_content))
+                    chunks = text_splitter.split_text(doc.page_content)
+                    metadata = dict(doc.metadata)
+                if sources:
+                    metadata["source"] = normalize_path(sources[i])
+                elif metadata.get("source"):
+                    metadata["source"] = normalize_path(metadata["source"])
+                texts.extend(chunks)
+                metadatas.extend(dict(metadata) for _ in chunks)
             
             # Criar vectorstore
-            self.vectorstore = FAISS.from_texts(texts, self.embeddings)
+            self.vectorstore = FAISS.from_texts(texts, self.embeddings, metadatas=metadatas)
             
             # Salvar
             self.vectorstore.save_local(persist_directory)
+            self.persist_directory = persist_directory
             
             logger.info(f"Vectorstore criado com {len(texts)} chunks")
             return True
@@ -486,6 +670,7 @@ class LangChainEnhancer:
         
         try:
             self.vectorstore = FAISS.load_local(persist_directory, self.embeddings)
+            self.persist_directory = persist_directory
             logger.info("Vectorstore carregado")
             return True
             
@@ -493,6 +678,28 @@ class LangChainEnhancer:
             logger.error(f"Erro ao carregar vectorstore: {e}")
             return False
     
+    def remove_source(self, source: str) -> int:
+        """Remove do vectorstore os chunks de um arquivo; retorna quantos foram removidos
+        
+        Só alcança chunks criados com a origem (sources ou metadata["source"]).
+        """
+        docstore = getattr(self.vectorstore, "docstore", None)
+        if docstore is None:
+            return 0
+        
+        try:
+            ids = [doc_id for doc_id, doc in getattr(docstore, "_dict", {}).items()
+                   if doc.metadata.get("source") == source]
+            if ids:
+                self.vectorstore.delete(ids)
+                if self.persist_directory:
+                    self.vectorstore.save_local(self.persist_directory)
+                logger.info(f"{len(ids)} chunks de {source} removidos do vectorstore")
+            return len(ids)
+        except Exception as e:
+            logger.error(f"Erro ao remover {source} do vectorstore: {e}")
+            return 0
+    
     def query_knowledge_base(self, question: str, k: int = 4) -> Dict[str, Any]:
         """Consulta a base de conhecimento"""
         if not LANGCHAIN_AVAILABLE or not self.vectorstore:
@@ -539,21 +746,39 @@ class KnowledgeEnhancementSystem:
         self.config = self.load_config()
         
         # Inicializar componentes
-        self.document_processor = DocumentProcessor()
-        self.tensorflow_analyzer = TensorFlowAnalyzer()
+        self.document_processor = DocumentProcessor(self.config.get("pdf_engine", "auto"))
+        self.tensorflow_analyzer = TensorFlowAnalyzer(
+            model_path=self.config.get("cluster_model_path", "rag_data/knowledge_clusters.pkl"),
+            hashing_features=self.config.get("cluster_hashing_features", HASHING_FEATURES)
+        )
         self.langchain_enhancer = LangChainEnhancer(
             openai_api_key=self.config.get("openai_api_key")
         )
         
-        # Estado do sistema
+        # Estado do sistema (conteúdos persistidos são lidos sob demanda do armazenamento)
+        self.knowledge_store = KnowledgeStore(self.config.get("knowledge_store_dir", "knowledge_store"))
         self.processed_documents = []
-        self.knowledge_base = []
+        self.knowledge_base = LazyContentList(self.knowledge_store)
         self.analysis_results = {}
         
-        # Threading para processamento assíncrono
-        self.processing_queue = queue.Queue()
-        self.processing_thread = None
+        # Pool de workers: threads para I/O, processos para extração
+        self.worker_pool = WorkerPool(
+            self._process_task,
+            num_threads=self.config.get("worker_threads", 2),
+            num_processes=self.config.get("extraction_processes", 2)
+        )
+        self.processing_queue = self.worker_pool.queue
         self.is_processing = False
+        self._state_lock = threading.RLock()
+        self._batch_analysis_pending = False
+        
+        # Observador de pastas sincronizadas
+        self.folder_watcher = None
+        
+        # Registro periódico de memória (0 desativa)
+        self.memory_logger = None
+        if self.config.get("memory_log_interval", 0) > 0:
+            self.start_memory_logging(self.config["memory_log_interval"])
         
         logger.info("Sistema de Aprimoramento de Conhecimento inicializado")
     
@@ -573,7 +798,22 @@ class KnowledgeEnhancementSystem:
                     "chunk_size": 1000,
                     "chunk_overlap": 200,
                     "enable_tensorflow": TENSORFLOW_AVAILABLE,
-                    "enable_langchain": LANGCHAIN_AVAILABLE
+                    "enable_langchain": LANGCHAIN_AVAILABLE,
+                    "watch_directories": [],
+                    "watch_interval": 30,
+                    "watch_debounce": 5,
+                    "watch_catalog_file": "config/knowledge_watch_catalog.json",
+                    "memory_log_interval": 0,
+                    "worker_threads": 2,
+                    "extraction_processes": 2,
+                    "tabular_rows_per_group": 200,
+                    "cluster_model_path": "rag_data/knowledge_clusters.pkl",
+                    "cluster_features": "hashing",
+                    "cluster_hashing_features": HASHING_FEATURES,
+                    "knowledge_store_dir": "knowledge_store",
+                    "pdf_engine": "auto",
+                    "batch_analysis": False,
+                    "analysis_batch_size": 256
                 }
                 
                 # Salvar configuração padrão
@@ -591,70 +831,214 @@ class KnowledgeEnhancementSystem:
         """Inicia processamento em background"""
         if not self.is_processing:
             self.is_processing = True
-            self.processing_thread = threading.Thread(target=self._processing_worker)
-            self.processing_thread.daemon = True
-            self.processing_thread.start()
-            logger.info("Processamento em background iniciado")
+            self.worker_pool.start()
+            logger.info(f"Processamento em background iniciado "
+                        f"({self.worker_pool.num_threads} threads, "
+                        f"{self.worker_pool.num_processes} processos de extração)")
     
-    def stop_processing(self):
-        """Para processamento em background"""
+    def stop_processing(self, drain: bool = True, timeout: Optional[float] = None) -> bool:
+        """Para processamento em background (por padrão, após esvaziar a fila)"""
         self.is_processing = False
-        if self.processing_thread:
-            self.processing_thread.join()
+        drained = self.worker_pool.shutdown(drain=drain, timeout=timeout)
         logger.info("Processamento em background parado")
+        return drained
     
-    def _processing_worker(self):
-        """Worker para processamento em background"""
-        while self.is_processing:
-            try:
-                # Processar itens da fila
-                if not self.processing_queue.empty():
-                    task = self.processing_queue.get(timeout=1)
-                    self._process_task(task)
-                else:
-                    time.sleep(1)
-            except queue.Empty:
-                continue
-            except Exception as e:
-                logger.error(f"Erro no worker: {e}")
+    def wait_until_idle(self, timeout: Optional[float] = None) -> bool:
+        """Aguarda a fila esvaziar e as tarefas em execução terminarem"""
+        return self.worker_pool.wait_until_idle(timeout)
+    
+    def add_progress_listener(self, callback: Callable[[TaskEvent], None]):
+        """Registra callback chamado a cada evento de progresso das tarefas"""
+        self.worker_pool.add_listener(callback)
+    
+    def remove_progress_listener(self, callback: Callable[[TaskEvent], None]):
+        self.worker_pool.remove_listener(callback)
+    
+    def _submit_task(self, task: Dict[str, Any], priority: Optional[int] = None) -> Future:
+        """Enfileira uma tarefa no pool de workers"""
+        return self.worker_pool.submit(task, priority)
     
     def _process_task(self, task: Dict[str, Any]):
         """Processa uma tarefa"""
         task_type = task.get("type")
+        if task.get("file_path"):
+            # Mesmo arquivo, mesma chave: adicionado à mão ou detectado pelo observador
+            task["file_path"] = normalize_path(task["file_path"])
         
         if task_type == "document":
-            self._process_document_task(task)
+            return self._process_document_task(task)
+        elif task_type == "remove_document":
+            removed = self._remove_document_entries(task["file_path"])
+            removed_chunks = self.langchain_enhancer.remove_source(task["file_path"])
+            return removed or bool(removed_chunks)
         elif task_type == "analysis":
-            self._process_analysis_task(task)
+            return self._process_analysis_task(task)
+        elif task_type == "batch_analysis":
+            return self._process_batch_analysis_task(task)
         elif task_type == "enhancement":
-            self._process_enhancement_task(task)
+            return self._process_enhancement_task(task)
     
     def _process_document_task(self, task: Dict[str, Any]):
         """Processa tarefa de documento"""
         file_path = task.get("file_path")
         
-        # Processar documento
-        result = self.document_processor.process_document(file_path)
+        if self.document_processor.supports_streaming(file_path):
+            return self._process_tabular_document_task(task)
+        
+        # Extração (CPU) no pool de processos
+        result = self.worker_pool.run_in_process(extract_document, file_path,
+                                                 self.document_processor.pdf_engine)
+        self.worker_pool.report_progress(task, 0.5, "Conteúdo extraído")
         
         if result["status"] == "success":
-            self.processed_documents.append(result)
-            self.knowledge_base.append(result["content"])
+            self._describe_content(result, result["content"])
+            with self._state_lock:
+                # Documento modificado: substituir a versão anterior
+                self._remove_document_entries(result["file_path"])
+                
+                self.processed_documents.append(result)
+                self.knowledge_base.append(result["content"])
             
             # Adicionar análise à fila
-            self.processing_queue.put({
-                "type": "analysis",
-                "content": result["content"],
-                "file_info": result
-            })
+            if self.config.get("batch_analysis", False):
+                self._schedule_batch_analysis()
+            else:
+                self._submit_task({
+                    "type": "analysis",
+                    "content": result["content"],
+                    "file_info": result
+                })
+        
+        return result
+    
+    def _process_tabular_document_task(self, task: Dict[str, Any]):
+        """Ingere uma planilha em grupos de linhas, sem carregá-la inteira"""
+        file_path = str(Path(task.get("file_path")))
+        chunks = 0
+        pending = []
+        
+        try:
+            self._remove_document_entries(file_path)
+            for chunk in self.document_processor.iter_document_chunks(
+                    file_path,
+                    rows_per_group=self.config.get("tabular_rows_per_group", 200),
+                    max_chars=self.config.get("chunk_size", 1000)):
+                pending.append(self._describe_content(chunk, chunk["content"]))
+                chunks += 1
+                if len(pending) >= TABULAR_WRITE_BATCH:
+                    self._store_chunks(pending)
+                    pending = []
+                if chunks % 100 == 0:
+                    self.worker_pool.report_progress(task, 0.5, f"{chunks} grupos de linhas lidos")
+            self._store_chunks(pending)
+        except Exception as e:
+            logger.error(f"Erro ao processar planilha {file_path}: {e}")
+            return {"file_path": file_path, "status": "error", "error": str(e), "chunks": chunks}
+        
+        logger.info(f"Planilha {file_path} ingerida em {chunks} grupos de linhas")
+        return {"file_path": file_path, "status": "success", "chunks": chunks}
+    
+    def _store_chunks(self, chunks: List[Dict[str, Any]]):
+        """Grava grupos de linhas no armazenamento; em memória ficam só os metadados"""
+        if not chunks:
+            return
+        # Sob o lock do estado: um sync simultâneo apagaria ids gravados ainda não registrados
+        with self._state_lock:
+            ids = self.knowledge_store.add_documents(
+                ({k: v for k, v in chunk.items() if k != "content"}, chunk["content"]) for chunk in chunks
+            )
+            for chunk, doc_id in zip(chunks, ids):
+                chunk.pop("content")
+                chunk["store_id"] = doc_id
+                self.processed_documents.append(chunk)
+                self.knowledge_base.append(doc_id)
     
     def _process_analysis_task(self, task: Dict[str, Any]):
         """Processa tarefa de análise"""
         content = task.get("content")
         
         if TENSORFLOW_AVAILABLE:
-            # Análise com TensorFlow
-            analysis = self.tensorflow_analyzer.analyze_sentiment([content])
-            self.analysis_results[task.get("file_info", {}).get("file_name", "unknown")] = analysis[0]
+            file_name = task.get("file_info", {}).get("file_name", "unknown")
+            key = content_hash(content or "")
+            stored = self.knowledge_store.get_sentiment_results([key], SENTIMENT_VERSION)
+            if key in stored:
+                analysis = [stored[key]]
+            else:
+                # Análise com TensorFlow
+                analysis = self.tensorflow_analyzer.analyze_sentiment([content])
+                if "error" not in analysis[0]:
+                    self.knowledge_store.save_sentiment_results({key: analysis[0]}, SENTIMENT_VERSION)
+            with self._state_lock:
+                self.analysis_results[file_name] = analysis[0]
+            return analysis[0]
+    
+    def _schedule_batch_analysis(self):
+        """Agenda uma única análise em lote para os documentos acumulados na fila"""
+        with self._state_lock:
+            if self._batch_analysis_pending:
+                return
+            self._batch_analysis_pending = True
+        self._submit_task({"type": "batch_analysis"})
+    
+    def _process_batch_analysis_task(self, task: Dict[str, Any]):
+        """Processa tarefa de análise em lote"""
+        with self._state_lock:
+            self._batch_analysis_pending = False
+        return self.analyze_knowledge_base_sentiment(self.config.get("analysis_batch_size", 256))
+    
+    def analyze_knowledge_base_sentiment(self, batch_size: int = 256) -> Dict[str, Any]:
+        """Análise de sentimento de toda a base em lotes, distribuídos no pool de processos
+        
+        Os resultados ficam gravados por hash do conteúdo; documentos já analisados
+        (mesmo conteúdo e mesma versão do léxico) não são reprocessados.
+        """
+        with self._state_lock:
+            entries = [(doc.get("file_name", "unknown"), i)
+                       for i, doc in enumerate(self.processed_documents)]
+        
+        counts = {"positive": 0, "negative": 0, "neutral": 0}
+        analyzed = skipped = 0
+        
+        # Lotes enviados ao pool, na ordem em que os resultados retornam
+        submitted = []
+        
+        try:
+            def pending_texts():
+                # Lê o conteúdo sob demanda, um lote por vez
+                for start in range(0, len(entries), batch_size):
+                    batch = []
+                    for file_name, index in entries[start:start + batch_size]:
+                        try:
+                            text = self.knowledge_base[index]
+                        except (IndexError, KeyError):
+                            continue
+                        batch.append((file_name, content_hash(text), text))
+                    stored = self.knowledge_store.get_sentiment_results(
+                        [key for _, key, _ in batch], SENTIMENT_VERSION)
+                    todo = [item for item in batch if item[1] not in stored]
+                    submitted.append((batch, stored, todo))
+                    yield [text for _, _, text in todo]
+            
+            for scores in self.worker_pool.map_in_process(score_sentiment_batch, pending_texts()):
+                batch, stored, todo = submitted.pop(0)
+                new_results = {key: result for (_, key, _), result in zip(todo, scores)}
+                if new_results:
+                    self.knowledge_store.save_sentiment_results(new_results, SENTIMENT_VERSION)
+                analyzed += len(new_results)
+                skipped += len(batch) - len(todo)
+                
+                with self._state_lock:
+                    for file_name, key, _ in batch:
+                        result = new_results.get(key) or stored[key]
+                        self.analysis_results[file_name] = result
+                        counts[result["sentiment"]] += 1
+            
+            logger.info(f"Análise em lote: {analyzed} documentos analisados, {skipped} já analisados")
+            return {"analyzed": analyzed, "skipped": skipped, "sentiments": counts}
+            
+        except Exception as e:
+            logger.error(f"Erro na análise em lote: {e}")
+            return {"error": str(e), "analyzed": analyzed, "skipped": skipped}
     
     def _process_enhancement_task(self, task: Dict[str, Any]):
         """Processa tarefa de aprimoramento"""
@@ -664,6 +1048,72 @@ class KnowledgeEnhancementSystem:
             # Consulta com LangChain
             result = self.langchain_enhancer.query_knowledge_base(question)
             task["result"] = result
+            return result
+        return {"error": "LangChain não disponível"}
+    
+    def _remove_document_entries(self, file_path: str) -> bool:
+        """Remove um documento já processado da base de conhecimento"""
+        file_path = str(file_path)
+        with self._state_lock:
+            indices = [i for i, doc in enumerate(self.processed_documents)
+                       if doc.get("file_path") == file_path]
+            
+            for i in reversed(indices):
+                document = self.processed_documents.pop(i)
+                if i < len(self.knowledge_base):
+                    # del (e não pop) para não ler o conteúdo do armazenamento
+                    del self.knowledge_base[i]
+                self.analysis_results.pop(document.get("file_name"), None)
+        
+        if indices:
+            logger.info(f"Documento removido da base de conhecimento: {file_path}")
+        return bool(indices)
+    
+    def _handle_file_change(self, change: FileChange) -> Future:
+        """Envia alterações detectadas pelo observador para a fila
+        
+        O Future retornado permite ao observador registrar a alteração no
+        catálogo só depois que a tarefa terminar com sucesso.
+        """
+        logger.info(f"Alteração detectada ({change.change_type}): {change.path}")
+        if change.change_type == "deleted":
+            return self._submit_task({
+                "type": "remove_document",
+                "file_path": change.path
+            })
+        return self._submit_task({
+            "type": "document",
+            "file_path": change.path
+        })
+    
+    def start_watching(self, directories: Optional[List[str]] = None) -> bool:
+        """Inicia a observação incremental das pastas configuradas"""
+        directories = directories or self.config.get("watch_directories", [])
+        directories = [d for d in directories if Path(d).is_dir()]
+        if not directories:
+            logger.warning("Nenhuma pasta válida para observar")
+            return False
+        
+        self.stop_watching()
+        self.folder_watcher = FolderWatcher(
+            directories,
+            on_change=self._handle_file_change,
+            catalog=FolderCatalog(self.config.get("watch_catalog_file", "config/knowledge_watch_catalog.json")),
+            extensions=self.document_processor.supported_formats.keys(),
+            interval=self.config.get("watch_interval", 30),
+            debounce=self.config.get("watch_debounce", 5)
+        )
+        self.folder_watcher.start()
+        
+        # A fila só é consumida com o processamento ativo
+        self.start_processing()
+        return True
+    
+    def stop_watching(self):
+        """Para a observação de pastas"""
+        if self.folder_watcher:
+            self.folder_watcher.stop()
+            self.folder_watcher = None
     
     def add_document(self, file_path: str) -> Dict[str, Any]:
         """Adiciona documento para processamento"""
@@ -671,13 +1121,15 @@ class KnowledgeEnhancementSystem:
             return {"error": "Arquivo não encontrado"}
         
         # Adicionar à fila de processamento
-        self.processing_queue.put({
+        task = {
             "type": "document",
             "file_path": file_path
-        })
+        }
+        self._submit_task(task)
         
         return {
             "status": "queued",
+            "task_id": task["task_id"],
             "file_path": file_path,
             "message": "Documento adicionado à fila de processamento"
         }
@@ -689,6 +1141,10 @@ class KnowledgeEnhancementSystem:
         else:
             return {"error": "LangChain não disponível"}
     
+    def query_knowledge_async(self, question: str) -> Future:
+        """Enfileira uma consulta com prioridade sobre as análises em lote"""
+        return self._submit_task({"type": "enhancement", "question": question}, PRIORITY_QUERY)
+    
     def analyze_documents(self, n_clusters: int = 5) -> Dict[str, Any]:
         """Analisa documentos com TensorFlow"""
         if not TENSORFLOW_AVAILABLE:
@@ -697,60 +1153,254 @@ class KnowledgeEnhancementSystem:
         if not self.knowledge_base:
             return {"error": "Nenhum documento processado"}
         
-        return self.tensorflow_analyzer.cluster_documents(self.knowledge_base, n_clusters)
+        # Opcionalmente reutiliza o modelo de embeddings do RAG (apenas para documentos novos)
+        embed_fn = None
+        if self.config.get("cluster_features") == "embeddings" and self.langchain_enhancer.embeddings:
+            embed_fn = self.langchain_enhancer.embeddings.embed_documents
+        
+        analyzer = self.tensorflow_analyzer
+        entries = self._content_hashes()
+        labels = analyzer.prepare_cluster_model(n_clusters, embed_fn)
+        
+        def unlabelled():
+            # Conteúdo lido sob demanda, só para documentos ainda sem rótulo
+            for index, doc_hash, _ in entries:
+                if doc_hash not in labels:
+                    with self._state_lock:
+                        text = self.knowledge_base[index]
+                    yield doc_hash, text
+        
+        update = analyzer.update_clusters(unlabelled(), {doc_hash for _, doc_hash, _ in entries},
+                                          n_clusters, embed_fn=embed_fn)
+        if "error" in update:
+            return update
+        return analyzer.cluster_results(((doc_hash, preview) for _, doc_hash, preview in entries),
+                                        n_clusters, update["new_documents"])
+    
+    @staticmethod
+    def _describe_content(document: Dict[str, Any], content: str) -> Dict[str, Any]:
+        """Hash e prévia do conteúdo, guardados nos metadados na ingestão"""
+        document["content_hash"] = content_hash(content or "")
+        document["preview"] = (content or "")[:100]
+        return document
+    
+    def _content_hashes(self) -> List[Tuple[int, str, str]]:
+        """(posição, hash, prévia) de cada documento, a partir dos metadados
+        
+        Documentos gravados antes do hash nos metadados são lidos uma única vez
+        e têm os metadados atualizados no armazenamento.
+        """
+        with self._state_lock:
+            entries = []
+            backfill = {}
+            for index, document in enumerate(self.processed_documents):
+                if "content_hash" not in document:
+                    self._describe_content(document, self.knowledge_base[index])
+                    if document.get("store_id") is not None:
+                        backfill[document["store_id"]] = {
+                            "content_hash": document["content_hash"], "preview": document["preview"]
+                        }
+                entries.append((index, document["content_hash"], document.get("preview", "")))
+        if backfill:
+            self.knowledge_store.update_metadata(backfill)
+            logger.info(f"Hash do conteúdo calculado para {len(backfill)} documentos já gravados")
+        return entries
     
     def get_system_status(self) -> Dict[str, Any]:
         """Retorna status do sistema"""
+        workers = self.worker_pool.stats()
         return {
             "processed_documents": len(self.processed_documents),
             "knowledge_base_size": len(self.knowledge_base),
             "analysis_results": len(self.analysis_results),
-            "queue_size": self.processing_queue.qsize(),
+            "queue_size": workers["queued"],
             "is_processing": self.is_processing,
+            "workers": workers,
+            "watching": self.folder_watcher.directories if self.folder_watcher else [],
             "tensorflow_available": TENSORFLOW_AVAILABLE,
             "langchain_available": LANGCHAIN_AVAILABLE,
-            "document_processing_available": DOCUMENT_PROCESSING_AVAILABLE
+            "document_processing_available": DOCUMENT_PROCESSING_AVAILABLE,
+            "memory": cached_memory_report(self)
         }
     
-    def save_knowledge_base(self, file_path: str = "knowledge_base.json"):
-        """Salva base de conhecimento"""
+    def get_memory_usage(self) -> Dict[str, Any]:
+        """Memória aproximada por componente e RSS do processo"""
+        enhancer = self.langchain_enhancer
+        analyzer = self.tensorflow_analyzer
+        vectorstore = enhancer.vectorstore
+        docstore = getattr(vectorstore, "docstore", None)
+        
+        keras_bytes = 0
+        if analyzer.model is not None:
+            keras_bytes = analyzer.model.count_params() * 4
+        
+        return build_memory_report({
+            "embedding_model": model_parameter_bytes(enhancer.embeddings),
+            "vectorstore_index": faiss_index_bytes(vectorstore),
+            "vectorstore_docstore": deep_sizeof(getattr(docstore, "_dict", None)),
+            "processed_documents": deep_sizeof(self.processed_documents),
+            "knowledge_base": deep_sizeof(self.knowledge_base),
+            "analysis_results": deep_sizeof(self.analysis_results),
+            "analysis_models": deep_sizeof(analyzer.vectorizer) + deep_sizeof(analyzer.cluster_model) + keras_bytes,
+            "processing_queue": deep_sizeof(self.processing_queue.queue)
+        })
+    
+    def start_memory_logging(self, interval: float = 60.0):
+        """Registra o uso de memória periodicamente no log"""
+        if self.memory_logger is None:
+            self.memory_logger = PeriodicMemoryLogger("KnowledgeEnhancementSystem", self.get_memory_usage, interval)
+        self.memory_logger.start()
+    
+    def stop_memory_logging(self):
+        """Para o registro periódico de memória"""
+        if self.memory_logger:
+            self.memory_logger.stop()
+    
+    def save_knowledge_base(self, file_path: Optional[str] = None):
+        """Salva base de conhecimento (incremental: só documentos novos são gravados)
+        
+        Com um caminho .json, exporta no formato JSON antigo.
+        """
+        if file_path:
+            return self.export_knowledge_base_json(file_path)
+        
         try:
+            with self._state_lock:
+                written = self.knowledge_store.sync(
+                    self.processed_documents, self.knowledge_base, self.analysis_results
+                )
+            
+            logger.info(f"Base de conhecimento salva em {self.knowledge_store.store_dir} "
+                        f"({written} documentos novos)")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Erro ao salvar base de conhecimento: {e}")
+            return False
+    
+    def load_knowledge_base(self, file_path: Optional[str] = None):
+        """Carrega base de conhecimento (metadados agora, conteúdo sob demanda)
+        
+        Com um caminho .json, importa o formato JSON antigo.
+        """
+        try:
+            if file_path:
+                return self._load_legacy_json(file_path)
+            
+            if self.knowledge_store.is_empty():
+                # Migração do arquivo JSON único
+                if Path(LEGACY_KNOWLEDGE_FILE).exists():
+                    logger.info(f"Migrando {LEGACY_KNOWLEDGE_FILE} para o armazenamento segmentado")
+                    return self._load_legacy_json(LEGACY_KNOWLEDGE_FILE) and self.save_knowledge_base()
+                logger.warning(f"Base de conhecimento vazia: {self.knowledge_store.store_dir}")
+                return False
+            
+            documents = self._normalize_document_paths(self.knowledge_store.list_documents())
+            with self._state_lock:
+                self.processed_documents = documents
+                self.knowledge_base = LazyContentList(
+                    self.knowledge_store, [doc["store_id"] for doc in documents]
+                )
+                self.analysis_results = self.knowledge_store.load_analysis_results()
+            
+            logger.info(f"Base de conhecimento carregada de {self.knowledge_store.store_dir} "
+                        f"({len(documents)} documentos)")
+            return True
+                
+        except Exception as e:
+            logger.error(f"Erro ao carregar base de conhecimento: {e}")
+            return False
+    
+    @staticmethod
+    def _normalize_document_paths(documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Caminhos gravados antes da normalização passam à forma canônica"""
+        normalized = {}
+        for document in documents:
+            path = document.get("file_path")
+            if path:
+                if path not in normalized:
+                    normalized[path] = normalize_path(path)
+                document["file_path"] = normalized[path]
+        return documents
+    
+    def _load_legacy_json(self, file_path: str) -> bool:
+        """Importa o formato JSON antigo (conteúdo fica em memória até o próximo salvamento)"""
+        if not Path(file_path).exists():
+            logger.warning(f"Arquivo de base de conhecimento não encontrado: {file_path}")
+            return False
+        
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        with self._state_lock:
+            self.processed_documents = self._normalize_document_paths(data.get("processed_documents", []))
+            contents = data.get("knowledge_base", [])
+            for document, content in zip(self.processed_documents, contents):
+                document.pop("store_id", None)
+                self._describe_content(document, content)
+            self.knowledge_base = LazyContentList(self.knowledge_store, contents)
+            self.analysis_results = data.get("analysis_results", {})
+        
+        logger.info(f"Base de conhecimento carregada de {file_path}")
+        return True
+    
+    def export_knowledge_base_json(self, file_path: str) -> bool:
+        """Exporta a base inteira no formato JSON antigo"""
+        try:
+            with self._state_lock:
+                documents = [dict(doc) for doc in self.processed_documents]
+                contents = list(self.knowledge_base)
+                analysis_results = dict(self.analysis_results)
+            
+            for document, content in zip(documents, contents):
+                document.pop("store_id", None)
+                document["content"] = content
+            
             data = {
-                "processed_documents": self.processed_documents,
-                "knowledge_base": self.knowledge_base,
-                "analysis_results": self.analysis_results,
+                "processed_documents": documents,
+                "knowledge_base": contents,
+                "analysis_results": analysis_results,
                 "saved_at": datetime.now().isoformat()
             }
             
             with open(file_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2, ensure_ascii=False)
             
-            logger.info(f"Base de conhecimento salva em {file_path}")
+            logger.info(f"Base de conhecimento exportada para {file_path}")
             return True
             
         except Exception as e:
-            logger.error(f"Erro ao salvar base de conhecimento: {e}")
+            logger.error(f"Erro ao exportar base de conhecimento: {e}")
             return False
     
-    def load_knowledge_base(self, file_path: str = "knowledge_base.json"):
-        """Carrega base de conhecimento"""
+    def export_knowledge_base_columnar(self, file_path: str, batch_size: int = 2048,
+                                       export_format: Optional[str] = None) -> bool:
+        """Exporta documentos, metadados, sentimento e clusters para Parquet ou Arrow IPC"""
         try:
-            if Path(file_path).exists():
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                self.processed_documents = data.get("processed_documents", [])
-                self.knowledge_base = data.get("knowledge_base", [])
-                self.analysis_results = data.get("analysis_results", {})
-                
-                logger.info(f"Base de conhecimento carregada de {file_path}")
-                return True
-            else:
-                logger.warning(f"Arquivo de base de conhecimento não encontrado: {file_path}")
-                return False
-                
+            with self._state_lock:
+                documents = [dict(doc) for doc in self.processed_documents]
+                analysis_results = dict(self.analysis_results)
+            labels = self.tensorflow_analyzer.document_labels
+            
+            with ChunkExportWriter(file_path, schema_metadata={"source": "knowledge_enhancement_system"},
+                                   export_format=export_format) as writer:
+                for batch in iter_in_batches(range(len(documents)), batch_size):
+                    rows = []
+                    for i in batch:
+                        # Conteúdo lido sob demanda do armazenamento, um lote por vez
+                        text = self.knowledge_base[i]
+                        document = {k: v for k, v in documents[i].items() if k not in ("content", "store_id")}
+                        file_name = document.get("file_name")
+                        rows.append(chunk_row(i, text, document, source=document.get("file_path"),
+                                              analysis=analysis_results.get(file_name),
+                                              cluster=labels.get(content_hash(text))))
+                    writer.write_batch(rows)
+            
+            logger.info(f"{writer.rows} documentos exportados para {file_path}")
+            return True
+            
         except Exception as e:
-            logger.error(f"Erro ao carregar base de conhecimento: {e}")
+            logger.error(f"Erro ao exportar base de conhecimento: {e}")
             return False
 
 def main():
@@ -777,7 +1427,7 @@ def main():
             print(f"  {file_path}: {result}")
     
     # Aguardar processamento
-    time.sleep(5)
+    system.wait_until_idle(timeout=60)
     
     # Status do sistema
     print("\n📊 Status do Sistema:")
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Exportação colunar (Parquet / Arrow IPC) da base de conhecimento
+Texto dos chunks, metadados, embeddings e resultados de análise (sentimento,
+cluster) gravados em lotes de registros. Embeddings ficam em uma coluna
+fixed_size_list<float32>, o que permite carregá-los no NumPy sem cópia e
+reconstruir um índice sem recalcular os embeddings.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable, Iterator
+
+from lazy_imports import module_available, lazy_import
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# pyarrow/numpy só são importados no primeiro uso (exportar não é parte da inicialização)
+PYARROW_AVAILABLE = module_available("pyarrow", "numpy")
+if PYARROW_AVAILABLE:
+    np = lazy_import("numpy")
+    pa = lazy_import("pyarrow")
+    pa_ipc = lazy_import("pyarrow.ipc")
+    pq = lazy_import("pyarrow.parquet")
+
+EXPORT_FORMAT_VERSION = "1"
+DEFAULT_BATCH_SIZE = 2048
+
+# Colunas escalares; metadados extras vão como JSON na coluna "metadata"
+SCALAR_COLUMNS = [
+    ("chunk_id", "int64"),
+    ("source", "string"),
+    ("page", "int32"),
+    ("text", "string"),
+    ("metadata", "string"),
+    ("sentiment", "string"),
+    ("sentiment_score", "float64"),
+    ("cluster", "int32"),
+]
+
+_PARQUET_SUFFIXES = {".parquet", ".pq"}
+_ARROW_SUFFIXES = {".arrow", ".ipc", ".feather"}
+
+def _require_pyarrow():
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow não disponível. Instale com: pip install pyarrow")
+
+def detect_format(path: str, export_format: Optional[str] = None) -> str:
+    """Formato pela opção explícita ou pela extensão do arquivo"""
+    if export_format:
+        if export_format not in ("parquet", "arrow"):
+            raise ValueError(f"Formato de exportação desconhecido: {export_format}")
+        return export_format
+    suffix = Path(path).suffix.lower()
+    if suffix in _ARROW_SUFFIXES:
+        return "arrow"
+    if suffix in _PARQUET_SUFFIXES:
+        return "parquet"
+    raise ValueError(f"Extensão não reconhecida (use .parquet ou .arrow): {path}")
+
+def build_schema(embedding_dim: Optional[int] = None,
+                 schema_metadata: Optional[Dict[str, Any]] = None) -> "pa.Schema":
+    """Esquema da exportação; a dimensão dos embeddings é fixa por arquivo"""
+    _require_pyarrow()
+    fields = [pa.field(name, pa.type_for_alias(alias)) for name, alias in SCALAR_COLUMNS]
+    if embedding_dim:
+        fields.append(pa.field("embedding", pa.list_(pa.float32(), embedding_dim)))
+
+    metadata = {"format_version": EXPORT_FORMAT_VERSION,
+                "embedding_dim": str(embedding_dim or 0)}
+    metadata.update({key: json.dumps(value) for key, value in (schema_metadata or {}).items()})
+    return pa.schema(fields, metadata=metadata)
+
+class ChunkExportWriter:
+    """Grava lotes de chunks em Parquet ou Arrow IPC sem montar a tabela inteira"""
+
+    def __init__(self, path: str, embedding_dim: Optional[int] = None,
+                 schema_metadata: Optional[Dict[str, Any]] = None,
+                 export_format: Optional[str] = None,
+                 compression: str = "zstd"):
+        _require_pyarrow()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.format = detect_format(path, export_format)
+        self.embedding_dim = embedding_dim
+        self.schema = build_schema(embedding_dim, schema_metadata)
+        self.rows = 0
+
+        if self.format == "parquet":
+            self._writer = pq.ParquetWriter(str(self.path), self.schema, compression=compression)
+        else:
+            self._sink = pa.OSFile(str(self.path), "wb")
+            self._writer = pa_ipc.new_file(self._sink, self.schema)
+
+    def write_batch(self, rows: List[Dict[str, Any]], embeddings: Optional["np.ndarray"] = None):
+        """Grava um lote; embeddings (n x dim) acompanham as linhas na mesma ordem"""
+        if not rows:
+            return
+
+        arrays = [pa.array([row.get(name) for row in rows], type=self.schema.field(name).type)
+                  for name, _ in SCALAR_COLUMNS]
+        if self.embedding_dim:
+            if embeddings is None or len(embeddings) != len(rows):
+                raise ValueError("Lote sem embeddings para todas as linhas")
+            values = np.ascontiguousarray(embeddings, dtype=np.float32).reshape(-1)
+            arrays.append(pa.FixedSizeListArray.from_arrays(pa.array(values), self.embedding_dim))
+
+        self._writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        self.rows += len(rows)
+
+    def close(self):
+        self._writer.close()
+        if self.format == "arrow":
+            self._sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def chunk_row(chunk_id: int, text: str, metadata: Optional[Dict[str, Any]] = None,
+              source: Optional[str] = None, page: Optional[int] = None,
+              analysis: Optional[Dict[str, Any]] = None, cluster: Optional[int] = None) -> Dict[str, Any]:
+    """Monta uma linha da exportação a partir de um chunk e dos seus resultados"""
+    analysis = analysis or {}
+    return {
+        "chunk_id": chunk_id,
+        "source": source,
+        "page": page,
+        "text": text,
+        "metadata": json.dumps(metadata or {}, ensure_ascii=False, default=str),
+        "sentiment": analysis.get("sentiment"),
+        "sentiment_score": analysis.get("score"),
+        "cluster": cluster,
+    }
+
+def read_export_metadata(path: str, export_format: Optional[str] = None) -> Dict[str, Any]:
+    """Metadados do esquema (dimensão, projeção etc.) sem ler os dados"""
+    _require_pyarrow()
+    if detect_format(path, export_format) == "parquet":
+        schema = pq.read_schema(str(path))
+    else:
+        with pa.memory_map(str(path), "r") as source:
+            schema = pa_ipc.open_file(source).schema
+
+    metadata = {}
+    for key, value in (schema.metadata or {}).items():
+        key, value = key.decode(), value.decode()
+        if key in ("format_version", "embedding_dim"):
+            metadata[key] = value
+        else:
+            metadata[key] = json.loads(value)
+    metadata["embedding_dim"] = int(metadata.get("embedding_dim", 0))
+    return metadata
+
+def iter_export_batches(path: str, columns: Optional[List[str]] = None,
+                        batch_size: int = DEFAULT_BATCH_SIZE,
+                        export_format: Optional[str] = None) -> Iterator["pa.RecordBatch"]:
+    """Lê a exportação em lotes de registros (Arrow IPC via memory map)"""
+    _require_pyarrow()
+    if detect_format(path, export_format) == "parquet":
+        parquet_file = pq.ParquetFile(str(path))
+        yield from parquet_file.iter_batches(batch_size=batch_size, columns=columns)
+        return
+
+    with pa.memory_map(str(path), "r") as source:
+        reader = pa_ipc.open_file(source)
+        for index in range(reader.num_record_batches):
+            batch = reader.get_batch(index)
+            if columns:
+                batch = batch.select(columns)
+            yield batch
+
+def open_export_table(path: str, columns: Optional[List[str]] = None,
+                      export_format: Optional[str] = None) -> "pa.Table":
+    """Tabela inteira; em Arrow IPC os buffers apontam para o arquivo mapeado
+
+    Use table.to_pandas() para um DataFrame.
+    """
+    _require_pyarrow()
+    if detect_format(path, export_format) == "parquet":
+        return pq.read_table(str(path), columns=columns)
+
+    source = pa.memory_map(str(path), "r")
+    table = pa_ipc.open_file(source).read_all()
+    return table.select(columns) if columns else table
+
+def batch_embeddings(batch: "pa.RecordBatch") -> "np.ndarray":
+    """Embeddings de um lote como matriz float32 (n x dim), sem cópia"""
+    column = batch.column(batch.schema.get_field_index("embedding"))
+    dim = column.type.list_size
+    return column.flatten().to_numpy(zero_copy_only=True).reshape(-1, dim)
+
+def load_embeddings(path: str, export_format: Optional[str] = None) -> "np.ndarray":
+    """Todos os embeddings da exportação em uma matriz (n x dim)"""
+    matrices = [batch_embeddings(batch)
+                for batch in iter_export_batches(path, ["embedding"], export_format=export_format)]
+    if not matrices:
+        return np.zeros((0, read_export_metadata(path, export_format)["embedding_dim"]), dtype=np.float32)
+    return matrices[0] if len(matrices) == 1 else np.concatenate(matrices)
+
+def batch_rows(batch: "pa.RecordBatch") -> List[Dict[str, Any]]:
+    """Linhas de um lote como dicts, com a coluna de metadados decodificada"""
+    rows = batch.select([name for name, _ in SCALAR_COLUMNS
+                         if name in batch.schema.names]).to_pylist()
+    for row in rows:
+        row["metadata"] = json.loads(row["metadata"]) if row.get("metadata") else {}
+    return rows
+
+def iter_in_batches(items: Iterable[Any], batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[List[Any]]:
+    """Agrupa um iterável em listas de até batch_size itens"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
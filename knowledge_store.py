@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Armazenamento segmentado da base de conhecimento
+O conteúdo de cada documento é gravado uma única vez, comprimido com zlib, em
+arquivos de segmento só-de-acréscimo; um índice SQLite guarda os metadados e a
+posição de cada documento. A carga é preguiçosa (o texto só é lido quando
+acessado) e o salvamento é incremental (só documentos novos são gravados).
+"""
+
+import json
+import zlib
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import MutableSequence
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable, Tuple, Union
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEGMENT_MAX_BYTES = 8 * 1024 * 1024
+
+class KnowledgeStore:
+    """Segmentos comprimidos + índice SQLite"""
+
+    def __init__(self, store_dir: str = "knowledge_store",
+                 segment_max_bytes: int = DEFAULT_SEGMENT_MAX_BYTES,
+                 read_cache_size: int = 64):
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.segment_max_bytes = segment_max_bytes
+        self.read_cache_size = read_cache_size
+
+        self._lock = threading.RLock()
+        self._read_cache: "OrderedDict[int, str]" = OrderedDict()
+        self._conn = sqlite3.connect(str(self.store_dir / "index.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._create_tables()
+
+    def _create_tables(self):
+        with self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    file_path TEXT,
+                    metadata TEXT NOT NULL,
+                    segment INTEGER NOT NULL,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_documents_path ON documents(file_path);
+                CREATE TABLE IF NOT EXISTS analysis_results (
+                    file_name TEXT PRIMARY KEY,
+                    result TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS sentiment_results (
+                    content_hash TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    PRIMARY KEY (content_hash, version)
+                );
+                CREATE TABLE IF NOT EXISTS store_info (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+            """)
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.store_dir / f"seg_{segment:06d}.bin"
+
+    def _get_info(self, key: str, default: int = 0) -> int:
+        row = self._conn.execute("SELECT value FROM store_info WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_info(self, key: str, value: int):
+        self._conn.execute("INSERT OR REPLACE INTO store_info (key, value) VALUES (?, ?)", (key, value))
+
+    def is_empty(self) -> bool:
+        return self._conn.execute("SELECT 1 FROM documents LIMIT 1").fetchone() is None
+
+    def add_documents(self, documents: Iterable[Tuple[Dict[str, Any], str]]) -> List[int]:
+        """Acrescenta (metadados, conteúdo) aos segmentos; retorna os ids"""
+        ids = []
+        with self._lock, self._conn:
+            segment = self._get_info("current_segment")
+            handle = open(self._segment_path(segment), 'ab')
+            try:
+                for metadata, content in documents:
+                    data = zlib.compress((content or "").encode('utf-8'), 6)
+                    offset = handle.tell()
+                    if offset and offset + len(data) > self.segment_max_bytes:
+                        handle.close()
+                        segment += 1
+                        handle = open(self._segment_path(segment), 'ab')
+                        offset = handle.tell()
+                    handle.write(data)
+
+                    cursor = self._conn.execute(
+                        "INSERT INTO documents (file_path, metadata, segment, offset, length) VALUES (?, ?, ?, ?, ?)",
+                        (metadata.get("file_path"), json.dumps(metadata, ensure_ascii=False),
+                         segment, offset, len(data))
+                    )
+                    ids.append(cursor.lastrowid)
+            finally:
+                handle.close()
+            self._set_info("current_segment", segment)
+        return ids
+
+    def read_content(self, doc_id: int) -> str:
+        """Lê e descomprime o conteúdo de um documento"""
+        with self._lock:
+            if doc_id in self._read_cache:
+                self._read_cache.move_to_end(doc_id)
+                return self._read_cache[doc_id]
+
+            row = self._conn.execute(
+                "SELECT segment, offset, length FROM documents WHERE id = ?", (doc_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(f"Documento {doc_id} não encontrado no armazenamento")
+
+            segment, offset, length = row
+            with open(self._segment_path(segment), 'rb') as f:
+                f.seek(offset)
+                content = zlib.decompress(f.read(length)).decode('utf-8')
+
+            self._read_cache[doc_id] = content
+            if len(self._read_cache) > self.read_cache_size:
+                self._read_cache.popitem(last=False)
+            return content
+
+    def list_documents(self) -> List[Dict[str, Any]]:
+        """Metadados de todos os documentos (sem o conteúdo), na ordem de inserção"""
+        with self._lock:
+            rows = self._conn.execute("SELECT id, metadata FROM documents ORDER BY id").fetchall()
+        documents = []
+        for doc_id, metadata in rows:
+            document = json.loads(metadata)
+            document["store_id"] = doc_id
+            documents.append(document)
+        return documents
+
+    def update_metadata(self, updates: Dict[int, Dict[str, Any]]):
+        """Acrescenta campos aos metadados de documentos já gravados (id -> campos)"""
+        with self._lock, self._conn:
+            for doc_id, fields in updates.items():
+                row = self._conn.execute("SELECT metadata FROM documents WHERE id = ?", (doc_id,)).fetchone()
+                if row:
+                    metadata = json.loads(row[0])
+                    metadata.update(fields)
+                    self._conn.execute("UPDATE documents SET metadata = ? WHERE id = ?",
+                                       (json.dumps(metadata, ensure_ascii=False), doc_id))
+
+    def delete_documents(self, doc_ids: Iterable[int]):
+        """Remove documentos do índice; o espaço é recuperado na compactação"""
+        doc_ids = list(doc_ids)
+        if not doc_ids:
+            return
+        with self._lock, self._conn:
+            dead = 0
+            for doc_id in doc_ids:
+                row = self._conn.execute("SELECT length FROM documents WHERE id = ?", (doc_id,)).fetchone()
+                if row:
+                    dead += row[0]
+                    self._conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+                self._read_cache.pop(doc_id, None)
+            self._set_info("dead_bytes", self._get_info("dead_bytes") + dead)
+
+    def save_analysis_results(self, analysis_results: Dict[str, Any]):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM analysis_results")
+            self._conn.executemany(
+                "INSERT INTO analysis_results (file_name, result) VALUES (?, ?)",
+                [(name, json.dumps(result, ensure_ascii=False)) for name, result in analysis_results.items()]
+            )
+
+    def load_analysis_results(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute("SELECT file_name, result FROM analysis_results").fetchall()
+        return {name: json.loads(result) for name, result in rows}
+
+    def get_sentiment_results(self, content_hashes: Iterable[str], version: str) -> Dict[str, Any]:
+        """Resultados de sentimento já calculados, por hash do conteúdo"""
+        content_hashes = list(content_hashes)
+        found = {}
+        with self._lock:
+            # Limite de parâmetros do SQLite: consultar em blocos
+            for start in range(0, len(content_hashes), 500):
+                chunk = content_hashes[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT content_hash, result FROM sentiment_results "
+                    f"WHERE version = ? AND content_hash IN ({placeholders})",
+                    [version, *chunk]
+                ).fetchall()
+                found.update((content_hash, json.loads(result)) for content_hash, result in rows)
+        return found
+
+    def save_sentiment_results(self, results: Dict[str, Any], version: str):
+        """Grava resultados de sentimento por hash do conteúdo"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sentiment_results (content_hash, version, result) VALUES (?, ?, ?)",
+                [(content_hash, version, json.dumps(result, ensure_ascii=False))
+                 for content_hash, result in results.items()]
+            )
+
+    def sync(self, documents: List[Dict[str, Any]],
+             contents: Union["LazyContentList", List[str]],
+             analysis_results: Dict[str, Any]) -> int:
+        """Sincroniza o estado em memória: grava só os documentos novos
+
+        Documentos gravados recebem "store_id" e deixam de manter o conteúdo
+        em memória (ele passa a ser lido sob demanda). Retorna quantos foram gravados.
+        """
+        with self._lock:
+            keep = {doc["store_id"] for doc in documents if doc.get("store_id") is not None}
+            stored = {row[0] for row in self._conn.execute("SELECT id FROM documents")}
+            self.delete_documents(stored - keep)
+
+            new_positions = [i for i, doc in enumerate(documents) if doc.get("store_id") is None]
+            ids = self.add_documents(
+                ({k: v for k, v in documents[i].items() if k not in ("content", "store_id")}, contents[i])
+                for i in new_positions
+            ) if new_positions else []
+            for i, doc_id in zip(new_positions, ids):
+                documents[i]["store_id"] = doc_id
+                documents[i].pop("content", None)
+                if isinstance(contents, LazyContentList):
+                    contents.mark_stored(i, doc_id)
+
+            self.save_analysis_results(analysis_results)
+
+            if self._should_compact():
+                self.compact()
+            return len(ids)
+
+    def _should_compact(self) -> bool:
+        dead = self._get_info("dead_bytes")
+        if dead < self.segment_max_bytes:
+            return False
+        live = self._conn.execute("SELECT COALESCE(SUM(length), 0) FROM documents").fetchone()[0]
+        return dead > live
+
+    def compact(self):
+        """Regrava os documentos vivos em segmentos novos e apaga os antigos"""
+        with self._lock:
+            old_segments = sorted(self.store_dir.glob("seg_*.bin"))
+            segment = self._get_info("current_segment") + 1
+            rows = self._conn.execute(
+                "SELECT id, segment, offset, length FROM documents ORDER BY id"
+            ).fetchall()
+
+            updates = []
+            handle = open(self._segment_path(segment), 'wb')
+            try:
+                for doc_id, old_segment, old_offset, length in rows:
+                    with open(self._segment_path(old_segment), 'rb') as f:
+                        f.seek(old_offset)
+                        data = f.read(length)
+                    if handle.tell() and handle.tell() + length > self.segment_max_bytes:
+                        handle.close()
+                        segment += 1
+                        handle = open(self._segment_path(segment), 'wb')
+                    updates.append((segment, handle.tell(), doc_id))
+                    handle.write(data)
+            finally:
+                handle.close()
+
+            with self._conn:
+                self._conn.executemany("UPDATE documents SET segment = ?, offset = ? WHERE id = ?", updates)
+                self._set_info("current_segment", segment)
+                self._set_info("dead_bytes", 0)
+
+            for path in old_segments:
+                try:
+                    path.unlink()
+                except OSError as e:
+                    logger.warning(f"Erro ao remover segmento antigo {path}: {e}")
+            logger.info(f"Armazenamento compactado: {len(rows)} documentos")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, live = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM documents"
+            ).fetchone()
+            return {
+                "documents": count,
+                "compressed_bytes": live,
+                "dead_bytes": self._get_info("dead_bytes"),
+                "segments": len(list(self.store_dir.glob("seg_*.bin")))
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class LazyContentList(MutableSequence):
+    """Lista de conteúdos em que documentos já gravados são lidos sob demanda
+
+    Cada item é o id no KnowledgeStore (int) ou o texto ainda não gravado (str).
+    """
+
+    def __init__(self, store: KnowledgeStore, items: Iterable[Union[int, str]] = ()):
+        self._store = store
+        self._items: List[Union[int, str]] = list(items)
+
+    def _resolve(self, item: Union[int, str]) -> str:
+        return self._store.read_content(item) if isinstance(item, int) else item
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._resolve(item) for item in self._items[index]]
+        return self._resolve(self._items[index])
+
+    def __setitem__(self, index, value):
+        self._items[index] = value
+
+    def __delitem__(self, index):
+        del self._items[index]
+
+    def insert(self, index, value):
+        self._items.insert(index, value)
+
+    def __iter__(self):
+        for item in list(self._items):
+            yield self._resolve(item)
+
+    def mark_stored(self, index: int, doc_id: int):
+        """Troca o texto em memória pela referência ao armazenamento"""
+        self._items[index] = doc_id
+
+    def __repr__(self) -> str:
+        loaded = sum(1 for item in self._items if isinstance(item, str))
+        return f"LazyContentList({len(self._items)} itens, {loaded} em memória)"
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Observador incremental de pastas para o sistema de conhecimento
+Mantém um catálogo persistido (mtime/tamanho/hash) dos arquivos e envia
+para a fila de ingestão apenas os arquivos adicionados, modificados ou removidos
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Callable, Iterable, Tuple
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@dataclass
+class FileChange:
+    """Alteração detectada em um arquivo observado"""
+    path: str
+    change_type: str  # "added", "modified" ou "deleted"
+    size: int = 0
+    mtime_ns: int = 0
+    file_hash: Optional[str] = None
+
+def normalize_path(path: str) -> str:
+    """Forma canônica de um caminho (absoluto, sem links simbólicos)
+
+    Usada como chave no catálogo e na base de conhecimento, para que o mesmo
+    arquivo adicionado à mão e detectado pelo observador seja um só.
+    """
+    return str(Path(path).expanduser().resolve())
+
+def hash_file(file_path: str, block_size: int = 1024 * 1024) -> str:
+    """Hash SHA-256 do conteúdo do arquivo"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class FolderCatalog:
+    """Catálogo persistido dos arquivos observados"""
+
+    def __init__(self, catalog_file: str = "config/knowledge_watch_catalog.json"):
+        self.catalog_file = Path(catalog_file)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.load()
+
+    def load(self):
+        """Carrega o catálogo do disco"""
+        try:
+            if self.catalog_file.exists():
+                with open(self.catalog_file, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+        except Exception as e:
+            logger.error(f"Erro ao carregar catálogo de arquivos: {e}")
+            self.entries = {}
+
+    def save(self):
+        """Salva o catálogo de forma atômica"""
+        try:
+            self.catalog_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.catalog_file.with_name(self.catalog_file.name + ".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.catalog_file)
+        except Exception as e:
+            logger.error(f"Erro ao salvar catálogo de arquivos: {e}")
+
+    @staticmethod
+    def iter_files(directories: Iterable[str], extensions: Optional[Iterable[str]] = None):
+        """Percorre os diretórios com os.scandir, retornando (caminho, stat)"""
+        extensions = {ext.lower() for ext in extensions} if extensions else None
+        stack = [normalize_path(directory) for directory in directories]
+
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.is_file():
+                                if extensions and os.path.splitext(entry.name)[1].lower() not in extensions:
+                                    continue
+                                yield entry.path, entry.stat()
+                        except OSError as e:
+                            logger.warning(f"Erro ao ler {entry.path}: {e}")
+            except OSError as e:
+                logger.warning(f"Erro ao percorrer {directory}: {e}")
+
+    def detect_changes(self, directories: List[str],
+                       extensions: Optional[Iterable[str]] = None) -> List[FileChange]:
+        """Compara o estado atual com o catálogo (apenas stat, sem ler conteúdo)"""
+        changes = []
+        seen = set()
+
+        for path, stat in self.iter_files(directories, extensions):
+            seen.add(path)
+            entry = self.entries.get(path)
+            if entry is None:
+                changes.append(FileChange(path, "added", stat.st_size, stat.st_mtime_ns))
+            elif entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+                changes.append(FileChange(path, "modified", stat.st_size, stat.st_mtime_ns))
+
+        roots = tuple(normalize_path(directory) + os.sep for directory in directories)
+        for path in self.entries:
+            if path not in seen and path.startswith(roots):
+                changes.append(FileChange(path, "deleted"))
+
+        return changes
+
+    def content_changed(self, change: FileChange) -> bool:
+        """False se o arquivo foi apenas "tocado" (stat mudou, conteúdo igual)"""
+        if change.change_type == "deleted":
+            return change.path in self.entries
+        previous = self.entries.get(change.path)
+        return previous is None or previous.get("hash") != change.file_hash
+
+    def commit(self, change: FileChange) -> bool:
+        """Registra uma alteração; retorna False se o conteúdo não mudou de fato"""
+        changed = self.content_changed(change)
+        if change.change_type == "deleted":
+            self.entries.pop(change.path, None)
+        else:
+            self.entries[change.path] = {
+                "size": change.size,
+                "mtime_ns": change.mtime_ns,
+                "hash": change.file_hash
+            }
+        return changed
+
+def _succeeded(future: Future) -> bool:
+    """Tarefa concluída sem exceção e sem resultado {"status": "error"}"""
+    if future.cancelled() or future.exception() is not None:
+        return False
+    result = future.result()
+    return not (isinstance(result, dict) and result.get("status") == "error")
+
+class FolderWatcher:
+    """Observa diretórios e emite alterações estáveis (com debounce)
+
+    on_change pode retornar um Future (ex.: a tarefa de ingestão): a alteração
+    só entra no catálogo quando ele termina com sucesso. Se on_change falhar, a
+    alteração é emitida de novo nas próximas varreduras, até max_retries vezes;
+    depois disso fica registrada sem hash e volta quando o arquivo mudar.
+    """
+
+    def __init__(self,
+                 directories: List[str],
+                 on_change: Callable[[FileChange], Optional[Future]],
+                 catalog: Optional[FolderCatalog] = None,
+                 extensions: Optional[Iterable[str]] = None,
+                 interval: float = 30.0,
+                 debounce: float = 5.0,
+                 max_retries: int = 3):
+        self.directories = list(directories)
+        self.on_change = on_change
+        self.catalog = catalog or FolderCatalog()
+        self.extensions = list(extensions) if extensions else None
+        self.interval = interval
+        self.debounce = debounce
+        self.max_retries = max_retries
+
+        # Alterações aguardando estabilizar: caminho -> (alteração, instante da última mudança)
+        self.pending: Dict[str, Tuple[FileChange, float]] = {}
+        # Alterações emitidas ainda em processamento e falhas consecutivas por caminho
+        self.in_flight: Dict[str, FileChange] = {}
+        self.failures: Dict[str, int] = {}
+        self._catalog_dirty = False
+
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def scan_once(self) -> List[FileChange]:
+        """Executa uma varredura e retorna as alterações emitidas"""
+        with self._lock:
+            now = time.monotonic()
+
+            for change in self.catalog.detect_changes(self.directories, self.extensions):
+                if change.path in self.in_flight:
+                    continue  # ainda em processamento
+                pending = self.pending.get(change.path)
+                if (pending is None or pending[0].size != change.size or
+                        pending[0].mtime_ns != change.mtime_ns or
+                        pending[0].change_type != change.change_type):
+                    # Arquivo ainda mudando: reiniciar o debounce
+                    self.pending[change.path] = (change, now)
+
+            ready = []
+            for path, (change, last_change) in list(self.pending.items()):
+                if now - last_change < self.debounce:
+                    continue
+                del self.pending[path]
+
+                if change.change_type != "deleted":
+                    try:
+                        change.file_hash = hash_file(path)
+                    except OSError as e:
+                        # Removido ou bloqueado durante a varredura; tentar na próxima
+                        logger.warning(f"Erro ao calcular hash de {path}: {e}")
+                        continue
+
+                if self.catalog.content_changed(change):
+                    self.in_flight[path] = change
+                    ready.append(change)
+                else:
+                    # Só tocado: registrar o novo stat sem reprocessar
+                    self.catalog.commit(change)
+                    self._catalog_dirty = True
+
+        emitted = []
+        for change in ready:
+            try:
+                result = self.on_change(change)
+            except Exception as e:
+                logger.error(f"Erro ao tratar alteração em {change.path}: {e}")
+                self._finish(change, False)
+                continue
+
+            emitted.append(change)
+            if isinstance(result, Future):
+                result.add_done_callback(lambda future, change=change: self._finish(change, _succeeded(future)))
+            else:
+                self._finish(change, True)
+
+        self.save_catalog()
+        return emitted
+
+    def _finish(self, change: FileChange, succeeded: bool):
+        """Registra a alteração no catálogo só depois de tratada com sucesso"""
+        with self._lock:
+            self.in_flight.pop(change.path, None)
+            if succeeded:
+                self.failures.pop(change.path, None)
+                self.catalog.commit(change)
+                self._catalog_dirty = True
+                return
+
+            failures = self.failures.get(change.path, 0) + 1
+            if failures < self.max_retries:
+                self.failures[change.path] = failures
+                logger.warning(f"Alteração em {change.path} será tentada de novo ({failures}/{self.max_retries})")
+                return
+
+            # Desistir até o arquivo mudar: stat registrado sem hash
+            self.failures.pop(change.path, None)
+            change.file_hash = None
+            self.catalog.commit(change)
+            self._catalog_dirty = True
+            logger.error(f"Alteração em {change.path} falhou {failures} vezes; ignorada até o arquivo mudar")
+
+    def save_catalog(self):
+        """Grava o catálogo se houve alterações registradas desde a última gravação"""
+        with self._lock:
+            if self._catalog_dirty:
+                self.catalog.save()
+                self._catalog_dirty = False
+
+    def _watch_loop(self):
+        """Loop de varredura periódica"""
+        while not self._stop_event.is_set():
+            try:
+                self.scan_once()
+            except Exception as e:
+                logger.error(f"Erro na varredura de pastas: {e}")
+
+            # Com alterações pendentes, verificar de novo assim que o debounce expirar
+            wait = min(self.interval, self.debounce) if self.pending else self.interval
+            self._stop_event.wait(wait)
+
+    def start(self):
+        """Inicia a observação em background"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._watch_loop, daemon=True)
+        self._thread.start()
+        logger.info(f"Observando pastas: {', '.join(self.directories)}")
+
+    def stop(self):
+        """Para a observação"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.save_catalog()
+        logger.info("Observação de pastas parada")
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Pool de workers orientado a eventos para o sistema de conhecimento
+Fila com prioridades (consultas antes de análises em lote), threads para I/O,
+pool de processos opcional para a extração, eventos de progresso por tarefa
+e encerramento com drenagem da fila
+"""
+
+import time
+import logging
+import itertools
+import threading
+import queue
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Callable, Iterable, Iterator
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Prioridades (menor valor = executado antes)
+PRIORITY_QUERY = 0
+PRIORITY_DOCUMENT = 5
+PRIORITY_ANALYSIS = 10
+
+DEFAULT_PRIORITIES = {
+    "enhancement": PRIORITY_QUERY,
+    "document": PRIORITY_DOCUMENT,
+    "remove_document": PRIORITY_DOCUMENT,
+    "analysis": PRIORITY_ANALYSIS,
+    "batch_analysis": PRIORITY_ANALYSIS
+}
+
+# Marcador de parada dos workers
+_STOP = object()
+
+@dataclass
+class TaskEvent:
+    """Evento de progresso de uma tarefa"""
+    task_id: int
+    task_type: str
+    stage: str  # "queued", "started", "progress", "done" ou "failed"
+    progress: float = 0.0
+    message: str = ""
+    duration: Optional[float] = None
+    timestamp: float = field(default_factory=time.time)
+
+class WorkerPool:
+    """Pool de threads consumindo uma fila de prioridades com espera bloqueante"""
+
+    def __init__(self,
+                 handler: Callable[[Dict[str, Any]], Any],
+                 num_threads: int = 2,
+                 num_processes: int = 0,
+                 priorities: Optional[Dict[str, int]] = None,
+                 throughput_window: float = 60.0):
+        self.handler = handler
+        self.num_threads = max(1, num_threads)
+        self.num_processes = max(0, num_processes)
+        self.priorities = dict(DEFAULT_PRIORITIES, **(priorities or {}))
+        self.throughput_window = throughput_window
+
+        # Entradas: (prioridade, sequência, tarefa, future)
+        self.queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._threads: List[threading.Thread] = []
+        self._executor = None
+        self._listeners: List[Callable[[TaskEvent], None]] = []
+
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._unfinished = 0
+        self._in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self._finished_at = deque()
+        self._durations = deque(maxlen=200)
+
+    def add_listener(self, callback: Callable[[TaskEvent], None]):
+        """Registra um callback para os eventos de progresso"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[TaskEvent], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _emit(self, event: TaskEvent):
+        for callback in list(self._listeners):
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Erro no listener de progresso: {e}")
+
+    def submit(self, task: Dict[str, Any], priority: Optional[int] = None) -> Future:
+        """Enfileira uma tarefa; o Future recebe o retorno do handler"""
+        task_type = task.get("type", "unknown")
+        if priority is None:
+            priority = self.priorities.get(task_type, PRIORITY_DOCUMENT)
+
+        with self._lock:
+            task_id = next(self._sequence)
+            self._unfinished += 1
+
+        task["task_id"] = task_id
+        future = Future()
+        self._emit(TaskEvent(task_id, task_type, "queued"))
+        self.queue.put((priority, task_id, task, future))
+        return future
+
+    def report_progress(self, task: Dict[str, Any], progress: float, message: str = ""):
+        """Emite um evento de progresso intermediário para a tarefa"""
+        self._emit(TaskEvent(task.get("task_id", -1), task.get("type", "unknown"),
+                             "progress", progress, message))
+
+    def run_in_process(self, func: Callable, *args) -> Any:
+        """Executa uma função (de nível de módulo) no pool de processos"""
+        executor = self._executor
+        if executor is None:
+            return func(*args)
+        try:
+            return executor.submit(func, *args).result()
+        except BrokenProcessPool as e:
+            logger.warning(f"Pool de processos indisponível, executando na thread: {e}")
+            self._executor = None
+            executor.shutdown(wait=False)
+            return func(*args)
+
+    def map_in_process(self, func: Callable, items: Iterable[Any], max_pending: Optional[int] = None) -> Iterator[Any]:
+        """Aplica func a cada item no pool de processos, em ordem, com no máximo max_pending em voo"""
+        executor = self._executor
+        if executor is None:
+            for item in items:
+                yield func(item)
+            return
+
+        max_pending = max_pending or 2 * max(1, self.num_processes)
+        pending: deque = deque()
+        iterator = iter(items)
+        missing = object()
+        # Item cujo result() falhou (já fora de pending) e item cujo submit falhou (ainda não em pending)
+        failed = unsubmitted = missing
+        try:
+            for item in iterator:
+                try:
+                    future = executor.submit(func, item)
+                except BrokenProcessPool:
+                    unsubmitted = item
+                    raise
+                pending.append((item, future))
+                if len(pending) >= max_pending:
+                    failed, future = pending.popleft()
+                    yield future.result()
+                    failed = missing
+            while pending:
+                failed, future = pending.popleft()
+                yield future.result()
+                failed = missing
+        except BrokenProcessPool as e:
+            logger.warning(f"Pool de processos indisponível, executando na thread: {e}")
+            self._executor = None
+            executor.shutdown(wait=False)
+            # Refazer na thread, na ordem original: o item que falhou, os pendentes e o restante
+            if failed is not missing:
+                yield func(failed)
+            for item, _ in pending:
+                yield func(item)
+            if unsubmitted is not missing:
+                yield func(unsubmitted)
+            for item in iterator:
+                yield func(item)
+
+    def _worker_loop(self):
+        """Consome a fila com get() bloqueante (sem polling)"""
+        while True:
+            _, task_id, task, future = self.queue.get()
+            if task is _STOP:
+                break
+
+            if not future.set_running_or_notify_cancel():
+                self._finish(None)
+                continue
+
+            self._run(task_id, task, future)
+
+    def _run(self, task_id: int, task: Dict[str, Any], future: Future):
+        task_type = task.get("type", "unknown")
+        with self._lock:
+            self._in_flight += 1
+        self._emit(TaskEvent(task_id, task_type, "started"))
+
+        start = time.monotonic()
+        try:
+            result = self.handler(task)
+        except Exception as e:
+            duration = time.monotonic() - start
+            logger.error(f"Erro na tarefa {task_type} #{task_id}: {e}")
+            self._finish(duration, failed=True)
+            future.set_exception(e)
+            self._emit(TaskEvent(task_id, task_type, "failed", 1.0, str(e), duration))
+        else:
+            duration = time.monotonic() - start
+            self._finish(duration)
+            future.set_result(result)
+            self._emit(TaskEvent(task_id, task_type, "done", 1.0, duration=duration))
+
+    def _finish(self, duration: Optional[float], failed: bool = False):
+        with self._lock:
+            self._unfinished -= 1
+            if duration is not None:
+                self._in_flight -= 1
+                self._durations.append(duration)
+                self._finished_at.append(time.monotonic())
+                if failed:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+            self._idle.notify_all()
+
+    def start(self):
+        """Inicia as threads (e o pool de processos, se configurado)"""
+        if self.is_running():
+            return
+
+        if self.num_processes and self._executor is None:
+            try:
+                self._executor = ProcessPoolExecutor(max_workers=self.num_processes)
+            except Exception as e:
+                logger.warning(f"Pool de processos não disponível: {e}")
+                self._executor = None
+
+        self._threads = []
+        for i in range(self.num_threads):
+            thread = threading.Thread(target=self._worker_loop, name=f"knowledge-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def wait_until_idle(self, timeout: Optional[float] = None) -> bool:
+        """Aguarda até não haver tarefas na fila nem em execução"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._unfinished == 0, timeout)
+
+    def shutdown(self, drain: bool = True, timeout: Optional[float] = None) -> bool:
+        """Para os workers; com drain=True, processa a fila antes de parar
+
+        Tarefas que não couberem no timeout permanecem na fila para o próximo start().
+        Sem workers em execução não há o que drenar: a fila fica como está.
+        """
+        if drain and self.is_running():
+            drained = self.wait_until_idle(timeout)
+        else:
+            drained = self._unfinished == 0
+
+        # Marcadores com prioridade máxima: passam à frente do que restou na fila
+        for _ in self._threads:
+            self.queue.put((float("-inf"), next(self._sequence), _STOP, None))
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+        return drained
+
+    def is_running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def stats(self) -> Dict[str, Any]:
+        """Tamanho da fila, tarefas em execução e vazão recente"""
+        now = time.monotonic()
+        with self._lock:
+            while self._finished_at and now - self._finished_at[0] > self.throughput_window:
+                self._finished_at.popleft()
+            recent = len(self._finished_at)
+            avg_duration = sum(self._durations) / len(self._durations) if self._durations else 0.0
+            return {
+                "queued": self._unfinished - self._in_flight,
+                "in_flight": self._in_flight,
+                "completed": self.completed,
+                "failed": self.failed,
+                "threads": len(self._threads),
+                "processes": self.num_processes if self._executor is not None else 0,
+                "throughput_per_min": round(recent * 60.0 / self.throughput_window, 2),
+                "avg_task_seconds": round(avg_duration, 3)
+            }
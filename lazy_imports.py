@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Importação preguiçosa de dependências opcionais pesadas
+A disponibilidade é verificada com find_spec (sem executar o módulo) e o
+import real só acontece no primeiro uso do módulo ou do atributo. Assim,
+importar um helper não carrega TensorFlow, LangChain, sentence-transformers
+ou pandas até que sejam de fato necessários.
+"""
+
+import sys
+import logging
+import importlib
+import importlib.util
+import importlib.machinery
+import threading
+from typing import Any, Sequence, Union
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _spec_exists(name: str) -> bool:
+    """find_spec de um nome (pontuado ou não) sem executar pacotes ainda não importados
+
+    Submódulos são procurados nos diretórios do pacote pai (PathFinder), o que
+    não importa o pai; se o pai já estiver importado, usa find_spec normal.
+    """
+    parts = name.split(".")
+    spec = importlib.util.find_spec(parts[0])
+    for position in range(1, len(parts)):
+        if spec is None:
+            return False
+        parent = ".".join(parts[:position])
+        if parent in sys.modules:
+            return importlib.util.find_spec(name) is not None
+        locations = spec.submodule_search_locations
+        if not locations:
+            return False  # o pai é um módulo simples, não um pacote
+        spec = importlib.machinery.PathFinder.find_spec(".".join(parts[:position + 1]), list(locations))
+    return spec is not None
+
+def module_available(*names: str) -> bool:
+    """Todos os módulos estão instalados? Não executa o código dos módulos
+
+    Nomes pontuados verificam também o submódulo (ex.: "langchain.chains",
+    removido no LangChain 1.0), não só o pacote de topo.
+    """
+    for name in names:
+        if name in sys.modules:
+            continue
+        try:
+            if not _spec_exists(name):
+                return False
+        except (ImportError, ValueError):
+            return False
+    return True
+
+class LazyModule:
+    """Módulo importado no primeiro acesso a um atributo"""
+
+    def __init__(self, name: str):
+        self.__dict__["_lazy_name"] = name
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _resolve(self):
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__dict__["_lazy_name"])
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self._resolve(), attribute)
+
+    def __setattr__(self, attribute: str, value: Any):
+        setattr(self._resolve(), attribute, value)
+
+    def __dir__(self):
+        return dir(self._resolve())
+
+    def __repr__(self) -> str:
+        state = "carregado" if self.__dict__["_lazy_module"] is not None else "não carregado"
+        return f"<LazyModule {self.__dict__['_lazy_name']} ({state})>"
+
+class LazyAttribute:
+    """Classe ou função de um módulo, importada no primeiro uso
+
+    Aceita vários módulos candidatos, tentados em ordem (ex.: pacote novo e
+    pacote antigo que exportam o mesmo nome).
+    """
+
+    def __init__(self, modules: Union[str, Sequence[str]], attribute: str):
+        self._modules = [modules] if isinstance(modules, str) else list(modules)
+        self._attribute = attribute
+        self._target = None
+        self._lock = threading.Lock()
+
+    def resolve(self) -> Any:
+        """Importa e retorna o objeto real"""
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    errors = []
+                    for module_name in self._modules:
+                        try:
+                            self._target = getattr(importlib.import_module(module_name), self._attribute)
+                            break
+                        except (ImportError, AttributeError) as e:
+                            errors.append(f"{module_name}: {e}")
+                    else:
+                        raise ImportError(f"{self._attribute} não disponível ({'; '.join(errors)})")
+        return self._target
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __getattr__(self, attribute: str) -> Any:
+        if attribute.startswith("_"):
+            raise AttributeError(attribute)
+        return getattr(self.resolve(), attribute)
+
+    def __repr__(self) -> str:
+        state = "carregado" if self._target is not None else "não carregado"
+        return f"<LazyAttribute {self._attribute} de {', '.join(self._modules)} ({state})>"
+
+def lazy_import(name: str) -> Any:
+    """Módulo preguiçoso (ou o próprio módulo, se já estiver importado)"""
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
+
+def lazy_attribute(modules: Union[str, Sequence[str]], attribute: str) -> LazyAttribute:
+    """Equivalente preguiçoso de "from módulo import atributo" """
+    return LazyAttribute(modules, attribute)
+
+def is_loaded(obj: Any) -> bool:
+    """O módulo/atributo preguiçoso já foi importado?"""
+    if isinstance(obj, LazyModule):
+        return obj.__dict__["_lazy_module"] is not None
+    if isinstance(obj, LazyAttribute):
+        return obj._target is not None
+    return True
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Utilitários de streaming de respostas de LLMs
+Leitura de Server-Sent Events (OpenRouter/OpenAI) e NDJSON (Ollama),
+medição do tempo até o primeiro token e consumo de geradores de deltas.
+"""
+
+import json
+import time
+import logging
+from typing import Dict, Any, Optional, Callable, Iterable, Iterator, Generator, Union
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+Line = Union[bytes, str]
+
+def _decode(line: Line) -> str:
+    return line.decode('utf-8', errors='replace') if isinstance(line, bytes) else line
+
+def iter_sse_data(lines: Iterable[Line]) -> Iterator[str]:
+    """Conteúdo dos campos "data:" de um stream SSE, um evento por vez
+
+    Linhas de comentário (": ...", usadas como keep-alive) são ignoradas e o
+    stream termina em "data: [DONE]".
+    """
+    data_lines = []
+    for raw in lines:
+        line = _decode(raw).rstrip("\r")
+        if not line:
+            # Linha vazia encerra o evento
+            if data_lines:
+                data = "\n".join(data_lines)
+                data_lines = []
+                if data.strip() == "[DONE]":
+                    return
+                yield data
+            continue
+        if line.startswith(":"):
+            continue
+        if line.startswith("data:"):
+            data_lines.append(line[5:].lstrip(" "))
+
+    if data_lines:
+        data = "\n".join(data_lines)
+        if data.strip() != "[DONE]":
+            yield data
+
+def iter_ndjson(lines: Iterable[Line]) -> Iterator[Dict[str, Any]]:
+    """Objetos JSON de um stream com um objeto por linha"""
+    for raw in lines:
+        line = _decode(raw).strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Linha inválida no stream NDJSON: {e}")
+
+class StreamTimer:
+    """Mede o tempo até o primeiro token e o tempo total de um stream"""
+
+    def __init__(self):
+        self.start = time.time()
+        self.first_token_at: Optional[float] = None
+
+    def mark_token(self):
+        if self.first_token_at is None:
+            self.first_token_at = time.time()
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        return self.first_token_at - self.start if self.first_token_at is not None else None
+
+    @property
+    def elapsed(self) -> float:
+        return time.time() - self.start
+
+def collect_stream(stream: Generator[str, None, Any],
+                   on_delta: Optional[Callable[[str], None]] = None) -> Any:
+    """Consome um gerador de deltas, repassando cada um ao callback
+
+    Retorna o valor final do gerador (ex.: AgentResponse com o texto completo).
+    """
+    while True:
+        try:
+            delta = next(stream)
+        except StopIteration as stop:
+            return stop.value
+        if on_delta and delta:
+            try:
+                on_delta(delta)
+            except Exception as e:
+                logger.error(f"Erro no callback de streaming: {e}")
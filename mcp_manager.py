@@ -13,13 +13,17 @@ import time
 import logging
 import requests
 import re
+import hashlib
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Generator
 from dataclasses import dataclass
 import platform
 import tempfile
 import shutil
 
+from llm_streaming import iter_ndjson, StreamTimer
+from ollama_inventory import get_model_inventory
+
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -218,6 +222,9 @@ class OllamaManager:
     def __init__(self, ollama_url: str = "http://localhost:11434"):
         self.ollama_url = ollama_url
         self.base_url = f"{ollama_url}/api"
+        self.inventory = get_model_inventory(ollama_url)
+        # Cache semântico opcional (SemanticResponseCache); None desativa
+        self.semantic_cache = None
         
         # Modelos otimizados para Ryzen 5600 (CPU only)
         self.recommended_models = {
@@ -274,13 +281,9 @@ class OllamaManager:
             return False
     
     def get_installed_models(self) -> List[Dict[str, Any]]:
-        """Lista modelos instalados"""
+        """Lista modelos instalados (inventário em cache, renovado em background)"""
         try:
-            response = requests.get(f"{self.base_url}/tags")
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("models", [])
-            return []
+            return self.inventory.models()
         except Exception as e:
             logger.error(f"Erro ao listar modelos: {e}")
             return []
@@ -305,6 +308,7 @@ class OllamaManager:
             
             if process.returncode == 0:
                 logger.info(f"Modelo {model_name} instalado com sucesso")
+                self.inventory.invalidate()
                 return True
             else:
                 logger.error(f"Erro ao instalar modelo {model_name}: {stderr}")
@@ -322,6 +326,7 @@ class OllamaManager:
             
             if process.returncode == 0:
                 logger.info(f"Modelo {model_name} removido com sucesso")
+                self.inventory.invalidate()
                 return True
             else:
                 logger.error(f"Erro ao remover modelo {model_name}: {process.stderr}")
@@ -331,8 +336,23 @@ class OllamaManager:
             logger.error(f"Erro ao remover modelo {model_name}: {e}")
             return False
     
+    def _semantic_scope(self, model: str, system_prompt: str) -> str:
+        """Escopo do cache semântico: modelo + prompt de sistema (que define o modo)"""
+        return f"ollama:{model}:{hashlib.sha1(system_prompt.encode('utf-8')).hexdigest()[:12]}"
+    
     def chat_completion(self, model: str, message: str, system_prompt: str = "") -> Dict[str, Any]:
         """Envia mensagem para modelo Ollama"""
+        if self.semantic_cache:
+            cached = self.semantic_cache.lookup(message, self._semantic_scope(model, system_prompt))
+            if cached:
+                return {
+                    "success": True,
+                    "response": {"message": {"role": "assistant", "content": cached["response"]}},
+                    "model": model,
+                    "cached": True,
+                    "similarity": cached["similarity"]
+                }
+        
         try:
             payload = {
                 "model": model,
@@ -349,6 +369,8 @@ class OllamaManager:
                 "role": "user", 
                 "content": message
             })
+            # Sem "stream": False o Ollama responde em NDJSON e response.json() falha
+            payload["stream"] = False
             
             response = requests.post(
                 f"{self.base_url}/chat",
@@ -357,9 +379,15 @@ class OllamaManager:
             )
             
             if response.status_code == 200:
+                data = response.json()
+                if self.semantic_cache:
+                    self.semantic_cache.store(message, data.get("message", {}).get("content", ""),
+                                              self._semantic_scope(model, system_prompt),
+                                              tokens_used=data.get("prompt_eval_count", 0) + data.get("eval_count", 0),
+                                              response_time=data.get("total_duration", 0) / 1e9)
                 return {
                     "success": True,
-                    "response": response.json(),
+                    "response": data,
                     "model": model
                 }
             else:
@@ -374,6 +402,67 @@ class OllamaManager:
                 "error": str(e)
             }
 
+    def chat_completion_stream(self, model: str, message: str,
+                               system_prompt: str = "") -> Generator[str, None, Dict[str, Any]]:
+        """Versão em streaming (NDJSON): gera os deltas de texto e retorna o resultado final
+        
+        O resultado tem o mesmo formato de chat_completion, mais "time_to_first_token".
+        """
+        timer = StreamTimer()
+        parts = []
+        
+        try:
+            messages = []
+            if system_prompt:
+                messages.append({"role": "system", "content": system_prompt})
+            messages.append({"role": "user", "content": message})
+            
+            # Timeout de leitura vale entre linhas, não para a geração inteira
+            with requests.post(
+                f"{self.base_url}/chat",
+                json={"model": model, "messages": messages, "stream": True},
+                stream=True,
+                timeout=(10, 60)
+            ) as response:
+                if response.status_code != 200:
+                    return {
+                        "success": False,
+                        "error": f"HTTP {response.status_code}: {response.text}"
+                    }
+                
+                final = {}
+                for chunk in iter_ndjson(response.iter_lines()):
+                    if "error" in chunk:
+                        raise RuntimeError(chunk["error"])
+                    
+                    delta = (chunk.get("message") or {}).get("content", "")
+                    if delta:
+                        timer.mark_token()
+                        parts.append(delta)
+                        yield delta
+                    
+                    if chunk.get("done"):
+                        final = chunk
+                        break
+            
+            # Mesmo formato da resposta sem streaming, com o texto completo
+            final["message"] = {"role": "assistant", "content": "".join(parts)}
+            return {
+                "success": True,
+                "response": final,
+                "model": model,
+                "time_to_first_token": timer.time_to_first_token,
+                "response_time": timer.elapsed
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "partial_response": "".join(parts),
+                "time_to_first_token": timer.time_to_first_token
+            }
+
 class MCPManager:
     """Gerenciador principal de MCPs"""
     
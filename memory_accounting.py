@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Contabilidade de memória por componente
+Estimativas aproximadas (em bytes) das principais estruturas em memória:
+parâmetros de modelos, índices FAISS, listas de chunks, caches e RSS do processo
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, Optional, Callable
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Coleções maiores que isso são estimadas por amostragem
+SAMPLE_LIMIT = 2000
+# Idade máxima (s) do relatório reaproveitado pelos endpoints de status
+REPORT_MAX_AGE = 5.0
+
+def format_bytes(size: Optional[int]) -> str:
+    """Formata bytes em unidade legível"""
+    if size is None:
+        return "N/A"
+    value = float(size)
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(value) < 1024 or unit == "GB":
+            return f"{value:.1f} {unit}" if unit != "B" else f"{int(value)} B"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+def process_rss_bytes() -> Optional[int]:
+    """Memória residente (RSS) do processo atual"""
+    try:
+        import psutil
+        return psutil.Process(os.getpid()).memory_info().rss
+    except ImportError:
+        pass
+    except Exception as e:
+        logger.debug(f"psutil falhou ao ler RSS: {e}")
+
+    # Linux sem psutil
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def deep_sizeof(obj: Any, _seen: Optional[set] = None) -> int:
+    """Tamanho aproximado de um objeto e do que ele referencia
+
+    Listas, dicionários e conjuntos grandes são estimados a partir de uma
+    amostra dos primeiros itens para manter o custo baixo.
+    """
+    if obj is None:
+        return 0
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    # Arrays NumPy e similares informam o próprio buffer
+    nbytes = getattr(obj, "nbytes", None)
+    if isinstance(nbytes, int):
+        base = getattr(obj, "base", None)
+        if base is not None:
+            # View: o buffer pertence ao array base (contado uma única vez)
+            return sys.getsizeof(obj) + deep_sizeof(base, seen)
+        size = sys.getsizeof(obj)
+        # Arrays NumPy donos do buffer já o incluem em getsizeof
+        return size if size >= nbytes else size + nbytes
+
+    size = sys.getsizeof(obj)
+
+    if isinstance(obj, dict):
+        items = list(obj.items()) if len(obj) <= SAMPLE_LIMIT else [
+            item for _, item in zip(range(SAMPLE_LIMIT), obj.items())]
+        contents = sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in items)
+        size += _scale(contents, len(items), len(obj))
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        items = list(obj) if len(obj) <= SAMPLE_LIMIT else [
+            item for _, item in zip(range(SAMPLE_LIMIT), obj)]
+        contents = sum(deep_sizeof(item, seen) for item in items)
+        size += _scale(contents, len(items), len(obj))
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+        size += deep_sizeof(vars(obj), seen)
+
+    return size
+
+def _scale(sampled_bytes: int, sampled: int, total: int) -> int:
+    """Extrapola o tamanho de uma amostra para a coleção inteira"""
+    if sampled == 0 or sampled == total:
+        return sampled_bytes
+    return int(sampled_bytes * total / sampled)
+
+def model_parameter_bytes(model: Any) -> int:
+    """Bytes dos parâmetros e buffers de um modelo PyTorch (ex.: SentenceTransformer)
+
+    Aceita também wrappers do LangChain, que guardam o modelo em `client`.
+    """
+    if model is None:
+        return 0
+    model = getattr(model, "client", model)
+    total = 0
+    try:
+        for tensor in list(model.parameters()) + list(model.buffers()):
+            total += tensor.numel() * tensor.element_size()
+    except (AttributeError, TypeError):
+        return 0
+    return total
+
+def faiss_index_bytes(index: Any) -> int:
+    """Bytes dos vetores armazenados em um índice FAISS (ou vectorstore LangChain)"""
+    if index is None:
+        return 0
+    index = getattr(index, "index", index)
+    ntotal = getattr(index, "ntotal", 0)
+    code_size = getattr(index, "code_size", None)
+    if code_size is None:
+        code_size = getattr(index, "d", 0) * 4
+    return int(ntotal * code_size)
+
+def build_memory_report(components: Dict[str, int]) -> Dict[str, Any]:
+    """Monta o relatório com componentes, total rastreado e RSS"""
+    total = sum(value for value in components.values() if value)
+    rss = process_rss_bytes()
+    return {
+        "components": components,
+        "tracked_bytes": total,
+        "process_rss_bytes": rss,
+        "summary": {name: format_bytes(value) for name, value in components.items()},
+        "tracked": format_bytes(total),
+        "process_rss": format_bytes(rss)
+    }
+
+def cached_memory_report(owner: Any, max_age: float = REPORT_MAX_AGE) -> Dict[str, Any]:
+    """owner.get_memory_usage() reaproveitado por até max_age segundos
+
+    Percorrer os objetos a cada consulta de status (polling da interface)
+    custa caro; o relatório recente é guardado no próprio objeto.
+    """
+    cached = owner.__dict__.get("_memory_report_cache")
+    now = time.monotonic()
+    if cached is not None and now - cached[0] < max_age:
+        return cached[1]
+    report = owner.get_memory_usage()
+    owner.__dict__["_memory_report_cache"] = (now, report)
+    return report
+
+class PeriodicMemoryLogger:
+    """Registra periodicamente o relatório de memória de um componente"""
+
+    def __init__(self, name: str, report_provider: Callable[[], Dict[str, Any]], interval: float = 60.0):
+        self.name = name
+        self.report_provider = report_provider
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _log_loop(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                report = self.report_provider()
+                details = ", ".join(f"{name}={value}" for name, value in report["summary"].items())
+                logger.info(f"[memória] {self.name}: RSS={report['process_rss']} "
+                            f"rastreado={report['tracked']} ({details})")
+            except Exception as e:
+                logger.error(f"Erro ao registrar memória de {self.name}: {e}")
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._log_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
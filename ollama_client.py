@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Cliente HTTP persistente para a API do Ollama
+Uma sessão requests com pool de conexões keep-alive substitui o "ollama run"
+por requisição: sem criar processos, com streaming (NDJSON), controle de
+keep_alive do modelo na memória e cancelamento de requisições em andamento.
+"""
+
+import os
+import time
+import uuid
+import logging
+import threading
+import subprocess
+from typing import Dict, List, Any, Optional, Generator, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from llm_streaming import iter_ndjson, collect_stream, StreamTimer
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+DEFAULT_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "5m")
+# (conexão, leitura); a leitura vale entre linhas do stream, não para a geração inteira
+DEFAULT_TIMEOUT = (5, 120)
+
+class OllamaRequestCancelled(Exception):
+    """Requisição cancelada antes do fim da geração"""
+
+def _normalize_base_url(base_url: str) -> str:
+    base_url = base_url.rstrip("/")
+    if not base_url.startswith(("http://", "https://")):
+        base_url = f"http://{base_url}"
+    return base_url[:-4] if base_url.endswith("/api") else base_url
+
+class OllamaHTTPClient:
+    """Cliente da API do Ollama com conexões reaproveitadas entre requisições"""
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, pool_size: int = 10,
+                 timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+                 keep_alive: Optional[str] = DEFAULT_KEEP_ALIVE):
+        self.base_url = _normalize_base_url(base_url)
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Requisições em andamento: id -> (evento de cancelamento, resposta HTTP)
+        self._active: Dict[str, Tuple[threading.Event, Optional[requests.Response]]] = {}
+        self._lock = threading.Lock()
+
+    def _url(self, path: str) -> str:
+        return f"{self.base_url}/api/{path}"
+
+    def _payload(self, model: str, keep_alive: Optional[str], options: Optional[Dict[str, Any]],
+                 **fields) -> Dict[str, Any]:
+        payload = {"model": model, **{k: v for k, v in fields.items() if v is not None}}
+        keep_alive = self.keep_alive if keep_alive is None else keep_alive
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        if options:
+            payload["options"] = options
+        return payload
+
+    def _stream(self, path: str, payload: Dict[str, Any], request_id: Optional[str],
+                extract) -> Generator[str, None, Dict[str, Any]]:
+        """POST com stream=True; gera os deltas e retorna o último objeto (done=true)"""
+        request_id = request_id or uuid.uuid4().hex
+        cancel_event = threading.Event()
+        with self._lock:
+            self._active[request_id] = (cancel_event, None)
+
+        timer = StreamTimer()
+        parts = []
+        final: Dict[str, Any] = {}
+        try:
+            with self.session.post(self._url(path), json={**payload, "stream": True},
+                                   stream=True, timeout=self.timeout) as response:
+                with self._lock:
+                    self._active[request_id] = (cancel_event, response)
+                if cancel_event.is_set():
+                    raise OllamaRequestCancelled(request_id)
+                if response.status_code != 200:
+                    raise RuntimeError(f"HTTP {response.status_code}: {response.text}")
+
+                for chunk in iter_ndjson(response.iter_lines()):
+                    if cancel_event.is_set():
+                        raise OllamaRequestCancelled(request_id)
+                    if "error" in chunk:
+                        raise RuntimeError(chunk["error"])
+
+                    delta = extract(chunk)
+                    if delta:
+                        timer.mark_token()
+                        parts.append(delta)
+                        yield delta
+
+                    if chunk.get("done"):
+                        final = chunk
+                        break
+        except Exception:
+            # Fechar a resposta para cancelar interrompe a leitura com erro de conexão
+            if cancel_event.is_set():
+                raise OllamaRequestCancelled(request_id)
+            raise
+        finally:
+            with self._lock:
+                self._active.pop(request_id, None)
+
+        final.update({
+            "text": "".join(parts),
+            "request_id": request_id,
+            "time_to_first_token": timer.time_to_first_token,
+            "wall_time": timer.elapsed
+        })
+        return final
+
+    def generate_stream(self, model: str, prompt: str, system: Optional[str] = None,
+                        options: Optional[Dict[str, Any]] = None, keep_alive: Optional[str] = None,
+                        request_id: Optional[str] = None) -> Generator[str, None, Dict[str, Any]]:
+        """/api/generate em streaming: gera trechos de texto e retorna o resultado final"""
+        payload = self._payload(model, keep_alive, options, prompt=prompt, system=system)
+        return self._stream("generate", payload, request_id, lambda chunk: chunk.get("response", ""))
+
+    def chat_stream(self, model: str, messages: List[Dict[str, str]],
+                    options: Optional[Dict[str, Any]] = None, keep_alive: Optional[str] = None,
+                    request_id: Optional[str] = None) -> Generator[str, None, Dict[str, Any]]:
+        """/api/chat em streaming"""
+        payload = self._payload(model, keep_alive, options, messages=messages)
+        return self._stream("chat", payload, request_id,
+                            lambda chunk: (chunk.get("message") or {}).get("content", ""))
+
+    def generate(self, model: str, prompt: str, system: Optional[str] = None,
+                 options: Optional[Dict[str, Any]] = None, keep_alive: Optional[str] = None,
+                 request_id: Optional[str] = None) -> Dict[str, Any]:
+        """Geração completa (internamente em streaming, para poder ser cancelada)"""
+        return collect_stream(self.generate_stream(model, prompt, system, options, keep_alive, request_id))
+
+    def chat(self, model: str, messages: List[Dict[str, str]],
+             options: Optional[Dict[str, Any]] = None, keep_alive: Optional[str] = None,
+             request_id: Optional[str] = None) -> Dict[str, Any]:
+        """Chat completo (internamente em streaming, para poder ser cancelado)"""
+        return collect_stream(self.chat_stream(model, messages, options, keep_alive, request_id))
+
+    def cancel(self, request_id: str) -> bool:
+        """Cancela uma requisição em andamento; o Ollama interrompe a geração ao fechar a conexão"""
+        with self._lock:
+            entry = self._active.get(request_id)
+        if not entry:
+            return False
+        cancel_event, response = entry
+        cancel_event.set()
+        if response is not None:
+            try:
+                response.close()
+            except Exception as e:
+                logger.error(f"Erro ao cancelar requisição {request_id}: {e}")
+        logger.info(f"Requisição {request_id} cancelada")
+        return True
+
+    def cancel_all(self) -> int:
+        """Cancela todas as requisições em andamento"""
+        with self._lock:
+            request_ids = list(self._active)
+        return sum(self.cancel(request_id) for request_id in request_ids)
+
+    def active_requests(self) -> List[str]:
+        with self._lock:
+            return list(self._active)
+
+    def list_models(self, timeout: Optional[Tuple[float, float]] = None) -> List[Dict[str, Any]]:
+        """Modelos instalados (/api/tags)"""
+        response = self.session.get(self._url("tags"), timeout=timeout or self.timeout)
+        response.raise_for_status()
+        return response.json().get("models", [])
+
+    def load_model(self, model: str, keep_alive: Optional[str] = None) -> bool:
+        """Carrega o modelo na memória sem gerar texto (requisição sem prompt)"""
+        try:
+            response = self.session.post(self._url("generate"),
+                                         json=self._payload(model, keep_alive, None, stream=False),
+                                         timeout=self.timeout)
+            return response.status_code == 200
+        except Exception as e:
+            logger.error(f"Erro ao carregar modelo {model}: {e}")
+            return False
+
+    def unload_model(self, model: str) -> bool:
+        """Libera o modelo da memória imediatamente (keep_alive=0)"""
+        return self.load_model(model, keep_alive=0)
+
+    def is_available(self) -> bool:
+        try:
+            return self.session.get(f"{self.base_url}/api/version", timeout=self.timeout).status_code == 200
+        except Exception:
+            return False
+
+    def close(self):
+        self.cancel_all()
+        self.session.close()
+
+_shared_client: Optional[OllamaHTTPClient] = None
+_shared_lock = threading.Lock()
+
+def get_ollama_client() -> OllamaHTTPClient:
+    """Cliente compartilhado pelo processo (o pool de conexões é reaproveitado)"""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_lock:
+            if _shared_client is None:
+                _shared_client = OllamaHTTPClient()
+    return _shared_client
+
+def benchmark_overhead(model: str, prompt: str = "Responda apenas: ok", runs: int = 5,
+                       client: Optional[OllamaHTTPClient] = None,
+                       include_subprocess: bool = True) -> List[Dict[str, Any]]:
+    """Compara "ollama run" por requisição com o cliente HTTP persistente
+
+    O overhead é o tempo total menos o tempo de geração informado pelo Ollama
+    (total_duration), ou seja: criação de processo, conexão e serialização.
+    """
+    client = client or get_ollama_client()
+    options = {"num_predict": 8, "temperature": 0}
+    client.generate(model, prompt, options=options)  # aquece o modelo na memória
+
+    results = []
+    if include_subprocess:
+        walls = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run(["ollama", "run", model, prompt], capture_output=True, text=True, timeout=120)
+            walls.append(time.perf_counter() - start)
+        results.append({"method": "ollama run", "runs": runs,
+                        "avg_wall_ms": sum(walls) / runs * 1000, "avg_overhead_ms": None})
+
+    walls, overheads, ttfts = [], [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = client.generate(model, prompt, options=options)
+        wall = time.perf_counter() - start
+        walls.append(wall)
+        overheads.append(wall - result.get("total_duration", 0) / 1e9)
+        if result.get("time_to_first_token") is not None:
+            ttfts.append(result["time_to_first_token"])
+    results.append({"method": "http keep-alive", "runs": runs,
+                    "avg_wall_ms": sum(walls) / runs * 1000,
+                    "avg_overhead_ms": sum(overheads) / runs * 1000,
+                    "avg_ttft_ms": sum(ttfts) / len(ttfts) * 1000 if ttfts else None})
+    return results
+
+def main():
+    """Benchmark do overhead por requisição ao Ollama"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Overhead por requisição: ollama run vs. HTTP keep-alive")
+    parser.add_argument("model", help="Modelo instalado (ex.: gemma2:7b)")
+    parser.add_argument("--prompt", default="Responda apenas: ok")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--no-subprocess", action="store_true", help="Mede apenas o cliente HTTP")
+    args = parser.parse_args()
+
+    results = benchmark_overhead(args.model, args.prompt, args.runs,
+                                 include_subprocess=not args.no_subprocess)
+    print(f"\n{'método':<18} {'total (ms)':>12} {'overhead (ms)':>14} {'1º token (ms)':>14}")
+    for result in results:
+        overhead = f"{result['avg_overhead_ms']:.1f}" if result["avg_overhead_ms"] is not None else "-"
+        ttft = f"{result['avg_ttft_ms']:.1f}" if result.get("avg_ttft_ms") is not None else "-"
+        print(f"{result['method']:<18} {result['avg_wall_ms']:>12.1f} {overhead:>14} {ttft:>14}")
+
+if __name__ == "__main__":
+    main()
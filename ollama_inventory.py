@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Inventário em cache dos modelos instalados no Ollama
+Uma única leitura de /api/tags por servidor, renovada em background após o
+TTL, é compartilhada por app.py, OllamaManager e RAGSystemFunctional.
+Consultas de status viram leituras em memória, sem "ollama list" por chamada.
+"""
+
+import time
+import logging
+import threading
+from typing import Dict, List, Any, Optional
+
+from ollama_client import OllamaHTTPClient, DEFAULT_BASE_URL, _normalize_base_url
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 30.0
+# /api/tags é rápido; um Ollama fora do ar não deve travar quem consulta
+TAGS_TIMEOUT = (2, 5)
+
+class OllamaModelInventory:
+    """Lista de modelos do Ollama em memória, renovada em background"""
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, ttl: float = DEFAULT_TTL,
+                 client: Optional[OllamaHTTPClient] = None):
+        self.base_url = _normalize_base_url(base_url)
+        self.ttl = ttl
+        self.client = client or OllamaHTTPClient(self.base_url, pool_size=2)
+
+        self._models: List[Dict[str, Any]] = []
+        self._names: set = set()
+        self._available = False
+        self._error: Optional[str] = None
+        self._updated_at: Optional[float] = None
+
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._first_load = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self) -> bool:
+        """Lê /api/tags agora (bloqueia); retorna se o Ollama respondeu"""
+        try:
+            models = self.client.list_models(timeout=TAGS_TIMEOUT)
+            with self._lock:
+                self._models = models
+                self._names = {model.get("name", "") for model in models}
+                self._available = True
+                self._error = None
+        except Exception as e:
+            with self._lock:
+                # Mantém a última lista conhecida, mas marca o servidor como indisponível
+                self._available = False
+                self._error = str(e)
+            logger.debug(f"Ollama indisponível em {self.base_url}: {e}")
+        finally:
+            with self._lock:
+                self._updated_at = time.monotonic()
+                self._refreshing = False
+            self._first_load.set()
+        return self._available
+
+    def _refresh_in_background(self):
+        """Dispara uma renovação, no máximo uma por vez"""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self.refresh, name="ollama-inventory", daemon=True).start()
+
+    def is_stale(self) -> bool:
+        return self._updated_at is None or time.monotonic() - self._updated_at > self.ttl
+
+    def _ensure_fresh(self, wait: float):
+        """Dados vencidos disparam renovação em background; só a primeira leitura espera"""
+        if self.is_stale():
+            self._refresh_in_background()
+        if not self._first_load.is_set() and wait > 0:
+            self._first_load.wait(wait)
+
+    def models(self, wait: float = TAGS_TIMEOUT[1]) -> List[Dict[str, Any]]:
+        """Modelos instalados (formato de /api/tags)"""
+        self._ensure_fresh(wait)
+        with self._lock:
+            return list(self._models)
+
+    def model_names(self, wait: float = TAGS_TIMEOUT[1]) -> List[str]:
+        self._ensure_fresh(wait)
+        with self._lock:
+            return sorted(self._names)
+
+    def has_model(self, name: str, wait: float = TAGS_TIMEOUT[1]) -> bool:
+        """Modelo instalado? Sem tag, "modelo" equivale a "modelo:latest" ou a qualquer tag"""
+        self._ensure_fresh(wait)
+        with self._lock:
+            names = self._names
+        if name in names or f"{name}:latest" in names:
+            return True
+        return ":" not in name and any(installed.split(":")[0] == name for installed in names)
+
+    def is_available(self, wait: float = TAGS_TIMEOUT[1]) -> bool:
+        """O Ollama respondeu na última leitura?"""
+        self._ensure_fresh(wait)
+        return self._available
+
+    def invalidate(self):
+        """Força nova leitura (ex.: após instalar ou remover um modelo)"""
+        with self._lock:
+            self._updated_at = None
+        self._refresh_in_background()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado atual sem disparar leitura (para endpoints de status)"""
+        with self._lock:
+            age = None if self._updated_at is None else round(time.monotonic() - self._updated_at, 1)
+            return {
+                "available": self._available,
+                "models": sorted(self._names),
+                "error": self._error,
+                "age_seconds": age
+            }
+
+    def start(self, interval: Optional[float] = None):
+        """Renovação periódica em background (padrão: a cada TTL)"""
+        if self._thread and self._thread.is_alive():
+            return
+        interval = interval or self.ttl
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.is_set():
+                self.refresh()
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=loop, name="ollama-inventory-loop", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+_inventories: Dict[str, OllamaModelInventory] = {}
+_inventories_lock = threading.Lock()
+
+def get_model_inventory(base_url: str = DEFAULT_BASE_URL, ttl: float = DEFAULT_TTL) -> OllamaModelInventory:
+    """Inventário compartilhado por servidor Ollama (um leitor por URL)"""
+    key = _normalize_base_url(base_url)
+    with _inventories_lock:
+        if key not in _inventories:
+            _inventories[key] = OllamaModelInventory(key, ttl)
+        return _inventories[key]
@@ -11,7 +11,10 @@ import logging
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
-import tiktoken
+
+from async_llm_client import fan_out_sync
+from token_counter import get_token_counter
+from usage_ledger import UsageLedger
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
@@ -25,10 +28,16 @@ class OpenRouterCalculator:
         self.base_url = "https://openrouter.ai/api/v1"
         self.usage_file = Path("config/openrouter_usage.json")
         self.models_info = self.load_models_info()
-        self.usage_history = self.load_usage_history()
+        # Registro só-de-acréscimo com agregados diários (o JSON antigo é migrado uma vez)
+        self.usage_ledger = UsageLedger("config/usage_ledger")
+        self.usage_ledger.migrate_json(str(self.usage_file))
+        self.usage_ledger.compact()
+        # Encoders em cache, contagem única por tokenizador e estimador calibrado
+        self.token_counter = get_token_counter()
         
-    def load_models_info(self) -> Dict[str, Any]:
-        """Carrega informações dos modelos OpenRouter"""
+    @staticmethod
+    def load_models_info() -> Dict[str, Any]:
+        """Carrega informações dos modelos OpenRouter (preços e tamanho de contexto)"""
         models = {
             # Modelos Gratuitos
             "google/gemini-1.5-flash": {
@@ -207,38 +216,37 @@ class OpenRouterCalculator:
         return models
     
     def load_usage_history(self) -> List[Dict[str, Any]]:
-        """Carrega histórico de uso"""
-        if self.usage_file.exists():
-            try:
-                with open(self.usage_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"Erro ao carregar histórico: {e}")
-        
-        return []
+        """Registros de uso ainda não compactados"""
+        try:
+            return self.usage_ledger.recent_records()
+        except Exception as e:
+            logger.error(f"Erro ao carregar histórico: {e}")
+            return []
     
     def save_usage_history(self):
-        """Salva histórico de uso"""
-        self.usage_file.parent.mkdir(exist_ok=True)
-        
+        """Grava o checkpoint dos agregados de uso"""
         try:
-            with open(self.usage_file, 'w', encoding='utf-8') as f:
-                json.dump(self.usage_history, f, indent=2, ensure_ascii=False)
+            self.usage_ledger.flush()
         except Exception as e:
             logger.error(f"Erro ao salvar histórico: {e}")
     
     def count_tokens(self, text: str, model: str = "gpt-4") -> int:
-        """Conta tokens em um texto"""
+        """Conta tokens em um texto (exato com tiktoken quando o modelo tem tokenizador conhecido)"""
         try:
-            # Usar tiktoken para contar tokens
-            encoding = tiktoken.encoding_for_model(model)
-            tokens = encoding.encode(text)
-            return len(tokens)
+            return self.token_counter.count(text, model)
         except Exception as e:
             logger.error(f"Erro ao contar tokens: {e}")
             # Fallback: estimativa aproximada (1 token ≈ 4 caracteres)
             return len(text) // 4
     
+    def count_tokens_batch(self, texts: List[str], model: str = "gpt-4") -> List[int]:
+        """Conta tokens de vários textos em um único lote"""
+        try:
+            return self.token_counter.count_batch(texts, model)
+        except Exception as e:
+            logger.error(f"Erro ao contar tokens: {e}")
+            return [len(text) // 4 for text in texts]
+    
     def calculate_cost(self, input_tokens: int, output_tokens: int, model: str) -> Dict[str, float]:
         """Calcula custo de uma requisição"""
         if model not in self.models_info:
@@ -324,74 +332,23 @@ class OpenRouterCalculator:
         if timestamp is None:
             timestamp = datetime.now().isoformat()
         
-        record = {
-            "timestamp": timestamp,
-            "model": model,
-            "input_tokens": input_tokens,
-            "output_tokens": output_tokens,
-            "total_tokens": input_tokens + output_tokens,
-            "cost": cost,
-            "model_info": self.models_info.get(model, {})
-        }
-        
-        self.usage_history.append(record)
-        self.save_usage_history()
+        try:
+            self.usage_ledger.append(model, input_tokens, output_tokens, cost, timestamp)
+        except Exception as e:
+            logger.error(f"Erro ao registrar uso: {e}")
     
     def get_usage_summary(self, days: int = 30) -> Dict[str, Any]:
-        """Obtém resumo do uso local"""
-        if not self.usage_history:
-            return {}
-        
-        # Filtrar por período
-        cutoff_date = datetime.now() - timedelta(days=days)
-        recent_usage = [
-            record for record in self.usage_history
-            if datetime.fromisoformat(record["timestamp"]) > cutoff_date
-        ]
-        
-        if not recent_usage:
-            return {}
-        
-        # Calcular estatísticas
-        total_requests = len(recent_usage)
-        total_input_tokens = sum(record["input_tokens"] for record in recent_usage)
-        total_output_tokens = sum(record["output_tokens"] for record in recent_usage)
-        total_cost = sum(record["cost"] for record in recent_usage)
-        
-        # Modelos mais usados
-        model_usage = {}
-        for record in recent_usage:
-            model = record["model"]
-            if model not in model_usage:
-                model_usage[model] = {
-                    "requests": 0,
-                    "input_tokens": 0,
-                    "output_tokens": 0,
-                    "cost": 0
-                }
-            
-            model_usage[model]["requests"] += 1
-            model_usage[model]["input_tokens"] += record["input_tokens"]
-            model_usage[model]["output_tokens"] += record["output_tokens"]
-            model_usage[model]["cost"] += record["cost"]
-        
-        return {
-            "period_days": days,
-            "total_requests": total_requests,
-            "total_input_tokens": total_input_tokens,
-            "total_output_tokens": total_output_tokens,
-            "total_tokens": total_input_tokens + total_output_tokens,
-            "total_cost": round(total_cost, 6),
-            "average_cost_per_request": round(total_cost / total_requests, 6) if total_requests > 0 else 0,
-            "model_usage": model_usage
-        }
+        """Resumo de uso dos últimos dias, a partir dos agregados diários"""
+        return self.usage_ledger.summary(days)
     
-    def estimate_cost(self, text: str, model: str, expected_output_length: int = 100) -> Dict[str, Any]:
-        """Estima custo de uma requisição"""
-        input_tokens = self.count_tokens(text, model)
+    def estimate_cost(self, text: str, model: str, expected_output_length: int = 100,
+                      input_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """Estima custo de uma requisição (input_tokens evita recontar o mesmo texto)"""
+        if input_tokens is None:
+            input_tokens = self.count_tokens(text, model)
         
-        # Estimar tokens de saída baseado no comprimento esperado
-        output_tokens = self.count_tokens("a" * expected_output_length, model)
+        # Estimar tokens de saída pelo comprimento esperado (em caracteres), sem tokenizar
+        output_tokens = self.token_counter.estimate(expected_output_length, model)
         
         cost_info = self.calculate_cost(input_tokens, output_tokens, model)
         
@@ -436,10 +393,13 @@ class OpenRouterCalculator:
             models = list(self.models_info.keys())
         
         comparison = {}
+        # Uma contagem por tokenizador, compartilhada entre os modelos da mesma família
+        models = [model for model in models if model in self.models_info]
+        token_counts = self.token_counter.count_for_models(text, models)
         
         for model in models:
             if model in self.models_info:
-                estimate = self.estimate_cost(text, model)
+                estimate = self.estimate_cost(text, model, input_tokens=token_counts[model])
                 comparison[model] = {
                     "name": self.models_info[model]["name"],
                     "provider": self.models_info[model]["provider"],
@@ -456,6 +416,42 @@ class OpenRouterCalculator:
         ))
         
         return sorted_comparison
+    
+    def compare_model_responses(self, text: str, models: List[str], max_tokens: int = 512,
+                                record_usage: bool = True) -> Dict[str, Any]:
+        """Envia o mesmo prompt a vários modelos em paralelo e compara custo real e latência"""
+        if not self.api_key:
+            logger.error("API key necessária para comparar respostas")
+            return {}
+        
+        try:
+            results = fan_out_sync(self.api_key, [{"role": "user", "content": text}], models,
+                                   max_tokens=max_tokens)
+        except Exception as e:
+            logger.error(f"Erro ao comparar modelos: {e}")
+            return {}
+        
+        comparison = {}
+        for result in results:
+            cost = self.calculate_cost(result.prompt_tokens, result.completion_tokens, result.model)
+            if result.success:
+                # Uso real ajusta o estimador dos modelos sem tokenizador local
+                self.token_counter.calibrate(result.model, text, result.prompt_tokens)
+            if record_usage and result.success:
+                self.add_usage_record(result.model, result.prompt_tokens,
+                                      result.completion_tokens, cost["total_cost"])
+            comparison[result.model] = {
+                "success": result.success,
+                "response": result.content,
+                "error": result.error_message,
+                "input_tokens": result.prompt_tokens,
+                "output_tokens": result.completion_tokens,
+                "response_time": round(result.response_time, 3),
+                "cost": cost["total_cost"]
+            }
+        
+        # Ordenar por custo (falhas por último)
+        return dict(sorted(comparison.items(), key=lambda x: (not x[1]["success"], x[1]["cost"])))
 
 # Função de teste
 def test_calculator():
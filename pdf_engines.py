@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Motores de extração de texto de PDF intercambiáveis
+pypdfium2, PyMuPDF, pdfminer.six, pypdf e PyPDF2 registrados sob um nome comum; o modo
+"auto" usa o motor mais rápido disponível cuja saída pareça texto válido.
+Inclui um benchmark (páginas/s e concordância de caracteres entre motores).
+"""
+
+import os
+import json
+import time
+import difflib
+import logging
+import importlib.util
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Callable, Tuple, Iterable
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ENGINES_CONFIG_FILE = "config/pdf_engines.json"
+
+def _extract_pypdfium2(pdf_path: str) -> List[str]:
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(str(pdf_path))
+    try:
+        pages = []
+        for index in range(len(pdf)):
+            page = pdf[index]
+            text_page = page.get_textpage()
+            pages.append(text_page.get_text_range())
+            text_page.close()
+            page.close()
+        return pages
+    finally:
+        pdf.close()
+
+def _extract_pymupdf(pdf_path: str) -> List[str]:
+    import fitz
+
+    with fitz.open(str(pdf_path)) as document:
+        return [page.get_text() for page in document]
+
+def _extract_pdfminer(pdf_path: str) -> List[str]:
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer
+
+    return ["".join(element.get_text() for element in layout if isinstance(element, LTTextContainer))
+            for layout in extract_pages(str(pdf_path))]
+
+def _extract_pypdf(pdf_path: str) -> List[str]:
+    import pypdf
+
+    with open(pdf_path, 'rb') as file:
+        reader = pypdf.PdfReader(file)
+        return [page.extract_text() or "" for page in reader.pages]
+
+def _extract_pypdf2(pdf_path: str) -> List[str]:
+    import PyPDF2
+
+    with open(pdf_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        return [page.extract_text() or "" for page in reader.pages]
+
+# nome -> (módulo necessário, função); a ordem é a preferência padrão do modo auto
+PDF_ENGINES: Dict[str, Tuple[str, Callable[[str], List[str]]]] = {
+    "pypdfium2": ("pypdfium2", _extract_pypdfium2),
+    "pymupdf": ("fitz", _extract_pymupdf),
+    "pdfminer": ("pdfminer", _extract_pdfminer),
+    "pypdf": ("pypdf", _extract_pypdf),
+    "pypdf2": ("PyPDF2", _extract_pypdf2),
+}
+
+def available_engines() -> List[str]:
+    """Motores cujas bibliotecas estão instaladas"""
+    return [name for name, (module, _) in PDF_ENGINES.items()
+            if importlib.util.find_spec(module) is not None]
+
+def auto_engine_order() -> List[str]:
+    """Ordem do modo auto: a do último benchmark salvo ou a padrão"""
+    available = available_engines()
+    try:
+        if Path(ENGINES_CONFIG_FILE).exists():
+            with open(ENGINES_CONFIG_FILE, 'r', encoding='utf-8') as f:
+                preferred = json.load(f).get("auto_order", [])
+            return [name for name in preferred if name in available] + \
+                   [name for name in available if name not in preferred]
+    except Exception as e:
+        logger.warning(f"Erro ao ler {ENGINES_CONFIG_FILE}: {e}")
+    return available
+
+def text_quality(pages: List[str]) -> float:
+    """Fração de caracteres alfanuméricos/espaços (0 quando não há texto ou há lixo)"""
+    sample = "".join(pages)[:20000]
+    if not sample.strip():
+        return 0.0
+    garbage = sample.count("�") + sum(1 for c in sample if ord(c) < 32 and c not in "\n\r\t\x0c")
+    if garbage / len(sample) > 0.05:
+        return 0.0
+    return sum(1 for c in sample if c.isalnum() or c.isspace()) / len(sample)
+
+def is_sane_text(pages: List[str], min_quality: float = 0.6) -> bool:
+    """A saída parece texto legível?"""
+    return text_quality(pages) >= min_quality
+
+def extract_pdf_pages(pdf_path: str, engine: str = "auto") -> Tuple[List[str], str]:
+    """Extrai o texto de cada página; retorna (páginas, motor usado)"""
+    if engine != "auto":
+        if engine not in PDF_ENGINES:
+            raise ValueError(f"Motor de PDF desconhecido: {engine}")
+        return PDF_ENGINES[engine][1](pdf_path), engine
+
+    candidates = auto_engine_order()
+    if not candidates:
+        raise ImportError("Nenhum motor de PDF disponível. Instale com: pip install pypdfium2")
+
+    best = ([], candidates[0], -1.0)
+    for name in candidates:
+        try:
+            pages = PDF_ENGINES[name][1](pdf_path)
+        except Exception as e:
+            logger.warning(f"Motor {name} falhou em {pdf_path}: {e}")
+            continue
+        if is_sane_text(pages):
+            return pages, name
+        quality = text_quality(pages)
+        if quality > best[2]:
+            best = (pages, name, quality)
+
+    # Nenhum motor produziu texto confiável (ex.: PDF escaneado): usar o melhor
+    logger.warning(f"Nenhum motor extraiu texto confiável de {pdf_path}")
+    return best[0], best[1]
+
+def _agreement(pages: List[str], reference: List[str], max_chars: int = 5000) -> float:
+    """Concordância média de caracteres por página (difflib), espaços normalizados"""
+    if not reference:
+        return 0.0
+    ratios = []
+    for index, expected in enumerate(reference):
+        actual = pages[index] if index < len(pages) else ""
+        a = " ".join(actual.split())[:max_chars]
+        b = " ".join(expected.split())[:max_chars]
+        ratios.append(1.0 if not a and not b else
+                      difflib.SequenceMatcher(None, a, b, autojunk=False).ratio())
+    return sum(ratios) / len(ratios)
+
+def benchmark_engines(pdf_paths: Iterable[str],
+                      engines: Optional[List[str]] = None,
+                      reference: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Mede páginas/s e concordância de cada motor com o motor de referência
+
+    Uma referência fora da lista de motores é incluída na execução.
+    """
+    engines = list(engines or available_engines())
+    if reference is None:
+        reference = "pdfminer" if "pdfminer" in engines else engines[0]
+    elif reference not in PDF_ENGINES:
+        raise ValueError(f"Motor de referência desconhecido: {reference}")
+    elif reference not in engines:
+        engines.append(reference)
+
+    outputs: Dict[str, Dict[str, List[str]]] = {name: {} for name in engines}
+    totals = {name: {"pages": 0, "seconds": 0.0, "chars": 0, "errors": 0} for name in engines}
+
+    for pdf_path in pdf_paths:
+        for name in engines:
+            start = time.perf_counter()
+            try:
+                pages = PDF_ENGINES[name][1](pdf_path)
+            except Exception as e:
+                logger.warning(f"Motor {name} falhou em {pdf_path}: {e}")
+                totals[name]["errors"] += 1
+                continue
+            totals[name]["seconds"] += time.perf_counter() - start
+            totals[name]["pages"] += len(pages)
+            totals[name]["chars"] += sum(len(page) for page in pages)
+            outputs[name][pdf_path] = pages
+
+    report = []
+    for name in engines:
+        agreements = [_agreement(pages, outputs[reference][path])
+                      for path, pages in outputs[name].items() if path in outputs[reference]]
+        seconds = totals[name]["seconds"]
+        report.append({
+            "engine": name,
+            "pages": totals[name]["pages"],
+            "pages_per_sec": round(totals[name]["pages"] / seconds, 2) if seconds else 0.0,
+            "chars": totals[name]["chars"],
+            "agreement": round(sum(agreements) / len(agreements), 4) if agreements else 0.0,
+            "errors": totals[name]["errors"],
+            "reference": name == reference
+        })
+    return report
+
+def save_auto_order(report: List[Dict[str, Any]], min_agreement: float = 0.9) -> List[str]:
+    """Salva a ordem do modo auto: motores concordantes, do mais rápido ao mais lento"""
+    good = [row for row in report if row["agreement"] >= min_agreement and not row["errors"]]
+    order = [row["engine"] for row in sorted(good, key=lambda row: row["pages_per_sec"], reverse=True)]
+    order += [row["engine"] for row in report if row["engine"] not in order]
+
+    Path(ENGINES_CONFIG_FILE).parent.mkdir(parents=True, exist_ok=True)
+    with open(ENGINES_CONFIG_FILE, 'w', encoding='utf-8') as f:
+        json.dump({"auto_order": order}, f, indent=2)
+    return order
+
+def main():
+    """Benchmark dos motores de PDF sobre uma amostra de arquivos"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark dos motores de extração de PDF")
+    parser.add_argument("paths", nargs="+", help="Arquivos PDF ou pastas com PDFs")
+    parser.add_argument("--engines", nargs="+", choices=list(PDF_ENGINES), default=None)
+    parser.add_argument("--reference", choices=list(PDF_ENGINES), default=None,
+                        help="Motor usado como referência de concordância")
+    parser.add_argument("--limit", type=int, default=50, help="Número máximo de PDFs da amostra")
+    parser.add_argument("--save", action="store_true",
+                        help=f"Salva a ordem do modo auto em {ENGINES_CONFIG_FILE}")
+    args = parser.parse_args()
+
+    pdf_paths = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            pdf_paths.extend(str(p) for p in sorted(Path(path).rglob("*.pdf")))
+        else:
+            pdf_paths.append(path)
+    pdf_paths = pdf_paths[:args.limit]
+
+    engines = args.engines or available_engines()
+    if not pdf_paths or not engines:
+        print("Nenhum PDF ou motor disponível")
+        return
+
+    report = benchmark_engines(pdf_paths, engines, args.reference)
+    print(f"{len(pdf_paths)} PDFs")
+    print(f"{'motor':<10} {'páginas':>8} {'pág/s':>9} {'caracteres':>11} {'concordância':>13} {'erros':>6}")
+    for row in report:
+        marker = " (ref)" if row["reference"] else ""
+        print(f"{row['engine']:<10} {row['pages']:>8} {row['pages_per_sec']:>9.2f} {row['chars']:>11} "
+              f"{row['agreement']:>13.4f} {row['errors']:>6}{marker}")
+
+    if args.save:
+        print(f"Ordem do modo auto: {', '.join(save_auto_order(report))}")
+
+if __name__ == "__main__":
+    main()
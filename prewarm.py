@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Pré-aquecimento de componentes pesados em background
+A interface aparece imediatamente; modelos de embeddings, índices FAISS e
+módulos opcionais (TensorFlow, LangChain) são carregados em threads, cada um
+com seu estado de prontidão. Quem precisa de um componente espera só por ele.
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Any, Optional, Callable, Sequence
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Estados de prontidão
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+STATE_LABELS = {
+    PENDING: "⏳ aguardando",
+    LOADING: "🔄 carregando",
+    READY: "✅ pronto",
+    FAILED: "❌ falhou",
+}
+
+class ComponentNotReady(Exception):
+    """Componente falhou ao carregar ou não ficou pronto no tempo limite"""
+
+class _Component:
+    def __init__(self, name: str, loader: Callable[[], Any], depends_on: Sequence[str], label: str):
+        self.name = name
+        self.loader = loader
+        self.depends_on = list(depends_on)
+        self.label = label or name
+        self.future: Future = Future()
+        self.state = PENDING
+        self.error: Optional[str] = None
+        self.duration: Optional[float] = None
+
+class ComponentPrewarmer:
+    """Carrega componentes registrados em threads de background"""
+
+    def __init__(self):
+        self._components: Dict[str, _Component] = {}
+        self._listeners: List[Callable[[str, str, Optional[str]], None]] = []
+        self._lock = threading.Lock()
+        self._started = False
+
+    def register(self, name: str, loader: Callable[[], Any],
+                 depends_on: Sequence[str] = (), label: str = ""):
+        """Registra um componente; o loader roda em background ao iniciar"""
+        with self._lock:
+            if self._started:
+                raise RuntimeError("Componentes devem ser registrados antes de start()")
+            self._components[name] = _Component(name, loader, depends_on, label)
+
+    def add_listener(self, callback: Callable[[str, str, Optional[str]], None]):
+        """Callback (nome, estado, erro) chamado a cada mudança de estado, na thread do loader"""
+        self._listeners.append(callback)
+
+    def _set_state(self, component: _Component, state: str, error: Optional[str] = None):
+        component.state = state
+        component.error = error
+        for callback in list(self._listeners):
+            try:
+                callback(component.name, state, error)
+            except Exception as e:
+                logger.error(f"Erro no listener de prontidão: {e}")
+
+    def start(self):
+        """Inicia o carregamento de todos os componentes (não bloqueia)"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            components = list(self._components.values())
+
+        for component in components:
+            thread = threading.Thread(target=self._load, args=(component,),
+                                      name=f"prewarm-{component.name}", daemon=True)
+            thread.start()
+
+    def _load(self, component: _Component):
+        try:
+            # Dependências primeiro (ex.: índice depende do modelo de embeddings)
+            for dependency in component.depends_on:
+                self.get(dependency)
+
+            self._set_state(component, LOADING)
+            start = time.monotonic()
+            value = component.loader()
+            component.duration = time.monotonic() - start
+        except Exception as e:
+            logger.error(f"Erro ao carregar {component.label}: {e}")
+            component.future.set_exception(e)
+            self._set_state(component, FAILED, str(e))
+        else:
+            logger.info(f"{component.label} pronto em {component.duration:.1f}s")
+            component.future.set_result(value)
+            self._set_state(component, READY)
+
+    def _component(self, name: str) -> _Component:
+        if name not in self._components:
+            raise KeyError(f"Componente não registrado: {name}")
+        return self._components[name]
+
+    def get(self, name: str, timeout: Optional[float] = None) -> Any:
+        """Aguarda o componente ficar pronto e o retorna"""
+        component = self._component(name)
+        try:
+            return component.future.result(timeout)
+        except FutureTimeoutError:
+            raise ComponentNotReady(f"{component.label} ainda não está pronto")
+        except Exception as e:
+            raise ComponentNotReady(f"{component.label} não disponível: {e}") from e
+
+    def peek(self, name: str) -> Any:
+        """Componente se já estiver pronto; None caso contrário (não bloqueia)"""
+        component = self._component(name)
+        return component.future.result() if component.state == READY else None
+
+    def state(self, name: str) -> str:
+        return self._component(name).state
+
+    def is_ready(self, name: str) -> bool:
+        return self.state(name) == READY
+
+    def is_loading(self, name: str) -> bool:
+        return self.state(name) in (PENDING, LOADING)
+
+    def when_ready(self, name: str, callback: Callable[[Any], None]):
+        """Chama callback(componente) quando pronto (imediatamente, se já estiver)"""
+        def done(future: Future):
+            if future.exception() is None:
+                callback(future.result())
+        self._component(name).future.add_done_callback(done)
+
+    def wait_all(self, timeout: Optional[float] = None) -> bool:
+        """Aguarda todos os componentes terminarem (prontos ou com falha)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for component in list(self._components.values()):
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                component.future.exception(remaining)
+            except FutureTimeoutError:
+                return False
+        return True
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Estado, erro e tempo de carga de cada componente"""
+        return {name: {"label": component.label,
+                       "state": component.state,
+                       "error": component.error,
+                       "seconds": round(component.duration, 2) if component.duration is not None else None}
+                for name, component in self._components.items()}
+
+    def summary(self) -> str:
+        """Linha de prontidão para barras de status"""
+        parts = []
+        for component in self._components.values():
+            text = f"{component.label}: {STATE_LABELS[component.state]}"
+            if component.state == READY and component.duration is not None:
+                text += f" ({component.duration:.1f}s)"
+            parts.append(text)
+        return " | ".join(parts)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Coleções RAG nomeadas (namespaces)
+Cada coleção tem seu próprio índice em disco, é carregada sob demanda
+e pode ser descarregada da memória respeitando um orçamento de RAM
+"""
+
+import re
+import shutil
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from rag_system import RAGSystem
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Nomes só com pontos ("." e "..") apontariam para fora do diretório de coleções
+COLLECTION_NAME_PATTERN = re.compile(r'^(?!\.+$)[A-Za-z0-9_.\-]+$')
+
+class RAGCollectionManager:
+    """Gerenciador de coleções RAG com carregamento lazy e despejo LRU"""
+
+    def __init__(self, base_dir: str = "rag_data/collections", ram_budget_mb: float = 512):
+        self.base_dir = Path(base_dir)
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.ram_budget_bytes = int(ram_budget_mb * 1024 * 1024)
+
+        # Modelo de embeddings compartilhado por todas as coleções
+        self._embedding_model = None
+
+        # Coleções carregadas, da menos para a mais recentemente usada
+        self.loaded_collections: "OrderedDict[str, RAGSystem]" = OrderedDict()
+        self.lock = threading.RLock()
+
+    @property
+    def embedding_model(self):
+        """Carrega o modelo de embeddings apenas no primeiro uso"""
+        if self._embedding_model is None:
+            from sentence_transformers import SentenceTransformer
+            self._embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        return self._embedding_model
+
+    def _collection_dir(self, name: str) -> Path:
+        """Diretório em disco de uma coleção"""
+        if not COLLECTION_NAME_PATTERN.match(name or ""):
+            raise ValueError(f"Nome de coleção inválido: {name!r}")
+        collection_dir = self.base_dir / name
+        if collection_dir.resolve().parent != self.base_dir.resolve():
+            raise ValueError(f"Nome de coleção inválido: {name!r}")
+        return collection_dir
+
+    def list_collections(self) -> List[str]:
+        """Lista coleções existentes em disco"""
+        return sorted(path.name for path in self.base_dir.iterdir() if path.is_dir())
+
+    def collection_exists(self, name: str) -> bool:
+        """Verifica se a coleção existe em disco"""
+        return self._collection_dir(name).is_dir()
+
+    def create_collection(self, name: str) -> RAGSystem:
+        """Cria (ou abre) uma coleção"""
+        self._collection_dir(name).mkdir(parents=True, exist_ok=True)
+        return self.get_collection(name)
+
+    def get_collection(self, name: str, create: bool = False) -> Optional[RAGSystem]:
+        """Retorna a coleção, carregando-a do disco se necessário"""
+        collection_dir = self._collection_dir(name)
+
+        with self.lock:
+            if name in self.loaded_collections:
+                self.loaded_collections.move_to_end(name)
+                return self.loaded_collections[name]
+
+            if not collection_dir.is_dir() and not create:
+                return None
+
+            logger.info(f"Carregando coleção: {name}")
+            collection = RAGSystem(data_dir=str(collection_dir), embedding_model=self.embedding_model)
+            self.loaded_collections[name] = collection
+            self._enforce_ram_budget(protect=name)
+            return collection
+
+    def evict_collection(self, name: str) -> bool:
+        """Remove uma coleção da memória (os dados continuam em disco)"""
+        with self.lock:
+            if self.loaded_collections.pop(name, None) is None:
+                return False
+            logger.info(f"Coleção descarregada da memória: {name}")
+            return True
+
+    def _enforce_ram_budget(self, protect: Optional[str] = None):
+        """Descarrega coleções menos usadas até caber no orçamento de RAM"""
+        while self.get_loaded_bytes() > self.ram_budget_bytes:
+            candidates = [name for name in self.loaded_collections if name != protect]
+            if not candidates:
+                logger.warning(f"Coleção '{protect}' sozinha excede o orçamento de RAM")
+                break
+            self.evict_collection(candidates[0])
+
+    def get_loaded_bytes(self) -> int:
+        """Memória estimada das coleções carregadas"""
+        return sum(collection.estimate_memory_bytes() for collection in self.loaded_collections.values())
+
+    def add_document(self, name: str, pdf_path: str) -> bool:
+        """Adiciona um documento a uma coleção (criando-a se necessário)"""
+        with self.lock:
+            collection = self.get_collection(name, create=True)
+            success = collection.add_document(pdf_path)
+            self._enforce_ram_budget(protect=name)
+            return success
+
+    def search(self, name: str, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        """Busca em uma única coleção"""
+        collection = self.get_collection(name)
+        if collection is None:
+            return []
+
+        results = collection.search(query, top_k)
+        for result in results:
+            result['collection'] = name
+        return results
+
+    def search_collections(self, query: str, collections: Optional[List[str]] = None,
+                           top_k: int = 5) -> List[Dict[str, Any]]:
+        """Busca em várias coleções e combina os resultados por score"""
+        names = collections if collections is not None else self.list_collections()
+        if not names:
+            return []
+
+        # O embedding da query é calculado uma única vez; cada coleção o projeta
+        # com a própria projeção PCA (ou nenhuma)
+        raw_embedding = None
+        merged = []
+
+        for name in names:
+            with self.lock:
+                collection = self.get_collection(name)
+                if collection is None:
+                    continue
+                collection.refresh()
+                if raw_embedding is None:
+                    raw_embedding = collection.encode_raw_query(query)
+                results = collection.search_by_raw_embedding(raw_embedding, top_k)
+
+            for result in results:
+                result['collection'] = name
+            merged.extend(results)
+
+        merged.sort(key=lambda result: result['score'], reverse=True)
+        merged = merged[:top_k]
+        for rank, result in enumerate(merged, 1):
+            result['rank'] = rank
+
+        return merged
+
+    def delete_collection(self, name: str) -> bool:
+        """Remove uma coleção da memória e do disco"""
+        collection_dir = self._collection_dir(name)
+
+        with self.lock:
+            self.evict_collection(name)
+            if not collection_dir.is_dir():
+                return False
+            try:
+                shutil.rmtree(collection_dir)
+                logger.info(f"Coleção removida: {name}")
+                return True
+            except Exception as e:
+                logger.error(f"Erro ao remover coleção {name}: {e}")
+                return False
+
+    def get_status(self) -> Dict[str, Any]:
+        """Retorna o estado das coleções"""
+        with self.lock:
+            return {
+                "collections": self.list_collections(),
+                "loaded": list(self.loaded_collections.keys()),
+                "loaded_bytes": self.get_loaded_bytes(),
+                "ram_budget_bytes": self.ram_budget_bytes
+            }
+
+# Função de teste
+def test_rag_collections():
+    """Testa o gerenciador de coleções"""
+    print("=== Teste das Coleções RAG ===\n")
+
+    manager = RAGCollectionManager()
+    for name in manager.list_collections():
+        collection = manager.get_collection(name)
+        print(f"- {name}: {len(collection.get_document_list())} documentos")
+
+    print(f"\nStatus: {manager.get_status()}")
+    print("\n=== Teste concluído ===")
+
+if __name__ == "__main__":
+    test_rag_collections()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Manifesto com geração para índices RAG em disco
+Permite que vários processos compartilhem o mesmo diretório (ex.: rag_data/)
+e que cada leitor carregue apenas os segmentos novos, sem reiniciar
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple, Callable
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ManifestLock:
+    """Lock entre processos baseado em arquivo exclusivo"""
+
+    def __init__(self, lock_path: Path, timeout: float = 30.0, stale_after: float = 120.0):
+        self.lock_path = Path(lock_path)
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self._fd = None
+
+    def __enter__(self):
+        deadline = time.time() + self.timeout
+        while True:
+            try:
+                self._fd = os.open(str(self.lock_path), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(self._fd, str(os.getpid()).encode())
+                return self
+            except FileExistsError:
+                # Lock abandonado por um processo que morreu
+                try:
+                    if time.time() - self.lock_path.stat().st_mtime > self.stale_after:
+                        self.lock_path.unlink()
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.time() > deadline:
+                    raise TimeoutError(f"Timeout aguardando lock: {self.lock_path}")
+                time.sleep(0.05)
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        try:
+            self.lock_path.unlink()
+        except FileNotFoundError:
+            pass
+
+class IndexManifest:
+    """Manifesto versionado (geração) de um diretório de índice
+
+    O nome separa manifestos de sistemas diferentes que usam o mesmo
+    diretório (ex.: RAGSystem e RAGSystemFunctional em rag_data/).
+    """
+
+    def __init__(self, data_dir: str, name: str = "index"):
+        self.data_dir = Path(data_dir)
+        self.name = name
+        self.path = self.data_dir / f"{name}_manifest.json"
+        self.segments_dir = self.data_dir / f"{name}_segments"
+
+    @staticmethod
+    def empty() -> Dict[str, Any]:
+        """Manifesto de um índice vazio"""
+        return {
+            "generation": 0,
+            "base": None,
+            "segments": []
+        }
+
+    @staticmethod
+    def new_id() -> str:
+        """Identificador curto para bases e segmentos"""
+        return uuid.uuid4().hex[:12]
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def lock(self) -> ManifestLock:
+        """Lock para escrita do manifesto"""
+        return ManifestLock(self.path.with_name(self.path.name + ".lock"))
+
+    def stamp(self) -> Optional[Tuple[int, int, int]]:
+        """Detector de mudança barato: apenas um stat() do manifesto"""
+        try:
+            stat = self.path.stat()
+            # A escrita atômica cria um novo arquivo, então o inode também muda
+            return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        except FileNotFoundError:
+            return None
+
+    def read(self) -> Dict[str, Any]:
+        """Lê o manifesto atual"""
+        if not self.path.exists():
+            return self.empty()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        for key, value in self.empty().items():
+            manifest.setdefault(key, value)
+        return manifest
+
+    def write(self, manifest: Dict[str, Any]):
+        """Grava o manifesto de forma atômica"""
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        manifest["updated_at"] = time.time()
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def segment_path(self, segment_id: str) -> Path:
+        """Caminho do arquivo de um segmento"""
+        return self.segments_dir / f"seg_{segment_id}.pkl"
+
+    def base_paths(self, base_id: str) -> Tuple[Path, Path]:
+        """Caminhos do índice FAISS e dos chunks de uma base compactada"""
+        return (self.data_dir / f"{self.name}_base_{base_id}.idx",
+                self.data_dir / f"{self.name}_base_{base_id}.pkl")
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """Escreve um arquivo via arquivo temporário + rename"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+class SegmentedIndexMixin:
+    """Sincronização base + segmentos compartilhada pelos sistemas RAG
+
+    A classe concreta implementa os ganchos de leitura/escrita (_reset_index,
+    _load_base, _load_segment, _write_base, _write_segment, _remove_base,
+    _remove_segment); o mixin cuida do manifesto, da detecção de mudanças
+    e da compactação.
+    """
+
+    def _init_manifest(self, data_dir: Path, max_segments: int = 16, name: str = "index"):
+        """Inicializa o estado de sincronização"""
+        self.manifest = IndexManifest(data_dir, name)
+        self.max_segments = max_segments
+        self._base_id = None
+        self._loaded_segments = set()
+        self._manifest_stamp = None
+        self._index_lock = threading.RLock()
+        self._refresh_thread = None
+        self._refresh_stop = threading.Event()
+
+    def _load_full(self, manifest: Dict[str, Any]):
+        """Carrega a base compactada e todos os segmentos do manifesto"""
+        self._reset_index()
+        self._load_base(manifest.get("base"))
+        self._base_id = manifest.get("base")
+        self._loaded_segments = set()
+        for segment_id in manifest["segments"]:
+            self._load_segment(segment_id)
+            self._loaded_segments.add(segment_id)
+
+    def _apply_manifest(self, manifest: Dict[str, Any]) -> bool:
+        """Sincroniza a memória com o manifesto; retorna True se algo mudou"""
+        if manifest.get("base") != self._base_id:
+            # Outro processo compactou ou limpou o índice
+            self._load_full(manifest)
+            return True
+
+        new_segments = [segment_id for segment_id in manifest["segments"]
+                        if segment_id not in self._loaded_segments]
+        for segment_id in new_segments:
+            self._load_segment(segment_id)
+            self._loaded_segments.add(segment_id)
+
+        return bool(new_segments)
+
+    def _load_from_manifest(self):
+        """Carregamento completo a partir do disco"""
+        with self._index_lock:
+            stamp = self.manifest.stamp()
+            self._load_full(self.manifest.read())
+            self._manifest_stamp = stamp
+
+    def _append_segment(self, payload: Any) -> int:
+        """Grava um novo segmento e avança a geração; retorna o total de segmentos"""
+        with self._index_lock, self.manifest.lock():
+            manifest = self.manifest.read()
+            up_to_date = (manifest.get("base") == self._base_id and
+                          set(manifest["segments"]) <= self._loaded_segments)
+
+            segment_id = self.manifest.new_id()
+            self._write_segment(segment_id, payload)
+
+            manifest["generation"] += 1
+            manifest["segments"].append(segment_id)
+            self.manifest.write(manifest)
+            self._loaded_segments.add(segment_id)
+
+            # Só marcar como atualizado se não havia alterações de outros processos pendentes
+            if up_to_date:
+                self._manifest_stamp = self.manifest.stamp()
+
+            logger.info(f"Segmento {segment_id} salvo (geração {manifest['generation']})")
+            return len(manifest["segments"])
+
+    def _compact(self, edit: Optional[Callable[[], Any]] = None) -> Optional[int]:
+        """Grava o estado completo como nova base e descarta os segmentos
+
+        Alterações locais que não viram segmento (remoções, troca de projeção)
+        vão em edit: ela é aplicada sob o lock, depois de incorporar as
+        alterações de outros processos, para não ser descartada quando outro
+        processo compactou antes. Se edit retornar False, nada é gravado e o
+        retorno é None.
+        """
+        with self._index_lock, self.manifest.lock():
+            manifest = self.manifest.read()
+
+            # Incorporar alterações de outros processos antes de compactar
+            self._apply_manifest(manifest)
+            self._manifest_stamp = self.manifest.stamp()
+
+            if edit is not None and edit() is False:
+                return None
+
+            old_base = manifest.get("base")
+            old_segments = list(manifest["segments"])
+
+            base_id = self.manifest.new_id()
+            if not self._write_base(base_id):
+                base_id = None
+
+            manifest["generation"] += 1
+            manifest["base"] = base_id
+            manifest["segments"] = []
+            self.manifest.write(manifest)
+
+            self._base_id = base_id
+            self._loaded_segments = set()
+            self._manifest_stamp = self.manifest.stamp()
+
+            for segment_id in old_segments:
+                self._safe_remove(self._remove_segment, segment_id)
+            self._safe_remove(self._remove_base, old_base)
+
+            return manifest["generation"]
+
+    def _reset_manifest(self):
+        """Publica uma geração vazia (usado ao limpar o índice)"""
+        with self._index_lock, self.manifest.lock():
+            manifest = self.manifest.read()
+            for segment_id in manifest["segments"]:
+                self._safe_remove(self._remove_segment, segment_id)
+            self._safe_remove(self._remove_base, manifest.get("base"))
+
+            empty = self.manifest.empty()
+            empty["generation"] = manifest["generation"] + 1
+            self.manifest.write(empty)
+
+            self._reset_index()
+            self._base_id = None
+            self._loaded_segments = set()
+            self._manifest_stamp = self.manifest.stamp()
+
+    @staticmethod
+    def _safe_remove(remover, item):
+        try:
+            remover(item)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Não foi possível remover {item}: {e}")
+
+    def refresh(self) -> bool:
+        """Carrega alterações de outros processos sem recarregar o índice inteiro"""
+        stamp = self.manifest.stamp()
+        if stamp == self._manifest_stamp:
+            return False
+
+        try:
+            with self._index_lock:
+                manifest = self.manifest.read()
+                changed = self._apply_manifest(manifest)
+                self._manifest_stamp = stamp
+
+            if changed:
+                logger.info(f"Índice atualizado para a geração {manifest['generation']}")
+            return changed
+
+        except Exception as e:
+            # Provavelmente uma escrita em andamento; tentar no próximo ciclo
+            logger.warning(f"Erro ao atualizar índice: {e}")
+            return False
+
+    def start_auto_refresh(self, interval: float = 2.0):
+        """Verifica periodicamente alterações feitas por outros processos"""
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return
+
+        def refresh_loop():
+            while not self._refresh_stop.wait(interval):
+                self.refresh()
+
+        self._refresh_stop.clear()
+        self._refresh_thread = threading.Thread(target=refresh_loop, daemon=True)
+        self._refresh_thread.start()
+        logger.info(f"Atualização automática do índice iniciada (intervalo {interval}s)")
+
+    def stop_auto_refresh(self):
+        """Para a verificação periódica"""
+        self._refresh_stop.set()
+        if self._refresh_thread:
+            self._refresh_thread.join()
+            self._refresh_thread = None
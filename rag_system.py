@@ -1,73 +1,106 @@
 #!/usr/bin/env python3
 """
 Sistema RAG (Retrieval-Augmented Generation) para processamento de PDFs
-Usando PyPDF2 para extração e FAISS para indexação vetorial
+Usando motores de PDF intercambiáveis (pdf_engines) para extração e FAISS para indexação vetorial
 """
 
 import os
+import sys
 import json
 import pickle
 import logging
 from typing import List, Dict, Any, Optional
 from pathlib import Path
-import PyPDF2
 import numpy as np
 from sentence_transformers import SentenceTransformer
 import faiss
 import re
 
+from rag_manifest import SegmentedIndexMixin, atomic_write_bytes
+from embedding_reduction import PCAProjection, PCA_FILE_NAME, benchmark_pca_recall
+from memory_accounting import (build_memory_report, cached_memory_report, deep_sizeof, faiss_index_bytes,
+                               model_parameter_bytes)
+from extraction_cache import get_extraction_cache
+from pdf_engines import extract_pdf_pages
+from knowledge_export import (ChunkExportWriter, chunk_row, read_export_metadata, iter_export_batches,
+                              batch_rows, batch_embeddings, DEFAULT_BATCH_SIZE)
+
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class RAGSystem:
+# Incrementar quando a extração mudar, invalidando o cache de extração
+PDF_EXTRACTOR_VERSION = "1"
+
+class RAGSystem(SegmentedIndexMixin):
     """Sistema RAG para processamento e busca em documentos PDF"""
     
-    def __init__(self, data_dir: str = "rag_data"):
+    def __init__(self, data_dir: str = "rag_data", embedding_model: Optional[SentenceTransformer] = None,
+                 max_segments: int = 16, pdf_engine: str = "auto"):
         self.data_dir = Path(data_dir)
-        self.data_dir.mkdir(exist_ok=True)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
         
         # Modelo de embeddings (usando um modelo pequeno e rápido)
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Pode ser compartilhado entre várias instâncias (ex.: coleções)
+        self.embedding_model = embedding_model or SentenceTransformer('all-MiniLM-L6-v2')
         
         # Índice FAISS
         self.index = None
         self.documents = []
         self.document_metadata = []
         
+        # Projeção PCA opcional (reduz a dimensão dos embeddings no índice)
+        self.pca_path = self.data_dir / PCA_FILE_NAME
+        self.pca = PCAProjection.load(self.pca_path)
+        
+        # Texto extraído por página, compartilhado com os demais loaders
+        self.extraction_cache = get_extraction_cache()
+        self.pdf_engine = pdf_engine
+        
+        # Manifesto com geração: novos documentos viram segmentos em disco,
+        # permitindo que outros processos carreguem apenas o que mudou
+        self._init_manifest(self.data_dir, max_segments)
+        
         # Carregar dados existentes se disponível
         self.load_index()
     
     def extract_text_from_pdf(self, pdf_path: str) -> List[Dict[str, Any]]:
         """Extrai texto de um PDF e divide em chunks"""
         try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                
-                chunks = []
-                for page_num, page in enumerate(pdf_reader.pages):
-                    text = page.extract_text()
-                    
-                    # Dividir texto em chunks menores (aproximadamente 500 caracteres)
-                    text_chunks = self.split_text_into_chunks(text, chunk_size=500)
-                    
-                    for chunk_idx, chunk in enumerate(text_chunks):
-                        if chunk.strip():  # Ignorar chunks vazios
-                            chunks.append({
-                                'text': chunk.strip(),
-                                'page': page_num + 1,
-                                'chunk_id': chunk_idx,
-                                'source_file': os.path.basename(pdf_path),
-                                'full_path': pdf_path
-                            })
+            # O parsing do PDF é pulado quando o mesmo conteúdo já foi extraído
+            pages = self.extraction_cache.get_or_extract(
+                pdf_path, f"rag_pdf_pages:{self.pdf_engine}", PDF_EXTRACTOR_VERSION,
+                lambda: self._read_pdf_pages(pdf_path)
+            )
+            
+            chunks = []
+            for page_num, text in enumerate(pages):
+                # Dividir texto em chunks menores (aproximadamente 500 caracteres)
+                text_chunks = self.split_text_into_chunks(text, chunk_size=500)
                 
-                logger.info(f"Extraídos {len(chunks)} chunks do PDF: {pdf_path}")
-                return chunks
+                for chunk_idx, chunk in enumerate(text_chunks):
+                    if chunk.strip():  # Ignorar chunks vazios
+                        chunks.append({
+                            'text': chunk.strip(),
+                            'page': page_num + 1,
+                            'chunk_id': chunk_idx,
+                            'source_file': os.path.basename(pdf_path),
+                            'full_path': pdf_path
+                        })
+            
+            logger.info(f"Extraídos {len(chunks)} chunks do PDF: {pdf_path}")
+            return chunks
                 
         except Exception as e:
             logger.error(f"Erro ao processar PDF {pdf_path}: {e}")
             return []
     
+    def _read_pdf_pages(self, pdf_path: str) -> List[str]:
+        """Lê o texto de cada página com o motor de PDF configurado"""
+        pages, engine = extract_pdf_pages(pdf_path, self.pdf_engine)
+        logger.info(f"PDF {pdf_path} extraído com {engine}")
+        return pages
+    
     def split_text_into_chunks(self, text: str, chunk_size: int = 500) -> List[str]:
         """Divide texto em chunks menores"""
         # Remover quebras de linha extras
@@ -110,22 +143,23 @@ class RAGSystem:
             texts = [chunk['text'] for chunk in chunks]
             embeddings = self.embedding_model.encode(texts, show_progress_bar=True)
             
-            # Adicionar ao índice FAISS
-            if self.index is None:
-                # Criar novo índice
-                dimension = embeddings.shape[1]
-                self.index = faiss.IndexFlatIP(dimension)  # Inner Product para similaridade de cosseno
+            # Normalizar (e projetar) embeddings para similaridade de cosseno
+            embeddings = self._prepare_embeddings(embeddings)
             
-            # Normalizar embeddings para similaridade de cosseno
-            faiss.normalize_L2(embeddings)
-            self.index.add(embeddings.astype('float32'))
-            
-            # Adicionar metadados
-            self.documents.extend(texts)
-            self.document_metadata.extend(chunks)
+            with self._index_lock:
+                self._add_embeddings(embeddings, texts, chunks)
+                
+                # Persistir apenas os novos chunks como um segmento
+                segment_count = self._append_segment({
+                    "embeddings": embeddings,
+                    "documents": texts,
+                    "metadata": chunks,
+                    "projection": self.pca.signature if self.pca else None
+                })
             
-            # Salvar índice atualizado
-            self.save_index()
+            # Compactar quando houver segmentos demais
+            if segment_count > self.max_segments:
+                self.save_index()
             
             logger.info(f"Documento adicionado com sucesso: {pdf_path}")
             return True
@@ -137,19 +171,61 @@ class RAGSystem:
     def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """Busca documentos similares à query"""
         try:
+            # Incorporar segmentos de outros processos (só um stat() se nada mudou)
+            self.refresh()
             if self.index is None or len(self.documents) == 0:
                 return []
             
             # Gerar embedding da query
-            query_embedding = self.embedding_model.encode([query])
-            faiss.normalize_L2(query_embedding)
+            return self.search_by_raw_embedding(self.encode_raw_query(query), top_k)
+            
+        except Exception as e:
+            logger.error(f"Erro na busca: {e}")
+            return []
+    
+    def encode_query(self, query: str) -> np.ndarray:
+        """Gera o embedding normalizado (e projetado, com PCA) de uma query"""
+        return self.project_query(self.encode_raw_query(query))
+    
+    def encode_raw_query(self, query: str) -> np.ndarray:
+        """Embedding normalizado em dimensão completa (independe da projeção do índice)"""
+        return self._normalize(self.embedding_model.encode([query]))
+    
+    def project_query(self, raw_embedding: np.ndarray) -> np.ndarray:
+        """Leva um embedding de encode_raw_query para o espaço deste índice"""
+        return self.pca.transform(raw_embedding) if self.pca is not None else raw_embedding
+    
+    def _normalize(self, embeddings: np.ndarray) -> np.ndarray:
+        """Normaliza embeddings (dimensão completa) para similaridade de cosseno"""
+        embeddings = np.ascontiguousarray(embeddings, dtype='float32')
+        faiss.normalize_L2(embeddings)
+        return embeddings
+    
+    def _prepare_embeddings(self, embeddings: np.ndarray) -> np.ndarray:
+        """Normaliza e, com PCA ativo, projeta embeddings para o índice"""
+        embeddings = self._normalize(embeddings)
+        if self.pca is not None:
+            embeddings = self.pca.transform(embeddings)
+        return embeddings
+    
+    def search_by_raw_embedding(self, raw_embedding: np.ndarray, top_k: int = 5) -> List[Dict[str, Any]]:
+        """Busca com um embedding de encode_raw_query (projeção e busca sob o mesmo lock)"""
+        with self._index_lock:
+            return self.search_by_embedding(self.project_query(raw_embedding), top_k)
+    
+    def search_by_embedding(self, query_embedding: np.ndarray, top_k: int = 5) -> List[Dict[str, Any]]:
+        """Busca usando um embedding de query já calculado"""
+        try:
+            if self.index is None or len(self.documents) == 0:
+                return []
             
             # Buscar no índice
-            scores, indices = self.index.search(query_embedding.astype('float32'), top_k)
+            with self._index_lock:
+                scores, indices = self.index.search(query_embedding, top_k)
             
             results = []
             for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-                if idx < len(self.documents):
+                if 0 <= idx < len(self.documents):
                     results.append({
                         'text': self.documents[idx],
                         'metadata': self.document_metadata[idx],
@@ -180,50 +256,238 @@ class RAGSystem:
         
         return "\n".join(context_parts)
     
+    def _add_embeddings(self, embeddings: np.ndarray, texts: List[str], metadata: List[Dict[str, Any]]):
+        """Adiciona embeddings já normalizados ao índice em memória"""
+        if self.index is None:
+            # Criar novo índice
+            dimension = embeddings.shape[1]
+            self.index = faiss.IndexFlatIP(dimension)  # Inner Product para similaridade de cosseno
+        
+        self.index.add(embeddings)
+        
+        # Adicionar metadados
+        self.documents.extend(texts)
+        self.document_metadata.extend(metadata)
+    
+    # Ganchos de persistência usados pelo SegmentedIndexMixin
+    
+    def _legacy_paths(self):
+        """Arquivos do formato antigo (índice monolítico)"""
+        return (self.data_dir / "faiss_index.idx",
+                self.data_dir / "documents.pkl",
+                self.data_dir / "metadata.pkl")
+    
+    def _reset_index(self):
+        self.index = None
+        self.documents = []
+        self.document_metadata = []
+    
+    def _load_base(self, base_id: Optional[str]):
+        # A projeção acompanha a base (pode ter sido trocada por outro processo)
+        self.pca = PCAProjection.load(self.pca_path)
+        
+        if base_id:
+            index_path, chunks_path = self.manifest.base_paths(base_id)
+            self.index = faiss.read_index(str(index_path))
+            with open(chunks_path, 'rb') as f:
+                chunks = pickle.load(f)
+            self.documents = chunks["documents"]
+            self.document_metadata = chunks["metadata"]
+            return
+        
+        # Sem base compactada: carregar índice no formato antigo, se existir
+        index_path, documents_path, metadata_path = self._legacy_paths()
+        if index_path.exists() and documents_path.exists() and metadata_path.exists():
+            self.index = faiss.read_index(str(index_path))
+            with open(documents_path, 'rb') as f:
+                self.documents = pickle.load(f)
+            with open(metadata_path, 'rb') as f:
+                self.document_metadata = pickle.load(f)
+        
+        self._check_index_dimension()
+    
+    def _load_segment(self, segment_id: str):
+        with open(self.manifest.segment_path(segment_id), 'rb') as f:
+            segment = pickle.load(f)
+        
+        embeddings = segment["embeddings"]
+        if segment.get("projection") != (self.pca.signature if self.pca else None):
+            # Segmento gravado com outra projeção: recalcular os embeddings
+            embeddings = self._prepare_embeddings(self.embedding_model.encode(segment["documents"]))
+        self._add_embeddings(embeddings, segment["documents"], segment["metadata"])
+    
+    def _write_segment(self, segment_id: str, payload: Dict[str, Any]):
+        atomic_write_bytes(self.manifest.segment_path(segment_id),
+                           pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+    
+    def _write_base(self, base_id: str) -> bool:
+        if self.index is None:
+            return False
+        
+        index_path, chunks_path = self.manifest.base_paths(base_id)
+        atomic_write_bytes(index_path, faiss.serialize_index(self.index).tobytes())
+        atomic_write_bytes(chunks_path, pickle.dumps({
+            "documents": self.documents,
+            "metadata": self.document_metadata
+        }, protocol=pickle.HIGHEST_PROTOCOL))
+        return True
+    
+    def _remove_segment(self, segment_id: str):
+        self.manifest.segment_path(segment_id).unlink()
+    
+    def _remove_base(self, base_id: Optional[str]):
+        paths = self.manifest.base_paths(base_id) if base_id else self._legacy_paths()
+        for path in paths:
+            if path.exists():
+                path.unlink()
+    
+    def _check_index_dimension(self):
+        """Reconstrói o índice se a dimensão não corresponder à projeção atual"""
+        if self.index is None:
+            return
+        
+        expected = (self.pca.output_dim if self.pca is not None
+                    else self.embedding_model.get_sentence_embedding_dimension())
+        if self.index.d != expected:
+            logger.warning(f"Dimensão do índice ({self.index.d}) difere da esperada ({expected}); reconstruindo")
+            self._build_index(self._prepare_embeddings(self.embedding_model.encode(self.documents)))
+    
+    def _build_index(self, embeddings: np.ndarray):
+        """Substitui o índice em memória pelos embeddings informados"""
+        index = faiss.IndexFlatIP(embeddings.shape[1])
+        index.add(embeddings)
+        self.index = index
+    
+    def _full_dim_vectors(self) -> Optional[np.ndarray]:
+        """Embeddings normalizados em dimensão completa de todos os chunks"""
+        if self.index is None or not self.documents:
+            return None
+        if self.pca is None:
+            # O índice plano guarda os próprios vetores
+            return self.index.reconstruct_n(0, self.index.ntotal)
+        return self._normalize(self.embedding_model.encode(self.documents, show_progress_bar=True))
+    
+    def enable_pca(self, target_dim: int = 128, sample_size: int = 5000) -> bool:
+        """Ativa a redução PCA, ajustando a projeção e reconstruindo o índice"""
+        def apply():
+            vectors = self._full_dim_vectors()
+            if vectors is None:
+                logger.warning("Nenhum documento indexado para ajustar o PCA")
+                return False
+            
+            projection = PCAProjection.fit(vectors, target_dim, sample_size=sample_size)
+            projection.save(self.pca_path)
+            self.pca = projection
+            self._build_index(projection.transform(vectors))
+        
+        try:
+            # Aplicada sobre o estado mais recente do disco, dentro da compactação
+            if self._compact(apply) is None:
+                return False
+            logger.info(f"PCA ativado: {self.pca.input_dim} -> {self.pca.output_dim} dimensões")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Erro ao ativar PCA: {e}")
+            return False
+    
+    def disable_pca(self) -> bool:
+        """Volta a indexar os embeddings em dimensão completa"""
+        def apply():
+            if self.pca is None:
+                return False
+            
+            vectors = self._full_dim_vectors()
+            self.pca = None
+            if self.pca_path.exists():
+                self.pca_path.unlink()
+            if vectors is not None:
+                self._build_index(vectors)
+        
+        try:
+            if self._compact(apply) is not None:
+                logger.info("PCA desativado")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Erro ao desativar PCA: {e}")
+            return False
+    
+    def benchmark_pca_recall(self, dims=(64, 128, 192, 256), k: int = 10,
+                             n_queries: int = 200, queries: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Mede recall@k de índices reduzidos contra o índice de dimensão completa"""
+        vectors = self._full_dim_vectors()
+        if vectors is None:
+            return []
+        
+        if queries:
+            query_vectors = self._normalize(self.embedding_model.encode(queries))
+        else:
+            # Sem queries informadas, usar uma amostra dos próprios chunks, retirada
+            # do índice avaliado (senão cada query encontra a si mesma)
+            if len(vectors) < 2:
+                return []
+            rng = np.random.default_rng(42)
+            sample = rng.choice(len(vectors), min(n_queries, max(1, len(vectors) // 5)), replace=False)
+            held_out = np.zeros(len(vectors), dtype=bool)
+            held_out[sample] = True
+            query_vectors = vectors[held_out]
+            vectors = vectors[~held_out]
+        
+        return benchmark_pca_recall(vectors, query_vectors, dims=dims, k=k)
+    
     def save_index(self):
-        """Salva o índice FAISS e metadados"""
+        """Salva o índice completo, compactando os segmentos em uma nova base"""
         try:
-            if self.index is not None:
-                # Salvar índice FAISS
-                faiss.write_index(self.index, str(self.data_dir / "faiss_index.idx"))
-                
-                # Salvar documentos e metadados
-                with open(self.data_dir / "documents.pkl", 'wb') as f:
-                    pickle.dump(self.documents, f)
-                
-                with open(self.data_dir / "metadata.pkl", 'wb') as f:
-                    pickle.dump(self.document_metadata, f)
-                
-                logger.info("Índice salvo com sucesso")
-                
+            generation = self._compact()
+            logger.info(f"Índice salvo com sucesso (geração {generation})")
         except Exception as e:
             logger.error(f"Erro ao salvar índice: {e}")
     
     def load_index(self):
-        """Carrega o índice FAISS e metadados"""
+        """Carrega o índice FAISS e metadados (base + segmentos do manifesto)"""
         try:
-            index_path = self.data_dir / "faiss_index.idx"
-            documents_path = self.data_dir / "documents.pkl"
-            metadata_path = self.data_dir / "metadata.pkl"
-            
-            if index_path.exists() and documents_path.exists() and metadata_path.exists():
-                # Carregar índice FAISS
-                self.index = faiss.read_index(str(index_path))
-                
-                # Carregar documentos e metadados
-                with open(documents_path, 'rb') as f:
-                    self.documents = pickle.load(f)
-                
-                with open(metadata_path, 'rb') as f:
-                    self.document_metadata = pickle.load(f)
-                
+            self._load_from_manifest()
+            if self.documents:
                 logger.info(f"Índice carregado com {len(self.documents)} documentos")
                 
         except Exception as e:
             logger.error(f"Erro ao carregar índice: {e}")
-            self.index = None
-            self.documents = []
-            self.document_metadata = []
+            self._reset_index()
+    
+    def estimate_memory_bytes(self) -> int:
+        """Estimativa aproximada da memória ocupada pelo índice e pelos chunks"""
+        total = 0
+        if self.index is not None:
+            # IndexFlatIP guarda os vetores em float32
+            total += self.index.ntotal * self.index.d * 4
+        total += sum(sys.getsizeof(text) for text in self.documents)
+        for metadata in self.document_metadata:
+            total += sys.getsizeof(metadata)
+            total += sum(sys.getsizeof(value) for value in metadata.values())
+        return total
+    
+    def get_memory_usage(self) -> Dict[str, Any]:
+        """Memória aproximada por componente (modelo, índice, chunks) e RSS"""
+        return build_memory_report({
+            "embedding_model": model_parameter_bytes(self.embedding_model),
+            "faiss_index": faiss_index_bytes(self.index),
+            "documents": deep_sizeof(self.documents),
+            "metadata": deep_sizeof(self.document_metadata),
+            "pca_projection": (self.pca.components.nbytes + self.pca.mean.nbytes) if self.pca else 0
+        })
+    
+    def get_system_status(self) -> Dict[str, Any]:
+        """Retorna status do sistema"""
+        return {
+            "index_loaded": self.index is not None,
+            "chunks": len(self.documents),
+            "documents_count": len({m['source_file'] for m in self.document_metadata}),
+            "index_dimension": self.index.d if self.index is not None else None,
+            "pca_enabled": self.pca is not None,
+            "generation": self.manifest.read()["generation"],
+            "memory": cached_memory_report(self)
+        }
     
     def get_document_list(self) -> List[Dict[str, Any]]:
         """Retorna lista de documentos processados"""
@@ -256,55 +520,113 @@ class RAGSystem:
         
         return result
     
-    def remove_document(self, filename: str) -> bool:
-        """Remove um documento do sistema"""
+    def export_chunks(self, file_path: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                      export_format: Optional[str] = None) -> bool:
+        """Exporta chunks, metadados e embeddings do índice (Parquet ou Arrow IPC)"""
         try:
-            # Encontrar chunks do documento
-            indices_to_remove = []
-            for i, metadata in enumerate(self.document_metadata):
-                if metadata['source_file'] == filename:
-                    indices_to_remove.append(i)
+            with self._index_lock:
+                if self.index is None or not self.documents:
+                    logger.warning("Nenhum chunk indexado para exportar")
+                    return False
+                index = self.index
+                documents = list(self.documents)
+                metadata = list(self.document_metadata)
+                projection = self.pca.signature if self.pca else None
             
-            if not indices_to_remove:
-                return False
+            schema_metadata = {"source": "rag_system", "projection": projection, "normalized": True}
+            with ChunkExportWriter(file_path, index.d, schema_metadata, export_format) as writer:
+                for start in range(0, len(documents), batch_size):
+                    end = min(start + batch_size, len(documents))
+                    rows = [chunk_row(i, documents[i], metadata[i],
+                                      source=metadata[i].get('source_file'), page=metadata[i].get('page'))
+                            for i in range(start, end)]
+                    # O índice plano guarda os vetores: exportar sem recalcular
+                    writer.write_batch(rows, index.reconstruct_n(start, end - start))
             
-            # Remover do índice FAISS
-            if self.index is not None:
-                # FAISS não suporta remoção direta, então recriamos o índice
-                remaining_embeddings = []
-                remaining_docs = []
-                remaining_metadata = []
-                
-                for i in range(len(self.documents)):
-                    if i not in indices_to_remove:
-                        remaining_docs.append(self.documents[i])
-                        remaining_metadata.append(self.document_metadata[i])
-                
-                if remaining_docs:
-                    # Recriar embeddings
-                    embeddings = self.embedding_model.encode(remaining_docs)
-                    faiss.normalize_L2(embeddings)
-                    
-                    # Recriar índice
-                    dimension = embeddings.shape[1]
-                    self.index = faiss.IndexFlatIP(dimension)
-                    self.index.add(embeddings.astype('float32'))
-                    
-                    self.documents = remaining_docs
-                    self.document_metadata = remaining_metadata
+            logger.info(f"{writer.rows} chunks exportados para {file_path}")
+            return True
+        
+        except Exception as e:
+            logger.error(f"Erro ao exportar chunks: {e}")
+            return False
+    
+    def import_chunks(self, file_path: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                      export_format: Optional[str] = None) -> int:
+        """Acrescenta ao índice os chunks de uma exportação; retorna quantos foram importados
+        
+        Os embeddings exportados são usados diretamente quando a projeção e a
+        dimensão coincidem com as do índice atual; caso contrário são recalculados.
+        """
+        try:
+            export_info = read_export_metadata(file_path, export_format)
+            expected_dim = (self.pca.output_dim if self.pca is not None
+                            else self.embedding_model.get_sentence_embedding_dimension())
+            reuse = (export_info["embedding_dim"] == expected_dim and
+                     export_info.get("projection") == (self.pca.signature if self.pca else None))
+            if not reuse:
+                logger.warning(f"Embeddings de {file_path} incompatíveis com o índice atual; recalculando")
+            
+            imported = 0
+            segment_count = 0
+            for batch in iter_export_batches(file_path, batch_size=batch_size, export_format=export_format):
+                rows = batch_rows(batch)
+                texts = [row["text"] for row in rows]
+                chunks = [row["metadata"] for row in rows]
+                if reuse:
+                    embeddings = np.ascontiguousarray(batch_embeddings(batch))
                 else:
-                    # Sem documentos restantes
-                    self.index = None
-                    self.documents = []
-                    self.document_metadata = []
+                    embeddings = self._prepare_embeddings(self.embedding_model.encode(texts))
                 
-                # Salvar índice atualizado
+                with self._index_lock:
+                    self._add_embeddings(embeddings, texts, chunks)
+                    segment_count = self._append_segment({
+                        "embeddings": embeddings,
+                        "documents": texts,
+                        "metadata": chunks,
+                        "projection": self.pca.signature if self.pca else None
+                    })
+                imported += len(rows)
+            
+            if segment_count > self.max_segments:
                 self.save_index()
-                
-                logger.info(f"Documento removido: {filename}")
-                return True
             
-            return False
+            logger.info(f"{imported} chunks importados de {file_path}")
+            return imported
+        
+        except Exception as e:
+            logger.error(f"Erro ao importar chunks de {file_path}: {e}")
+            return 0
+    
+    def remove_document(self, filename: str) -> bool:
+        """Remove um documento do sistema"""
+        def remove():
+            # Encontrar chunks do documento
+            keep = [i for i, metadata in enumerate(self.document_metadata)
+                    if metadata['source_file'] != filename]
+            if self.index is None or len(keep) == len(self.documents):
+                return False
+            
+            if keep:
+                # FAISS não suporta remoção direta, então recriamos o índice com os
+                # vetores restantes (o índice plano guarda os vetores já preparados)
+                vectors = self.index.reconstruct_n(0, self.index.ntotal)
+                self._build_index(np.ascontiguousarray(vectors[keep]))
+                self.documents = [self.documents[i] for i in keep]
+                self.document_metadata = [self.document_metadata[i] for i in keep]
+            else:
+                # Sem documentos restantes
+                self.index = None
+                self.documents = []
+                self.document_metadata = []
+        
+        try:
+            # Aplicada sobre o estado mais recente do disco (alterações de outros
+            # processos não são perdidas) e gravada como nova base
+            if self._compact(remove) is None:
+                return False
+            
+            logger.info(f"Documento removido: {filename}")
+            return True
             
         except Exception as e:
             logger.error(f"Erro ao remover documento {filename}: {e}")
@@ -313,18 +635,14 @@ class RAGSystem:
     def clear_all(self):
         """Limpa todos os documentos do sistema"""
         try:
-            self.index = None
-            self.documents = []
-            self.document_metadata = []
-            
-            # Remover arquivos salvos
-            for file_path in self.data_dir.glob("*"):
-                file_path.unlink()
-            
+            # Publica uma geração vazia para que outros processos também limpem
+            self._reset_manifest()
             logger.info("Todos os documentos removidos")
+            return True
             
         except Exception as e:
             logger.error(f"Erro ao limpar documentos: {e}")
+            return False
 
 # Função de teste
 def test_rag_system():
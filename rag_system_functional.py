@@ -5,6 +5,7 @@ Sistema RAG Funcional - Integração Real com Ollama, OpenRouter e Docker
 
 import os
 import json
+import shutil
 import logging
 import requests
 from typing import List, Dict, Any, Optional
@@ -12,34 +13,50 @@ from pathlib import Path
 from datetime import datetime
 import hashlib
 
-# LangChain imports
-try:
-    from langchain_community.document_loaders import PyPDFLoader, TextLoader
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
-    from langchain_community.vectorstores import FAISS
-    from langchain.schema import Document
-    try:
-        from langchain_huggingface import HuggingFaceEmbeddings
-    except ImportError:
-        from langchain_community.embeddings import HuggingFaceEmbeddings
-    LANGCHAIN_AVAILABLE = True
-except ImportError:
-    LANGCHAIN_AVAILABLE = False
+from rag_manifest import SegmentedIndexMixin
+from memory_accounting import (build_memory_report, cached_memory_report, deep_sizeof, faiss_index_bytes,
+                               model_parameter_bytes)
+from extraction_cache import get_extraction_cache
+from pdf_engines import extract_pdf_pages
+from ollama_inventory import get_model_inventory
+
+from lazy_imports import module_available, lazy_attribute
+
+# LangChain imports (carregados no primeiro uso)
+LANGCHAIN_AVAILABLE = module_available("langchain.text_splitter", "langchain.schema",
+                                       "langchain_community.document_loaders",
+                                       "langchain_community.vectorstores")
+if LANGCHAIN_AVAILABLE:
+    PyPDFLoader = lazy_attribute("langchain_community.document_loaders", "PyPDFLoader")
+    TextLoader = lazy_attribute("langchain_community.document_loaders", "TextLoader")
+    RecursiveCharacterTextSplitter = lazy_attribute("langchain.text_splitter", "RecursiveCharacterTextSplitter")
+    FAISS = lazy_attribute("langchain_community.vectorstores", "FAISS")
+    Document = lazy_attribute("langchain.schema", "Document")
+    HuggingFaceEmbeddings = lazy_attribute(["langchain_huggingface", "langchain_community.embeddings"],
+                                           "HuggingFaceEmbeddings")
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class RAGSystemFunctional:
+# Incrementar quando a extração mudar, invalidando o cache de extração
+LOADER_VERSION = "1"
+
+class RAGSystemFunctional(SegmentedIndexMixin):
     """Sistema RAG Funcional com múltiplos backends"""
     
     def __init__(self, 
                  data_dir: str = "rag_data",
                  ollama_url: str = "http://localhost:11434",
-                 openrouter_api_key: Optional[str] = None):
+                 openrouter_api_key: Optional[str] = None,
+                 max_segments: int = 16,
+                 pdf_engine: str = "auto"):
         
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
         
+        # Manifesto com geração para recarga entre processos
+        self._init_manifest(self.data_dir, max_segments, name="vectorstore")
+        
         # Configurações dos backends
         self.ollama_url = ollama_url
         self.openrouter_api_key = openrouter_api_key
@@ -50,6 +67,10 @@ class RAGSystemFunctional:
         self.text_splitter = None
         self.documents_cache = {}
         
+        # Texto extraído compartilhado com os demais loaders
+        self.extraction_cache = get_extraction_cache()
+        self.pdf_engine = pdf_engine
+        
         # Inicializar sistema
         self._init_system()
         
@@ -87,12 +108,11 @@ class RAGSystemFunctional:
         
     def _test_connections(self):
         """Testa conexões com os backends"""
-        # Testar Ollama
+        # Testar Ollama (inventário compartilhado com app.py e OllamaManager)
         try:
-            response = requests.get(f"{self.ollama_url}/api/tags", timeout=5)
-            if response.status_code == 200:
-                models = response.json().get("models", [])
-                logger.info(f"✅ Ollama conectado - {len(models)} modelos disponíveis")
+            inventory = get_model_inventory(self.ollama_url)
+            if inventory.is_available():
+                logger.info(f"✅ Ollama conectado - {len(inventory.models())} modelos disponíveis")
                 self.ollama_available = True
             else:
                 logger.warning("⚠️ Ollama não disponível")
@@ -145,25 +165,34 @@ class RAGSystemFunctional:
             texts = self.text_splitter.split_documents(documents)
             
             # Adicionar metadados
+            file_hash = self._get_file_hash(file_path)
             for doc in texts:
                 doc.metadata.update({
                     "source_file": file_path.name,
                     "full_path": str(file_path),
                     "document_type": document_type,
                     "added_at": datetime.now().isoformat(),
-                    "file_hash": self._get_file_hash(file_path)
+                    "file_hash": file_hash
                 })
             
-            # Adicionar ao vectorstore
-            if self.vectorstore is None:
-                self.vectorstore = FAISS.from_documents(texts, self.embeddings)
-            else:
-                self.vectorstore.add_documents(texts)
+            # Embeddings calculados uma única vez: o mesmo store vira segmento em disco
+            segment_store = FAISS.from_documents(texts, self.embeddings)
+            
+            with self._index_lock:
+                segment_count = self._append_segment(segment_store)
                 
-            # Salvar
-            self.save_vectorstore()
+                # Adicionar ao vectorstore
+                if self.vectorstore is None:
+                    self.vectorstore = segment_store
+                else:
+                    self.vectorstore.merge_from(segment_store)
+            
+            # Compactar quando houver segmentos demais
+            if segment_count > self.max_segments:
+                self.save_vectorstore()
             
-            # Atualizar cache
+            # Atualizar cache (relendo o disco para não perder entradas de outros processos)
+            self._load_documents_cache()
             self.documents_cache[file_path.name] = {
                 "path": str(file_path),
                 "type": document_type,
@@ -193,15 +222,27 @@ class RAGSystemFunctional:
         """Carrega documento baseado no tipo"""
         try:
             if document_type == "pdf":
-                loader = PyPDFLoader(str(file_path))
+                load = lambda: self._load_pdf_pages(file_path)
+                extractor = f"langchain_pdf_docs:{self.pdf_engine}"
             else:
-                loader = TextLoader(str(file_path), encoding="utf-8")
+                load = TextLoader(str(file_path), encoding="utf-8").load
+                extractor = f"langchain_{document_type}"
             
-            return loader.load()
+            # Documentos já extraídos (mesmo conteúdo) vêm do cache
+            return self.extraction_cache.get_or_load_documents(
+                str(file_path), extractor, LOADER_VERSION, load, Document
+            )
         except Exception as e:
             logger.error(f"❌ Erro ao carregar documento: {e}")
             return []
     
+    def _load_pdf_pages(self, file_path: Path) -> List[Document]:
+        """Uma Document por página (mesmos metadados do PyPDFLoader)"""
+        pages, engine = extract_pdf_pages(str(file_path), self.pdf_engine)
+        logger.info(f"📄 PDF extraído com {engine}: {file_path.name}")
+        return [Document(page_content=text, metadata={"source": str(file_path), "page": index})
+                for index, text in enumerate(pages)]
+    
     def _get_file_hash(self, file_path: Path) -> str:
         """Gera hash do arquivo"""
         hash_md5 = hashlib.md5()
@@ -213,12 +254,15 @@ class RAGSystemFunctional:
     def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """Busca documentos relevantes"""
         try:
+            # Incorporar segmentos de outros processos (só um stat() se nada mudou)
+            self.refresh()
             if self.vectorstore is None:
                 logger.warning("⚠️ Vectorstore não inicializado")
                 return []
                 
             # Buscar documentos similares
-            docs = self.vectorstore.similarity_search_with_score(query, k=top_k)
+            with self._index_lock:
+                docs = self.vectorstore.similarity_search_with_score(query, k=top_k)
             
             results = []
             for i, (doc, score) in enumerate(docs):
@@ -265,27 +309,86 @@ class RAGSystemFunctional:
         return {
             "vectorstore_loaded": self.vectorstore is not None,
             "documents_count": len(self.documents_cache),
-            "ollama_available": getattr(self, "ollama_available", False),
+            "ollama_available": get_model_inventory(self.ollama_url).is_available(wait=0),
             "openrouter_available": getattr(self, "openrouter_available", False),
-            "embeddings_type": "HuggingFace"
+            "embeddings_type": "HuggingFace",
+            "memory": cached_memory_report(self)
         }
     
+    def get_memory_usage(self) -> Dict[str, Any]:
+        """Memória aproximada por componente (modelo, índice, docstore, cache) e RSS"""
+        docstore = getattr(self.vectorstore, "docstore", None)
+        return build_memory_report({
+            "embedding_model": model_parameter_bytes(self.embeddings),
+            "faiss_index": faiss_index_bytes(self.vectorstore),
+            "docstore": deep_sizeof(getattr(docstore, "_dict", None)),
+            "documents_cache": deep_sizeof(self.documents_cache)
+        })
+    
+    # Ganchos de persistência usados pelo SegmentedIndexMixin
+    
+    def _base_path(self, base_id: Optional[str]) -> Path:
+        """Diretório da base compactada (ou do formato antigo)"""
+        return self.data_dir / (f"vectorstore_{base_id}" if base_id else "vectorstore")
+    
+    def _segment_path(self, segment_id: str) -> Path:
+        return self.manifest.segments_dir / f"seg_{segment_id}"
+    
+    def _save_store(self, store, target: Path):
+        """Salva um vectorstore em diretório temporário e renomeia"""
+        tmp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        if tmp_path.exists():
+            shutil.rmtree(tmp_path)
+        store.save_local(str(tmp_path))
+        os.replace(tmp_path, target)
+    
+    def _reset_index(self):
+        self.vectorstore = None
+    
+    def _load_base(self, base_id: Optional[str]):
+        base_path = self._base_path(base_id)
+        if base_path.exists():
+            self.vectorstore = FAISS.load_local(str(base_path), self.embeddings)
+    
+    def _load_segment(self, segment_id: str):
+        segment_store = FAISS.load_local(str(self._segment_path(segment_id)), self.embeddings)
+        if self.vectorstore is None:
+            self.vectorstore = segment_store
+        else:
+            self.vectorstore.merge_from(segment_store)
+    
+    def _write_segment(self, segment_id: str, segment_store):
+        self.manifest.segments_dir.mkdir(parents=True, exist_ok=True)
+        self._save_store(segment_store, self._segment_path(segment_id))
+    
+    def _write_base(self, base_id: str) -> bool:
+        if self.vectorstore is None:
+            return False
+        self._save_store(self.vectorstore, self._base_path(base_id))
+        return True
+    
+    def _remove_segment(self, segment_id: str):
+        shutil.rmtree(self._segment_path(segment_id))
+    
+    def _remove_base(self, base_id: Optional[str]):
+        base_path = self._base_path(base_id)
+        if base_path.exists():
+            shutil.rmtree(base_path)
+    
     def save_vectorstore(self):
-        """Salva vectorstore"""
+        """Salva vectorstore, compactando os segmentos em uma nova base"""
         if self.vectorstore is not None:
             try:
-                vectorstore_path = self.data_dir / "vectorstore"
-                self.vectorstore.save_local(str(vectorstore_path))
-                logger.info("💾 Vectorstore salvo")
+                generation = self._compact()
+                logger.info(f"💾 Vectorstore salvo (geração {generation})")
             except Exception as e:
                 logger.error(f"❌ Erro ao salvar vectorstore: {e}")
     
     def load_vectorstore(self):
         """Carrega vectorstore"""
         try:
-            vectorstore_path = self.data_dir / "vectorstore"
-            if vectorstore_path.exists():
-                self.vectorstore = FAISS.load_local(str(vectorstore_path), self.embeddings)
+            self._load_from_manifest()
+            if self.vectorstore is not None:
                 logger.info("📂 Vectorstore carregado")
             
             # Carregar cache de documentos
@@ -295,11 +398,20 @@ class RAGSystemFunctional:
             logger.error(f"❌ Erro ao carregar vectorstore: {e}")
             self.vectorstore = None
     
+    def refresh(self) -> bool:
+        """Carrega documentos adicionados por outros processos"""
+        changed = super().refresh()
+        if changed:
+            self._load_documents_cache()
+        return changed
+    
     def _save_documents_cache(self):
         """Salva cache de documentos"""
         cache_path = self.data_dir / "documents_cache.json"
-        with open(cache_path, "w") as f:
+        tmp_path = cache_path.with_name(f"documents_cache.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
             json.dump(self.documents_cache, f, indent=2)
+        os.replace(tmp_path, cache_path)
     
     def _load_documents_cache(self):
         """Carrega cache de documentos"""
@@ -311,10 +423,11 @@ class RAGSystemFunctional:
     def clear_all(self):
         """Limpa todos os dados"""
         try:
-            import shutil
-            shutil.rmtree(self.data_dir)
-            self.data_dir.mkdir(exist_ok=True)
-            self.vectorstore = None
+            # Publica uma geração vazia para que outros processos também limpem
+            self._reset_manifest()
+            cache_path = self.data_dir / "documents_cache.json"
+            if cache_path.exists():
+                cache_path.unlink()
             self.documents_cache = {}
             logger.info("🗑️ Todos os dados foram limpos")
         except Exception as e:
@@ -9,32 +9,37 @@ import logging
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 
-# LangChain imports
-try:
-    from langchain_community.document_loaders import PyPDFLoader
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
-    from langchain_community.embeddings import HuggingFaceEmbeddings
-    from langchain_community.vectorstores import FAISS
-    from langchain.chains import RetrievalQA
-    from langchain_community.llms import OpenAI
-    LANGCHAIN_AVAILABLE = True
-except ImportError:
-    LANGCHAIN_AVAILABLE = False
+from lazy_imports import module_available, lazy_import, lazy_attribute
+
+# LangChain imports (carregados no primeiro uso)
+LANGCHAIN_AVAILABLE = module_available("langchain.text_splitter", "langchain.schema",
+                                       "langchain_community.document_loaders",
+                                       "langchain_community.embeddings",
+                                       "langchain_community.vectorstores")
+if LANGCHAIN_AVAILABLE:
+    PyPDFLoader = lazy_attribute("langchain_community.document_loaders", "PyPDFLoader")
+    Document = lazy_attribute("langchain.schema", "Document")
+    RecursiveCharacterTextSplitter = lazy_attribute("langchain.text_splitter", "RecursiveCharacterTextSplitter")
+    HuggingFaceEmbeddings = lazy_attribute("langchain_community.embeddings", "HuggingFaceEmbeddings")
+    FAISS = lazy_attribute("langchain_community.vectorstores", "FAISS")
 
 # Fallback
-try:
-    from sentence_transformers import SentenceTransformer
-    import faiss
-    import numpy as np
-    FALLBACK_AVAILABLE = True
-except ImportError:
-    FALLBACK_AVAILABLE = False
+FALLBACK_AVAILABLE = module_available("sentence_transformers", "faiss", "numpy")
+if FALLBACK_AVAILABLE:
+    SentenceTransformer = lazy_attribute("sentence_transformers", "SentenceTransformer")
+    faiss = lazy_import("faiss")
+    np = lazy_import("numpy")
 
-import PyPDF2
+from memory_accounting import (build_memory_report, cached_memory_report, deep_sizeof, faiss_index_bytes,
+                               model_parameter_bytes)
+from extraction_cache import get_extraction_cache
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Incrementar quando a extração mudar, invalidando o cache de extração
+LOADER_VERSION = "1"
+
 class RAGSystemLangChain:
     """Sistema RAG usando LangChain"""
     
@@ -42,6 +47,7 @@ class RAGSystemLangChain:
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
         self.api_key = api_key
+        self.extraction_cache = get_extraction_cache()
         
         if LANGCHAIN_AVAILABLE:
             self._init_langchain()
@@ -93,7 +99,9 @@ class RAGSystemLangChain:
     def _add_document_langchain(self, pdf_path: str) -> bool:
         """Adiciona com LangChain"""
         loader = PyPDFLoader(pdf_path)
-        documents = loader.load()
+        documents = self.extraction_cache.get_or_load_documents(
+            pdf_path, "langchain_pdf", LOADER_VERSION, loader.load, Document
+        )
         texts = self.text_splitter.split_documents(documents)
         
         for doc in texts:
@@ -193,6 +201,30 @@ class RAGSystemLangChain:
         """Lista documentos"""
         return []
     
+    def get_memory_usage(self) -> Dict[str, Any]:
+        """Memória aproximada por componente e RSS"""
+        if self.mode == "langchain":
+            docstore = getattr(self.vectorstore, "docstore", None)
+            return build_memory_report({
+                "embedding_model": model_parameter_bytes(self.embeddings),
+                "faiss_index": faiss_index_bytes(self.vectorstore),
+                "docstore": deep_sizeof(getattr(docstore, "_dict", None))
+            })
+        return build_memory_report({
+            "embedding_model": model_parameter_bytes(self.embedding_model),
+            "faiss_index": faiss_index_bytes(self.index),
+            "documents": deep_sizeof(self.documents),
+            "metadata": deep_sizeof(self.document_metadata)
+        })
+    
+    def get_system_status(self) -> Dict[str, Any]:
+        """Retorna status do sistema"""
+        return {
+            "mode": self.mode,
+            "vectorstore_loaded": (self.vectorstore if self.mode == "langchain" else self.index) is not None,
+            "memory": cached_memory_report(self)
+        }
+    
     def remove_document(self, filename: str) -> bool:
         """Remove um documento (funcionalidade limitada)"""
         # Nota: FAISS não suporta remoção eficiente de documentos
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Cache de respostas do agente com limite de tamanho, TTL e LRU
+A chave é um hash do modelo, do prompt de sistema, do modo do agente e da
+janela de histórico enviada ao modelo, então uma resposta só é reaproveitada
+no mesmo contexto de conversa. Opcionalmente persiste em SQLite e mantém
+estatísticas de acerto, tokens e latência economizados.
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_VERSION = "1"
+
+def make_cache_key(model: str, system_prompt: str, mode: str,
+                   messages: List[Dict[str, str]], **params) -> str:
+    """Hash estável do contexto completo da requisição
+
+    messages é a janela de histórico enviada ao modelo (incluindo a mensagem
+    atual); params são opções que mudam a resposta (temperature, max_tokens).
+    """
+    payload = {
+        "version": CACHE_KEY_VERSION,
+        "model": model,
+        "system": system_prompt,
+        "mode": mode,
+        "messages": [[m.get("role"), m.get("content")] for m in messages],
+        "params": params
+    }
+    canonical = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """LRU em memória limitado por número de entradas e TTL, com cópia opcional em disco"""
+
+    def __init__(self, max_entries: int = 512, ttl: float = 3600,
+                 db_path: Optional[str] = None, max_disk_entries: int = 10000):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0,
+                       "disk_hits": 0, "tokens_saved": 0, "latency_saved": 0.0}
+
+        self._conn = None
+        if db_path:
+            try:
+                Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+                self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                with self._conn:
+                    self._conn.execute("""
+                        CREATE TABLE IF NOT EXISTS responses (
+                            key TEXT PRIMARY KEY,
+                            entry TEXT NOT NULL,
+                            created_at REAL NOT NULL
+                        )
+                    """)
+                    self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_created ON responses(created_at)")
+            except Exception as e:
+                logger.error(f"Erro ao abrir cache em disco {db_path}: {e}")
+                self._conn = None
+
+    def _expired(self, entry: Dict[str, Any], now: float) -> bool:
+        return self.ttl > 0 and now - entry["created_at"] >= self.ttl
+
+    def _load_from_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        if self._conn is None:
+            return None
+        try:
+            row = self._conn.execute("SELECT entry FROM responses WHERE key = ?", (key,)).fetchone()
+            return json.loads(row[0]) if row else None
+        except Exception as e:
+            logger.error(f"Erro ao ler cache em disco: {e}")
+            return None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Entrada válida para a chave (content, tokens_used, response_time...) ou None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            from_disk = False
+            if entry is None:
+                entry = self._load_from_disk(key)
+                from_disk = entry is not None
+
+            if entry is not None and self._expired(entry, now):
+                self._stats["expired"] += 1
+                self._remove(key)
+                entry = None
+
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+
+            if from_disk:
+                self._stats["disk_hits"] += 1
+                self._store_in_memory(key, entry)
+            else:
+                self._entries.move_to_end(key)
+
+            self._stats["hits"] += 1
+            self._stats["tokens_saved"] += entry.get("tokens_used", 0) or 0
+            self._stats["latency_saved"] += entry.get("response_time", 0.0) or 0.0
+            return dict(entry)
+
+    def put(self, key: str, content: str, tokens_used: int = 0,
+            response_time: float = 0.0, model: Optional[str] = None):
+        """Guarda uma resposta (em memória e, se configurado, em disco)"""
+        entry = {
+            "content": content,
+            "tokens_used": tokens_used,
+            "response_time": response_time,
+            "model": model,
+            "created_at": time.time()
+        }
+        with self._lock:
+            self._store_in_memory(key, entry)
+            if self._conn is not None:
+                try:
+                    with self._conn:
+                        self._conn.execute("INSERT OR REPLACE INTO responses (key, entry, created_at) VALUES (?, ?, ?)",
+                                           (key, json.dumps(entry, ensure_ascii=False), entry["created_at"]))
+                        self._prune_disk()
+                except Exception as e:
+                    logger.error(f"Erro ao gravar cache em disco: {e}")
+
+    def _store_in_memory(self, key: str, entry: Dict[str, Any]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evicted"] += 1
+
+    def _prune_disk(self):
+        """Remove entradas vencidas e as mais antigas acima do limite do disco"""
+        if self.ttl > 0:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+        self._conn.execute("""
+            DELETE FROM responses WHERE key IN (
+                SELECT key FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_disk_entries,))
+
+    def _remove(self, key: str):
+        self._entries.pop(key, None)
+        if self._conn is not None:
+            try:
+                with self._conn:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            except Exception as e:
+                logger.error(f"Erro ao remover do cache em disco: {e}")
+
+    def clear(self):
+        """Esvazia o cache (memória e disco); as estatísticas são mantidas"""
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Taxa de acerto, tokens e segundos economizados"""
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+            stats["latency_saved"] = round(stats["latency_saved"], 3)
+            stats["entries"] = len(self._entries)
+            stats["max_entries"] = self.max_entries
+            stats["ttl"] = self.ttl
+            stats["persistent"] = self._conn is not None
+            return stats
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
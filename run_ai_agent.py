@@ -8,6 +8,8 @@ import sys
 import os
 from pathlib import Path
 
+from lazy_imports import module_available
+
 def check_dependencies():
     """Verifica se todas as dependências estão instaladas"""
     required_packages = [
@@ -21,10 +23,10 @@ def check_dependencies():
     
     missing_packages = []
     
+    # Só verifica se estão instalados: importar faiss/sentence_transformers aqui
+    # custaria segundos antes de a interface aparecer
     for package in required_packages:
-        try:
-            __import__(package)
-        except ImportError:
+        if not module_available(package):
             missing_packages.append(package)
     
     if missing_packages:
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Cache semântico de respostas para prompts quase duplicados
+O prompt é convertido em embedding e comparado (similaridade de cosseno) com
+os prompts já respondidos no mesmo escopo (modo do agente + modelo). Acima do
+limiar, a resposta em cache é devolvida sem chamar o LLM. Opcional: só é
+usado quando habilitado na configuração.
+"""
+
+import time
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Callable
+
+import numpy as np
+
+from lazy_imports import module_available, lazy_attribute
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SENTENCE_TRANSFORMERS_AVAILABLE = module_available("sentence_transformers")
+if SENTENCE_TRANSFORMERS_AVAILABLE:
+    SentenceTransformer = lazy_attribute("sentence_transformers", "SentenceTransformer")
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+DEFAULT_THRESHOLD = 0.92
+
+EmbedFn = Callable[[List[str]], np.ndarray]
+
+def sentence_transformer_embedder(model_name: str = DEFAULT_MODEL) -> EmbedFn:
+    """Embedder padrão; o modelo só é carregado no primeiro prompt"""
+    if not SENTENCE_TRANSFORMERS_AVAILABLE:
+        raise ImportError("sentence-transformers não disponível. Instale com: pip install sentence-transformers")
+    state = {}
+    lock = threading.Lock()
+
+    def embed(texts: List[str]) -> np.ndarray:
+        with lock:
+            if "model" not in state:
+                state["model"] = SentenceTransformer(model_name)
+        return state["model"].encode(texts)
+
+    # Para a contabilidade de memória (None até o primeiro prompt)
+    embed.loaded_model = lambda: state.get("model")
+    return embed
+
+class _Scope:
+    """Índice vetorial pequeno (matriz normalizada) e entradas de um escopo"""
+
+    def __init__(self, dim: int, capacity: int):
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.entries: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self.size = 0
+
+class SemanticResponseCache:
+    """Busca pelo prompt em cache mais próximo, por escopo, com limiar de similaridade"""
+
+    def __init__(self, embed_fn: Optional[EmbedFn] = None, threshold: float = DEFAULT_THRESHOLD,
+                 max_entries_per_scope: int = 256, ttl: float = 24 * 3600):
+        self._embed_fn = embed_fn
+        self.threshold = threshold
+        self.max_entries = max_entries_per_scope
+        self.ttl = ttl
+        self._scopes: Dict[str, _Scope] = {}
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "hits": 0, "misses": 0, "stored": 0,
+                       "evicted": 0, "tokens_avoided": 0, "latency_avoided": 0.0}
+
+    def _embed(self, text: str) -> np.ndarray:
+        if self._embed_fn is None:
+            self._embed_fn = sentence_transformer_embedder()
+        vector = np.asarray(self._embed_fn([text]), dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def embedding_model(self) -> Optional[Any]:
+        """Modelo de embeddings já carregado pelo embedder padrão, se houver"""
+        loaded_model = getattr(self._embed_fn, "loaded_model", None)
+        return loaded_model() if loaded_model else None
+
+    @staticmethod
+    def _normalize_prompt(prompt: str) -> str:
+        return " ".join(prompt.lower().split())
+
+    def lookup(self, prompt: str, scope: str = "default") -> Optional[Dict[str, Any]]:
+        """Resposta de um prompt equivalente no escopo, ou None
+
+        O retorno inclui "similarity" e "matched_prompt".
+        """
+        try:
+            vector = self._embed(self._normalize_prompt(prompt))
+        except Exception as e:
+            logger.error(f"Erro ao gerar embedding do prompt: {e}")
+            return None
+
+        now = time.time()
+        with self._lock:
+            self._stats["lookups"] += 1
+            index = self._scopes.get(scope)
+            if index is None or index.size == 0 or index.vectors.shape[1] != vector.shape[0]:
+                self._stats["misses"] += 1
+                return None
+
+            scores = index.vectors[:index.size] @ vector
+            for position in np.argsort(-scores):
+                score = float(scores[position])
+                if score < self.threshold:
+                    break
+                entry = index.entries[position]
+                if self.ttl > 0 and now - entry["created_at"] >= self.ttl:
+                    continue
+                entry["last_hit"] = now
+                entry["hits"] += 1
+                self._stats["hits"] += 1
+                self._stats["tokens_avoided"] += entry.get("tokens_used", 0) or 0
+                self._stats["latency_avoided"] += entry.get("response_time", 0.0) or 0.0
+                result = dict(entry)
+                result["similarity"] = score
+                result["matched_prompt"] = entry["prompt"]
+                return result
+
+            self._stats["misses"] += 1
+            return None
+
+    def store(self, prompt: str, response: str, scope: str = "default",
+              tokens_used: int = 0, response_time: float = 0.0) -> bool:
+        """Guarda a resposta do prompt no escopo (substitui a menos usada se cheio)"""
+        try:
+            vector = self._embed(self._normalize_prompt(prompt))
+        except Exception as e:
+            logger.error(f"Erro ao gerar embedding do prompt: {e}")
+            return False
+
+        now = time.time()
+        entry = {"prompt": prompt, "response": response, "tokens_used": tokens_used,
+                 "response_time": response_time, "created_at": now, "last_hit": now, "hits": 0}
+        with self._lock:
+            index = self._scopes.get(scope)
+            if index is None or index.vectors.shape[1] != vector.shape[0]:
+                index = self._scopes[scope] = _Scope(vector.shape[0], self.max_entries)
+
+            if index.size < self.max_entries:
+                position = index.size
+                index.size += 1
+            else:
+                position = self._eviction_slot(index, now)
+                self._stats["evicted"] += 1
+
+            index.vectors[position] = vector
+            index.entries[position] = entry
+            self._stats["stored"] += 1
+        return True
+
+    def _eviction_slot(self, index: _Scope, now: float) -> int:
+        """Primeiro uma entrada vencida; senão a usada há mais tempo (LRU)"""
+        oldest, oldest_time = 0, None
+        for position, entry in enumerate(index.entries[:index.size]):
+            if self.ttl > 0 and now - entry["created_at"] >= self.ttl:
+                return position
+            if oldest_time is None or entry["last_hit"] < oldest_time:
+                oldest, oldest_time = position, entry["last_hit"]
+        return oldest
+
+    def clear(self, scope: Optional[str] = None):
+        """Esvazia um escopo ou todos"""
+        with self._lock:
+            if scope is None:
+                self._scopes.clear()
+            else:
+                self._scopes.pop(scope, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Acertos servidos, tokens e segundos evitados"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["hit_ratio"] = round(stats["hits"] / stats["lookups"], 4) if stats["lookups"] else 0.0
+            stats["latency_avoided"] = round(stats["latency_avoided"], 3)
+            stats["threshold"] = self.threshold
+            stats["scopes"] = {name: index.size for name, index in self._scopes.items()}
+            return stats
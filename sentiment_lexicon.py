@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Análise de sentimento por léxico em lote
+As listas de palavras são compiladas em uma única expressão regular e cada
+lote de documentos é varrido de uma só vez (texto concatenado), em vez de
+testar palavra por palavra em cada documento. Mantém a semântica original:
+conta as palavras do léxico presentes como substring do texto em minúsculas.
+"""
+
+import re
+import hashlib
+from bisect import bisect_right
+from typing import Dict, List, Any
+
+POSITIVE_WORDS = ['good', 'great', 'excellent', 'amazing', 'wonderful', 'perfect']
+NEGATIVE_WORDS = ['bad', 'terrible', 'awful', 'horrible', 'worst', 'disappointing']
+
+# Incrementar quando o léxico ou a pontuação mudarem (invalida resultados salvos)
+SENTIMENT_VERSION = "1"
+
+# Separador que não ocorre nas palavras do léxico: impede casamentos entre documentos
+_SEPARATOR = "\x00"
+
+def compile_lexicon(words: List[str]) -> "re.Pattern":
+    """Uma regex para todo o léxico; o lookahead encontra ocorrências sobrepostas"""
+    alternatives = "|".join(re.escape(word) for word in sorted(set(words), key=len, reverse=True))
+    return re.compile(f"(?=({alternatives}))")
+
+_LEXICON_PATTERN = compile_lexicon(POSITIVE_WORDS + NEGATIVE_WORDS)
+_POSITIVE = frozenset(POSITIVE_WORDS)
+_NEGATIVE = frozenset(NEGATIVE_WORDS)
+
+def content_hash(text: str) -> str:
+    """Chave do resultado por documento"""
+    return hashlib.sha1(text.encode('utf-8', errors='replace')).hexdigest()
+
+def _score(text: str, found: set) -> Dict[str, Any]:
+    positive_count = len(found & _POSITIVE)
+    negative_count = len(found & _NEGATIVE)
+
+    if positive_count > negative_count:
+        sentiment = "positive"
+        score = positive_count / (positive_count + negative_count + 1)
+    elif negative_count > positive_count:
+        sentiment = "negative"
+        score = negative_count / (positive_count + negative_count + 1)
+    else:
+        sentiment = "neutral"
+        score = 0.5
+
+    return {
+        "text": text[:100] + "...",
+        "sentiment": sentiment,
+        "score": score,
+        "positive_words": positive_count,
+        "negative_words": negative_count
+    }
+
+def score_sentiment_batch(texts: List[str]) -> List[Dict[str, Any]]:
+    """Pontua um lote de textos com uma única varredura da regex"""
+    if not texts:
+        return []
+
+    lowered = [text.lower().replace(_SEPARATOR, " ") for text in texts]
+    starts = []
+    position = 0
+    for text in lowered:
+        starts.append(position)
+        position += len(text) + 1
+
+    found = [set() for _ in texts]
+    for match in _LEXICON_PATTERN.finditer(_SEPARATOR.join(lowered)):
+        found[bisect_right(starts, match.start()) - 1].add(match.group(1))
+
+    return [_score(text, words) for text, words in zip(texts, found)]
@@ -29,6 +29,8 @@ document.addEventListener('DOMContentLoaded', function() {
         isListening: false,
         recognition: null,
         commandHistory: [],
+        historyCursor: null,
+        historyLoading: false,
         lastCommand: null,
         docsStatus: {},
         apiStatus: {}
@@ -403,27 +405,45 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
     
-    // Fetch command history from server
-    function fetchHistory() {
-        fetch('/api/history')
+    // Fetch command history from server (paginated; pass a cursor to load older entries)
+    function fetchHistory(cursor) {
+        const params = new URLSearchParams({ limit: 20 });
+        if (cursor) {
+            params.set('cursor', cursor);
+        }
+        
+        state.historyLoading = true;
+        fetch(`/api/history?${params}`)
             .then(response => response.json())
             .then(data => {
-                if (Array.isArray(data) && data.length > 0) {
-                    // Convert to our history format
-                    state.commandHistory = data.map(item => ({
-                        command: item.user_input,
-                        response: item.ai_response,
-                        technology: 'Unknown', // Server doesn't store this yet
-                        timestamp: item.timestamp
-                    }));
-                    updateHistoryUI();
-                }
+                const items = (data.items || []).map(item => ({
+                    command: item.user_input,
+                    response: item.ai_response,
+                    technology: item.technology || 'Unknown',
+                    timestamp: item.created_at
+                }));
+                
+                // Convert to our history format
+                state.commandHistory = cursor ? state.commandHistory.concat(items) : items;
+                state.historyCursor = data.next_cursor;
+                updateHistoryUI();
             })
             .catch(error => {
                 console.error('Error fetching history:', error);
+            })
+            .finally(() => {
+                state.historyLoading = false;
             });
     }
     
+    // Load older entries when the history list is scrolled to the bottom
+    historyContainer.addEventListener('scroll', () => {
+        const nearBottom = historyContainer.scrollTop + historyContainer.clientHeight >= historyContainer.scrollHeight - 20;
+        if (nearBottom && state.historyCursor && !state.historyLoading) {
+            fetchHistory(state.historyCursor);
+        }
+    });
+    
     // Select a technology
     function selectTechnology(tech) {
         // Update state
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Leitura em streaming de planilhas (CSV, XLSX e ODS)
+Em vez de carregar a planilha inteira com pandas, as linhas são lidas em lotes
+e emitidas como grupos de linhas com o cabeçalho repetido, já no tamanho
+de um chunk, mantendo a memória limitada
+"""
+
+import csv
+import zipfile
+import logging
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Iterator, Iterable, Tuple
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+STREAMING_EXTENSIONS = ('.csv', '.xlsx', '.ods')
+
+# Namespaces do OpenDocument
+TABLE_NS = "urn:oasis:names:tc:opendocument:xmlns:table:1.0"
+TEXT_NS = "urn:oasis:names:tc:opendocument:xmlns:text:1.0"
+
+# Limite para células/linhas vazias repetidas (comuns no fim de planilhas ODS)
+MAX_REPEAT = 1024
+
+@dataclass
+class RowGroup:
+    """Grupo de linhas consecutivas de uma planilha, com o cabeçalho"""
+    sheet: Optional[str]
+    start_row: int
+    end_row: int
+    header: List[str] = field(default_factory=list)
+    rows: List[List[str]] = field(default_factory=list)
+
+    def to_text(self) -> str:
+        """Texto do grupo com o contexto do cabeçalho"""
+        location = f"linhas {self.start_row}-{self.end_row}"
+        lines = [f"Planilha: {self.sheet} ({location})" if self.sheet else location.capitalize()]
+        if self.header:
+            lines.append(" | ".join(self.header))
+        lines.extend(" | ".join(row) for row in self.rows)
+        return "\n".join(lines)
+
+def _trim(cells: List[str]) -> List[str]:
+    """Remove células vazias do fim da linha"""
+    end = len(cells)
+    while end and not cells[end - 1]:
+        end -= 1
+    return cells[:end]
+
+def group_rows(rows: Iterable[Tuple[int, List[str]]],
+               sheet: Optional[str] = None,
+               rows_per_group: int = 200,
+               max_chars: int = 4000) -> Iterator[RowGroup]:
+    """Agrupa linhas (número, células) em RowGroups; a primeira linha não vazia é o cabeçalho"""
+    header = None
+    group = None
+    size = 0
+
+    for row_number, cells in rows:
+        cells = _trim(cells)
+        if not cells:
+            continue
+        if header is None:
+            header = cells
+            continue
+
+        row_size = sum(len(cell) for cell in cells) + 3 * len(cells)
+        if group is not None and (len(group.rows) >= rows_per_group or size + row_size > max_chars):
+            yield group
+            group = None
+
+        if group is None:
+            group = RowGroup(sheet, row_number, row_number, header)
+            size = sum(len(cell) for cell in header) + 40
+        group.rows.append(cells)
+        group.end_row = row_number
+        size += row_size
+
+    if group is not None:
+        yield group
+    elif header is not None:
+        # Planilha só com cabeçalho
+        yield RowGroup(sheet, 1, 1, header)
+
+def iter_csv_row_groups(file_path: Path, rows_per_group: int = 200,
+                        max_chars: int = 4000, encoding: str = 'utf-8') -> Iterator[RowGroup]:
+    """Lê um CSV linha a linha com o módulo csv"""
+    with open(file_path, 'r', encoding=encoding, errors='replace', newline='') as f:
+        sample = f.read(64 * 1024)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+        except csv.Error:
+            dialect = csv.excel
+
+        rows = ((number, [cell.strip() for cell in row])
+                for number, row in enumerate(csv.reader(f, dialect), start=1))
+        yield from group_rows(rows, None, rows_per_group, max_chars)
+
+def iter_xlsx_row_groups(file_path: Path, rows_per_group: int = 200,
+                         max_chars: int = 4000) -> Iterator[RowGroup]:
+    """Lê um XLSX com openpyxl em modo somente leitura (linha a linha)"""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            rows = ((number, ["" if value is None else str(value).strip() for value in row])
+                    for number, row in enumerate(sheet.iter_rows(values_only=True), start=1))
+            yield from group_rows(rows, sheet.title, rows_per_group, max_chars)
+    finally:
+        workbook.close()
+
+def _iter_ods_sheets(file_path: Path) -> Iterator[Tuple[str, Iterator[Tuple[int, List[str]]]]]:
+    """Percorre content.xml com iterparse, liberando cada linha após lê-la"""
+    table_tag = f"{{{TABLE_NS}}}table"
+    row_tag = f"{{{TABLE_NS}}}table-row"
+    cell_tags = (f"{{{TABLE_NS}}}table-cell", f"{{{TABLE_NS}}}covered-table-cell")
+    paragraph_tag = f"{{{TEXT_NS}}}p"
+    rows_repeated = f"{{{TABLE_NS}}}number-rows-repeated"
+    columns_repeated = f"{{{TABLE_NS}}}number-columns-repeated"
+
+    with zipfile.ZipFile(file_path) as archive, archive.open("content.xml") as content:
+        stack = []
+        sheet_rows = None
+        cells = []
+        row_number = 0
+
+        for event, elem in ET.iterparse(content, events=("start", "end")):
+            if event == "start":
+                stack.append(elem)
+                if elem.tag == table_tag and sheet_rows is None:
+                    sheet_name = elem.get(f"{{{TABLE_NS}}}name", "")
+                    sheet_rows = []
+                    row_number = 0
+                elif elem.tag == row_tag:
+                    cells = []
+                continue
+
+            stack.pop()
+            if elem.tag in cell_tags:
+                value = "\n".join("".join(p.itertext()) for p in elem.iter(paragraph_tag)).strip()
+                repeat = int(elem.get(columns_repeated, "1"))
+                cells.extend([value] * (repeat if value else min(repeat, MAX_REPEAT)))
+            elif elem.tag == row_tag:
+                repeat = int(elem.get(rows_repeated, "1"))
+                cells = _trim(cells)
+                if cells:
+                    for _ in range(min(repeat, MAX_REPEAT)):
+                        row_number += 1
+                        sheet_rows.append((row_number, list(cells)))
+                else:
+                    row_number += repeat
+                # Libera a linha já lida
+                if stack:
+                    stack[-1].remove(elem)
+                # Entrega as linhas acumuladas aos poucos
+                if len(sheet_rows) >= MAX_REPEAT:
+                    yield sheet_name, sheet_rows
+                    sheet_rows = []
+            elif elem.tag == table_tag and sheet_rows is not None:
+                yield sheet_name, sheet_rows
+                yield sheet_name, None  # fim da planilha
+                sheet_rows = None
+                if stack:
+                    stack[-1].remove(elem)
+
+def iter_ods_row_groups(file_path: Path, rows_per_group: int = 200,
+                        max_chars: int = 4000) -> Iterator[RowGroup]:
+    """Lê um ODS diretamente do XML, sem pandas/odfpy"""
+    batches = _iter_ods_sheets(file_path)
+
+    def sheet_rows(first_batch):
+        batch = first_batch
+        while batch is not None:
+            yield from batch
+            batch = next(batches)[1]
+
+    for sheet_name, batch in batches:
+        if batch is None:
+            continue
+        yield from group_rows(sheet_rows(batch), sheet_name, rows_per_group, max_chars)
+
+def iter_row_groups(file_path: Path, rows_per_group: int = 200,
+                    max_chars: int = 4000) -> Iterator[RowGroup]:
+    """Seleciona o leitor em streaming pela extensão"""
+    file_path = Path(file_path)
+    extension = file_path.suffix.lower()
+    if extension == '.csv':
+        return iter_csv_row_groups(file_path, rows_per_group, max_chars)
+    if extension == '.xlsx':
+        return iter_xlsx_row_groups(file_path, rows_per_group, max_chars)
+    if extension == '.ods':
+        return iter_ods_row_groups(file_path, rows_per_group, max_chars)
+    raise ValueError(f"Formato sem leitura em streaming: {extension}")
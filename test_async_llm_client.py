@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Testes do cliente LLM assíncrono contra um servidor local simulado
+"""
+
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from async_llm_client import AsyncLLMClient, fan_out_sync
+
+# Comportamento por modelo: (atraso em segundos, status HTTP)
+MODELS = {
+    "rapido/erro": (0.05, 500),
+    "medio/ok": (0.3, 200),
+    "lento/ok": (2.0, 200),
+    "a/ok": (0.3, 200),
+    "b/ok": (0.3, 200),
+}
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        delay, status = MODELS.get(payload["model"], (0.2, 200))
+        time.sleep(delay)
+        if status == 200:
+            body = json.dumps({
+                "choices": [{"message": {"content": f"resposta de {payload['model']}"}}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+            })
+        else:
+            body = json.dumps({"error": "falha simulada"})
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+@pytest.fixture
+def stub_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+MESSAGES = [{"role": "user", "content": "olá"}]
+
+def test_fan_out_runs_in_parallel(stub_url):
+    """Três modelos de 0,3 s em paralelo; resultados na ordem pedida, erros sem exceção"""
+    models = ["a/ok", "b/ok", "rapido/erro"]
+
+    start = time.perf_counter()
+    results = fan_out_sync("chave", MESSAGES, models, client_options={"base_url": stub_url})
+    elapsed = time.perf_counter() - start
+
+    assert [r.model for r in results] == models
+    assert results[0].success and results[0].content == "resposta de a/ok"
+    assert results[0].prompt_tokens == 10 and results[0].tokens_used == 15
+    assert not results[2].success and "500" in results[2].error_message
+    assert elapsed < 0.55
+
+    # Limite de concorrência 1: as requisições passam a ser sequenciais
+    start = time.perf_counter()
+    fan_out_sync("chave", MESSAGES, ["a/ok", "b/ok"],
+                 client_options={"base_url": stub_url, "max_concurrency": 1})
+    assert time.perf_counter() - start >= 0.55
+
+def test_first_good_within_deadline(stub_url):
+    """Ignora a falha rápida, aceita o primeiro bom e respeita o prazo"""
+    async def scenario():
+        async with AsyncLLMClient("chave", base_url=stub_url) as client:
+            start = time.perf_counter()
+            best = await client.first_good(MESSAGES, ["rapido/erro", "medio/ok", "lento/ok"],
+                                           deadline=1.5)
+            first_elapsed = time.perf_counter() - start
+
+            start = time.perf_counter()
+            none = await client.first_good(MESSAGES, ["rapido/erro", "lento/ok"], deadline=0.5)
+            return best, first_elapsed, none, time.perf_counter() - start
+
+    best, first_elapsed, none, none_elapsed = asyncio.run(scenario())
+    assert best.model == "medio/ok" and first_elapsed < 1.0
+    assert none is None and none_elapsed < 1.0
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
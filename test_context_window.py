@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Testes da janela de contexto por orçamento de tokens
+"""
+
+import threading
+
+from context_window import (MESSAGE_OVERHEAD_TOKENS, RollingSummary, messages_tokens,
+                            output_reserve, select_history)
+
+def count_words(texts):
+    return [len(text.split()) for text in texts]
+
+def make_history(sizes):
+    return [{"role": "user" if i % 2 == 0 else "assistant", "content": " ".join(["x"] * size),
+             "timestamp": f"2024-01-01T00:00:{i:02d}"} for i, size in enumerate(sizes)]
+
+def test_select_history_budget_and_window():
+    """Mantém as mensagens mais recentes que cabem, em ordem cronológica"""
+    history = make_history([50, 10, 20, 30])
+    cost = lambda size: size + MESSAGE_OVERHEAD_TOKENS
+
+    kept, dropped, used = select_history(history, cost(30) + cost(20), count_words)
+    assert kept == history[2:] and dropped == history[:2]
+    assert used == cost(30) + cost(20)
+
+    # Uma mensagem antiga pequena não entra depois de uma que não coube (sem lacunas)
+    kept, dropped, _ = select_history(history, cost(30) + cost(20) + cost(10) + 1, count_words)
+    assert kept == history[1:] and dropped == history[:1]
+
+    kept, dropped, _ = select_history(history, 10_000, count_words, max_messages=2)
+    assert kept == history[2:] and len(dropped) == 2
+
+    kept, dropped, used = select_history(history, 0, count_words)
+    assert kept == [] and dropped == history and used == 0
+
+def test_output_reserve_and_message_tokens():
+    """Reserva da resposta limitada a metade do contexto"""
+    assert output_reserve(8192, 4096) == 4096
+    assert output_reserve(4096, 4096) == 2048
+    assert messages_tokens([], count_words) == 0
+    assert messages_tokens(make_history([3, 2]), count_words) == 5 + 2 * MESSAGE_OVERHEAD_TOKENS
+
+def test_rolling_summary():
+    """Resumo só é atualizado com mensagens novas suficientes e não repete as já resumidas"""
+    calls = []
+
+    def summarize(current, new_messages):
+        calls.append(len(new_messages))
+        return f"{current} +{len(new_messages)}".strip()
+
+    summary = RollingSummary(summarize, min_new_messages=3)
+    history = make_history([1] * 8)
+    assert summary.as_message() is None
+
+    assert not summary.update(history[:2])
+    assert summary.update(history[:4])
+    assert summary.text == "+4" and summary.covered_until == history[3]["timestamp"]
+    assert summary.as_message()["role"] == "system"
+
+    # Só 2 mensagens novas desde o último resumo
+    assert not summary.update(history[:6])
+    assert summary.update(history[:7])
+    assert calls == [4, 3] and summary.text == "+4 +3"
+
+    summary.reset()
+    assert summary.as_message() is None and summary.pending(history) == history
+
+def test_rolling_summary_discards_result_after_reset():
+    """Resumo em andamento quando a conversa é limpa não vaza para a conversa nova"""
+    started, release = threading.Event(), threading.Event()
+
+    def slow_summarize(current, new_messages):
+        started.set()
+        release.wait(5)
+        return "resumo da conversa antiga"
+
+    summary = RollingSummary(slow_summarize, min_new_messages=1)
+    worker = threading.Thread(target=summary.update, args=(make_history([1, 1]),))
+    worker.start()
+    assert started.wait(5)
+    summary.reset()
+    release.set()
+    worker.join(5)
+    assert summary.text == "" and summary.as_message() is None and summary.covered_until == ""
+
+if __name__ == "__main__":
+    test_select_history_budget_and_window()
+    test_output_reserve_and_message_tokens()
+    test_rolling_summary()
+    test_rolling_summary_discards_result_after_reset()
+    print("✅ Testes da janela de contexto passaram")
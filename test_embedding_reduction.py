@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Teste da redução PCA dos embeddings (embedding_reduction)
+"""
+
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from embedding_reduction import PCAProjection, recall_at_k, benchmark_pca_recall
+
+def _vectors(count=200, dim=32, rank=6, seed=0):
+    """Vetores normalizados concentrados em poucas direções (mais ruído)"""
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(count, rank)) @ rng.normal(size=(rank, dim))
+    vectors += 0.05 * rng.normal(size=(count, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype('float32')
+
+def test_fit_transform_and_persistence():
+    """Projeção normalizada, variância explicada e mesma projeção após salvar e carregar"""
+    vectors = _vectors()
+    projection = PCAProjection.fit(vectors, 8)
+    assert (projection.input_dim, projection.output_dim) == (32, 8)
+    assert projection.explained_variance_ratio.sum() > 0.95
+
+    reduced = projection.transform(vectors)
+    assert reduced.shape == (200, 8) and reduced.dtype == np.float32
+    assert np.allclose(np.linalg.norm(reduced, axis=1), 1.0, atol=1e-5)
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = Path(folder) / "pca.npz"
+        assert PCAProjection.load(path) is None
+        projection.save(path)
+        loaded = PCAProjection.load(path)
+        assert loaded.signature == projection.signature
+        assert np.allclose(loaded.transform(vectors), reduced)
+
+    assert PCAProjection.fit(_vectors(seed=1), 8).signature != projection.signature
+    with pytest.raises(ValueError):
+        PCAProjection.fit(vectors, 32)
+    with pytest.raises(ValueError):
+        PCAProjection.fit(vectors[:4], 8)
+
+def test_recall_at_k():
+    reference = np.array([[1, 2, 3], [4, 5, 6]])
+    assert recall_at_k(reference, reference, 3) == 1.0
+    assert recall_at_k(reference, np.array([[3, 2, 9], [7, 8, 9]]), 3) == pytest.approx(2 / 6)
+    assert recall_at_k(reference, np.array([[1, 9, 9], [4, 9, 9]]), 1) == 1.0
+
+def test_benchmark_reports_recall_by_dimension():
+    """Recall perto de 1 quando a dimensão alvo cobre o posto dos dados"""
+    pytest.importorskip("faiss")
+    vectors = _vectors()
+    report = benchmark_pca_recall(vectors[:160], vectors[160:], dims=(2, 8, 64), k=5)
+    rows = {row["dim"]: row for row in report}
+    assert set(rows) == {32, 2, 8}  # 64 >= dimensão original: ignorada
+    assert rows[32]["recall@5"] == 1.0
+    assert rows[8]["recall@5"] > 0.9 and rows[8]["size_ratio"] == 0.25
+    assert rows[2]["recall@5"] < rows[8]["recall@5"]
+
+if __name__ == "__main__":
+    test_fit_transform_and_persistence()
+    test_recall_at_k()
+    test_benchmark_reports_recall_by_dimension()
+    print("✅ Testes da redução PCA concluídos")
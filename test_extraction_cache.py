@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Teste do cache de extração endereçado por conteúdo (extraction_cache)
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from extraction_cache import ExtractionCache
+
+def test_cache_is_keyed_by_content_and_version():
+    """Mesmo conteúdo em outro caminho reaproveita; nova versão do extrator não"""
+    with tempfile.TemporaryDirectory() as folder:
+        cache = ExtractionCache(os.path.join(folder, "cache"))
+        calls = []
+
+        def extract():
+            calls.append(1)
+            return ["página 1", "página 2"]
+
+        first = Path(folder) / "a.pdf"
+        first.write_bytes(b"%PDF conteudo")
+        copy = Path(folder) / "copia.pdf"
+        copy.write_bytes(b"%PDF conteudo")
+
+        assert cache.get_or_extract(str(first), "pdf", "1", extract) == ["página 1", "página 2"]
+        assert cache.get_or_extract(str(copy), "pdf", "1", extract) == ["página 1", "página 2"]
+        assert len(calls) == 1
+        assert cache.hits == 1
+
+        cache.get_or_extract(str(first), "pdf", "2", extract)
+        assert len(calls) == 2
+
+        # Conteúdo alterado invalida a entrada
+        first.write_bytes(b"%PDF outro conteudo")
+        cache.get_or_extract(str(first), "pdf", "1", extract)
+        assert len(calls) == 3
+
+        # Resultados vazios não são guardados
+        empty = Path(folder) / "vazio.pdf"
+        empty.write_bytes(b"nada")
+        cache.get_or_extract(str(empty), "pdf", "1", lambda: "")
+        assert cache.get(str(empty), "pdf", "1") is None
+
+def test_eviction_keeps_cache_under_limit():
+    """Ao passar do limite, as entradas menos usadas são removidas"""
+    with tempfile.TemporaryDirectory() as folder:
+        cache = ExtractionCache(os.path.join(folder, "cache"), max_size_mb=0.05)
+        paths = []
+        for i in range(20):
+            path = Path(folder) / f"doc{i}.txt"
+            path.write_text(f"documento {i}")
+            paths.append(str(path))
+            # Texto pouco compressível (~5 KB por entrada)
+            cache.put(str(path), "txt", "1", os.urandom(2500).hex())
+
+        assert cache.stats()["size_bytes"] <= cache.max_size_bytes
+        assert cache.get(paths[-1], "txt", "1") is not None
+        assert cache.get(paths[0], "txt", "1") is None
+
+        # Um novo processo calcula o mesmo tamanho a partir do disco
+        reopened = ExtractionCache(os.path.join(folder, "cache"), max_size_mb=0.05)
+        assert reopened.stats()["size_bytes"] == cache.stats()["size_bytes"]
+
+def test_overwriting_an_entry_keeps_size_exact():
+    """Regravar a mesma entrada não acumula o tamanho antigo"""
+    with tempfile.TemporaryDirectory() as folder:
+        cache = ExtractionCache(os.path.join(folder, "cache"), max_size_mb=0.05)
+        path = Path(folder) / "doc.txt"
+        path.write_text("documento")
+        for _ in range(20):
+            cache.put(str(path), "txt", "1", os.urandom(2500).hex())
+
+        entry_size = cache._entry_path(str(path), "txt", "1").stat().st_size
+        assert cache.stats()["size_bytes"] == entry_size
+        assert cache.get(str(path), "txt", "1") is not None
+
+class _Document:
+    """Document mínimo (page_content + metadata) no lugar do LangChain"""
+
+    def __init__(self, page_content, metadata):
+        self.page_content = page_content
+        self.metadata = metadata
+
+def test_rag_loaders_share_cache_without_collisions():
+    """RAGSystem (páginas) e RAGSystemFunctional (Documents) no mesmo PDF e no mesmo cache"""
+    pytest.importorskip("sentence_transformers")
+    pytest.importorskip("faiss")
+    pytest.importorskip("requests")
+    for module in ("langchain.schema", "langchain.text_splitter", "langchain_community.document_loaders",
+                   "langchain_community.vectorstores"):
+        pytest.importorskip(module)
+    import rag_system
+    import rag_system_functional
+
+    pages = ["Primeira página do documento. Com duas frases.", "Segunda página."]
+    fake_extract = lambda path, engine: (list(pages), "falso")
+    originals = (rag_system.extract_pdf_pages, rag_system_functional.extract_pdf_pages,
+                 getattr(rag_system_functional, "Document", None))
+    rag_system.extract_pdf_pages = fake_extract
+    rag_system_functional.extract_pdf_pages = fake_extract
+    if originals[2] is None:
+        rag_system_functional.Document = _Document
+    try:
+        with tempfile.TemporaryDirectory() as folder:
+            cache = ExtractionCache(os.path.join(folder, "cache"))
+            pdf_path = Path(folder) / "doc.pdf"
+            pdf_path.write_bytes(b"%PDF conteudo")
+
+            rag = rag_system.RAGSystem.__new__(rag_system.RAGSystem)
+            functional = rag_system_functional.RAGSystemFunctional.__new__(rag_system_functional.RAGSystemFunctional)
+            for system in (rag, functional):
+                system.extraction_cache = cache
+                system.pdf_engine = "auto"
+
+            # Nas duas ordens: cada sistema lê o próprio formato
+            for _ in range(2):
+                chunks = rag.extract_text_from_pdf(str(pdf_path))
+                assert [chunk["page"] for chunk in chunks] == [1, 2]
+                documents = functional._load_document(pdf_path, "pdf")
+                assert [doc.page_content for doc in documents] == pages
+                assert documents[1].metadata == {"source": str(pdf_path), "page": 1}
+            assert cache.hits == 2
+    finally:
+        rag_system.extract_pdf_pages = originals[0]
+        rag_system_functional.extract_pdf_pages = originals[1]
+        if originals[2] is None:
+            del rag_system_functional.Document
+
+if __name__ == "__main__":
+    test_cache_is_keyed_by_content_and_version()
+    test_eviction_keeps_cache_under_limit()
+    test_overwriting_an_entry_keeps_size_exact()
+    test_rag_loaders_share_cache_without_collisions()
+    print("✅ Testes do cache de extração concluídos")
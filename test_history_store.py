@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Testes do histórico de conversas em SQLite
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+import history_store
+from history_store import HistoryStore
+
+def test_cursor_pagination_time_range_and_search():
+    """Páginas sem repetição, filtro por intervalo de tempo e busca de texto"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(str(Path(tmp) / "history.db"))
+        base = 1_700_000_000
+        for i in range(25):
+            store.append(f"comando {i}", f"resposta docker {i}" if i % 5 == 0 else f"resposta {i}",
+                         technology="Docker" if i % 5 == 0 else "Python", created_at=base + i)
+
+        seen, cursor = [], None
+        while True:
+            page = store.query(limit=10, cursor=cursor)
+            seen += [item["user_input"] for item in page["items"]]
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        assert seen == [f"comando {i}" for i in range(24, -1, -1)]
+
+        ranged = store.query(since=base + 10, until=base + 15)["items"]
+        assert [item["user_input"] for item in ranged] == [f"comando {i}" for i in range(14, 9, -1)]
+
+        found = store.query(search="docker")["items"]
+        assert [item["user_input"] for item in found] == [f"comando {i}" for i in (20, 15, 10, 5, 0)]
+        assert store.query(search='resposta "docker', technology="Docker", limit=2)["next_cursor"]
+        store.close()
+
+def test_migrate_legacy_prompt_files():
+    """Arquivos prompt_*.json são importados uma única vez, em ordem cronológica"""
+    with tempfile.TemporaryDirectory() as tmp:
+        prompts = Path(tmp)
+        for i, stamp in enumerate(["20240102_100000", "20240101_090000", "20240103_080000"]):
+            with open(prompts / f"prompt_{stamp}.json", "w", encoding="utf-8") as f:
+                json.dump({"timestamp": stamp, "user_input": f"pergunta {i}",
+                           "ai_response": "ok"}, f)
+
+        store = HistoryStore(str(prompts / "history.db"))
+        assert store.migrate_directory(str(prompts)) == 3
+
+        # Nova execução: só o arquivo novo é lido
+        with open(prompts / "prompt_20240104_070000.json", "w", encoding="utf-8") as f:
+            json.dump({"timestamp": "20240104_070000", "user_input": "pergunta 3", "ai_response": "ok"}, f)
+        loads = []
+        original_load = history_store.json.load
+        history_store.json.load = lambda f: loads.append(f.name) or original_load(f)
+        try:
+            assert store.migrate_directory(str(prompts)) == 1
+            assert store.migrate_directory(str(prompts)) == 0
+        finally:
+            history_store.json.load = original_load
+        assert [Path(name).name for name in loads] == ["prompt_20240104_070000.json"]
+        assert store.count() == 4
+
+        items = store.query()["items"][1:]
+        assert [item["timestamp"] for item in items] == ["20240103_080000", "20240102_100000", "20240101_090000"]
+        assert store.query(since="2024-01-02")["items"][-1]["user_input"] == "pergunta 0"
+        store.close()
+
+if __name__ == "__main__":
+    test_cursor_pagination_time_range_and_search()
+    test_migrate_legacy_prompt_files()
+    print("✅ Testes do histórico passaram")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Teste do clustering incremental de documentos (TensorFlowAnalyzer)
+"""
+
+import os
+import json
+import tempfile
+
+import pytest
+
+pytest.importorskip("sklearn")
+
+import knowledge_enhancement_system
+from knowledge_enhancement_system import TensorFlowAnalyzer, KnowledgeEnhancementSystem
+
+TOPICS = {
+    "space": ["planet", "orbit", "telescope", "galaxy", "rocket", "astronaut"],
+    "cooking": ["recipe", "oven", "flour", "butter", "sauce", "kitchen"],
+    "music": ["guitar", "melody", "concert", "piano", "rhythm", "violin"],
+}
+
+def _documents(offset, count):
+    """count documentos por tema, com combinações diferentes das palavras do tema"""
+    documents = []
+    for words in TOPICS.values():
+        for i in range(offset, offset + count):
+            documents.append(" ".join(words[(i + j) % len(words)] for j in range(4)) + f" note {i}")
+    return documents
+
+def _labels_by_topic(result, texts):
+    """Conjunto de clusters em que caíram os documentos de cada tema"""
+    topics = {}
+    for name, documents in result["clusters"].items():
+        for document in documents:
+            first_word = texts[document["index"]].split()[0]
+            topic = next(topic for topic, words in TOPICS.items() if first_word in words)
+            topics.setdefault(topic, set()).add(name)
+    return topics
+
+@pytest.mark.skipif(not knowledge_enhancement_system.TENSORFLOW_AVAILABLE,
+                    reason="dependências de análise não disponíveis")
+def test_incremental_batches_keep_labels_stable():
+    """Segundo lote só processa os documentos novos, que caem nos clusters dos antigos"""
+    with tempfile.TemporaryDirectory() as folder:
+        model_path = os.path.join(folder, "clusters.pkl")
+        analyzer = TensorFlowAnalyzer(model_path=model_path)
+
+        first = _documents(0, 4)
+        result = analyzer.cluster_documents(first, n_clusters=3)
+        first_topics = _labels_by_topic(result, first)
+        assert all(len(labels) == 1 for labels in first_topics.values())
+        assert len(set.union(*first_topics.values())) == 3
+        first_labels = dict(analyzer.document_labels)
+
+        second = first + _documents(4, 2)
+        result = analyzer.cluster_documents(second, n_clusters=3)
+        assert result["new_documents"] == 6
+        assert all(analyzer.document_labels[h] == label for h, label in first_labels.items())
+        second_topics = _labels_by_topic(result, second)
+        assert second_topics == first_topics
+
+        # Modelo salvo pequeno e reaproveitado por outra instância
+        assert os.path.getsize(model_path) < 2 * 1024 * 1024
+        reopened = TensorFlowAnalyzer(model_path=model_path)
+        assert reopened.cluster_documents(second, n_clusters=3)["new_documents"] == 0
+        assert reopened.document_labels == analyzer.document_labels
+
+def _system(folder):
+    config_file = os.path.join(folder, "knowledge_config.json")
+    with open(config_file, "w") as f:
+        json.dump({"knowledge_store_dir": os.path.join(folder, "store"),
+                   "cluster_model_path": os.path.join(folder, "clusters.pkl"),
+                   "extraction_processes": 0}, f)
+    return KnowledgeEnhancementSystem(config_file)
+
+def _ingest(system, texts):
+    for text in texts:
+        document = {"file_path": f"/docs/{len(system.processed_documents)}.txt", "status": "success"}
+        system.processed_documents.append(system._describe_content(document, text))
+        system.knowledge_base.append(text)
+
+@pytest.mark.skipif(not knowledge_enhancement_system.TENSORFLOW_AVAILABLE,
+                    reason="dependências de análise não disponíveis")
+def test_system_reads_only_unlabelled_documents():
+    """analyze_documents usa os hashes dos metadados e só lê o conteúdo dos documentos novos"""
+    with tempfile.TemporaryDirectory() as folder:
+        system = _system(folder)
+        first = _documents(0, 4)
+        _ingest(system, first)
+        assert system.save_knowledge_base()
+        
+        reloaded = _system(folder)
+        assert reloaded.load_knowledge_base()
+        reads = []
+        read_content = reloaded.knowledge_store.read_content
+        reloaded.knowledge_store.read_content = lambda doc_id: reads.append(doc_id) or read_content(doc_id)
+        
+        result = reloaded.analyze_documents(n_clusters=3)
+        assert result["new_documents"] == 12 and len(reads) == 12
+        
+        # Documentos já rotulados não são lidos de novo
+        reads.clear()
+        _ingest(reloaded, _documents(4, 2))
+        result = reloaded.analyze_documents(n_clusters=3)
+        assert result["new_documents"] == 6 and reads == []
+        assert result["total_documents"] == 18 and sum(result["cluster_sizes"].values()) == 18
+        
+        # Documento removido sai dos rótulos sem reler os demais
+        removed = reloaded.processed_documents[0]["content_hash"]
+        assert reloaded._remove_document_entries("/docs/0.txt")
+        result = reloaded.analyze_documents(n_clusters=3)
+        assert result["new_documents"] == 0 and reads == []
+        assert removed not in reloaded.tensorflow_analyzer.document_labels
+        
+        # Base gravada sem hash nos metadados: calculado uma vez e persistido
+        store = reloaded.knowledge_store
+        doc_id = store.add_documents([({"file_path": "/docs/antigo.txt"}, "planet orbit rocket galaxy")])[0]
+        reloaded.processed_documents.append(store.list_documents()[-1])
+        reloaded.knowledge_base.append(doc_id)
+        reloaded.analyze_documents(n_clusters=3)
+        assert set(reads) == {doc_id} and "content_hash" in store.list_documents()[-1]
+        reloaded.stop_processing()
+        system.stop_processing()
+
+if __name__ == "__main__":
+    test_incremental_batches_keep_labels_stable()
+    test_system_reads_only_unlabelled_documents()
+    print("✅ Teste do clustering incremental concluído")
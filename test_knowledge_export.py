@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Teste da exportação colunar (knowledge_export)
+Requer pyarrow e numpy
+"""
+
+import os
+import tempfile
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pyarrow")
+
+from knowledge_export import (ChunkExportWriter, chunk_row, iter_export_batches, batch_rows,
+                              batch_embeddings, load_embeddings, read_export_metadata, open_export_table)
+
+def _write_export(path, count=5, dim=4):
+    embeddings = np.arange(count * dim, dtype=np.float32).reshape(count, dim)
+    rows = [chunk_row(i, f"texto {i}", {"source_file": "a.pdf", "page": i + 1}, source="a.pdf", page=i + 1,
+                      analysis={"sentiment": "neutral", "score": 0.5}, cluster=i % 2)
+            for i in range(count)]
+    with ChunkExportWriter(path, dim, {"projection": None, "normalized": True}) as writer:
+        writer.write_batch(rows[:3], embeddings[:3])
+        writer.write_batch(rows[3:], embeddings[3:])
+    return rows, embeddings
+
+def test_roundtrip_parquet_and_arrow():
+    """Linhas, metadados e embeddings voltam iguais nos dois formatos"""
+    with tempfile.TemporaryDirectory() as folder:
+        for name in ("chunks.parquet", "chunks.arrow"):
+            path = os.path.join(folder, name)
+            rows, embeddings = _write_export(path)
+
+            info = read_export_metadata(path)
+            assert info["embedding_dim"] == 4 and info["projection"] is None
+
+            loaded = [row for batch in iter_export_batches(path, batch_size=2) for row in batch_rows(batch)]
+            assert [row["text"] for row in loaded] == [row["text"] for row in rows]
+            assert loaded[2]["metadata"] == {"source_file": "a.pdf", "page": 3}
+            assert loaded[1]["cluster"] == 1 and loaded[0]["sentiment"] == "neutral"
+
+            assert np.array_equal(load_embeddings(path), embeddings)
+            assert open_export_table(path, ["chunk_id"]).num_rows == 5
+
+def test_arrow_embeddings_are_zero_copy_views():
+    """Em Arrow IPC a matriz de embeddings aponta para o arquivo mapeado"""
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "chunks.arrow")
+        _, embeddings = _write_export(path)
+        batch = next(iter_export_batches(path, ["embedding"]))
+        matrix = batch_embeddings(batch)
+        assert matrix.dtype == np.float32 and not matrix.flags.owndata
+        assert np.array_equal(matrix, embeddings[:3])
+
+if __name__ == "__main__":
+    test_roundtrip_parquet_and_arrow()
+    test_arrow_embeddings_are_zero_copy_views()
+    print("✅ Testes da exportação colunar concluídos")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Teste do armazenamento segmentado da base de conhecimento (knowledge_store)
+"""
+
+import os
+import tempfile
+
+from knowledge_store import KnowledgeStore, LazyContentList
+
+def _document(name, content):
+    return {"file_path": f"/docs/{name}", "file_name": name, "content": content, "status": "success"}
+
+def test_sync_writes_only_new_documents_and_loads_lazily():
+    """Salvamento incremental e leitura sob demanda após reabrir"""
+    with tempfile.TemporaryDirectory() as store_dir:
+        store = KnowledgeStore(store_dir)
+        documents = [_document("a.txt", "conteúdo A"), _document("b.txt", "conteúdo B")]
+        contents = LazyContentList(store, [doc["content"] for doc in documents])
+
+        assert store.sync(documents, contents, {"a.txt": {"sentiment": "neutral"}}) == 2
+        assert all("content" not in doc for doc in documents)
+        assert contents[0] == "conteúdo A"
+
+        # Só o documento novo é gravado
+        documents.append(_document("c.txt", "conteúdo C"))
+        contents.append("conteúdo C")
+        assert store.sync(documents, contents, {}) == 1
+        assert store.sync(documents, contents, {}) == 0
+        store.close()
+
+        reopened = KnowledgeStore(store_dir)
+        loaded = reopened.list_documents()
+        assert [doc["file_name"] for doc in loaded] == ["a.txt", "b.txt", "c.txt"]
+        lazy = LazyContentList(reopened, [doc["store_id"] for doc in loaded])
+        assert lazy[1:] == ["conteúdo B", "conteúdo C"]
+        assert list(lazy) == ["conteúdo A", "conteúdo B", "conteúdo C"]
+        reopened.close()
+
+def test_removed_documents_are_compacted_away():
+    """Documentos removidos liberam espaço na compactação"""
+    with tempfile.TemporaryDirectory() as store_dir:
+        store = KnowledgeStore(store_dir, segment_max_bytes=256)
+        texts = [os.urandom(100).hex() for _ in range(10)]
+        documents = [_document(f"{i}.txt", text) for i, text in enumerate(texts)]
+        contents = LazyContentList(store, [doc["content"] for doc in documents])
+        store.sync(documents, contents, {})
+        assert store.stats()["segments"] > 1
+
+        del documents[:8]
+        del contents[:8]
+        store.sync(documents, contents, {})
+
+        stats = store.stats()
+        assert stats["documents"] == 2
+        assert stats["dead_bytes"] == 0
+        assert list(contents) == texts[8:]
+        store.close()
+
+if __name__ == "__main__":
+    test_sync_writes_only_new_documents_and_loads_lazily()
+    test_removed_documents_are_compacted_away()
+    print("✅ Testes do armazenamento da base de conhecimento concluídos")
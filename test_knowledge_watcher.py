@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Teste do observador incremental de pastas (knowledge_watcher)
+"""
+
+import os
+import json
+import tempfile
+from concurrent.futures import Future
+from pathlib import Path
+
+from knowledge_watcher import FolderWatcher, FolderCatalog, normalize_path
+
+def _make_watcher(folder, catalog_file, debounce=0.0):
+    events = []
+    watcher = FolderWatcher(
+        [folder],
+        on_change=events.append,
+        catalog=FolderCatalog(catalog_file),
+        extensions=[".txt", ".md"],
+        debounce=debounce
+    )
+    return watcher, events
+
+def test_only_changed_files_are_emitted():
+    """Somente arquivos adicionados, modificados e removidos são enviados"""
+    with tempfile.TemporaryDirectory() as folder:
+        catalog_file = os.path.join(folder, "catalog", "catalog.json")
+        (Path(folder) / "a.txt").write_text("primeiro")
+        (Path(folder) / "b.md").write_text("segundo")
+        (Path(folder) / "ignorado.bin").write_bytes(b"\x00")
+
+        watcher, events = _make_watcher(folder, catalog_file)
+        watcher.scan_once()
+        assert sorted((Path(e.path).name, e.change_type) for e in events) == [
+            ("a.txt", "added"), ("b.md", "added")
+        ]
+
+        # Nada mudou: nenhuma alteração
+        events.clear()
+        watcher.scan_once()
+        assert events == []
+
+        # Modificação real + remoção
+        a_path = Path(folder) / "a.txt"
+        a_path.write_text("primeiro, editado")
+        os.utime(a_path, ns=(1, 1))
+        (Path(folder) / "b.md").unlink()
+        watcher.scan_once()
+        assert sorted((Path(e.path).name, e.change_type) for e in events) == [
+            ("a.txt", "modified"), ("b.md", "deleted")
+        ]
+
+def test_touch_without_content_change_is_ignored():
+    """Arquivo apenas tocado (mtime novo, mesmo conteúdo) não é reprocessado"""
+    with tempfile.TemporaryDirectory() as folder:
+        catalog_file = os.path.join(folder, "catalog.json")
+        path = Path(folder) / "doc.txt"
+        path.write_text("conteúdo")
+
+        watcher, events = _make_watcher(folder, catalog_file)
+        watcher.scan_once()
+        assert len(events) == 1
+
+        events.clear()
+        os.utime(path, ns=(2, 2))
+        watcher.scan_once()
+        assert events == []
+
+def test_catalog_persists_between_runs():
+    """Um novo observador com o mesmo catálogo não reenvia arquivos antigos"""
+    with tempfile.TemporaryDirectory() as folder:
+        catalog_file = os.path.join(folder, "catalog.json")
+        (Path(folder) / "doc.txt").write_text("conteúdo")
+
+        watcher, events = _make_watcher(folder, catalog_file)
+        watcher.scan_once()
+        assert len(events) == 1
+
+        restarted, restarted_events = _make_watcher(folder, catalog_file)
+        restarted.scan_once()
+        assert restarted_events == []
+
+def test_debounce_waits_for_stable_files():
+    """Com debounce, o arquivo só é enviado depois de estabilizar"""
+    with tempfile.TemporaryDirectory() as folder:
+        catalog_file = os.path.join(folder, "catalog.json")
+        (Path(folder) / "doc.txt").write_text("conteúdo")
+
+        watcher, events = _make_watcher(folder, catalog_file, debounce=3600)
+        watcher.scan_once()
+        assert events == []
+        assert len(watcher.pending) == 1
+
+def test_failed_changes_are_retried_and_committed_after_success():
+    """A alteração só entra no catálogo depois que a ingestão (Future) termina bem"""
+    with tempfile.TemporaryDirectory() as folder:
+        catalog_file = os.path.join(folder, "catalog.json")
+        (Path(folder) / "doc.txt").write_text("conteúdo")
+        futures = []
+
+        def on_change(change):
+            futures.append(Future())
+            return futures[-1]
+
+        watcher = FolderWatcher([folder], on_change, catalog=FolderCatalog(catalog_file),
+                                extensions=[".txt"], debounce=0.0, max_retries=2)
+        assert len(watcher.scan_once()) == 1
+
+        # Em processamento: não é emitida de novo nem registrada
+        assert watcher.scan_once() == [] and len(futures) == 1
+        assert FolderCatalog(catalog_file).entries == {}
+
+        # Falha (exceção ou status "error"): emitida de novo na próxima varredura
+        futures[0].set_result({"status": "error", "error": "extração falhou"})
+        assert len(watcher.scan_once()) == 1
+        futures[1].set_result({"status": "success"})
+        assert watcher.scan_once() == []
+        assert list(FolderCatalog(catalog_file).entries) == [normalize_path(Path(folder) / "doc.txt")]
+
+def test_gives_up_after_max_retries_until_file_changes():
+    """on_change que sempre falha é tentado max_retries vezes; volta quando o arquivo muda"""
+    with tempfile.TemporaryDirectory() as folder:
+        path = Path(folder) / "doc.txt"
+        path.write_text("conteúdo")
+        calls = []
+
+        def on_change(change):
+            calls.append(change.change_type)
+            raise RuntimeError("fila indisponível")
+
+        watcher = FolderWatcher([folder], on_change, catalog=FolderCatalog(os.path.join(folder, "c.json")),
+                                extensions=[".txt"], debounce=0.0, max_retries=3)
+        for _ in range(5):
+            watcher.scan_once()
+        assert calls == ["added"] * 3
+
+        path.write_text("conteúdo novo")
+        os.utime(path, ns=(3, 3))
+        watcher.scan_once()
+        assert calls == ["added"] * 3 + ["modified"]
+
+def test_system_uses_one_path_per_file_and_propagates_deletes():
+    """Caminho relativo (à mão) e resolvido (observador) são o mesmo documento; remoção chega ao vectorstore"""
+    from knowledge_enhancement_system import KnowledgeEnhancementSystem
+
+    class Doc:
+        def __init__(self, source):
+            self.metadata = {"source": source}
+
+    class FakeVectorstore:
+        def __init__(self, sources):
+            self.docstore = type("Docstore", (), {})()
+            self.docstore._dict = {str(i): Doc(source) for i, source in enumerate(sources)}
+
+        def delete(self, ids):
+            for doc_id in ids:
+                del self.docstore._dict[doc_id]
+
+    with tempfile.TemporaryDirectory() as folder:
+        config_file = os.path.join(folder, "knowledge_config.json")
+        with open(config_file, "w") as f:
+            json.dump({"knowledge_store_dir": os.path.join(folder, "store"),
+                       "cluster_model_path": os.path.join(folder, "clusters.pkl"),
+                       "extraction_processes": 0}, f)
+        system = KnowledgeEnhancementSystem(config_file)
+        path = Path(folder) / "doc.txt"
+        path.write_text("primeira versão")
+
+        # Cache de extração (rag_data/) criado na pasta temporária
+        cwd = os.getcwd()
+        os.chdir(folder)
+        try:
+            assert system._process_task({"type": "document", "file_path": "doc.txt"})["status"] == "success"
+            path.write_text("segunda versão")
+            system._process_task({"type": "document", "file_path": str(path)})
+        finally:
+            os.chdir(cwd)
+        assert [doc["file_path"] for doc in system.processed_documents] == [normalize_path(path)]
+        assert list(system.knowledge_base) == ["segunda versão"]
+
+        system.langchain_enhancer.vectorstore = FakeVectorstore([normalize_path(path), "/outro.txt"])
+        assert system._process_task({"type": "remove_document", "file_path": str(path)}) is True
+        assert system.processed_documents == []
+        assert [doc.metadata["source"] for doc in system.langchain_enhancer.vectorstore.docstore._dict.values()] == \
+            ["/outro.txt"]
+        system.stop_processing()
+
+if __name__ == "__main__":
+    test_only_changed_files_are_emitted()
+    test_touch_without_content_change_is_ignored()
+    test_catalog_persists_between_runs()
+    test_debounce_waits_for_stable_files()
+    test_failed_changes_are_retried_and_committed_after_success()
+    test_gives_up_after_max_retries_until_file_changes()
+    test_system_uses_one_path_per_file_and_propagates_deletes()
+    print("✅ Testes do observador de pastas concluídos")
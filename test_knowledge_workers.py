@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Teste do pool de workers com prioridades (knowledge_workers)
+"""
+
+import threading
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+from knowledge_workers import WorkerPool
+
+def test_queries_run_before_bulk_analysis():
+    """Com um worker ocupado, a ordem de execução segue as prioridades"""
+    release = threading.Event()
+    order = []
+
+    def handler(task):
+        if task["type"] == "block":
+            release.wait(5)
+        else:
+            order.append(task["type"])
+        return task["type"]
+
+    pool = WorkerPool(handler, num_threads=1)
+    pool.start()
+    pool.submit({"type": "block"}, priority=-1)
+    pool.submit({"type": "analysis"})
+    pool.submit({"type": "document"})
+    query = pool.submit({"type": "enhancement"})
+    release.set()
+
+    assert query.result(timeout=5) == "enhancement"
+    assert pool.wait_until_idle(timeout=5)
+    assert order == ["enhancement", "document", "analysis"]
+    assert pool.shutdown() is True
+
+def test_progress_events_and_failures():
+    """Cada tarefa emite eventos; falhas chegam ao Future e às estatísticas"""
+    events = []
+
+    def handler(task):
+        if task.get("fail"):
+            raise ValueError("falhou")
+        pool.report_progress(task, 0.5, "meio")
+        return "ok"
+
+    pool = WorkerPool(handler, num_threads=2)
+    pool.add_listener(events.append)
+    pool.start()
+    ok_task = {"type": "document"}
+    ok = pool.submit(ok_task)
+    failed = pool.submit({"type": "document", "fail": True})
+
+    assert ok.result(timeout=5) == "ok"
+    assert isinstance(failed.exception(timeout=5), ValueError)
+    pool.shutdown()
+
+    stages = [event.stage for event in events if event.task_id == ok_task["task_id"]]
+    assert stages == ["queued", "started", "progress", "done"]
+    assert any(event.stage == "failed" for event in events)
+
+    stats = pool.stats()
+    assert stats["completed"] == 1 and stats["failed"] == 1
+    assert stats["queued"] == 0 and stats["in_flight"] == 0
+
+def test_shutdown_drains_queue_and_restart_resumes():
+    """shutdown(drain=True) processa tudo; sem drenagem, a fila sobrevive ao restart"""
+    done = []
+    pool = WorkerPool(lambda task: done.append(task["n"]), num_threads=2)
+    for n in range(20):
+        pool.submit({"type": "document", "n": n})
+
+    # Tarefas enfileiradas antes do start são processadas normalmente
+    pool.start()
+    assert pool.shutdown(drain=True) is True
+    assert sorted(done) == list(range(20))
+    assert not pool.is_running()
+
+    done.clear()
+    pool.submit({"type": "document", "n": 99})
+
+    # Sem workers iniciados, shutdown(drain=True) retorna na hora e mantém a fila
+    result = []
+    stopper = threading.Thread(target=lambda: result.append(pool.shutdown(drain=True)), daemon=True)
+    stopper.start()
+    stopper.join(timeout=5)
+    assert result == [False] and done == []
+
+    pool.start()
+    assert pool.wait_until_idle(timeout=5)
+    assert done == [99]
+    pool.shutdown()
+
+class _BreakingExecutor:
+    """Executor que quebra no submit de número break_at (como um pool de processos morto)"""
+
+    def __init__(self, break_at):
+        self.break_at = break_at
+        self.submitted = 0
+
+    def submit(self, func, item):
+        self.submitted += 1
+        if self.submitted == self.break_at:
+            raise BrokenProcessPool("processo filho encerrado")
+        future = Future()
+        future.set_result(func(item))
+        return future
+
+    def shutdown(self, wait=True):
+        pass
+
+def test_map_in_process_keeps_order_when_pool_breaks():
+    """Falha no submit ou no result(): os resultados continuam na ordem dos itens"""
+    for break_at in (1, 2, 3, 4, 6):
+        pool = WorkerPool(lambda task: None, num_threads=1)
+        pool._executor = _BreakingExecutor(break_at)
+        assert list(pool.map_in_process(lambda n: n * 10, range(8), max_pending=3)) == \
+            [n * 10 for n in range(8)]
+        assert pool._executor is None
+
+    # Falha ao buscar o resultado de um item já enviado
+    pool = WorkerPool(lambda task: None, num_threads=1)
+    executor = _BreakingExecutor(break_at=0)
+    broken = Future()
+    broken.set_exception(BrokenProcessPool("processo filho encerrado"))
+    executor.submit = lambda func, item: broken if item == 1 else _BreakingExecutor.submit(executor, func, item)
+    pool._executor = executor
+    assert list(pool.map_in_process(lambda n: n * 10, range(6), max_pending=2)) == [0, 10, 20, 30, 40, 50]
+
+if __name__ == "__main__":
+    test_queries_run_before_bulk_analysis()
+    test_progress_events_and_failures()
+    test_shutdown_drains_queue_and_restart_resumes()
+    test_map_in_process_keeps_order_when_pool_breaks()
+    print("✅ Testes do pool de workers concluídos")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Teste da importação preguiçosa (lazy_imports) e do perfil de imports (import_profiler)
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from lazy_imports import module_available, lazy_import, lazy_attribute, is_loaded, LazyModule
+from import_profiler import parse_importtime, direct_imports, top_packages
+
+def test_modules_load_only_on_first_use():
+    """Verificar disponibilidade não importa; o módulo carrega no primeiro acesso"""
+    sys.modules.pop("colorsys", None)
+    assert module_available("colorsys", "json.decoder")
+    assert not module_available("modulo_que_nao_existe_xyz")
+    assert "colorsys" not in sys.modules
+
+    colorsys = lazy_import("colorsys")
+    assert isinstance(colorsys, LazyModule) and not is_loaded(colorsys)
+    assert colorsys.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert is_loaded(colorsys) and "colorsys" in sys.modules
+
+    # Já importado: retorna o próprio módulo
+    assert lazy_import("colorsys") is sys.modules["colorsys"]
+
+def test_submodules_are_checked_without_importing_parent():
+    """Pacote instalado sem o submódulo usado (ex.: langchain.chains no LangChain 1.0)"""
+    with tempfile.TemporaryDirectory() as folder:
+        package = Path(folder) / "pacote_lazy_teste"
+        (package / "sub").mkdir(parents=True)
+        (package / "__init__.py").write_text("raise RuntimeError('pacote não deveria ser importado')")
+        (package / "presente.py").write_text("")
+        (package / "sub" / "__init__.py").write_text("raise RuntimeError('sub não deveria ser importado')")
+        (package / "sub" / "folha.py").write_text("")
+        sys.path.insert(0, folder)
+        try:
+            assert module_available("pacote_lazy_teste", "pacote_lazy_teste.presente",
+                                    "pacote_lazy_teste.sub.folha")
+            assert not module_available("pacote_lazy_teste.ausente")
+            assert not module_available("pacote_lazy_teste.sub.ausente")
+            assert not module_available("pacote_lazy_teste.presente.x")
+            assert "pacote_lazy_teste" not in sys.modules
+        finally:
+            sys.path.remove(folder)
+    assert not module_available("colorsys.x")
+
+def test_lazy_attribute_tries_candidates_in_order():
+    """Atributo preguiçoso usa o primeiro módulo candidato que existir"""
+    dumps = lazy_attribute(["modulo_que_nao_existe_xyz", "json"], "dumps")
+    assert not is_loaded(dumps)
+    assert dumps({"a": 1}) == '{"a": 1}'
+    assert is_loaded(dumps)
+
+    missing = lazy_attribute("json", "nao_existe")
+    try:
+        missing()
+        assert False, "deveria falhar"
+    except ImportError as e:
+        assert "nao_existe" in str(e)
+
+def test_parse_importtime_output():
+    """Profundidade, custos e imports diretos a partir da saída de -X importtime"""
+    output = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       156 |        156 |       _json",
+        "import time:       400 |        556 |     json.scanner",
+        "import time:       389 |       1088 |   json.decoder",
+        "import time:       430 |        430 |   json.encoder",
+        "import time:       301 |       1818 | json",
+    ])
+    records = parse_importtime(output)
+    assert [r["depth"] for r in records] == [3, 2, 1, 1, 0]
+    assert records[-1] == {"module": "json", "self_ms": 0.301, "cumulative_ms": 1.818, "depth": 0}
+    assert [r["module"] for r in direct_imports(records, "json")] == ["json.encoder", "json.decoder"]
+    assert top_packages(records, 1)[0]["package"] == "json"
+
+def test_importing_app_has_no_startup_side_effects():
+    """import_profiler importa app: sem migração do histórico nem thread do inventário"""
+    for module in ("flask", "flask_cors", "dotenv", "scripts.web_search", "scripts.docs_manager"):
+        pytest.importorskip(module)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        try:
+            sys.modules.pop("app", None)
+            import app
+            assert app.history_store is None and app.ollama_inventory is None
+            assert not os.path.exists(os.path.join(folder, app.PROMPTS_DIR, "history.db"))
+        finally:
+            os.chdir(cwd)
+
+if __name__ == "__main__":
+    test_modules_load_only_on_first_use()
+    test_submodules_are_checked_without_importing_parent()
+    test_lazy_attribute_tries_candidates_in_order()
+    test_parse_importtime_output()
+    test_importing_app_has_no_startup_side_effects()
+    print("✅ Testes da importação preguiçosa concluídos")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Testes dos utilitários de streaming (SSE, NDJSON e tempo até o primeiro token)
+"""
+
+import json
+
+from llm_streaming import iter_sse_data, iter_ndjson, StreamTimer, collect_stream
+
+def test_sse_and_ndjson_parsing():
+    """Comentários de keep-alive ignorados, eventos multilinha e [DONE]"""
+    sse = [
+        b": OPENROUTER PROCESSING",
+        b"",
+        b'data: {"choices": [{"delta": {"content": "Ol"}}]}',
+        b"",
+        "data: linha 1",
+        "data: linha 2",
+        "",
+        b"data: [DONE]",
+        b"",
+        b'data: {"ignorado": true}',
+        b"",
+    ]
+    events = list(iter_sse_data(sse))
+    assert len(events) == 2
+    assert json.loads(events[0])["choices"][0]["delta"]["content"] == "Ol"
+    assert events[1] == "linha 1\nlinha 2"
+
+    ndjson = [
+        b'{"message": {"content": "a"}, "done": false}',
+        b"",
+        b"{quebrado",
+        '{"message": {"content": "b"}, "done": true}',
+    ]
+    chunks = list(iter_ndjson(ndjson))
+    assert [c["message"]["content"] for c in chunks] == ["a", "b"]
+    assert chunks[-1]["done"] is True
+
+def test_collect_stream_returns_final_value():
+    """Callback recebe cada trecho e o valor de retorno do gerador é preservado"""
+    timer = StreamTimer()
+    assert timer.time_to_first_token is None
+
+    def generate():
+        for part in ["Olá", "", ", mundo"]:
+            timer.mark_token()
+            yield part
+        return {"content": "Olá, mundo"}
+
+    received = []
+    result = collect_stream(generate(), received.append)
+    assert received == ["Olá", ", mundo"]
+    assert result == {"content": "Olá, mundo"}
+    assert 0 <= timer.time_to_first_token <= timer.elapsed
+
+    # Erro no callback não interrompe o stream
+    def failing(_):
+        raise RuntimeError("falha")
+    assert collect_stream(generate(), failing) == {"content": "Olá, mundo"}
+
+if __name__ == "__main__":
+    test_sse_and_ndjson_parsing()
+    test_collect_stream_returns_final_value()
+    print("✅ Testes de streaming passaram")
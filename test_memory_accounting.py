@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Teste da contabilidade de memória por componente (memory_accounting)
+"""
+
+import sys
+import time
+
+import numpy as np
+
+import memory_accounting
+from memory_accounting import deep_sizeof, build_memory_report, cached_memory_report, format_bytes
+
+class Node:
+    def __init__(self, payload):
+        self.payload = payload
+        self.other = None
+
+def test_cycles_terminate_and_count_once():
+    """Ciclos (listas e objetos) não entram em recursão infinita nem contam em dobro"""
+    items = ["a" * 100]
+    items.append(items)
+    assert deep_sizeof(items) == sys.getsizeof(items) + sys.getsizeof(items[0])
+
+    first, second = Node("x" * 1000), Node("y" * 1000)
+    first.other, second.other = second, first
+    size = deep_sizeof(first)
+    assert size >= 2000 and size == deep_sizeof(second)
+
+def test_numpy_arrays_and_views():
+    """Buffer do array contado uma vez; views contam o array base"""
+    array = np.zeros(10_000, dtype=np.float64)
+    assert 80_000 <= deep_sizeof(array) < 81_000
+    assert deep_sizeof([array, array[:10], array[5:]]) < 82_000
+    assert deep_sizeof(array[:10]) >= 80_000  # a view mantém o buffer inteiro vivo
+
+def test_shared_references_and_sampling():
+    """Objeto referenciado duas vezes conta uma; coleções grandes são extrapoladas"""
+    shared = "z" * 10_000
+    assert deep_sizeof([shared, shared]) < deep_sizeof([shared, "w" * 10_000])
+    assert deep_sizeof({"a": shared, "b": shared}) < 11_000
+
+    large = [str(i).zfill(10) for i in range(memory_accounting.SAMPLE_LIMIT * 3)]
+    exact = sys.getsizeof(large) + sum(sys.getsizeof(item) for item in large)
+    assert abs(deep_sizeof(large) - exact) / exact < 0.01
+
+def test_report_and_cache():
+    """Relatório soma os componentes; o status reaproveita o relatório recente"""
+    report = build_memory_report({"modelo": 2048, "indice": 1024, "vazio": 0})
+    assert report["tracked_bytes"] == 3072 and report["tracked"] == "3.0 KB"
+    assert report["summary"]["vazio"] == "0 B" and format_bytes(None) == "N/A"
+
+    class Component:
+        calls = 0
+
+        def get_memory_usage(self):
+            self.calls += 1
+            return {"calls": self.calls}
+
+    component = Component()
+    assert cached_memory_report(component) == {"calls": 1}
+    assert cached_memory_report(component) == {"calls": 1}
+    time.sleep(0.02)
+    assert cached_memory_report(component, max_age=0.01) == {"calls": 2}
+
+if __name__ == "__main__":
+    test_cycles_terminate_and_count_once()
+    test_numpy_arrays_and_views()
+    test_shared_references_and_sampling()
+    test_report_and_cache()
+    print("✅ Testes da contabilidade de memória concluídos")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Testes do cliente HTTP do Ollama contra um servidor local simulado
+"""
+
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+
+from ollama_client import OllamaHTTPClient, OllamaRequestCancelled
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    payloads = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        FakeOllamaHandler.payloads.append(payload)
+        slow = payload.get("prompt") == "devagar"
+        words = ["um ", "dois ", "três"] * (50 if slow else 1)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for word in words:
+                if self.path.endswith("/chat"):
+                    chunk = {"message": {"role": "assistant", "content": word}, "done": False}
+                else:
+                    chunk = {"response": word, "done": False}
+                self._write_chunk(chunk)
+                if slow:
+                    time.sleep(0.02)
+            self._write_chunk({"done": True, "eval_count": len(words), "total_duration": 1000})
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _write_chunk(self, obj):
+        data = (json.dumps(obj) + "\n").encode()
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+def _start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllamaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def test_generate_and_chat_stream():
+    """Deltas em ordem, resultado final com texto completo e keep_alive no payload"""
+    server = _start_server()
+    try:
+        client = OllamaHTTPClient(f"127.0.0.1:{server.server_address[1]}", keep_alive="10m")
+
+        deltas = []
+        stream = client.generate_stream("modelo", "olá", options={"temperature": 0})
+        while True:
+            try:
+                deltas.append(next(stream))
+            except StopIteration as stop:
+                result = stop.value
+                break
+        assert deltas == ["um ", "dois ", "três"]
+        assert result["text"] == "um dois três" and result["eval_count"] == 3
+        assert result["time_to_first_token"] is not None
+        assert FakeOllamaHandler.payloads[-1]["keep_alive"] == "10m"
+        assert FakeOllamaHandler.payloads[-1]["stream"] is True
+
+        chat = client.chat("modelo", [{"role": "user", "content": "olá"}], keep_alive=0)
+        assert chat["text"] == "um dois três"
+        assert FakeOllamaHandler.payloads[-1]["keep_alive"] == 0
+        assert client.active_requests() == []
+    finally:
+        server.shutdown()
+
+def test_cancel_request():
+    """Cancelar interrompe a leitura e levanta OllamaRequestCancelled"""
+    server = _start_server()
+    try:
+        client = OllamaHTTPClient(f"http://127.0.0.1:{server.server_address[1]}")
+        outcome = {}
+
+        def run():
+            try:
+                client.generate("modelo", "devagar", request_id="req-1")
+                outcome["result"] = "completo"
+            except OllamaRequestCancelled:
+                outcome["result"] = "cancelado"
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        deadline = time.time() + 5
+        while "req-1" not in client.active_requests() and time.time() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        assert client.cancel("req-1")
+        thread.join(5)
+        assert outcome["result"] == "cancelado"
+        assert not client.cancel("req-1")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_generate_and_chat_stream()
+    test_cancel_request()
+    print("✅ Testes do cliente Ollama passaram")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Testes do inventário em cache de modelos do Ollama
+"""
+
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+from ollama_inventory import OllamaModelInventory, get_model_inventory
+
+class FakeClient:
+    """Substitui o cliente HTTP: conta as leituras de /api/tags"""
+
+    def __init__(self, names):
+        self.names = names
+        self.calls = 0
+        self.fail = False
+
+    def list_models(self, timeout=None):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("recusado")
+        return [{"name": name} for name in self.names]
+
+def test_cached_reads_and_tag_matching():
+    """Leituras dentro do TTL não consultam o servidor; nomes sem tag casam com :latest"""
+    client = FakeClient(["gemma2:7b", "llama3:latest"])
+    inventory = OllamaModelInventory("http://localhost:11434", ttl=60, client=client)
+
+    assert inventory.has_model("gemma2:7b")
+    assert inventory.has_model("llama3") and inventory.has_model("gemma2")
+    assert not inventory.has_model("codellama:7b")
+    for _ in range(50):
+        inventory.is_available()
+        inventory.models()
+    assert client.calls == 1
+    assert inventory.snapshot()["models"] == ["gemma2:7b", "llama3:latest"]
+
+def test_stale_refresh_keeps_last_list_on_failure():
+    """Dados vencidos são renovados em background; falha marca indisponível sem perder a lista"""
+    client = FakeClient(["gemma2:7b"])
+    inventory = OllamaModelInventory("localhost:11434", ttl=0.05, client=client)
+    assert inventory.is_available()
+
+    client.fail = True
+    time.sleep(0.1)
+    inventory.models()  # dispara a renovação e retorna a lista anterior
+    deadline = time.time() + 2
+    while inventory.snapshot()["available"] and time.time() < deadline:
+        time.sleep(0.01)
+    snapshot = inventory.snapshot()
+    assert not snapshot["available"] and snapshot["error"]
+    assert snapshot["models"] == ["gemma2:7b"]
+
+    # Leitura sem espera (status da GUI) também dispara a renovação de dados vencidos
+    client.fail = False
+    time.sleep(0.1)
+    inventory.is_available(wait=0)
+    deadline = time.time() + 2
+    while not inventory.is_available(wait=0) and time.time() < deadline:
+        time.sleep(0.01)
+    assert inventory.snapshot()["available"]
+
+    # Um leitor compartilhado por servidor, independente do formato da URL
+    assert get_model_inventory("http://localhost:11434/api") is get_model_inventory("localhost:11434")
+
+if __name__ == "__main__":
+    test_cached_reads_and_tag_matching()
+    test_stale_refresh_keeps_last_list_on_failure()
+    print("✅ Testes do inventário de modelos passaram")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Teste da seleção de motores de PDF (pdf_engines)
+Usa motores falsos para não depender das bibliotecas de PDF
+"""
+
+import os
+import json
+import tempfile
+
+import pdf_engines
+
+FAKE_ENGINES = {
+    "lixo": ("json", lambda path: ["\x00\x01\x02 �� \x03" * 10]),
+    "vazio": ("json", lambda path: ["", ""]),
+    "bom": ("json", lambda path: ["Primeira página com texto.", "Segunda página."]),
+    "parecido": ("json", lambda path: ["Primeira pagina com texto", "Segunda pagina"]),
+}
+
+def _with_fake_engines(test):
+    def wrapper():
+        original = dict(pdf_engines.PDF_ENGINES)
+        original_config = pdf_engines.ENGINES_CONFIG_FILE
+        pdf_engines.PDF_ENGINES.clear()
+        pdf_engines.PDF_ENGINES.update(FAKE_ENGINES)
+        try:
+            with tempfile.TemporaryDirectory() as folder:
+                pdf_engines.ENGINES_CONFIG_FILE = os.path.join(folder, "pdf_engines.json")
+                test()
+        finally:
+            pdf_engines.PDF_ENGINES.clear()
+            pdf_engines.PDF_ENGINES.update(original)
+            pdf_engines.ENGINES_CONFIG_FILE = original_config
+    wrapper.__name__ = test.__name__
+    return wrapper
+
+@_with_fake_engines
+def test_auto_skips_engines_with_garbage_or_empty_output():
+    """O modo auto usa o primeiro motor com saída legível"""
+    pages, engine = pdf_engines.extract_pdf_pages("documento.pdf", "auto")
+    assert engine == "bom"
+    assert pages[1] == "Segunda página."
+
+    assert pdf_engines.extract_pdf_pages("documento.pdf", "vazio") == (["", ""], "vazio")
+
+@_with_fake_engines
+def test_benchmark_reports_agreement_and_saves_auto_order():
+    """Benchmark mede concordância com a referência e define a ordem do auto"""
+    report = pdf_engines.benchmark_engines(["a.pdf", "b.pdf"], ["bom", "parecido", "lixo"], reference="bom")
+    rows = {row["engine"]: row for row in report}
+    assert rows["bom"]["agreement"] == 1.0 and rows["bom"]["reference"]
+    assert 0.8 < rows["parecido"]["agreement"] < 1.0
+    assert rows["lixo"]["agreement"] < 0.5
+    assert rows["bom"]["pages"] == 4
+
+    # Referência fora da lista: entra na execução em vez de falhar
+    report_with_reference = pdf_engines.benchmark_engines(["a.pdf"], ["parecido"], reference="bom")
+    assert [row["engine"] for row in report_with_reference] == ["parecido", "bom"]
+    assert report_with_reference[1]["reference"] and 0.8 < report_with_reference[0]["agreement"] < 1.0
+
+    order = pdf_engines.save_auto_order(report, min_agreement=0.8)
+    assert order[-1] == "lixo"
+    with open(pdf_engines.ENGINES_CONFIG_FILE, encoding="utf-8") as f:
+        assert json.load(f)["auto_order"] == order
+    assert pdf_engines.auto_engine_order()[:3] == order
+
+if __name__ == "__main__":
+    test_auto_skips_engines_with_garbage_or_empty_output()
+    test_benchmark_reports_agreement_and_saves_auto_order()
+    print("✅ Testes dos motores de PDF concluídos")
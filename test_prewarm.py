@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Teste do pré-aquecimento de componentes em background (prewarm)
+"""
+
+import threading
+
+from prewarm import ComponentPrewarmer, ComponentNotReady, READY, FAILED, LOADING
+
+def test_components_load_independently_with_dependencies():
+    """Cada componente espera só pelas suas dependências"""
+    release_slow = threading.Event()
+    events = []
+
+    prewarmer = ComponentPrewarmer()
+    prewarmer.register("embeddings", lambda: "modelo")
+    prewarmer.register("index", lambda: "índice com " + prewarmer.get("embeddings"), depends_on=["embeddings"])
+    prewarmer.register("tensorflow", lambda: release_slow.wait(5) and "tf")
+    prewarmer.add_listener(lambda name, state, error: events.append((name, state)))
+    prewarmer.start()
+
+    # O índice fica pronto sem esperar o componente lento
+    assert prewarmer.get("index", timeout=5) == "índice com modelo"
+    assert prewarmer.is_ready("embeddings")
+    assert prewarmer.state("tensorflow") == LOADING
+    assert prewarmer.peek("tensorflow") is None
+
+    try:
+        prewarmer.get("tensorflow", timeout=0.01)
+        assert False, "deveria expirar"
+    except ComponentNotReady:
+        pass
+
+    ready = []
+    prewarmer.when_ready("tensorflow", ready.append)
+    release_slow.set()
+    assert prewarmer.wait_all(timeout=5)
+    assert ready == ["tf"]
+    assert ("index", READY) in events
+    assert "✅ pronto" in prewarmer.summary()
+
+def test_failure_propagates_to_dependents():
+    """Falha de carga fica visível e se propaga para quem depende do componente"""
+    def broken():
+        raise ImportError("sem tensorflow")
+
+    prewarmer = ComponentPrewarmer()
+    prewarmer.register("tensorflow", broken)
+    prewarmer.register("analyzer", lambda: "ok", depends_on=["tensorflow"])
+    prewarmer.start()
+    assert prewarmer.wait_all(timeout=5)
+
+    assert prewarmer.state("tensorflow") == FAILED
+    assert prewarmer.status()["tensorflow"]["error"] == "sem tensorflow"
+    assert prewarmer.state("analyzer") == FAILED
+    try:
+        prewarmer.get("analyzer")
+        assert False, "deveria falhar"
+    except ComponentNotReady as e:
+        assert "tensorflow" in str(e)
+
+if __name__ == "__main__":
+    test_components_load_independently_with_dependencies()
+    test_failure_propagates_to_dependents()
+    print("✅ Testes do pré-aquecimento concluídos")
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Teste das coleções RAG nomeadas (rag_collections)
+Usa um modelo de embeddings falso (hash de palavras) e PDFs de texto simples
+"""
+
+import os
+import tempfile
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("faiss")
+
+import rag_system
+from extraction_cache import ExtractionCache
+from rag_collections import RAGCollectionManager
+
+DIM = 32
+
+class HashEmbeddingModel:
+    """Embeddings determinísticos: contagem de palavras por bucket de hash"""
+
+    def encode(self, texts, show_progress_bar=False):
+        vectors = np.zeros((len(texts), DIM), dtype='float32')
+        for row, text in enumerate(texts):
+            for word in text.lower().replace(".", " ").split():
+                vectors[row, zlib.crc32(word.encode()) % DIM] += 1.0
+        return vectors
+
+    def get_sentence_embedding_dimension(self):
+        return DIM
+
+def _with_fake_pdfs(test):
+    """Os "PDFs" são arquivos de texto; uma página por linha"""
+    def wrapper():
+        originals = (rag_system.extract_pdf_pages, rag_system.get_extraction_cache)
+        with tempfile.TemporaryDirectory() as folder:
+            cache = ExtractionCache(os.path.join(folder, "cache"))
+            rag_system.extract_pdf_pages = lambda path, engine: (Path(path).read_text().splitlines(), "texto")
+            rag_system.get_extraction_cache = lambda: cache
+            try:
+                manager = RAGCollectionManager(os.path.join(folder, "collections"))
+                manager._embedding_model = HashEmbeddingModel()
+                test(manager, Path(folder))
+            finally:
+                rag_system.extract_pdf_pages, rag_system.get_extraction_cache = originals
+    wrapper.__name__ = test.__name__
+    return wrapper
+
+def _write_pdf(folder: Path, name: str, pages):
+    path = folder / name
+    path.write_text("\n".join(pages))
+    return str(path)
+
+@_with_fake_pdfs
+def test_create_search_and_delete(manager, folder):
+    """Cada coleção busca só nos próprios documentos; a busca combinada junta as duas"""
+    manager.create_collection("receitas")
+    assert manager.add_document("receitas", _write_pdf(folder, "bolo.pdf", ["farinha ovos açúcar forno"]))
+    assert manager.add_document("codigo", _write_pdf(folder, "py.pdf", ["python função classe módulo"]))
+    assert manager.list_collections() == ["codigo", "receitas"]
+
+    results = manager.search("receitas", "farinha e ovos")
+    assert results and results[0]["collection"] == "receitas"
+    assert manager.search("inexistente", "farinha") == []
+
+    merged = manager.search_collections("python classe", top_k=2)
+    assert [r["collection"] for r in merged] == ["codigo", "receitas"]
+    assert [r["rank"] for r in merged] == [1, 2]
+
+    assert manager.delete_collection("receitas")
+    assert manager.list_collections() == ["codigo"]
+    assert not manager.delete_collection("receitas")
+    assert (manager.base_dir / "codigo").is_dir()
+
+@_with_fake_pdfs
+def test_lru_eviction_within_ram_budget(manager, folder):
+    """Ao passar do orçamento, a coleção usada há mais tempo sai da memória (não do disco)"""
+    for name in ("a", "b", "c"):
+        manager.add_document(name, _write_pdf(folder, f"{name}.pdf", [f"documento {name} texto"] * 3))
+    single = manager.loaded_collections["c"].estimate_memory_bytes()
+    manager.ram_budget_bytes = int(single * 2.5)
+
+    manager._enforce_ram_budget()
+    assert list(manager.loaded_collections) == ["b", "c"]
+
+    manager.get_collection("b")  # "b" passa a ser a mais recente
+    manager.get_collection("a")
+    assert list(manager.loaded_collections) == ["b", "a"]
+    assert manager.list_collections() == ["a", "b", "c"]
+    assert manager.search("c", "documento")  # recarregada do disco
+
+@_with_fake_pdfs
+def test_search_collections_with_different_pca_settings(manager, folder):
+    """A query é projetada por coleção: uma com PCA, outra em dimensão completa"""
+    topics = ["planeta órbita estrela", "rio montanha vale", "piano violino orquestra",
+              "futebol gol torcida", "chuva vento nuvem", "pão queijo manteiga",
+              "trem estação trilho", "livro página capítulo", "médico hospital remédio",
+              "praia areia onda", "computador teclado tela", "jardim flor semente"]
+    manager.add_document("reduzida", _write_pdf(folder, "reduzida.pdf", topics))
+    manager.add_document("completa", _write_pdf(folder, "completa.pdf", ["violino orquestra concerto"]))
+
+    # Benchmark sem queries: os chunks usados como queries saem do índice avaliado
+    report = manager.get_collection("reduzida").benchmark_pca_recall(dims=(8,), k=3)
+    assert report[0]["index_bytes"] == (len(topics) - len(topics) // 5) * DIM * 4
+
+    assert manager.get_collection("reduzida").enable_pca(target_dim=8)
+    assert manager.get_collection("reduzida").index.d == 8
+    assert manager.get_collection("completa").index.d == DIM
+
+    results = manager.search_collections("violino orquestra", top_k=3)
+    by_collection = {r["collection"]: r for r in results}
+    assert set(by_collection) == {"reduzida", "completa"}
+    assert by_collection["completa"]["text"].startswith("violino orquestra")
+    assert results[0]["text"].startswith(("piano violino", "violino orquestra"))
+
+    # Igual à busca individual de cada coleção
+    for name in ("reduzida", "completa"):
+        assert manager.search(name, "violino orquestra", top_k=1)[0]["text"] == \
+            [r for r in results if r["collection"] == name][0]["text"]
+
+@_with_fake_pdfs
+def test_other_process_changes_are_seen_and_kept(manager, folder):
+    """Busca vê documentos de outro processo sem auto-refresh; remoção não descarta a compactação alheia"""
+    other = RAGCollectionManager(str(manager.base_dir))
+    other._embedding_model = manager._embedding_model
+
+    manager.add_document("docs", _write_pdf(folder, "a.pdf", ["farinha ovos açúcar"]))
+    assert other.search("docs", "farinha")  # carrega a coleção no outro "processo"
+
+    manager.add_document("docs", _write_pdf(folder, "b.pdf", ["python função classe"]))
+    assert other.search("docs", "python classe")[0]["text"].startswith("python")
+    assert other.search_collections("python classe", top_k=1)[0]["text"].startswith("python")
+
+    manager.add_document("docs", _write_pdf(folder, "c.pdf", ["violino orquestra concerto"]))
+    manager.get_collection("docs").save_index()  # outro processo compacta em uma nova base
+    assert other.get_collection("docs").remove_document("a.pdf")
+
+    assert manager.search("docs", "violino")[0]["text"].startswith("violino")
+    assert sorted(set(m["source_file"] for m in other.get_collection("docs").document_metadata)) == \
+        ["b.pdf", "c.pdf"]
+    assert "a.pdf" not in [m["source_file"] for m in manager.get_collection("docs").document_metadata]
+    assert not other.get_collection("docs").remove_document("a.pdf")
+
+@_with_fake_pdfs
+def test_invalid_names_are_rejected(manager, folder):
+    """Nomes que escapam do diretório de coleções não apagam nada"""
+    manager.create_collection("valida")
+    (folder / "collections" / "fora").mkdir()
+    for name in ("", ".", "..", "...", "../fora", "a/b", "/tmp", "nome com espaço"):
+        with pytest.raises(ValueError):
+            manager.delete_collection(name)
+        with pytest.raises(ValueError):
+            manager.get_collection(name, create=True)
+    assert manager.list_collections() == ["fora", "valida"]
+    assert manager.collection_exists("v1.2_x-y") is False
+
+if __name__ == "__main__":
+    test_create_search_and_delete()
+    test_lru_eviction_within_ram_budget()
+    test_search_collections_with_different_pca_settings()
+    test_other_process_changes_are_seen_and_kept()
+    test_invalid_names_are_rejected()
+    print("✅ Testes das coleções RAG concluídos")
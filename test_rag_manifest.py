@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Teste da sincronização base + segmentos entre processos (rag_manifest)
+Usa um índice em memória simples para não depender de FAISS
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+from rag_manifest import SegmentedIndexMixin
+
+class ListIndex(SegmentedIndexMixin):
+    """Índice mínimo: uma lista de textos persistida em JSON"""
+
+    def __init__(self, data_dir: str, max_segments: int = 16):
+        self.data_dir = Path(data_dir)
+        self.items = []
+        self.segment_loads = 0
+        self._init_manifest(self.data_dir, max_segments)
+        self._load_from_manifest()
+
+    def add(self, texts):
+        with self._index_lock:
+            self.items.extend(texts)
+            count = self._append_segment(texts)
+        if count > self.max_segments:
+            self._compact()
+
+    def _reset_index(self):
+        self.items = []
+
+    def _load_base(self, base_id):
+        if base_id:
+            self.items = json.loads(self.manifest.base_paths(base_id)[1].read_text())
+
+    def _load_segment(self, segment_id):
+        self.segment_loads += 1
+        self.items.extend(json.loads(self.manifest.segment_path(segment_id).read_text()))
+
+    def _write_segment(self, segment_id, payload):
+        path = self.manifest.segment_path(segment_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(payload))
+
+    def _write_base(self, base_id):
+        if not self.items:
+            return False
+        self.manifest.base_paths(base_id)[1].write_text(json.dumps(self.items))
+        return True
+
+    def _remove_segment(self, segment_id):
+        self.manifest.segment_path(segment_id).unlink()
+
+    def _remove_base(self, base_id):
+        if base_id:
+            self.manifest.base_paths(base_id)[1].unlink()
+
+def test_reader_loads_only_new_segments():
+    """Leitor vê documentos de outro escritor carregando só os segmentos novos"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        writer = ListIndex(data_dir)
+        reader = ListIndex(data_dir)
+
+        assert reader.refresh() is False
+
+        writer.add(["a", "b"])
+        writer.add(["c"])
+        assert reader.refresh() is True
+        assert reader.items == ["a", "b", "c"]
+        assert reader.segment_loads == 2
+
+        # Sem mudanças: apenas um stat(), nada é relido
+        assert reader.refresh() is False
+
+        writer.add(["d"])
+        assert reader.refresh() is True
+        assert reader.items == ["a", "b", "c", "d"]
+        assert reader.segment_loads == 3
+
+def test_compaction_and_clear_propagate():
+    """Compactação e limpeza feitas por um processo chegam aos demais"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        writer = ListIndex(data_dir, max_segments=2)
+        reader = ListIndex(data_dir)
+
+        for text in ["a", "b", "c"]:
+            writer.add([text])
+
+        manifest = writer.manifest.read()
+        assert manifest["base"] is not None
+        assert manifest["segments"] == []
+        assert list(writer.manifest.segments_dir.iterdir()) == []
+
+        assert reader.refresh() is True
+        assert reader.items == ["a", "b", "c"]
+
+        writer._reset_manifest()
+        assert reader.refresh() is True
+        assert reader.items == []
+
+def test_writer_does_not_lose_concurrent_segments():
+    """Dois escritores: a compactação de um inclui os segmentos do outro"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        first = ListIndex(data_dir)
+        second = ListIndex(data_dir)
+
+        first.add(["a"])
+        second.add(["b"])
+        first._compact()
+
+        fresh = ListIndex(data_dir)
+        assert sorted(fresh.items) == ["a", "b"]
+
+        assert second.refresh() is True
+        assert sorted(second.items) == ["a", "b"]
+
+def test_local_edit_survives_compaction_by_another_process():
+    """Edição local aplicada na compactação não é descartada quando outro processo já compactou"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        first = ListIndex(data_dir)
+        second = ListIndex(data_dir)
+
+        first.add(["a", "x"])
+        second.add(["b"])
+        second._compact()  # nova base: a de first fica obsoleta
+
+        generation = first._compact(lambda: first.items.remove("x"))
+        assert generation == first.manifest.read()["generation"]
+        assert sorted(first.items) == ["a", "b"]
+        assert sorted(ListIndex(data_dir).items) == ["a", "b"]
+
+        # Edição sem efeito: nada é gravado
+        assert first._compact(lambda: False) is None
+        assert first.manifest.read()["generation"] == generation
+
+if __name__ == "__main__":
+    test_reader_loads_only_new_segments()
+    test_compaction_and_clear_propagate()
+    test_writer_does_not_lose_concurrent_segments()
+    test_local_edit_survives_compaction_by_another_process()
+    print("✅ Testes do manifesto concluídos")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Testes do cache de respostas do agente
+"""
+
+import time
+import tempfile
+from pathlib import Path
+
+from response_cache import ResponseCache, make_cache_key
+
+def test_key_depends_on_context():
+    """Mesma pergunta em outra conversa, modo ou modelo gera outra chave"""
+    question = {"role": "user", "content": "E agora?"}
+    base = make_cache_key("m1", "sistema", "assistant", [question], temperature=0.7)
+    assert base == make_cache_key("m1", "sistema", "assistant", [question], temperature=0.7)
+    assert base != make_cache_key("m1", "sistema", "assistant",
+                                  [{"role": "assistant", "content": "Oi"}, question], temperature=0.7)
+    assert base != make_cache_key("m1", "sistema", "developer", [question], temperature=0.7)
+    assert base != make_cache_key("m2", "sistema", "assistant", [question], temperature=0.7)
+    assert base != make_cache_key("m1", "sistema", "assistant", [question], temperature=0.2)
+
+def test_lru_ttl_persistence_and_stats():
+    """Limite de entradas (LRU), expiração, cópia em disco e economia acumulada"""
+    cache = ResponseCache(max_entries=2, ttl=3600)
+    cache.put("a", "resposta a", tokens_used=100, response_time=2.0)
+    cache.put("b", "resposta b", tokens_used=50, response_time=1.0)
+    assert cache.get("a")["content"] == "resposta a"  # "a" passa a ser a mais recente
+    cache.put("c", "resposta c")
+    assert cache.get("b") is None and cache.get("a") and len(cache) == 2
+
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 1 and stats["evicted"] == 1
+    assert stats["tokens_saved"] == 200 and stats["latency_saved"] == 4.0
+    assert stats["hit_ratio"] == round(2 / 3, 4)
+
+    short = ResponseCache(ttl=0.05)
+    short.put("x", "velha")
+    time.sleep(0.1)
+    assert short.get("x") is None and short.stats()["expired"] == 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "cache.db")
+        first = ResponseCache(db_path=db_path)
+        first.put("k", "persistida", tokens_used=10)
+        first.close()
+
+        second = ResponseCache(db_path=db_path)
+        assert second.get("k")["content"] == "persistida"
+        assert second.stats()["disk_hits"] == 1
+        second.clear()
+        assert second.get("k") is None
+        second.close()
+
+if __name__ == "__main__":
+    test_key_depends_on_context()
+    test_lru_ttl_persistence_and_stats()
+    print("✅ Testes do cache de respostas passaram")
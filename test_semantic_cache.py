@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Testes do cache semântico de respostas
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+from semantic_cache import SemanticResponseCache
+
+VOCABULARY = ["list", "show", "docker", "containers", "running", "my", "git", "status", "delete"]
+
+def bag_of_words(texts):
+    """Embedder determinístico para os testes (contagem de palavras do vocabulário)"""
+    vectors = np.zeros((len(texts), len(VOCABULARY)), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.lower().split():
+            if word in VOCABULARY:
+                vectors[row, VOCABULARY.index(word)] += 1
+    return vectors
+
+def test_threshold_and_scopes():
+    """Paráfrase acima do limiar é servida; outro escopo ou prompt distante não"""
+    cache = SemanticResponseCache(embed_fn=bag_of_words, threshold=0.7)
+    cache.store("list docker containers", "docker ps", scope="assistant:m1", tokens_used=40, response_time=1.5)
+
+    hit = cache.lookup("List   running docker containers", scope="assistant:m1")
+    assert hit and hit["response"] == "docker ps" and hit["similarity"] >= 0.7
+    assert hit["matched_prompt"] == "list docker containers"
+    assert cache.lookup("list docker containers", scope="developer:m1") is None
+    assert cache.lookup("git status", scope="assistant:m1") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2
+    assert stats["tokens_avoided"] == 40 and stats["latency_avoided"] == 1.5
+
+def test_eviction_keeps_recently_used():
+    """Escopo cheio substitui a entrada usada há mais tempo"""
+    cache = SemanticResponseCache(embed_fn=bag_of_words, threshold=0.99, max_entries_per_scope=2)
+    cache.store("list docker containers", "docker ps")
+    cache.store("git status", "git status")
+    assert cache.lookup("list docker containers")
+    cache.store("delete containers", "docker rm")
+
+    assert cache.lookup("git status") is None
+    assert cache.lookup("list docker containers")["response"] == "docker ps"
+    assert cache.stats()["evicted"] == 1 and cache.stats()["scopes"] == {"default": 2}
+
+class _FakeClient:
+    """Cliente OpenRouter falso: responde com o número da chamada"""
+
+    def __init__(self, response_class):
+        self.response_class = response_class
+        self.calls = []
+
+    def chat_completion(self, messages, model, max_tokens, temperature):
+        self.calls.append(messages)
+        return self.response_class(f"resposta {len(self.calls)}", model, 10, 0.1, True)
+
+def test_agent_uses_semantic_cache_only_for_standalone_turns():
+    """Um follow-up depende da conversa: não é servido nem guardado pelo cache semântico"""
+    pytest.importorskip("requests")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as folder:
+        os.makedirs(os.path.join(folder, "logs"))
+        os.chdir(folder)  # o módulo do agente grava o log em logs/
+        try:
+            import ai_agente_mcp
+            agent = ai_agente_mcp.AiAgenteMCP(os.path.join(folder, "agent.json"))
+            agent.config["cache_enabled"] = False
+            agent.semantic_cache = SemanticResponseCache(embed_fn=bag_of_words, threshold=0.7)
+            client = agent.openrouter_client = _FakeClient(ai_agente_mcp.AgentResponse)
+
+            assert agent.process_message("list docker containers").content == "resposta 1"
+            agent.clear_history()
+
+            # Mesma pergunta como follow-up de outra conversa: vai ao modelo
+            agent.process_message("git status")
+            follow_up = agent.process_message("list running docker containers")
+            assert follow_up.content == "resposta 3" and len(client.calls[-1]) > 2
+            assert agent.semantic_cache.stats()["stored"] == 2
+
+            # Primeiro turno de uma conversa nova: servido pelo cache
+            agent.clear_history()
+            assert agent.process_message("list running docker containers").content == "resposta 1"
+            assert len(client.calls) == 3
+
+            # O cache semântico entra no relatório de memória do agente
+            usage = agent.get_memory_usage()
+            vectors = sum(index.vectors.nbytes for index in agent.semantic_cache._scopes.values())
+            assert vectors and usage["components"]["semantic_cache"] > vectors
+            assert usage["components"]["semantic_cache_model"] == 0  # embedder próprio, sem modelo carregado
+        finally:
+            os.chdir(cwd)
+
+if __name__ == "__main__":
+    test_threshold_and_scopes()
+    test_eviction_keeps_recently_used()
+    test_agent_uses_semantic_cache_only_for_standalone_turns()
+    print("✅ Testes do cache semântico passaram")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Teste da análise de sentimento em lote (sentiment_lexicon)
+"""
+
+import tempfile
+
+from sentiment_lexicon import (score_sentiment_batch, content_hash, SENTIMENT_VERSION,
+                               POSITIVE_WORDS, NEGATIVE_WORDS)
+from knowledge_store import KnowledgeStore
+
+def _reference(text):
+    """Implementação original, palavra por palavra"""
+    text_lower = text.lower()
+    positive_count = sum(1 for word in POSITIVE_WORDS if word in text_lower)
+    negative_count = sum(1 for word in NEGATIVE_WORDS if word in text_lower)
+    return positive_count, negative_count
+
+def test_batch_matches_word_by_word_scoring():
+    """Uma varredura por lote dá as mesmas contagens da versão original"""
+    texts = [
+        "This is GOOD, really great and good again",
+        "terrible, awful... the worst",
+        "baddisappointing",  # palavras coladas também contam (substring)
+        "",
+        "nothing to see",
+        "excellent\x00bad",
+        "goo", "d great",  # não pode casar entre documentos
+    ]
+    results = score_sentiment_batch(texts)
+    assert len(results) == len(texts)
+    for text, result in zip(texts, results):
+        assert (result["positive_words"], result["negative_words"]) == _reference(text), text
+
+    assert results[0]["sentiment"] == "positive" and results[0]["score"] == 2 / 3
+    assert results[1]["sentiment"] == "negative"
+    assert results[4] == {"text": "nothing to see...", "sentiment": "neutral", "score": 0.5,
+                          "positive_words": 0, "negative_words": 0}
+    assert results[6]["positive_words"] == 0
+    assert score_sentiment_batch([]) == []
+
+def test_results_are_stored_by_content_hash():
+    """Resultados gravados por hash permitem pular documentos já analisados"""
+    with tempfile.TemporaryDirectory() as store_dir:
+        store = KnowledgeStore(store_dir)
+        texts = ["great day", "awful day"]
+        keys = [content_hash(text) for text in texts]
+        store.save_sentiment_results(dict(zip(keys, score_sentiment_batch(texts))), SENTIMENT_VERSION)
+
+        found = store.get_sentiment_results(keys + [content_hash("novo")], SENTIMENT_VERSION)
+        assert set(found) == set(keys)
+        assert found[keys[1]]["sentiment"] == "negative"
+        assert store.get_sentiment_results(keys, "outra-versao") == {}
+        store.close()
+
+if __name__ == "__main__":
+    test_batch_matches_word_by_word_scoring()
+    test_results_are_stored_by_content_hash()
+    print("✅ Testes da análise de sentimento em lote concluídos")
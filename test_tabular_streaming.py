@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Teste da leitura em streaming de planilhas (tabular_streaming)
+"""
+
+import os
+import json
+import zipfile
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from tabular_streaming import iter_row_groups
+
+ODS_CONTENT = """<?xml version="1.0" encoding="UTF-8"?>
+<office:document-content
+    xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0"
+    xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0"
+    xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0">
+  <office:body><office:spreadsheet>
+    <table:table table:name="Vendas">
+      <table:table-row>
+        <table:table-cell><text:p>produto</text:p></table:table-cell>
+        <table:table-cell><text:p>valor</text:p></table:table-cell>
+      </table:table-row>
+      <table:table-row table:number-rows-repeated="2">
+        <table:table-cell><text:p>caneta</text:p></table:table-cell>
+        <table:table-cell><text:p>2</text:p></table:table-cell>
+        <table:table-cell table:number-columns-repeated="16382"/>
+      </table:table-row>
+      <table:table-row>
+        <table:table-cell><text:p>caderno</text:p></table:table-cell>
+        <table:table-cell><text:p>15</text:p></table:table-cell>
+      </table:table-row>
+      <table:table-row table:number-rows-repeated="1048570">
+        <table:table-cell table:number-columns-repeated="16384"/>
+      </table:table-row>
+    </table:table>
+    <table:table table:name="Vazia"/>
+  </office:spreadsheet></office:body>
+</office:document-content>
+"""
+
+def test_csv_groups_repeat_header_and_respect_limits():
+    """CSV é dividido em grupos com o cabeçalho e no máximo N linhas"""
+    with tempfile.TemporaryDirectory() as folder:
+        path = Path(folder) / "dados.csv"
+        lines = ["nome;idade"] + [f"pessoa{i};{i}" for i in range(1, 26)]
+        path.write_text("\n".join(lines), encoding="utf-8")
+
+        groups = list(iter_row_groups(path, rows_per_group=10))
+        assert [len(g.rows) for g in groups] == [10, 10, 5]
+        assert all(g.header == ["nome", "idade"] for g in groups)
+        assert (groups[1].start_row, groups[1].end_row) == (12, 21)
+
+        text = groups[0].to_text()
+        assert text.splitlines()[:3] == ["Linhas 2-11", "nome | idade", "pessoa1 | 1"]
+
+        # Limite de caracteres também fecha o grupo
+        small = list(iter_row_groups(path, rows_per_group=100, max_chars=120))
+        assert len(small) > 1
+        assert sum(len(g.rows) for g in small) == 25
+
+def test_ods_streams_rows_and_skips_repeated_empties():
+    """ODS: linhas repetidas expandidas, vazias ignoradas, nome da planilha no texto"""
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "planilha.ods")
+        with zipfile.ZipFile(path, "w") as archive:
+            archive.writestr("mimetype", "application/vnd.oasis.opendocument.spreadsheet")
+            archive.writestr("content.xml", ODS_CONTENT)
+
+        groups = list(iter_row_groups(path))
+        assert len(groups) == 1
+        group = groups[0]
+        assert group.sheet == "Vendas"
+        assert group.header == ["produto", "valor"]
+        assert group.rows == [["caneta", "2"], ["caneta", "2"], ["caderno", "15"]]
+        assert (group.start_row, group.end_row) == (2, 4)
+        assert group.to_text().startswith("Planilha: Vendas (linhas 2-4)")
+
+def test_system_ingest_writes_groups_to_store():
+    """Ingestão da planilha grava cada grupo no armazenamento; em memória só metadados"""
+    import knowledge_enhancement_system
+    from knowledge_enhancement_system import KnowledgeEnhancementSystem
+    
+    with tempfile.TemporaryDirectory() as folder:
+        path = Path(folder) / "dados.csv"
+        path.write_text("\n".join(["nome,idade"] + [f"pessoa{i},{i}" for i in range(1, 101)]), encoding="utf-8")
+        config_file = os.path.join(folder, "knowledge_config.json")
+        with open(config_file, "w") as f:
+            json.dump({"knowledge_store_dir": os.path.join(folder, "store"),
+                       "cluster_model_path": os.path.join(folder, "clusters.pkl"),
+                       "tabular_rows_per_group": 10, "extraction_processes": 0}, f)
+        system = KnowledgeEnhancementSystem(config_file)
+        
+        # Extrator devolve os grupos sob demanda, não um texto único
+        processor = system.document_processor
+        assert not isinstance(processor.supported_formats[".csv"](path), str)
+        with pytest.raises(ValueError):
+            processor.process_document(str(path))
+        
+        knowledge_enhancement_system.TABULAR_WRITE_BATCH, batch = 3, knowledge_enhancement_system.TABULAR_WRITE_BATCH
+        try:
+            result = system._process_tabular_document_task({"file_path": str(path)})
+        finally:
+            knowledge_enhancement_system.TABULAR_WRITE_BATCH = batch
+        assert result["status"] == "success" and result["chunks"] == 10
+        assert all("content" not in doc and doc["store_id"] for doc in system.processed_documents)
+        assert system.knowledge_store.stats()["documents"] == 10
+        assert system.knowledge_base[9].splitlines()[:3] == ["Linhas 92-101", "nome | idade", "pessoa91 | 91"]
+        
+        # Reingestão substitui os grupos anteriores
+        system._process_tabular_document_task({"file_path": str(path)})
+        assert len(system.processed_documents) == 10
+        system.save_knowledge_base()
+        assert system.knowledge_store.stats()["documents"] == 10
+        system.stop_processing()
+
+if __name__ == "__main__":
+    test_csv_groups_repeat_header_and_respect_limits()
+    test_ods_streams_rows_and_skips_repeated_empties()
+    test_system_ingest_writes_groups_to_store()
+    print("✅ Testes de leitura em streaming concluídos")
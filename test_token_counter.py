@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Testes do contador de tokens (famílias, cache, lote e estimador calibrado)
+"""
+
+from token_counter import TokenCounter, tokenizer_family
+
+class CountingCounter(TokenCounter):
+    """Simula o tiktoken (1 token por palavra) e registra cada tokenização"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = []
+
+    def family(self, model):
+        return tokenizer_family(model)
+
+    def _exact(self, family, texts):
+        self.calls.append((family, list(texts)))
+        return [len(text.split()) for text in texts]
+
+def test_families_and_estimator_calibration():
+    """Modelos OpenAI mapeiam para encodings; os demais usam estimador calibrável"""
+    assert tokenizer_family("openai/gpt-4o-mini") == "tiktoken:o200k_base"
+    assert tokenizer_family("gpt-4") == "tiktoken:cl100k_base"
+    assert tokenizer_family("openai/gpt-3.5-turbo") == "tiktoken:cl100k_base"
+    assert tokenizer_family("anthropic/claude-3-opus") == "estimate:anthropic"
+    assert tokenizer_family("cohere/command-r-plus") == "estimate:default"
+
+    counter = TokenCounter()
+    assert counter.estimate(0, "anthropic/claude-3-haiku") == 0
+    assert counter.estimate(350, "anthropic/claude-3-haiku") == 100
+    before = counter.estimate(10_000, "anthropic/claude-3-haiku")
+
+    # Uso real com 2 caracteres por token puxa a razão para baixo
+    for _ in range(10):
+        counter.calibrate("anthropic/claude-3-opus", 2000, 1000)
+    after = counter.estimate(10_000, "anthropic/claude-3-haiku")
+    assert after > before
+    assert counter.estimate(10_000, "google/gemini-pro") == 2500
+
+def test_batch_cache_and_family_reuse():
+    """Textos repetidos e modelos da mesma família são tokenizados uma única vez"""
+    counter = CountingCounter(exact_char_limit=100)
+    texts = ["um dois três", "quatro cinco", "um dois três"]
+    assert counter.count_batch(texts, "openai/gpt-4") == [3, 2, 3]
+    assert counter.calls == [("tiktoken:cl100k_base", ["um dois três", "quatro cinco"])]
+
+    assert counter.count("um dois três", "openai/gpt-3.5-turbo") == 3
+    assert len(counter.calls) == 1 and counter.stats()["hits"] == 1
+
+    counts = counter.count_for_models("a b c d", ["openai/gpt-4", "openai/gpt-4-turbo",
+                                                  "openai/gpt-4o", "anthropic/claude-3-opus"])
+    assert counts["openai/gpt-4"] == counts["openai/gpt-4-turbo"] == counts["openai/gpt-4o"] == 4
+    assert [family for family, _ in counter.calls[1:]] == ["tiktoken:cl100k_base", "tiktoken:o200k_base"]
+    assert counts["anthropic/claude-3-opus"] == 2
+
+    # Acima do limite a contagem exata só acontece se pedida
+    long_text = "palavra " * 50
+    calls = len(counter.calls)
+    assert counter.count(long_text, "openai/gpt-4") == 100
+    assert len(counter.calls) == calls
+    assert counter.count(long_text, "openai/gpt-4", exact=True) == 50
+
+if __name__ == "__main__":
+    test_families_and_estimator_calibration()
+    test_batch_cache_and_family_reuse()
+    print("✅ Testes do contador de tokens passaram")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Testes do registro de uso com agregados diários
+"""
+
+import json
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from usage_ledger import UsageLedger
+
+def _day(offset: int) -> str:
+    return (datetime.now() - timedelta(days=offset)).replace(microsecond=0).isoformat()
+
+def test_rollups_survive_restart_and_windows():
+    """Agregados incrementais, reabertura com replay após o checkpoint e janelas por dia"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = UsageLedger(tmp, checkpoint_every=3)
+        ledger.append("m1", 100, 50, 0.01, _day(0))
+        ledger.append("m2", 10, 5, 0.001, _day(0))
+        ledger.append("m1", 200, 100, 0.02, _day(3))
+        ledger.append("m1", 1, 1, 0.5, _day(40))  # depois do checkpoint: relido ao abrir
+
+        reopened = UsageLedger(tmp, checkpoint_every=3)
+        assert reopened.rollups == ledger.rollups
+
+        week = reopened.summary(7)
+        assert week["total_requests"] == 3
+        assert week["total_input_tokens"] == 310 and week["total_output_tokens"] == 155
+        assert week["model_usage"]["m1"]["requests"] == 2
+        assert week["total_cost"] == 0.031
+        assert reopened.summary(1)["total_requests"] == 2
+        assert reopened.summary(60)["total_requests"] == 4
+        assert [d["requests"] for d in reopened.daily(7)] == [1, 2]
+
+def test_compaction_and_migration():
+    """Compactar remove registros brutos antigos sem alterar os totais; JSON antigo é migrado"""
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = Path(tmp) / "openrouter_usage.json"
+        with open(legacy, "w", encoding="utf-8") as f:
+            json.dump([
+                {"timestamp": _day(90), "model": "m1", "input_tokens": 5, "output_tokens": 5,
+                 "total_tokens": 10, "cost": 0.1, "model_info": {}},
+                {"timestamp": _day(1), "model": "m1", "input_tokens": 7, "output_tokens": 3,
+                 "total_tokens": 10, "cost": 0.2, "model_info": {}},
+            ], f)
+
+        ledger = UsageLedger(str(Path(tmp) / "ledger"), retention_days=30)
+        assert ledger.migrate_json(str(legacy)) == 2
+        assert not legacy.exists() and ledger.migrate_json(str(legacy)) == 0
+
+        before = ledger.summary(365)
+        assert ledger.compact() == 1
+        assert len(ledger.recent_records()) == 1
+        assert ledger.summary(365) == before
+
+        ledger.append("m2", 1, 1, 0.0)
+        reopened = UsageLedger(str(Path(tmp) / "ledger"))
+        assert reopened.generation == 1
+        assert reopened.summary(365)["total_requests"] == 3
+
+def test_torn_write_and_invalid_legacy_records():
+    """Linha incompleta é descartada ao abrir; registros antigos sem modelo são ignorados"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = UsageLedger(tmp)
+        ledger.append("m1", 10, 5, 0.01, _day(0))
+        with open(ledger.records_path, "ab") as f:
+            f.write(b'{"timestamp": "2024-01-01T00:00:00", "mod')  # gravação interrompida
+
+        reopened = UsageLedger(tmp)
+        reopened.append("m2", 1, 1, 0.0, _day(0))
+        assert [r["model"] for r in reopened.recent_records()] == ["m1", "m2"]
+        assert UsageLedger(tmp).summary(1)["total_requests"] == 2
+
+        with open(ledger.records_path, "ab") as f:
+            f.write(b"lixo\n")
+        assert len(reopened.recent_records()) == 2
+
+        legacy = Path(tmp) / "openrouter_usage.json"
+        with open(legacy, "w", encoding="utf-8") as f:
+            json.dump([{"timestamp": _day(1), "input_tokens": 7, "cost": 0.2},
+                       {"timestamp": _day(1), "model": "m3", "input_tokens": 7, "cost": 0.2}], f)
+        assert reopened.migrate_json(str(legacy)) == 1
+        assert reopened.summary(7)["model_usage"]["m3"]["requests"] == 1
+
+if __name__ == "__main__":
+    test_rollups_survive_restart_and_windows()
+    test_compaction_and_migration()
+    test_torn_write_and_invalid_legacy_records()
+    print("✅ Testes do registro de uso passaram")
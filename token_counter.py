@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Contagem de tokens com encoders em cache e API em lote
+Modelos que compartilham o mesmo tokenizador (família) reaproveitam uma única
+contagem; encoders do tiktoken são criados uma vez por família. Modelos sem
+tokenizador conhecido usam um estimador de caracteres por token calibrável
+com o uso real informado pelas APIs.
+"""
+
+import math
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+
+from lazy_imports import module_available, lazy_import
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TIKTOKEN_AVAILABLE = module_available("tiktoken")
+if TIKTOKEN_AVAILABLE:
+    tiktoken = lazy_import("tiktoken")
+
+# Prefixos de modelo (sem o provedor do OpenRouter) -> encoding do tiktoken; o mais específico primeiro
+TIKTOKEN_FAMILIES = [
+    ("gpt-4o", "o200k_base"),
+    ("o1", "o200k_base"),
+    ("o3", "o200k_base"),
+    ("gpt-4", "cl100k_base"),
+    ("gpt-3.5", "cl100k_base"),
+    ("text-embedding-3", "cl100k_base"),
+]
+
+# Caracteres por token iniciais do estimador, por provedor
+ESTIMATE_CHARS_PER_TOKEN = {
+    "anthropic": 3.5,
+    "google": 4.0,
+    "meta-llama": 3.8,
+    "mistralai": 3.6,
+    "deepseek": 3.8,
+    "qwen": 3.7,
+    "default": 4.0,
+}
+
+# Peso (em tokens) da estimativa inicial frente às amostras de calibração
+CALIBRATION_PRIOR_TOKENS = 2000
+# Acima deste tamanho, contagem exata só se pedida explicitamente
+DEFAULT_EXACT_CHAR_LIMIT = 50_000
+
+def tokenizer_family(model: str) -> str:
+    """"tiktoken:<encoding>" para modelos OpenAI; "estimate:<provedor>" para os demais"""
+    provider, _, name = model.rpartition("/")
+    if provider in ("", "openai"):
+        for prefix, encoding in TIKTOKEN_FAMILIES:
+            if name.startswith(prefix):
+                return f"tiktoken:{encoding}"
+    provider = provider.split("/")[0] if provider else "default"
+    return f"estimate:{provider if provider in ESTIMATE_CHARS_PER_TOKEN else 'default'}"
+
+@lru_cache(maxsize=None)
+def get_encoding(name: str):
+    """Encoder do tiktoken, criado uma vez por processo"""
+    return tiktoken.get_encoding(name)
+
+def _text_key(text: str):
+    # Textos longos entram no cache pelo hash, não pelo conteúdo
+    return text if len(text) <= 256 else (len(text), hashlib.sha1(text.encode("utf-8", "surrogatepass")).digest())
+
+class TokenCounter:
+    """Contagens exatas (tiktoken) ou estimadas, com cache por família e texto"""
+
+    def __init__(self, cache_size: int = 4096, exact_char_limit: int = DEFAULT_EXACT_CHAR_LIMIT):
+        self.cache_size = cache_size
+        self.exact_char_limit = exact_char_limit
+        self._cache: "OrderedDict[Tuple[str, Any], int]" = OrderedDict()
+        self._calibration: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "exact": 0, "estimated": 0}
+        # Encodings que não puderam ser carregados (ex.: sem rede para baixar o arquivo BPE)
+        self._unavailable: set = set()
+
+    def family(self, model: str) -> str:
+        family = tokenizer_family(model)
+        if family.startswith("tiktoken:") and (not TIKTOKEN_AVAILABLE or family in self._unavailable):
+            return "estimate:default"
+        return family
+
+    def chars_per_token(self, family: str) -> float:
+        """Razão calibrada do estimador para a família"""
+        provider = family.split(":", 1)[1] if family.startswith("estimate:") else "default"
+        prior = ESTIMATE_CHARS_PER_TOKEN.get(provider, ESTIMATE_CHARS_PER_TOKEN["default"])
+        chars, tokens = self._calibration.get(family, (0.0, 0.0))
+        return (prior * CALIBRATION_PRIOR_TOKENS + chars) / (CALIBRATION_PRIOR_TOKENS + tokens)
+
+    def estimate(self, text_or_chars, model: str = "default") -> int:
+        """Estimativa O(1) a partir do número de caracteres"""
+        chars = text_or_chars if isinstance(text_or_chars, int) else len(text_or_chars)
+        if chars <= 0:
+            return 0
+        family = self.family(model)
+        if family.startswith("tiktoken:"):
+            family = "estimate:default"
+        return max(1, math.ceil(chars / self.chars_per_token(family)))
+
+    def calibrate(self, model: str, text_or_chars, actual_tokens: int):
+        """Ajusta o estimador da família com o número real de tokens (ex.: usage da API)"""
+        family = self.family(model)
+        chars = text_or_chars if isinstance(text_or_chars, int) else len(text_or_chars)
+        if not family.startswith("estimate:") or chars <= 0 or actual_tokens <= 0:
+            return
+        with self._lock:
+            total_chars, total_tokens = self._calibration.get(family, (0.0, 0.0))
+            self._calibration[family] = [total_chars + chars, total_tokens + actual_tokens]
+
+    def _exact(self, family: str, texts: List[str]) -> List[int]:
+        encoding = get_encoding(family.split(":", 1)[1])
+        # encode_ordinary não falha com textos que contêm tokens especiais (<|endoftext|>)
+        if len(texts) == 1:
+            return [len(encoding.encode_ordinary(texts[0]))]
+        return [len(tokens) for tokens in encoding.encode_ordinary_batch(texts)]
+
+    def count_batch(self, texts: List[str], model: str = "gpt-4", exact: Optional[bool] = None) -> List[int]:
+        """Contagem de vários textos; os que não estão no cache são tokenizados em um lote
+
+        exact=None conta exatamente até exact_char_limit caracteres e estima acima disso.
+        """
+        family = self.family(model)
+        results: List[Optional[int]] = [None] * len(texts)
+        missing: Dict[Any, List[int]] = {}
+
+        with self._lock:
+            for position, text in enumerate(texts):
+                key = (family, _text_key(text))
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    self._stats["hits"] += 1
+                    results[position] = cached
+                else:
+                    missing.setdefault(key, []).append(position)
+
+        if not missing:
+            return results
+
+        exact_keys, exact_texts = [], []
+        for key, positions in missing.items():
+            text = texts[positions[0]]
+            use_exact = family.startswith("tiktoken:") and (
+                exact or (exact is None and len(text) <= self.exact_char_limit))
+            if use_exact:
+                exact_keys.append(key)
+                exact_texts.append(text)
+            else:
+                # Estimativas não entram no cache: são O(1) e mudam com a calibração
+                estimate = self.estimate(len(text), model)
+                with self._lock:
+                    self._stats["estimated"] += 1
+                for position in positions:
+                    results[position] = estimate
+
+        if exact_texts:
+            try:
+                counts = self._exact(family, exact_texts)
+            except Exception as e:
+                logger.error(f"Erro ao contar tokens com {family}, usando estimativa: {e}")
+                self._unavailable.add(family)
+                for key, text in zip(exact_keys, exact_texts):
+                    for position in missing[key]:
+                        results[position] = self.estimate(len(text), model)
+                return results
+            for key, count in zip(exact_keys, counts):
+                self._store(key, missing[key], results, count)
+
+        return results
+
+    def _store(self, key, positions: List[int], results: List[Optional[int]], count: int):
+        with self._lock:
+            self._stats["exact"] += 1
+            self._cache[key] = count
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        for position in positions:
+            results[position] = count
+
+    def count(self, text: str, model: str = "gpt-4", exact: Optional[bool] = None) -> int:
+        """Tokens de um texto para o modelo"""
+        return self.count_batch([text], model, exact)[0]
+
+    def count_for_models(self, text: str, models: Iterable[str],
+                         exact: Optional[bool] = None) -> Dict[str, int]:
+        """Contagem por modelo, tokenizando uma vez por família de tokenizador"""
+        by_family: Dict[str, int] = {}
+        counts = {}
+        for model in models:
+            family = self.family(model)
+            if family.startswith("tiktoken:"):
+                if family not in by_family:
+                    by_family[family] = self.count(text, model, exact)
+                counts[model] = by_family[family]
+            else:
+                counts[model] = self.estimate(len(text), model)
+        return counts
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["cached_counts"] = len(self._cache)
+            stats["tiktoken"] = TIKTOKEN_AVAILABLE
+            stats["calibration"] = {family: round(self.chars_per_token(family), 3)
+                                    for family in self._calibration}
+            return stats
+
+_shared_counter: Optional[TokenCounter] = None
+_shared_lock = threading.Lock()
+
+def get_token_counter() -> TokenCounter:
+    """Contador compartilhado pelo processo (encoders, cache e calibração)"""
+    global _shared_counter
+    if _shared_counter is None:
+        with _shared_lock:
+            if _shared_counter is None:
+                _shared_counter = TokenCounter()
+    return _shared_counter
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Registro de uso só-de-acréscimo com agregados diários por modelo
+Cada requisição vira uma linha JSONL (sem reescrever o arquivo); os totais por
+dia e modelo são mantidos incrementalmente, então um resumo de qualquer janela
+custa O(dias x modelos). Registros brutos antigos são compactados: saem do
+JSONL, mas continuam contados nos agregados.
+"""
+
+import os
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = "rollups.json"
+DEFAULT_RETENTION_DAYS = 30
+DEFAULT_CHECKPOINT_EVERY = 100
+
+ROLLUP_FIELDS = ("requests", "input_tokens", "output_tokens", "cost")
+
+def _empty_rollup() -> Dict[str, float]:
+    return {"requests": 0, "input_tokens": 0, "output_tokens": 0, "cost": 0.0}
+
+class UsageLedger:
+    """JSONL de registros + checkpoint dos agregados diários
+
+    O checkpoint guarda os agregados e até que posição (bytes) do JSONL eles
+    já incluem; ao abrir, só o trecho posterior é relido.
+    """
+
+    def __init__(self, ledger_dir: str = "config/usage_ledger",
+                 retention_days: int = DEFAULT_RETENTION_DAYS,
+                 checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY):
+        self.ledger_dir = Path(ledger_dir)
+        self.ledger_dir.mkdir(parents=True, exist_ok=True)
+        self.retention_days = retention_days
+        self.checkpoint_every = checkpoint_every
+        self._lock = threading.Lock()
+
+        # dia (AAAA-MM-DD) -> modelo -> totais
+        self.rollups: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self.generation = 0
+        self._offset = 0
+        self._pending = 0
+        self._load()
+
+    @property
+    def records_path(self) -> Path:
+        return self.ledger_dir / f"records-{self.generation:04d}.jsonl"
+
+    def _load(self):
+        checkpoint_path = self.ledger_dir / CHECKPOINT_FILE
+        if checkpoint_path.exists():
+            try:
+                with open(checkpoint_path, 'r', encoding='utf-8') as f:
+                    checkpoint = json.load(f)
+                self.rollups = checkpoint.get("rollups", {})
+                self.generation = checkpoint.get("generation", 0)
+                self._offset = checkpoint.get("offset", 0)
+            except Exception as e:
+                logger.error(f"Erro ao carregar checkpoint do registro de uso: {e}")
+                self.rollups, self._offset = {}, 0
+
+        # Registros gravados depois do último checkpoint
+        if self.records_path.exists():
+            with open(self.records_path, 'r+b') as f:
+                f.seek(self._offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # linha incompleta (gravação interrompida)
+                    try:
+                        self._add_to_rollups(json.loads(line))
+                    except Exception as e:
+                        logger.error(f"Registro de uso inválido ignorado: {e}")
+                    self._offset += len(line)
+                    self._pending += 1
+                # Descarta o fragmento final, senão o próximo append seria concatenado a ele
+                if f.seek(0, os.SEEK_END) > self._offset:
+                    logger.warning(f"Registro incompleto descartado em {self.records_path}")
+                    f.truncate(self._offset)
+
+    def _add_to_rollups(self, record: Dict[str, Any]):
+        day = record["timestamp"][:10]
+        totals = self.rollups.setdefault(day, {}).setdefault(record["model"], _empty_rollup())
+        totals["requests"] += 1
+        totals["input_tokens"] += record.get("input_tokens", 0)
+        totals["output_tokens"] += record.get("output_tokens", 0)
+        totals["cost"] += record.get("cost", 0.0)
+
+    def _write_checkpoint(self):
+        checkpoint_path = self.ledger_dir / CHECKPOINT_FILE
+        tmp_path = checkpoint_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"generation": self.generation, "offset": self._offset,
+                       "rollups": self.rollups}, f, ensure_ascii=False)
+        os.replace(tmp_path, checkpoint_path)
+        self._pending = 0
+
+    def append(self, model: str, input_tokens: int, output_tokens: int, cost: float,
+               timestamp: Optional[str] = None) -> Dict[str, Any]:
+        """Acrescenta um registro e atualiza os agregados do dia"""
+        record = {
+            "timestamp": timestamp or datetime.now().isoformat(),
+            "model": model,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+            "cost": cost
+        }
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            with open(self.records_path, 'ab') as f:
+                f.write(line)
+            self._offset += len(line)
+            self._add_to_rollups(record)
+            self._pending += 1
+            if self._pending >= self.checkpoint_every:
+                self._write_checkpoint()
+        return record
+
+    def summary(self, days: int = 30, today: Optional[str] = None) -> Dict[str, Any]:
+        """Totais dos últimos `days` dias (incluindo hoje), geral e por modelo"""
+        today = today or datetime.now().date().isoformat()
+        first_day = (datetime.fromisoformat(today) - timedelta(days=days - 1)).date().isoformat()
+
+        model_usage: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            for day, models in self.rollups.items():
+                if not first_day <= day <= today:
+                    continue
+                for model, totals in models.items():
+                    target = model_usage.setdefault(model, _empty_rollup())
+                    for field in ROLLUP_FIELDS:
+                        target[field] += totals[field]
+
+        if not model_usage:
+            return {}
+
+        total_requests = sum(m["requests"] for m in model_usage.values())
+        total_input_tokens = sum(m["input_tokens"] for m in model_usage.values())
+        total_output_tokens = sum(m["output_tokens"] for m in model_usage.values())
+        total_cost = sum(m["cost"] for m in model_usage.values())
+        return {
+            "period_days": days,
+            "total_requests": total_requests,
+            "total_input_tokens": total_input_tokens,
+            "total_output_tokens": total_output_tokens,
+            "total_tokens": total_input_tokens + total_output_tokens,
+            "total_cost": round(total_cost, 6),
+            "average_cost_per_request": round(total_cost / total_requests, 6) if total_requests > 0 else 0,
+            "model_usage": model_usage
+        }
+
+    def daily(self, days: int = 30) -> List[Dict[str, Any]]:
+        """Totais por dia (para gráficos), do mais antigo ao mais recente"""
+        first_day = (datetime.now() - timedelta(days=days - 1)).date().isoformat()
+        with self._lock:
+            result = []
+            for day in sorted(d for d in self.rollups if d >= first_day):
+                totals = _empty_rollup()
+                for model_totals in self.rollups[day].values():
+                    for field in ROLLUP_FIELDS:
+                        totals[field] += model_totals[field]
+                result.append({"day": day, **totals})
+            return result
+
+    def recent_records(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Registros brutos ainda não compactados (mais antigos primeiro)"""
+        if not self.records_path.exists():
+            return []
+        records = []
+        with self._lock, open(self.records_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    logger.warning("Registro de uso ilegível ignorado")
+        return records[-limit:] if limit else records
+
+    def compact(self, retention_days: Optional[int] = None) -> int:
+        """Remove do JSONL registros mais antigos que a retenção; retorna quantos saíram
+
+        Os agregados não mudam. Um novo arquivo de registros (nova geração) é
+        escrito e o checkpoint passa a apontar para ele de forma atômica.
+        """
+        retention_days = self.retention_days if retention_days is None else retention_days
+        cutoff = (datetime.now() - timedelta(days=retention_days)).date().isoformat()
+
+        with self._lock:
+            if not self.records_path.exists():
+                return 0
+            old_path = self.records_path
+            kept, removed = [], 0
+            with open(old_path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        continue
+                    try:
+                        day = json.loads(line)["timestamp"][:10]
+                    except Exception:
+                        removed += 1
+                        continue
+                    if day < cutoff:
+                        removed += 1
+                    else:
+                        kept.append(line)
+            if removed == 0:
+                return 0
+
+            self.generation += 1
+            with open(self.records_path, 'wb') as f:
+                f.writelines(kept)
+            self._offset = sum(len(line) for line in kept)
+            self._write_checkpoint()
+            old_path.unlink()
+
+        logger.info(f"Registro de uso compactado: {removed} registros antigos removidos")
+        return removed
+
+    def migrate_json(self, json_path: str) -> int:
+        """Importa o histórico antigo (lista JSON) e renomeia o arquivo para .migrated"""
+        json_path = Path(json_path)
+        if not json_path.exists():
+            return 0
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+        except Exception as e:
+            logger.error(f"Erro ao ler histórico antigo {json_path}: {e}")
+            return 0
+
+        migrated = 0
+        for record in sorted(records, key=lambda r: str(r.get("timestamp", ""))):
+            if not record.get("model"):
+                logger.warning(f"Registro sem modelo ignorado na migração: {record}")
+                continue
+            self.append(record["model"], record.get("input_tokens", 0), record.get("output_tokens", 0),
+                        record.get("cost", 0.0), record.get("timestamp"))
+            migrated += 1
+        with self._lock:
+            self._write_checkpoint()
+        json_path.rename(json_path.with_suffix(json_path.suffix + ".migrated"))
+        logger.info(f"{migrated} registros migrados de {json_path}")
+        return migrated
+
+    def flush(self):
+        """Grava o checkpoint dos agregados"""
+        with self._lock:
+            if self._pending:
+                self._write_checkpoint()